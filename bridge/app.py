@@ -1,9 +1,14 @@
 import os
 import asyncio
+import hashlib
+import itertools
+import json
+import uuid
+from collections import deque
 from datetime import datetime, timedelta, timezone
 from fastapi import FastAPI, Query
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 import threading
 import time
 
@@ -23,6 +28,22 @@ _calendar_cache = {}
 _cache_lock = threading.Lock()
 CACHE_TTL_SECONDS = 120  # Cache for 2 minutes given slow JXA execution
 
+# Calendar change feed: sequence-numbered deltas so consumers fetch only what changed.
+# Tokens are "<feed_id>:<seq>"; the feed id changes when the bridge restarts.
+# In live mode every scan lists the whole window through JXA, so bridge load grows
+# with the number of events in the window; widen the interval on large calendars.
+CALENDAR_CHANGE_LOG_SIZE = 10000
+CALENDAR_CHANGE_SCAN_SECONDS = float(os.getenv("CALENDAR_CHANGE_SCAN_SECONDS", "15"))
+CALENDAR_CHANGE_PAST_DAYS = int(os.getenv("CALENDAR_CHANGE_PAST_DAYS", "7"))
+CALENDAR_CHANGE_FUTURE_DAYS = int(os.getenv("CALENDAR_CHANGE_FUTURE_DAYS", "30"))
+CALENDAR_CHANGE_SCAN_LIMIT = int(os.getenv("CALENDAR_CHANGE_SCAN_LIMIT", "5000"))
+_calendar_feed_id = uuid.uuid4().hex[:8]
+_calendar_change_log = deque(maxlen=CALENDAR_CHANGE_LOG_SIZE)
+_calendar_change_seq = 0
+_calendar_change_signal = asyncio.Event()
+_calendar_snapshot: Dict[str, tuple] = {}  # event_id -> (checksum, event)
+_calendar_scan_task = None
+
 
 class MailMessage(BaseModel):
     id: str
@@ -289,6 +310,119 @@ async def _fetch_live_calendar_async(operation: str, **kwargs) -> List:
         print(f"[bridge] JXA Calendar {operation} timed out after 60s")
         return []
 
+def _calendar_event_checksum(event: dict) -> str:
+    """Checksum over the fields that change calendar answers."""
+    fields = {key: event.get(key) for key in ("title", "start", "end", "all_day", "calendar", "location", "attendees")}
+    return hashlib.sha256(json.dumps(fields, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _record_calendar_change(operation: str, event: dict, previous: Optional[dict] = None) -> None:
+    """Append a change to the feed and wake long-polling consumers."""
+    global _calendar_change_seq, _calendar_change_signal
+    
+    _calendar_change_seq += 1
+    _calendar_change_log.append({
+        "seq": _calendar_change_seq,
+        "operation": operation,
+        "event_id": event.get("id"),
+        "calendar": event.get("calendar"),
+        "event": event,
+        "previous": {"start": previous.get("start"), "end": previous.get("end")} if previous else None,
+        "changed_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    })
+    
+    if operation == "deleted":
+        _calendar_snapshot.pop(event.get("id"), None)
+    else:
+        _calendar_snapshot[event.get("id")] = (_calendar_event_checksum(event), event)
+    
+    _calendar_change_signal.set()
+    _calendar_change_signal = asyncio.Event()
+
+
+async def _scan_calendar_changes(baseline: bool = False) -> int:
+    """Diff the live calendar window against the last snapshot by checksum."""
+    now = datetime.now(timezone.utc)
+    window_start = now - timedelta(days=CALENDAR_CHANGE_PAST_DAYS)
+    events = await _fetch_live_calendar_async(
+        "list_events",
+        start_date=window_start.isoformat(),
+        end_date=(now + timedelta(days=CALENDAR_CHANGE_FUTURE_DAYS)).isoformat(),
+        limit=CALENDAR_CHANGE_SCAN_LIMIT
+    )
+    if not events and _calendar_snapshot:
+        return 0  # JXA failures also return nothing; keep the snapshot
+    
+    # JXA has no offset, so a scan that hits the limit has not seen the whole window.
+    # Events past the cutoff are missing, not deleted.
+    truncated = len(events) >= CALENDAR_CHANGE_SCAN_LIMIT
+    if truncated:
+        print(f"[bridge] calendar change scan hit CALENDAR_CHANGE_SCAN_LIMIT={CALENDAR_CHANGE_SCAN_LIMIT}; "
+              f"skipping deletions, raise the limit or shorten the window")
+    
+    current = {event.get("id"): event for event in events if event.get("id")}
+    if baseline:
+        for event_id, event in current.items():
+            _calendar_snapshot[event_id] = (_calendar_event_checksum(event), event)
+        return 0
+    
+    changes = 0
+    for event_id, event in current.items():
+        known = _calendar_snapshot.get(event_id)
+        if known is None:
+            _record_calendar_change("created", event)
+            changes += 1
+        elif known[0] != _calendar_event_checksum(event):
+            _record_calendar_change("updated", event, previous=known[1])
+            changes += 1
+    
+    if truncated:
+        return changes
+    
+    for event_id in set(_calendar_snapshot) - set(current):
+        previous = _calendar_snapshot[event_id][1]
+        try:
+            ended = datetime.fromisoformat(str(previous.get("end")).replace("Z", "+00:00"))
+            if ended.tzinfo is None:
+                ended = ended.replace(tzinfo=timezone.utc)
+        except ValueError:
+            ended = now
+        if ended < window_start:
+            # Aged out of the scan window rather than deleted
+            _calendar_snapshot.pop(event_id, None)
+            continue
+        _record_calendar_change("deleted", previous)
+        changes += 1
+    
+    return changes
+
+
+async def _calendar_scan_loop() -> None:
+    """Single shared scanner feeding the change log in live mode."""
+    await _scan_calendar_changes(baseline=True)
+    while True:
+        await asyncio.sleep(CALENDAR_CHANGE_SCAN_SECONDS)
+        try:
+            changes = await _scan_calendar_changes()
+            if changes:
+                print(f"[bridge] calendar change scan recorded {changes} changes")
+        except Exception as e:
+            print(f"[bridge] calendar change scan failed: {e}")
+
+
+def _ensure_calendar_scanner() -> None:
+    global _calendar_scan_task
+    if CALENDAR_BRIDGE_MODE == "live" and (_calendar_scan_task is None or _calendar_scan_task.done()):
+        _calendar_scan_task = asyncio.create_task(_calendar_scan_loop())
+
+
+def _calendar_changes_since(since_seq: int, limit: int) -> List[dict]:
+    if not _calendar_change_log:
+        return []
+    start = max(0, since_seq - _calendar_change_log[0]["seq"] + 1)
+    return list(itertools.islice(_calendar_change_log, start, start + limit))
+
+
 @app.get("/v1/mail/messages")
 async def mail_messages(
     mailbox: str = Query("Inbox"),
@@ -772,6 +906,45 @@ async def get_calendar_events(
     return events
 
 
+@app.get("/v1/calendar/changes")
+async def get_calendar_changes(
+    since: Optional[str] = Query(None, description="Sync token from a previous response"),
+    wait: float = Query(0.0, ge=0.0, le=60.0, description="Seconds to long-poll when nothing has changed"),
+    limit: int = Query(500, ge=1, le=5000, description="Maximum number of changes to return")
+):
+    """Get calendar changes since a sync token, optionally long-polling for new ones."""
+    _ensure_calendar_scanner()
+    
+    current_token = f"{_calendar_feed_id}:{_calendar_change_seq}"
+    if since is None:
+        return {"changes": [], "next_token": current_token, "has_more": False, "reset_required": False}
+    
+    feed_id, _, seq_text = since.partition(":")
+    oldest_seq = _calendar_change_log[0]["seq"] if _calendar_change_log else _calendar_change_seq + 1
+    try:
+        since_seq = int(seq_text)
+    except ValueError:
+        since_seq = -1
+    if feed_id != _calendar_feed_id or since_seq < oldest_seq - 1 or since_seq > _calendar_change_seq:
+        # Token from another bridge run or older than the retained log: resync from a snapshot
+        return {"changes": [], "next_token": current_token, "has_more": False, "reset_required": True}
+    
+    if since_seq == _calendar_change_seq and wait > 0:
+        try:
+            await asyncio.wait_for(_calendar_change_signal.wait(), timeout=wait)
+        except asyncio.TimeoutError:
+            pass
+    
+    changes = _calendar_changes_since(since_seq, limit)
+    next_seq = changes[-1]["seq"] if changes else since_seq
+    return {
+        "changes": changes,
+        "next_token": f"{_calendar_feed_id}:{next_seq}",
+        "has_more": next_seq < _calendar_change_seq,
+        "reset_required": False
+    }
+
+
 @app.get("/v1/calendar/event/{event_id}")
 async def get_calendar_event(event_id: str):
     """Get a specific calendar event by ID."""
@@ -827,6 +1000,8 @@ async def create_calendar_event(event_data: dict):
             live_data = await _fetch_live_calendar_async("create_event", event_data=event_data)
             if live_data and live_data[0]:
                 print(f"[bridge] created calendar event: {live_data[0].get('title')}")
+                if live_data[0].get("id"):
+                    _record_calendar_change("created", live_data[0])
                 return live_data[0]
             else:
                 return {"error": "Event creation failed", "created": False}
@@ -841,7 +1016,7 @@ async def create_calendar_event(event_data: dict):
     event_id = f"demo-event-{str(uuid.uuid4())[:8]}"
     now = datetime.now(timezone.utc)
     
-    return {
+    created = {
         "id": event_id,
         "title": event_data.get("title", "New Demo Event"),
         "start": event_data.get("start", now.isoformat().replace("+00:00", "Z")),
@@ -852,6 +1027,8 @@ async def create_calendar_event(event_data: dict):
         "description": event_data.get("description", ""),
         "created": True
     }
+    _record_calendar_change("created", created)
+    return created
 
 
 if __name__ == "__main__":
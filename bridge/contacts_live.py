@@ -1,8 +1,18 @@
 import json
 import subprocess
+import sys
 from datetime import datetime, timezone
+from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+# Confidence scoring is shared with the contacts agent through the agent SDK
+sys.path.append(str(Path(__file__).resolve().parent.parent / "services" / "agent-sdk"))
+
+from kenny_agent.contact_scoring import ContactScorer, normalize_text
+
+# Confidence for contacts JXA matched on a field the scorer does not index (e.g. notes)
+UNINDEXED_MATCH_CONFIDENCE = 0.3
+
 
 def _run_jxa(script: str) -> str:
     """Run a JXA (JavaScript for Automation) script via osascript and return stdout.
@@ -333,15 +343,10 @@ def search_contacts(query: str, limit: int = 50) -> List[Dict[str, Any]]:
     except Exception as parse_err:
         raise RuntimeError(f"Failed to parse JXA output: {parse_err}")
 
-    # Normalize and add confidence scores
+    # Normalize, then rank every result in one pass on the shared confidence scale
     normalized: List[Dict[str, Any]] = []
-    query_lower = query.lower()
-    
     for i, contact in enumerate(contacts):
         try:
-            # Calculate confidence based on match quality
-            confidence = _calculate_match_confidence(contact, query_lower)
-            
             normalized.append({
                 "id": str(contact.get("id", "")),
                 "name": str(contact.get("name", "")),
@@ -353,58 +358,18 @@ def search_contacts(query: str, limit: int = 50) -> List[Dict[str, Any]]:
                 "note": contact.get("note", ""),
                 "platforms": ["contacts"],
                 "source": "macos_contacts",
-                "confidence": confidence,
                 "match_rank": i  # Preserve JXA ranking
             })
         except Exception:
             # Skip malformed contacts
             continue
 
-    return normalized
-
+    scores = {contact_id: confidence for contact_id, confidence, _ in ContactScorer(normalized).rank(query)}
+    for contact in normalized:
+        contact["confidence"] = scores.get(contact["id"], UNINDEXED_MATCH_CONFIDENCE)
+    normalized.sort(key=lambda c: (-c["confidence"], normalize_text(c["name"]), c["id"]))
 
-def _calculate_match_confidence(contact: Dict[str, Any], query_lower: str) -> float:
-    """Calculate confidence score for a contact match."""
-    name = (contact.get("name", "") or "").lower()
-    emails = [email.lower() for email in contact.get("emails", [])]
-    phones = [phone.lower() for phone in contact.get("phones", [])]
-    
-    # Exact name match
-    if name == query_lower:
-        return 1.0
-    
-    # Exact email match
-    if query_lower in emails:
-        return 0.95
-    
-    # Phone number match (normalized)
-    clean_query = ''.join(c for c in query_lower if c.isdigit())
-    if clean_query:
-        for phone in phones:
-            clean_phone = ''.join(c for c in phone if c.isdigit())
-            if clean_query in clean_phone or clean_phone in clean_query:
-                return 0.90
-    
-    # Name starts with query
-    if name.startswith(query_lower):
-        return 0.85
-    
-    # Name contains query
-    if query_lower in name:
-        return 0.75
-    
-    # Email domain or partial match
-    for email in emails:
-        if query_lower in email:
-            return 0.70
-    
-    # Organization match
-    org = (contact.get("organization", "") or "").lower()
-    if query_lower in org:
-        return 0.65
-    
-    # Default for matches found by JXA search
-    return 0.60
+    return normalized
 
 
 def get_contact_by_id(contact_id: str) -> Optional[Dict[str, Any]]:
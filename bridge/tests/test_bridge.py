@@ -66,3 +66,26 @@ def test_messages_live_mode_falls_back(monkeypatch):
         sys.modules.pop('mail_live', None)
 
 
+
+
+def test_calendar_scan_at_limit_does_not_report_deletions(monkeypatch):
+    import asyncio
+    app_module = _load_app_module()
+    monkeypatch.setattr(app_module, 'CALENDAR_CHANGE_SCAN_LIMIT', 2)
+    start = app_module.datetime.now(app_module.timezone.utc).isoformat()
+    scans = [
+        [{'id': 'a', 'title': 'A', 'start': start, 'end': start},
+         {'id': 'b', 'title': 'B', 'start': start, 'end': start}],
+        [{'id': 'c', 'title': 'C', 'start': start, 'end': start},
+         {'id': 'a', 'title': 'A', 'start': start, 'end': start}],
+    ]
+    async def _fake_fetch(operation, **kwargs):
+        return scans.pop(0)
+    monkeypatch.setattr(app_module, '_fetch_live_calendar_async', _fake_fetch)
+
+    asyncio.run(app_module._scan_calendar_changes(baseline=True))
+    asyncio.run(app_module._scan_calendar_changes())
+
+    operations = [(change['operation'], change['event_id']) for change in app_module._calendar_change_log]
+    assert operations == [('created', 'c')]
+    assert 'b' in app_module._calendar_snapshot
@@ -43,6 +43,12 @@ try:
 except ImportError:
     SECURITY_AVAILABLE = False
 
+try:
+    from kenny_agent.stream_hub import StreamHub
+    STREAMING_AVAILABLE = True
+except ImportError:
+    STREAMING_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -53,6 +59,14 @@ trace_collector: Optional[TraceCollector] = None
 alert_engine: Optional[AlertEngine] = None
 analytics_engine: Optional[PerformanceAnalytics] = None
 security_monitor: Optional[SecurityMonitor] = None
+stream_hub: Optional[StreamHub] = None
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "*",
+}
 
 # Pydantic models for trace endpoints
 class TraceSpanModel(BaseModel):
@@ -73,12 +87,18 @@ class TraceSpanModel(BaseModel):
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan management"""
-    global registry, trace_collector, alert_engine, analytics_engine, security_monitor
+    global registry, trace_collector, alert_engine, analytics_engine, security_monitor, stream_hub
     
     # Startup
     logger.info("Starting Agent Registry Service")
     registry = AgentRegistry()
     
+    # Initialize the live stream hub shared by all SSE endpoints
+    if STREAMING_AVAILABLE:
+        stream_hub = StreamHub()
+    else:
+        logger.warning("Stream hub not available - live streams disabled")
+    
     # Initialize trace collector if tracing is available
     if TRACING_AVAILABLE:
         trace_collector = TraceCollector()
@@ -108,11 +128,23 @@ async def lifespan(app: FastAPI):
     
     # Initialize security monitor if security is available
     if SECURITY_AVAILABLE:
-        security_monitor = init_security()
+        security_monitor = init_security(
+            audit_log_dir=os.getenv("KENNY_SECURITY_AUDIT_DIR", "/tmp/kenny_cache/security_audit"),
+            audit_retention_days=int(os.getenv("KENNY_SECURITY_AUDIT_RETENTION_DAYS", "30"))
+        )
         logger.info("Security monitor initialized with default rules")
     else:
         logger.warning("Security monitoring not available - no security controls")
     
+    # Producers publish deltas to the hub once, regardless of connected clients
+    if stream_hub:
+        if alert_engine:
+            alert_engine.add_notification_handler(publish_alert)
+        if security_monitor:
+            security_monitor.event_collector.add_event_handler(publish_security_event)
+            security_monitor.event_collector.add_incident_handler(publish_security_incident)
+        asyncio.create_task(stream_snapshot_loop())
+    
     logger.info("Agent Registry Service started successfully")
     
     yield
@@ -123,6 +155,8 @@ async def lifespan(app: FastAPI):
         # Stop all health monitoring tasks
         for agent_id in list(registry.agents.keys()):
             await registry.unregister_agent(agent_id)
+    if security_monitor:
+        security_monitor.shutdown()
     logger.info("Agent Registry Service shutdown complete")
 
 
@@ -205,6 +239,93 @@ async def alert_monitoring_loop():
             await asyncio.sleep(60)  # Wait longer on error
 
 
+def publish_alert(alert: "Alert"):
+    """Publish a newly triggered alert to live alert streams."""
+    if stream_hub:
+        stream_hub.publish("alerts", "new_alerts", {"alerts": [alert.to_dict()]})
+
+
+def publish_alerts_updated():
+    """Publish the active alert count after an alert is acknowledged or resolved."""
+    if stream_hub and alert_engine:
+        stream_hub.publish(
+            "alerts", "alerts_updated",
+            {"active_count": len(alert_engine.active_alerts)},
+            coalesce_key="alerts_updated"
+        )
+
+
+def publish_security_event(event: "SecurityEvent"):
+    """Publish a collected security event to live security streams."""
+    if stream_hub:
+        stream_hub.publish("security", "new_security_events", {"events": [event.to_dict()], "count": 1})
+
+
+def publish_security_incident(incident):
+    """Publish a new security incident to live security streams."""
+    if stream_hub:
+        stream_hub.publish("security", "new_security_incidents", {"incidents": [incident.to_dict()], "count": 1})
+
+
+async def stream_snapshot_loop():
+    """Background task publishing periodic snapshots, only while someone is listening."""
+    global registry, stream_hub, security_monitor
+    
+    logger.info("Starting stream snapshot loop")
+    
+    dashboard_interval = 5.0
+    security_status_interval = 30.0
+    last_security_status = 0.0
+    
+    while True:
+        try:
+            now = asyncio.get_event_loop().time()
+            
+            # One dashboard build per interval, shared by every dashboard client
+            if registry and stream_hub.has_subscribers("health_dashboard"):
+                dashboard = await registry.get_enhanced_health_dashboard()
+                dashboard["streaming_info"] = {
+                    "last_update": now,
+                    "update_interval_seconds": dashboard_interval,
+                    "is_live": True
+                }
+                stream_hub.publish("health_dashboard", "dashboard_update", {"data": dashboard},
+                                   coalesce_key="dashboard_update")
+            
+            if (security_monitor and stream_hub.has_subscribers("security")
+                    and now - last_security_status >= security_status_interval):
+                stream_hub.publish("security", "security_status_update", {
+                    "status": {
+                        "total_events_1h": len(security_monitor.event_collector.get_events(hours=1)),
+                        "total_incidents_1h": len(security_monitor.event_collector.get_incidents(hours=1)),
+                        "compliance_summary": security_monitor.validate_privacy_compliance("status_check", {})
+                    }
+                }, coalesce_key="security_status_update")
+                last_security_status = now
+            
+            await asyncio.sleep(dashboard_interval)
+            
+        except Exception as e:
+            logger.error(f"Error in stream snapshot loop: {e}")
+            await asyncio.sleep(10.0)  # Wait longer on error
+
+
+def live_stream_response(topic: str) -> StreamingResponse:
+    """Subscribe a client to a hub topic and stream its queue as SSE."""
+    if stream_hub is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Live streaming not available"
+        )
+    
+    subscription = stream_hub.subscribe(topic)
+    return StreamingResponse(
+        subscription.sse_frames(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
 async def analytics_collection_loop():
     """Background task to collect performance metrics for analytics."""
     global registry, analytics_engine
@@ -584,60 +705,19 @@ async def stream_health_dashboard():
             detail="Registry service is starting up"
         )
     
-    async def generate_dashboard_updates():
-        """Generate live dashboard updates"""
-        import asyncio
-        
-        last_update_time = 0.0
-        
-        while True:
-            try:
-                current_time = asyncio.get_event_loop().time()
-                
-                # Get enhanced dashboard data
-                dashboard = await registry.get_enhanced_health_dashboard()
-                
-                # Add streaming metadata
-                dashboard["streaming_info"] = {
-                    "last_update": current_time,
-                    "update_interval_seconds": 5.0,
-                    "is_live": True
-                }
-                
-                # Send dashboard update
-                event_data = {
-                    "type": "dashboard_update",
-                    "data": dashboard,
-                    "timestamp": current_time
-                }
-                
-                yield f"data: {json.dumps(event_data)}\n\n"
-                
-                last_update_time = current_time
-                
-                # Wait before next update
-                await asyncio.sleep(5.0)  # Update every 5 seconds
-                
-            except Exception as e:
-                logger.error(f"Error in dashboard streaming: {e}")
-                error_event = {
-                    "type": "error",
-                    "message": str(e),
-                    "timestamp": asyncio.get_event_loop().time()
-                }
-                yield f"data: {json.dumps(error_event)}\n\n"
-                await asyncio.sleep(10.0)  # Wait longer on error
+    return live_stream_response("health_dashboard")
+
+
+@app.get("/system/streams/stats")
+async def get_stream_stats():
+    """Get live stream fan-out statistics"""
+    if stream_hub is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Live streaming not available"
+        )
     
-    return StreamingResponse(
-        generate_dashboard_updates(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "*",
-        }
-    )
+    return stream_hub.get_stats()
 
 
 # Security endpoints
@@ -657,7 +737,7 @@ async def get_security_dashboard(hours: int = 24):
                 detail="Hours must be between 1 and 168"
             )
         
-        dashboard = security_monitor.get_security_dashboard(hours)
+        dashboard = await security_monitor.get_security_dashboard_async(hours)
         return dashboard
     except HTTPException:
         raise
@@ -670,7 +750,8 @@ async def get_security_dashboard(hours: int = 24):
 
 
 @app.get("/security/events")
-async def get_security_events(hours: int = 24, severity: Optional[str] = None, event_type: Optional[str] = None):
+async def get_security_events(hours: int = 24, severity: Optional[str] = None, event_type: Optional[str] = None,
+                              limit: int = 1000):
     """Get security events with optional filtering"""
     if not SECURITY_AVAILABLE or security_monitor is None:
         raise HTTPException(
@@ -685,6 +766,12 @@ async def get_security_events(hours: int = 24, severity: Optional[str] = None, e
                 detail="Hours must be between 1 and 168"
             )
         
+        if limit < 1 or limit > 10000:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Limit must be between 1 and 10000"
+            )
+        
         # Parse filters
         severity_filter = None
         if severity:
@@ -708,8 +795,9 @@ async def get_security_events(hours: int = 24, severity: Optional[str] = None, e
                     detail=f"Invalid event type: {event_type}"
                 )
         
-        events = security_monitor.event_collector.get_events(hours, severity_filter, event_type_filter)
-        event_dicts = [event.to_dict() for event in events]
+        event_dicts = await security_monitor.event_collector.get_event_records_async(
+            hours, severity_filter, event_type_filter, limit=limit
+        )
         
         return {
             "events": event_dicts,
@@ -851,7 +939,8 @@ async def get_security_compliance_summary():
         )
     
     try:
-        event_summary = security_monitor.event_collector.get_event_summary()
+        event_summary = await security_monitor.event_collector.get_event_summary_async()
+        privacy_compliance = await security_monitor.get_privacy_compliance_report_async(hours=24)
         
         # Calculate compliance metrics
         total_critical_high = event_summary.get("critical_count", 0) + event_summary.get("high_count", 0)
@@ -877,6 +966,8 @@ async def get_security_compliance_summary():
             "event_summary": event_summary,
             "egress_rules_count": len(security_monitor.egress_monitor.rules),
             "egress_rules_enabled": len([r for r in security_monitor.egress_monitor.rules.values() if r.enabled]),
+            "privacy_compliance": privacy_compliance,
+            "audit_log": security_monitor.audit_log.get_stats() if security_monitor.audit_log else None,
             "assessment_timestamp": datetime.now(timezone.utc).isoformat()
         }
     except Exception as e:
@@ -896,91 +987,7 @@ async def stream_live_security_events():
             detail="Security monitoring service not available"
         )
     
-    async def generate_live_security_events():
-        """Generate live security event updates"""
-        import asyncio
-        
-        last_event_count = 0
-        last_incident_count = 0
-        
-        while True:
-            try:
-                # Get recent security events
-                recent_events = security_monitor.event_collector.get_events(hours=1)
-                current_event_count = len(recent_events)
-                
-                # Get recent incidents
-                recent_incidents = security_monitor.event_collector.get_incidents(hours=1)
-                current_incident_count = len(recent_incidents)
-                
-                # Check for new security events
-                if current_event_count > last_event_count:
-                    new_events = recent_events[:current_event_count - last_event_count]
-                    new_event_dicts = [event.to_dict() for event in new_events]
-                    
-                    if new_event_dicts:
-                        event_data = {
-                            "type": "new_security_events",
-                            "events": new_event_dicts,
-                            "count": len(new_event_dicts),
-                            "timestamp": asyncio.get_event_loop().time()
-                        }
-                        yield f"data: {json.dumps(event_data)}\n\n"
-                    
-                    last_event_count = current_event_count
-                
-                # Check for new incidents
-                if current_incident_count > last_incident_count:
-                    new_incidents = recent_incidents[:current_incident_count - last_incident_count]
-                    new_incident_dicts = [incident.to_dict() for incident in new_incidents]
-                    
-                    if new_incident_dicts:
-                        incident_data = {
-                            "type": "new_security_incidents",
-                            "incidents": new_incident_dicts,
-                            "count": len(new_incident_dicts),
-                            "timestamp": asyncio.get_event_loop().time()
-                        }
-                        yield f"data: {json.dumps(incident_data)}\n\n"
-                    
-                    last_incident_count = current_incident_count
-                
-                # Send periodic security status updates
-                if int(asyncio.get_event_loop().time()) % 30 == 0:  # Every 30 seconds
-                    security_status = {
-                        "type": "security_status_update",
-                        "status": {
-                            "total_events_1h": current_event_count,
-                            "total_incidents_1h": current_incident_count,
-                            "compliance_summary": security_monitor.validate_privacy_compliance("status_check", {})
-                        },
-                        "timestamp": asyncio.get_event_loop().time()
-                    }
-                    yield f"data: {json.dumps(security_status)}\n\n"
-                
-                # Wait before next check
-                await asyncio.sleep(3.0)  # Check every 3 seconds for rapid security response
-                
-            except Exception as e:
-                logger.error(f"Error in live security event streaming: {e}")
-                error_event = {
-                    "type": "error",
-                    "message": str(e),
-                    "timestamp": asyncio.get_event_loop().time()
-                }
-                yield f"data: {json.dumps(error_event)}\n\n"
-                await asyncio.sleep(10.0)  # Wait longer on error
-    
-    return StreamingResponse(
-        generate_live_security_events(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "*",
-        }
-    )
+    return live_stream_response("security")
 
 
 @app.get("/security/incidents")
@@ -1883,6 +1890,25 @@ async def get_alert_summary():
         )
 
 
+@app.get("/alerts/evaluation/stats")
+async def get_alert_evaluation_stats():
+    """Get rule evaluation timing statistics"""
+    if not ALERTING_AVAILABLE or alert_engine is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Alerting service not available"
+        )
+
+    try:
+        return alert_engine.get_evaluation_stats()
+    except Exception as e:
+        logger.error(f"Failed to get alert evaluation stats: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error while retrieving alert evaluation stats"
+        )
+
+
 @app.get("/alerts/history")
 async def get_alert_history(hours: int = 24, severity: Optional[str] = None):
     """Get alert history for the specified time period"""
@@ -1950,6 +1976,8 @@ async def acknowledge_alert(alert_id: str, acknowledge_data: Dict[str, str]):
     
     try:
         success = alert_engine.acknowledge_alert(alert_id, acknowledged_by, notes)
+        if success:
+            publish_alerts_updated()
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1991,6 +2019,8 @@ async def resolve_alert(alert_id: str, resolve_data: Dict[str, str]):
     
     try:
         success = alert_engine.resolve_alert(alert_id, resolved_by, resolution_notes)
+        if success:
+            publish_alerts_updated()
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -2021,66 +2051,7 @@ async def stream_live_alerts():
             detail="Alerting service not available"
         )
     
-    async def generate_live_alerts():
-        """Generate live alert updates"""
-        import asyncio
-        
-        last_alert_count = 0
-        
-        while True:
-            try:
-                # Get recent alerts
-                alerts = alert_engine.get_active_alerts()
-                current_count = len(alerts)
-                
-                # Check for new alerts
-                if current_count > last_alert_count:
-                    # Send new alerts
-                    new_alerts = alerts[:current_count - last_alert_count]
-                    new_alert_dicts = [alert.to_dict() for alert in new_alerts]
-                    
-                    if new_alert_dicts:
-                        event_data = {
-                            "type": "new_alerts",
-                            "alerts": new_alert_dicts,
-                            "timestamp": asyncio.get_event_loop().time()
-                        }
-                        yield f"data: {json.dumps(event_data)}\n\n"
-                    
-                    last_alert_count = current_count
-                elif current_count < last_alert_count:
-                    # Some alerts were resolved/acknowledged
-                    event_data = {
-                        "type": "alerts_updated",
-                        "active_count": current_count,
-                        "timestamp": asyncio.get_event_loop().time()
-                    }
-                    yield f"data: {json.dumps(event_data)}\n\n"
-                    last_alert_count = current_count
-                
-                # Wait before next check
-                await asyncio.sleep(2.0)
-                
-            except Exception as e:
-                logger.error(f"Error in live alert streaming: {e}")
-                error_event = {
-                    "type": "error",
-                    "message": str(e),
-                    "timestamp": asyncio.get_event_loop().time()
-                }
-                yield f"data: {json.dumps(error_event)}\n\n"
-                await asyncio.sleep(10.0)  # Wait longer on error
-    
-    return StreamingResponse(
-        generate_live_alerts(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "*",
-        }
-    )
+    return live_stream_response("alerts")
 
 
 # Tracing endpoints
@@ -2116,6 +2087,13 @@ async def collect_trace_span(span_data: TraceSpanModel):
         # Collect the span
         trace_collector.collect_span(span)
         
+        # Publish the updated trace summary; later spans of the same trace replace queued ones
+        if stream_hub and stream_hub.has_subscribers("traces"):
+            summary = trace_collector.get_trace_summary(span_data.correlation_id)
+            if summary:
+                stream_hub.publish("traces", "new_traces", {"traces": [summary]},
+                                   coalesce_key=span_data.correlation_id)
+        
         logger.debug(f"Collected trace span {span_data.span_id} from {span_data.service_name}")
         return {"status": "accepted", "span_id": span_data.span_id}
         
@@ -2205,60 +2183,7 @@ async def stream_live_traces():
             detail="Tracing service not available"
         )
     
-    async def generate_live_traces():
-        """Generate live trace updates"""
-        import asyncio
-        
-        last_trace_count = 0
-        
-        while True:
-            try:
-                # Get recent traces
-                traces = trace_collector.get_recent_traces(10)
-                current_count = len(traces)
-                
-                # Check for new traces
-                if current_count > last_trace_count:
-                    # Send new traces
-                    trace_summaries = []
-                    for correlation_id, spans in list(traces.items())[:current_count - last_trace_count]:
-                        summary = trace_collector.get_trace_summary(correlation_id)
-                        if summary:
-                            trace_summaries.append(summary)
-                    
-                    if trace_summaries:
-                        event_data = {
-                            "type": "new_traces",
-                            "traces": trace_summaries,
-                            "timestamp": asyncio.get_event_loop().time()
-                        }
-                        yield f"data: {json.dumps(event_data)}\n\n"
-                    
-                    last_trace_count = current_count
-                
-                # Wait before next check
-                await asyncio.sleep(1.0)
-                
-            except Exception as e:
-                logger.error(f"Error in live trace streaming: {e}")
-                error_event = {
-                    "type": "error",
-                    "message": str(e),
-                    "timestamp": asyncio.get_event_loop().time()
-                }
-                yield f"data: {json.dumps(error_event)}\n\n"
-                await asyncio.sleep(5.0)  # Wait longer on error
-    
-    return StreamingResponse(
-        generate_live_traces(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "*",
-        }
-    )
+    return live_stream_response("traces")
 
 
 @app.get("/security/ui")
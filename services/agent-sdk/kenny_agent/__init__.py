@@ -9,6 +9,8 @@ from .base_agent import BaseAgent
 from .agent_service_base import AgentServiceBase, SemanticCache, LLMQueryProcessor
 from .base_handler import BaseCapabilityHandler
 from .base_tool import BaseTool
+from .bridge_client import BridgeClient, RetryBudget, get_bridge_client, close_bridge_clients
+from .ollama_scheduler import OllamaScheduler, get_ollama_scheduler, close_ollama_schedulers
 from .health import HealthStatus, HealthCheck, HealthMonitor, AgentHealthMonitor
 from .registry import AgentRegistryClient
 from .tracing import Tracer, TracingMiddleware, SpanContext, AsyncSpanContext, trace_function, TraceCollector, init_tracing, get_tracer
@@ -24,6 +26,13 @@ __all__ = [
     "LLMQueryProcessor",
     "BaseCapabilityHandler", 
     "BaseTool",
+    "BridgeClient",
+    "RetryBudget",
+    "get_bridge_client",
+    "close_bridge_clients",
+    "OllamaScheduler",
+    "get_ollama_scheduler",
+    "close_ollama_schedulers",
     "HealthStatus",
     "HealthCheck",
     "HealthMonitor",
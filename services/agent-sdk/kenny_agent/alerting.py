@@ -7,9 +7,12 @@ performance degradation, security incidents, and system anomalies.
 
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional, Callable, AsyncGenerator
+import operator
+import time
+from typing import Dict, Any, List, Optional, Callable, AsyncGenerator, Tuple
 from datetime import datetime, timezone, timedelta
 from dataclasses import dataclass, asdict, field
+from collections import deque
 from enum import Enum
 import json
 
@@ -36,6 +39,43 @@ class AlertType(str, Enum):
     RESOURCE_EXHAUSTION = "resource_exhaustion"
 
 
+# Operators supported in complex rule conditions, mapped to the comparison
+# that must hold for the condition to pass (actual <op> expected).
+_CONDITION_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "gt": operator.gt,
+    "lt": operator.lt,
+    "gte": operator.ge,
+    "lte": operator.le,
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "contains": lambda actual, expected: expected in str(actual),
+}
+
+ConditionPredicate = Callable[[Dict[str, Any]], bool]
+
+
+def _compile_condition(key: str, condition_value: Any) -> ConditionPredicate:
+    """Compile a single rule condition into a predicate over a data payload."""
+    if not isinstance(condition_value, dict):
+        def equals(data: Dict[str, Any]) -> bool:
+            return data[key] == condition_value
+        return equals
+    
+    checks: List[Tuple[Callable[[Any, Any], bool], Any]] = [
+        (_CONDITION_OPERATORS[op], expected)
+        for op, expected in condition_value.items()
+        if op in _CONDITION_OPERATORS
+    ]
+    
+    def compare(data: Dict[str, Any]) -> bool:
+        actual = data[key]
+        for check, expected in checks:
+            if not check(actual, expected):
+                return False
+        return True
+    return compare
+
+
 class AlertStatus(str, Enum):
     """Alert status states."""
     ACTIVE = "active"
@@ -101,6 +141,26 @@ class AlertRule:
     max_alerts_per_hour: int = 10
     last_triggered: Optional[datetime] = None
     trigger_count: int = 0
+    _compiled: Optional[Tuple[Tuple[str, ...], List[ConditionPredicate]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    @property
+    def condition_keys(self) -> Tuple[str, ...]:
+        """Data keys that must be present for this rule to match."""
+        return self.compile()[0]
+    
+    def compile(self) -> Tuple[Tuple[str, ...], List[ConditionPredicate]]:
+        """Compile the condition dicts into predicates (cached until recompiled)."""
+        if self._compiled is None:
+            keys = tuple(self.conditions.keys())
+            predicates = [_compile_condition(key, value) for key, value in self.conditions.items()]
+            self._compiled = (keys, predicates)
+        return self._compiled
+    
+    def recompile(self) -> None:
+        """Drop compiled predicates after the conditions have been changed."""
+        self._compiled = None
     
     def should_trigger(self, data: Dict[str, Any]) -> bool:
         """Check if the rule should trigger based on data."""
@@ -127,34 +187,13 @@ class AlertRule:
     
     def _evaluate_conditions(self, data: Dict[str, Any]) -> bool:
         """Evaluate rule conditions against data."""
-        for condition_key, condition_value in self.conditions.items():
-            if condition_key not in data:
+        keys, predicates = self.compile()
+        for key in keys:
+            if key not in data:
+                return False
+        for predicate in predicates:
+            if not predicate(data):
                 return False
-            
-            actual_value = data[condition_key]
-            
-            # Handle different condition types
-            if isinstance(condition_value, dict):
-                # Complex condition with operators
-                if "gt" in condition_value and actual_value <= condition_value["gt"]:
-                    return False
-                if "lt" in condition_value and actual_value >= condition_value["lt"]:
-                    return False
-                if "gte" in condition_value and actual_value < condition_value["gte"]:
-                    return False
-                if "lte" in condition_value and actual_value > condition_value["lte"]:
-                    return False
-                if "eq" in condition_value and actual_value != condition_value["eq"]:
-                    return False
-                if "ne" in condition_value and actual_value == condition_value["ne"]:
-                    return False
-                if "contains" in condition_value and condition_value["contains"] not in str(actual_value):
-                    return False
-            else:
-                # Simple equality check
-                if actual_value != condition_value:
-                    return False
-        
         return True
     
     def trigger(self) -> None:
@@ -174,35 +213,121 @@ class AlertEngine:
         self.notification_handlers: List[Callable[[Alert], None]] = []
         self.max_history = 1000
         
+        # Rules indexed by one of the data keys they require ("anchor" key),
+        # so a payload is only checked against rules that could match it.
+        self._rule_index: Dict[str, Dict[str, AlertRule]] = {}
+        self._unconditional_rules: Dict[str, AlertRule] = {}
+        self._rule_sequence: Dict[str, int] = {}
+        self._next_sequence = 0
+        
+        # Rule evaluation statistics
+        self.evaluation_count = 0
+        self.rules_considered = 0
+        self.rules_matched = 0
+        self.total_evaluation_time_ms = 0.0
+        self.max_evaluation_time_ms = 0.0
+        self.recent_evaluation_times_ms: deque = deque(maxlen=1000)
+        
     def add_rule(self, rule: AlertRule) -> None:
         """Add an alert rule."""
+        if rule.rule_id in self.rules:
+            self._unindex_rule(self.rules[rule.rule_id])
+        rule.recompile()
         self.rules[rule.rule_id] = rule
+        self._index_rule(rule)
         logger.info(f"Added alert rule: {rule.name} ({rule.rule_id})")
     
     def remove_rule(self, rule_id: str) -> bool:
         """Remove an alert rule."""
         if rule_id in self.rules:
+            self._unindex_rule(self.rules[rule_id])
             del self.rules[rule_id]
             logger.info(f"Removed alert rule: {rule_id}")
             return True
         return False
     
+    def _index_rule(self, rule: AlertRule) -> None:
+        """Add a rule to the key index under its least-populated condition key."""
+        if rule.rule_id not in self._rule_sequence:
+            self._rule_sequence[rule.rule_id] = self._next_sequence
+            self._next_sequence += 1
+        
+        keys = rule.condition_keys
+        if not keys:
+            self._unconditional_rules[rule.rule_id] = rule
+            return
+        
+        anchor = min(keys, key=lambda k: len(self._rule_index.get(k, ())))
+        self._rule_index.setdefault(anchor, {})[rule.rule_id] = rule
+    
+    def _unindex_rule(self, rule: AlertRule) -> None:
+        """Remove a rule from the key index."""
+        self._unconditional_rules.pop(rule.rule_id, None)
+        for key in rule.condition_keys:
+            bucket = self._rule_index.get(key)
+            if bucket and bucket.pop(rule.rule_id, None) is not None:
+                if not bucket:
+                    del self._rule_index[key]
+                break
+        self._rule_sequence.pop(rule.rule_id, None)
+    
+    def _candidate_rules(self, data: Dict[str, Any]) -> List[AlertRule]:
+        """Get rules whose anchor key is present in the data, in insertion order."""
+        candidates = list(self._unconditional_rules.values())
+        rule_index = self._rule_index
+        for key in data:
+            bucket = rule_index.get(key)
+            if bucket:
+                candidates.extend(bucket.values())
+        if len(candidates) > 1:
+            sequence = self._rule_sequence
+            candidates.sort(key=lambda r: sequence[r.rule_id])
+        return candidates
+    
     def add_notification_handler(self, handler: Callable[[Alert], None]) -> None:
         """Add a notification handler for alerts."""
         self.notification_handlers.append(handler)
     
     def evaluate_data(self, data: Dict[str, Any]) -> List[Alert]:
-        """Evaluate data against all rules and generate alerts."""
+        """Evaluate data against the rules indexed by its keys and generate alerts."""
+        start_time = time.perf_counter()
         triggered_alerts = []
         
-        for rule in self.rules.values():
+        candidates = self._candidate_rules(data)
+        for rule in candidates:
             if rule.should_trigger(data):
                 alert = self._create_alert(rule, data)
                 triggered_alerts.append(alert)
                 rule.trigger()
         
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        self.evaluation_count += 1
+        self.rules_considered += len(candidates)
+        self.rules_matched += len(triggered_alerts)
+        self.total_evaluation_time_ms += elapsed_ms
+        self.max_evaluation_time_ms = max(self.max_evaluation_time_ms, elapsed_ms)
+        self.recent_evaluation_times_ms.append(elapsed_ms)
+        
         return triggered_alerts
     
+    def get_evaluation_stats(self) -> Dict[str, Any]:
+        """Get rule evaluation timing and selectivity statistics."""
+        recent = sorted(self.recent_evaluation_times_ms)
+        evaluations = self.evaluation_count
+        
+        return {
+            "evaluations": evaluations,
+            "rules_total": len(self.rules),
+            "indexed_keys": len(self._rule_index),
+            "rules_considered": self.rules_considered,
+            "rules_matched": self.rules_matched,
+            "avg_rules_considered": self.rules_considered / evaluations if evaluations else 0.0,
+            "avg_evaluation_time_ms": self.total_evaluation_time_ms / evaluations if evaluations else 0.0,
+            "p95_evaluation_time_ms": recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0,
+            "max_evaluation_time_ms": self.max_evaluation_time_ms,
+            "total_evaluation_time_ms": self.total_evaluation_time_ms
+        }
+    
     def _create_alert(self, rule: AlertRule, data: Dict[str, Any]) -> Alert:
         """Create an alert from a triggered rule."""
         import uuid
@@ -328,7 +453,8 @@ class AlertEngine:
             "rules": {
                 "total": len(self.rules),
                 "enabled": len([r for r in self.rules.values() if r.enabled])
-            }
+            },
+            "evaluation": self.get_evaluation_stats()
         }
     
     def load_default_rules(self) -> None:
@@ -0,0 +1,291 @@
+"""
+Persistent security audit log for Kenny v2.
+
+This module provides an append-only audit log for security events, data
+access records and privacy compliance audits. Entries are written in
+batches by a background thread into day-partitioned SQLite (WAL) segment
+files, queried newest-first with a row limit so memory stays bounded, and
+whole segments are dropped once they fall outside the retention window.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SecurityAuditLog:
+    """Segmented, append-only audit log backed by SQLite WAL files."""
+
+    SEGMENT_PREFIX = "security_audit_"
+    SEGMENT_SUFFIX = ".db"
+
+    def __init__(self, log_dir: str, retention_days: int = 30, batch_size: int = 500,
+                 flush_interval_seconds: float = 1.0, start_writer: bool = True):
+        """Initialize the audit log and start the background writer."""
+        self.log_dir = log_dir
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+
+        os.makedirs(self.log_dir, exist_ok=True)
+
+        self._pending: deque = deque()
+        self._lock = threading.Lock()
+        self._connections: Dict[str, sqlite3.Connection] = {}
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+
+        # Statistics
+        self.entries_written = 0
+        self.batches_written = 0
+        self.segments_dropped = 0
+        self.last_flush_ms = 0.0
+        self.write_errors = 0
+
+        self.apply_retention()
+        if start_writer:
+            self._writer = threading.Thread(target=self._writer_loop, name="security-audit-writer", daemon=True)
+            self._writer.start()
+
+    # Writing
+
+    def append(self, stream: str, payload: Dict[str, Any], timestamp: Optional[datetime] = None,
+               kind: Optional[str] = None, severity: Optional[str] = None,
+               source: Optional[str] = None):
+        """Queue an entry for the background writer."""
+        ts = (timestamp or datetime.now(timezone.utc)).timestamp()
+        self._pending.append((ts, stream, kind, severity, source, json.dumps(payload, default=str)))
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Write all queued entries now, returning the number written."""
+        with self._lock:
+            return self._flush_locked()
+
+    def _flush_locked(self) -> int:
+        if not self._pending:
+            return 0
+
+        start_time = time.perf_counter()
+        batches: Dict[str, List[Tuple]] = {}
+        written = 0
+
+        while self._pending:
+            entry = self._pending.popleft()
+            batches.setdefault(self._segment_name(entry[0]), []).append(entry)
+
+        for segment, rows in batches.items():
+            try:
+                conn = self._get_connection(segment)
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO audit_entries (ts, stream, kind, severity, source, payload) VALUES (?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+                written += len(rows)
+            except sqlite3.Error as e:
+                self.write_errors += 1
+                logger.error(f"Failed to write {len(rows)} audit entries to {segment}: {e}")
+
+        self.entries_written += written
+        self.batches_written += 1
+        self.last_flush_ms = (time.perf_counter() - start_time) * 1000
+        return written
+
+    def _writer_loop(self):
+        """Flush queued entries periodically and apply retention hourly."""
+        last_retention = time.monotonic()
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval_seconds)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                if time.monotonic() - last_retention >= 3600:
+                    self.apply_retention()
+                    last_retention = time.monotonic()
+            except Exception as e:
+                logger.error(f"Security audit writer error: {e}")
+
+    def close(self):
+        """Stop the background writer, flush pending entries and close segments."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._writer is not None:
+            self._writer.join(timeout=5)
+        with self._lock:
+            self._flush_locked()
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+
+    # Segments
+
+    def _segment_name(self, ts: float) -> str:
+        day = datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y%m%d")
+        return f"{self.SEGMENT_PREFIX}{day}{self.SEGMENT_SUFFIX}"
+
+    def _segment_day(self, segment: str) -> Optional[datetime]:
+        if not (segment.startswith(self.SEGMENT_PREFIX) and segment.endswith(self.SEGMENT_SUFFIX)):
+            return None
+        try:
+            day = segment[len(self.SEGMENT_PREFIX):-len(self.SEGMENT_SUFFIX)]
+            return datetime.strptime(day, "%Y%m%d").replace(tzinfo=timezone.utc)
+        except ValueError:
+            return None
+
+    def _get_connection(self, segment: str) -> sqlite3.Connection:
+        conn = self._connections.get(segment)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.log_dir, segment), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS audit_entries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    ts REAL NOT NULL,
+                    stream TEXT NOT NULL,
+                    kind TEXT,
+                    severity TEXT,
+                    source TEXT,
+                    payload TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_stream_ts ON audit_entries(stream, ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_stream_kind_ts ON audit_entries(stream, kind, ts)")
+            conn.commit()
+            self._connections[segment] = conn
+        return conn
+
+    def list_segments(self) -> List[Tuple[datetime, str]]:
+        """List segment files as (day, filename), newest first."""
+        segments = []
+        for name in os.listdir(self.log_dir):
+            day = self._segment_day(name)
+            if day is not None:
+                segments.append((day, name))
+        segments.sort(reverse=True)
+        return segments
+
+    def _segments_since(self, since: Optional[datetime]) -> List[str]:
+        if since is None:
+            return [name for _, name in self.list_segments()]
+        first_day = since.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        return [name for day, name in self.list_segments() if day >= first_day]
+
+    def apply_retention(self) -> int:
+        """Drop whole segments older than the retention window."""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        cutoff_day = cutoff.replace(hour=0, minute=0, second=0, microsecond=0)
+        dropped = 0
+
+        with self._lock:
+            for day, name in self.list_segments():
+                if day >= cutoff_day:
+                    continue
+                conn = self._connections.pop(name, None)
+                if conn is not None:
+                    conn.close()
+                for suffix in ("", "-wal", "-shm"):
+                    path = os.path.join(self.log_dir, name + suffix)
+                    if os.path.exists(path):
+                        os.remove(path)
+                dropped += 1
+                logger.info(f"Dropped expired security audit segment {name}")
+
+        self.segments_dropped += dropped
+        return dropped
+
+    # Querying
+
+    def _where(self, stream: str, since: Optional[datetime], until: Optional[datetime],
+               kind: Optional[str], severity: Optional[str], source: Optional[str]) -> Tuple[str, List[Any]]:
+        clauses = ["stream = ?"]
+        params: List[Any] = [stream]
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since.timestamp())
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until.timestamp())
+        if severity is not None:
+            clauses.append("severity = ?")
+            params.append(severity)
+        if source is not None:
+            clauses.append("source = ?")
+            params.append(source)
+        return " AND ".join(clauses), params
+
+    def query(self, stream: str, since: Optional[datetime] = None, until: Optional[datetime] = None,
+              kind: Optional[str] = None, severity: Optional[str] = None, source: Optional[str] = None,
+              limit: int = 1000) -> List[Dict[str, Any]]:
+        """Get entry payloads for a stream, newest first, reading at most limit rows."""
+        where, params = self._where(stream, since, until, kind, severity, source)
+        results: List[Dict[str, Any]] = []
+
+        with self._lock:
+            self._flush_locked()
+            for segment in self._segments_since(since):
+                remaining = limit - len(results)
+                if remaining <= 0:
+                    break
+                cursor = self._get_connection(segment).execute(
+                    f"SELECT payload FROM audit_entries WHERE {where} ORDER BY ts DESC, id DESC LIMIT ?",
+                    params + [remaining]
+                )
+                results.extend(json.loads(row[0]) for row in cursor)
+
+        return results
+
+    def count_by(self, stream: str, column: str, since: Optional[datetime] = None,
+                 kind: Optional[str] = None) -> Dict[str, int]:
+        """Count entries of a stream grouped by kind, severity or source."""
+        if column not in ("kind", "severity", "source"):
+            raise ValueError(f"Cannot group audit entries by {column}")
+
+        where, params = self._where(stream, since, None, kind, None, None)
+        counts: Dict[str, int] = {}
+
+        with self._lock:
+            self._flush_locked()
+            for segment in self._segments_since(since):
+                cursor = self._get_connection(segment).execute(
+                    f"SELECT {column}, COUNT(*) FROM audit_entries WHERE {where} GROUP BY {column}",
+                    params
+                )
+                for value, count in cursor:
+                    counts[value] = counts.get(value, 0) + count
+
+        return counts
+
+    def count(self, stream: str, since: Optional[datetime] = None, kind: Optional[str] = None) -> int:
+        """Count entries of a stream."""
+        return sum(self.count_by(stream, "kind", since, kind).values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get audit log statistics."""
+        segments = self.list_segments()
+        return {
+            "log_dir": self.log_dir,
+            "segments": len(segments),
+            "oldest_segment": segments[-1][0].date().isoformat() if segments else None,
+            "retention_days": self.retention_days,
+            "pending_entries": len(self._pending),
+            "entries_written": self.entries_written,
+            "batches_written": self.batches_written,
+            "segments_dropped": self.segments_dropped,
+            "write_errors": self.write_errors,
+            "last_flush_ms": self.last_flush_ms
+        }
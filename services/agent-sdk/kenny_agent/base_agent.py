@@ -151,6 +151,31 @@ class BaseAgent(ABC):
         
         return result
     
+    async def execute_tool_async(self, tool_name: str, parameters: Dict[str, Any]) -> Any:
+        """
+        Execute a registered tool without blocking the event loop.
+        
+        Args:
+            tool_name: Name of the tool to execute
+            parameters: Parameters to pass to the tool
+            
+        Returns:
+            Result of the tool execution
+            
+        Raises:
+            ValueError: If the tool is not registered
+        """
+        if tool_name not in self.tools:
+            raise ValueError(f"Unknown tool: {tool_name}")
+        
+        tool = self.tools[tool_name]
+        
+        if hasattr(tool, 'execute_async'):
+            return await tool.execute_async(parameters)
+        if hasattr(tool, 'execute'):
+            return await asyncio.to_thread(tool.execute, parameters)
+        raise ValueError(f"Tool {tool_name} has no execute method")
+    
     def get_health_status(self) -> Dict[str, Any]:
         """
         Get the current health status of the agent.
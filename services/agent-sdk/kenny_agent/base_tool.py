@@ -5,6 +5,8 @@ This class provides the foundation for implementing tools that agents
 can use to perform specific operations.
 """
 
+import asyncio
+import inspect
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timezone
@@ -69,6 +71,24 @@ class BaseTool(ABC):
         """
         raise NotImplementedError("Subclasses must implement execute method")
     
+    async def execute_async(self, parameters: Dict[str, Any]) -> Any:
+        """
+        Execute the tool without blocking the event loop.
+        
+        Coroutine `execute` implementations are awaited directly; synchronous
+        ones run in a worker thread. Tools doing I/O should override this
+        with a native async implementation.
+        
+        Args:
+            parameters: Input parameters for the tool
+            
+        Returns:
+            Result of the tool execution
+        """
+        if inspect.iscoroutinefunction(self.execute):
+            return await self.execute(parameters)
+        return await asyncio.to_thread(self.execute, parameters)
+    
     def get_manifest(self) -> Dict[str, Any]:
         """
         Generate the tool manifest for agent registration.
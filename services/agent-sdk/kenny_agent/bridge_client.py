@@ -0,0 +1,332 @@
+"""
+Async client for the macOS Bridge service.
+
+One keep-alive connection pool is shared per process and bridge URL, so the
+mail, iMessage and WhatsApp tools stop paying a TCP handshake per call and a
+slow bridge endpoint no longer blocks the agent's event loop. Identical GETs
+that are in flight at the same time share one request, every endpoint gets
+its own read timeout, and retries of transient failures are limited by a
+budget so a struggling bridge is not hit with a retry storm. Tools that
+still call the bridge synchronously share a pooled blocking client the same way.
+"""
+
+import asyncio
+import fnmatch
+import os
+import random
+import threading
+import time
+import logging
+from typing import Dict, Any, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {502, 503, 504}
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of recent requests.
+
+    Every request deposits `ratio` tokens and every retry withdraws one, so
+    at steady state at most `ratio` of the traffic is retries. `min_tokens`
+    lets a quiet client still retry its first few failures.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 10.0, max_tokens: float = 100.0):
+        """Initialize the retry budget."""
+        self.ratio = ratio
+        self.max_tokens = max(max_tokens, min_tokens)
+        self.tokens = min_tokens
+
+    def deposit(self):
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class BridgeClient:
+    """Pooled, deduplicating async HTTP client for one bridge base URL."""
+
+    def __init__(
+        self,
+        base_url: str,
+        endpoint_timeouts: Optional[Dict[str, float]] = None,
+        default_timeout: float = 30.0,
+        max_retries: Optional[int] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        Initialize the bridge client.
+
+        Args:
+            base_url: Bridge base URL (a legacy '/bridge' suffix is stripped)
+            endpoint_timeouts: Read timeout in seconds per path or path glob
+            default_timeout: Read timeout for paths without an entry
+            max_retries: Retries per request for transient failures
+            retry_budget: Shared retry budget (one is created if omitted)
+            transport: Optional transport, used by tests (also used by the
+                blocking client when it supports synchronous requests)
+        """
+        self.base_url = normalize_bridge_url(base_url)
+        self.endpoint_timeouts: Dict[str, float] = dict(endpoint_timeouts or {})
+        self.default_timeout = default_timeout
+        self.max_retries = int(os.getenv("BRIDGE_MAX_RETRIES", "2")) if max_retries is None else max_retries
+        self.retry_budget = retry_budget or RetryBudget(
+            ratio=float(os.getenv("BRIDGE_RETRY_RATIO", "0.2")),
+            min_tokens=float(os.getenv("BRIDGE_RETRY_MIN", "10"))
+        )
+        self.retry_backoff = float(os.getenv("BRIDGE_RETRY_BACKOFF", "0.05"))
+        self.limits = httpx.Limits(
+            max_connections=int(os.getenv("BRIDGE_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("BRIDGE_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("BRIDGE_KEEPALIVE_EXPIRY", "30"))
+        )
+        self._transport = transport
+
+        # httpx pools are bound to the event loop that opened their connections
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight: Dict[Tuple, asyncio.Task] = {}
+        # Blocking pool for synchronous callers, shared across their threads
+        self._sync_client: Optional[httpx.Client] = None
+        self._sync_lock = threading.Lock()
+
+        self.metrics = {
+            "requests": 0,
+            "deduplicated": 0,
+            "retries": 0,
+            "retries_denied": 0,
+            "errors": 0,
+            "total_latency": 0.0
+        }
+
+    def set_endpoint_timeouts(self, endpoint_timeouts: Dict[str, float]):
+        """Add or replace per-endpoint read timeouts."""
+        self.endpoint_timeouts.update(endpoint_timeouts)
+
+    def timeout_for(self, path: str) -> httpx.Timeout:
+        """
+        Resolve the timeout for a request path.
+
+        An exact path entry wins; otherwise the longest matching glob does.
+        """
+        read = self.endpoint_timeouts.get(path)
+        if read is None:
+            for pattern in sorted(self.endpoint_timeouts, key=len, reverse=True):
+                if fnmatch.fnmatchcase(path, pattern):
+                    read = self.endpoint_timeouts[pattern]
+                    break
+        if read is None:
+            read = self.default_timeout
+        return httpx.Timeout(connect=2.0, read=read, write=5.0, pool=3.0)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=self.limits,
+                trust_env=False,
+                http2=False,
+                follow_redirects=False,
+                transport=self._transport
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        GET a bridge endpoint and decode the JSON body.
+
+        Concurrent calls with the same path and parameters share one request.
+
+        Raises:
+            httpx.RequestError: If the bridge cannot be reached
+            httpx.HTTPStatusError: If the bridge answers with an error status
+        """
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        key = (path, tuple(sorted((k, str(v)) for k, v in params.items())))
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.metrics["deduplicated"] += 1
+        else:
+            task = asyncio.ensure_future(self._fetch_json(path, params))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        # Shield the shared request so one caller's cancellation doesn't fail the others
+        return await asyncio.shield(task)
+
+    async def _fetch_json(self, path: str, params: Dict[str, Any]) -> Any:
+        response = await self.request("GET", path, params=params)
+        return response.json()
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Send a request through the shared pool.
+
+        Idempotent methods are retried on connection failures and 502/503/504
+        responses while the retry budget allows.
+        """
+        client = self._get_client()
+        timeout = kwargs.pop("timeout", None) or self.timeout_for(path)
+        retryable = method.upper() in ("GET", "HEAD")
+
+        self.metrics["requests"] += 1
+        self.retry_budget.deposit()
+        started = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    response = await client.request(method, path, timeout=timeout, **kwargs)
+                    if response.status_code not in RETRYABLE_STATUS_CODES or not self._may_retry(retryable, attempt):
+                        response.raise_for_status()
+                        return response
+                except RETRYABLE_ERRORS as e:
+                    if not self._may_retry(retryable, attempt):
+                        raise
+                    logger.debug(f"Retrying {method} {path} after {type(e).__name__}")
+                attempt += 1
+                self.metrics["retries"] += 1
+                await asyncio.sleep(self.retry_backoff * (2 ** (attempt - 1)) * (0.5 + random.random()))
+        except (httpx.RequestError, httpx.HTTPStatusError):
+            self.metrics["errors"] += 1
+            raise
+        finally:
+            self.metrics["total_latency"] += time.perf_counter() - started
+
+    def _get_sync_client(self) -> httpx.Client:
+        with self._sync_lock:
+            if self._sync_client is None or self._sync_client.is_closed:
+                transport = self._transport if isinstance(self._transport, httpx.BaseTransport) else None
+                self._sync_client = httpx.Client(
+                    base_url=self.base_url,
+                    limits=self.limits,
+                    trust_env=False,
+                    http2=False,
+                    follow_redirects=False,
+                    transport=transport
+                )
+            return self._sync_client
+
+    def get_json_sync(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Blocking GET of a bridge endpoint through the shared synchronous pool.
+
+        Raises:
+            httpx.RequestError: If the bridge cannot be reached
+            httpx.HTTPStatusError: If the bridge answers with an error status
+        """
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        return self.request_sync("GET", path, params=params).json()
+
+    def request_sync(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Blocking counterpart of request(), with the same timeouts and retry budget."""
+        client = self._get_sync_client()
+        timeout = kwargs.pop("timeout", None) or self.timeout_for(path)
+        retryable = method.upper() in ("GET", "HEAD")
+
+        self.metrics["requests"] += 1
+        self.retry_budget.deposit()
+        started = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    response = client.request(method, path, timeout=timeout, **kwargs)
+                    if response.status_code not in RETRYABLE_STATUS_CODES or not self._may_retry(retryable, attempt):
+                        response.raise_for_status()
+                        return response
+                except RETRYABLE_ERRORS as e:
+                    if not self._may_retry(retryable, attempt):
+                        raise
+                    logger.debug(f"Retrying {method} {path} after {type(e).__name__}")
+                attempt += 1
+                self.metrics["retries"] += 1
+                time.sleep(self.retry_backoff * (2 ** (attempt - 1)) * (0.5 + random.random()))
+        except (httpx.RequestError, httpx.HTTPStatusError):
+            self.metrics["errors"] += 1
+            raise
+        finally:
+            self.metrics["total_latency"] += time.perf_counter() - started
+
+    def _may_retry(self, retryable: bool, attempt: int) -> bool:
+        if not retryable or attempt >= self.max_retries:
+            return False
+        if not self.retry_budget.try_withdraw():
+            self.metrics["retries_denied"] += 1
+            return False
+        return True
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get request, deduplication and retry counters."""
+        requests = self.metrics["requests"]
+        return {
+            "base_url": self.base_url,
+            **self.metrics,
+            "in_flight": len(self._in_flight),
+            "average_latency": self.metrics["total_latency"] / requests if requests else 0.0,
+            "retry_tokens": round(self.retry_budget.tokens, 2),
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections
+        }
+
+    async def aclose(self):
+        """Close the connection pools."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+        with self._sync_lock:
+            if self._sync_client is not None:
+                self._sync_client.close()
+            self._sync_client = None
+
+
+_clients: Dict[str, BridgeClient] = {}
+
+
+def normalize_bridge_url(bridge_url: str) -> str:
+    """Strip a trailing slash and the legacy '/bridge' suffix."""
+    norm = bridge_url.rstrip('/')
+    if norm.endswith('/bridge'):
+        norm = norm[:-len('/bridge')]
+    return norm
+
+
+def get_bridge_client(bridge_url: str, endpoint_timeouts: Optional[Dict[str, float]] = None) -> BridgeClient:
+    """
+    Get the process-wide client for a bridge URL, creating it on first use.
+
+    Args:
+        bridge_url: Bridge base URL
+        endpoint_timeouts: Read timeouts merged into the shared client's table
+
+    Returns:
+        Shared BridgeClient instance
+    """
+    base_url = normalize_bridge_url(bridge_url)
+    client = _clients.get(base_url)
+    if client is None:
+        client = _clients[base_url] = BridgeClient(base_url)
+    if endpoint_timeouts:
+        client.set_endpoint_timeouts(endpoint_timeouts)
+    return client
+
+
+async def close_bridge_clients():
+    """Close every shared bridge client."""
+    for client in list(_clients.values()):
+        await client.aclose()
+    _clients.clear()
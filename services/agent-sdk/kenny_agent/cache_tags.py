@@ -0,0 +1,277 @@
+"""
+Dependency tags for semantic cache entries.
+
+Every cached answer is tagged with what it depends on: the intents in the
+query ("today", "meetings"), the contacts it names, and the calendar days
+it covers. SemanticCache keeps a tag -> keys reverse index on every tier,
+so a calendar change can evict exactly the answers covering the changed
+days instead of scanning keys for text patterns.
+
+Tag formats:
+- intent:<name>       e.g. intent:today, intent:this_week
+- contact:<name>      lower-cased contact name or address
+- day:YYYY-MM-DD      a day the answer covers
+- month:YYYY-MM       a month covered by an answer spanning a long range
+- day:any             the answer covers no specific dates (e.g. a search)
+"""
+
+import re
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+UNDATED_TAG = "day:any"
+
+# Answers covering more than this many days are tagged by month
+LONG_RANGE_DAYS = 62
+
+# Matches the 30-day window the calendar monitor watches
+UPCOMING_WINDOW_DAYS = 30
+
+INTENT_PATTERNS = {
+    "today": r"\btoday\b",
+    "tomorrow": r"\btomorrow\b",
+    "yesterday": r"\byesterday\b",
+    "this_week": r"\bthis[ _]week\b",
+    "next_week": r"\bnext[ _]week\b",
+    "this_month": r"\bthis[ _]month\b",
+    "next_month": r"\bnext[ _]month\b",
+    "upcoming": r"\bupcoming\b",
+    "meetings": r"\bmeetings?\b",
+    "events": r"\bevents?\b",
+    "schedule": r"\bschedule\b",
+    "availability": r"\b(?:availability|available|free)\b",
+}
+
+# Intents whose dates are resolved against the current day
+RELATIVE_DATE_INTENTS = ("today", "tomorrow", "yesterday", "this_week", "next_week",
+                         "this_month", "next_month", "upcoming")
+
+CONTACT_PARAMETERS = ("contact", "contact_name", "person", "participant", "participants", "attendees")
+
+# Words that end a "with <name>" phrase
+_CONTACT_STOP_WORDS = {
+    "today", "tomorrow", "yesterday", "this", "next", "on", "at", "in", "about",
+    "for", "from", "upcoming", "and", "between", "before", "after", "during"
+}
+
+_ISO_DATE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+_TEMPLATE_PLACEHOLDER = re.compile(r"\[([A-Z_]+)\]")
+
+DateLike = Union[date, datetime, str]
+
+
+def intent_tag(intent: str) -> str:
+    """Tag for a query intent."""
+    return f"intent:{intent}"
+
+
+def contact_tag(name: str) -> str:
+    """Tag for a contact name, email or handle."""
+    return f"contact:{' '.join(str(name).lower().split())}"
+
+
+def day_tag(day: date) -> str:
+    """Tag for a single calendar day."""
+    return f"day:{day.isoformat()}"
+
+
+def month_tag(day: date) -> str:
+    """Tag for the month containing a day."""
+    return f"month:{day.strftime('%Y-%m')}"
+
+
+def to_local_date(value: Optional[DateLike]) -> Optional[date]:
+    """Convert a date, datetime or ISO string to a local calendar date."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone()
+        return value.date()
+    return value
+
+
+def _months_between(start: date, end: date) -> List[date]:
+    months = []
+    current = start.replace(day=1)
+    while current <= end:
+        months.append(current)
+        current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return months
+
+
+def _days_between(start: date, end: date) -> List[date]:
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def entry_date_tags(start: date, end: date) -> Set[str]:
+    """Tags for an answer covering start..end (day tags, or month tags for long ranges)."""
+    if end < start:
+        start, end = end, start
+    if (end - start).days + 1 > LONG_RANGE_DAYS:
+        return {month_tag(month) for month in _months_between(start, end)}
+    return {day_tag(day) for day in _days_between(start, end)}
+
+
+def date_range_tags(start: DateLike, end: DateLike) -> Set[str]:
+    """Tags of every answer that may depend on a change between start and end."""
+    start_day = to_local_date(start)
+    end_day = to_local_date(end) or start_day
+    if start_day is None:
+        return {UNDATED_TAG}
+    if end_day < start_day:
+        start_day, end_day = end_day, start_day
+
+    tags = {day_tag(day) for day in _days_between(start_day, end_day)}
+    tags.update(month_tag(month) for month in _months_between(start_day, end_day))
+    tags.add(UNDATED_TAG)
+    return tags
+
+
+def _intent_ranges(intents: Iterable[str], today: date) -> List[Tuple[date, date]]:
+    """Calendar days covered by relative date intents, resolved against today."""
+    monday = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    next_month_start = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    following_month_start = (next_month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+    windows = {
+        "today": (today, today),
+        "tomorrow": (today + timedelta(days=1), today + timedelta(days=1)),
+        "yesterday": (today - timedelta(days=1), today - timedelta(days=1)),
+        # Covers both calendar-week and rolling seven-day readings
+        "this_week": (monday, max(monday + timedelta(days=6), today + timedelta(days=6))),
+        "next_week": (monday + timedelta(days=7), monday + timedelta(days=13)),
+        "this_month": (month_start, next_month_start - timedelta(days=1)),
+        "next_month": (next_month_start, following_month_start - timedelta(days=1)),
+        "upcoming": (today, today + timedelta(days=UPCOMING_WINDOW_DAYS)),
+    }
+    return [windows[intent] for intent in intents if intent in windows]
+
+
+def _parameter_ranges(parameters: Dict[str, Any]) -> List[Tuple[date, date]]:
+    """Calendar days named explicitly in capability parameters."""
+    ranges = []
+    date_range = parameters.get("date_range")
+    if isinstance(date_range, dict):
+        start = to_local_date(date_range.get("start") or date_range.get("start_date"))
+        end = to_local_date(date_range.get("end") or date_range.get("end_date"))
+        if start or end:
+            ranges.append((start or end, end or start))
+
+    start = to_local_date(parameters.get("start_date"))
+    end = to_local_date(parameters.get("end_date"))
+    if start or end:
+        ranges.append((start or end, end or start))
+
+    single = to_local_date(parameters.get("date"))
+    if single:
+        ranges.append((single, single))
+    return ranges
+
+
+def _contacts_in_text(text: str) -> List[str]:
+    """Names following "with" in a query, e.g. "meetings with Sarah Chen today"."""
+    words = re.findall(r"[\w.@'+-]+", text)
+    contacts = []
+    for index, word in enumerate(words):
+        if word.lower() != "with":
+            continue
+        name = []
+        for candidate in words[index + 1:index + 4]:
+            if candidate.lower() in _CONTACT_STOP_WORDS:
+                break
+            name.append(candidate)
+        if name:
+            contacts.append(" ".join(name))
+    return contacts
+
+
+def _contacts_in_parameters(parameters: Dict[str, Any]) -> List[str]:
+    contacts = []
+    for key in CONTACT_PARAMETERS:
+        value = parameters.get(key)
+        values = value if isinstance(value, list) else [value]
+        for item in values:
+            if isinstance(item, dict):
+                item = item.get("name") or item.get("email")
+            if isinstance(item, str) and item.strip():
+                contacts.append(item)
+
+    contact_filter = parameters.get("contact_filter")
+    if isinstance(contact_filter, dict):
+        for key in ("name", "email", "display_name"):
+            if isinstance(contact_filter.get(key), str):
+                contacts.append(contact_filter[key])
+    return contacts
+
+
+def _normalize_template(text: str) -> str:
+    """Turn query-analyzer templates ("events [THIS_WEEK]") back into words."""
+    return _TEMPLATE_PLACEHOLDER.sub(
+        lambda match: "" if match.group(1) in ("NAME", "DATE") else match.group(1).lower().replace("_", " "),
+        text
+    )
+
+
+def _intents(text: str) -> List[str]:
+    lowered = text.lower()
+    return [intent for intent, pattern in INTENT_PATTERNS.items() if re.search(pattern, lowered)]
+
+
+def derive_cache_tags(query: str, parameters: Optional[Dict[str, Any]] = None,
+                      now: Optional[datetime] = None) -> Set[str]:
+    """Derive the dependency tags of a cached answer from its query and capability parameters."""
+    parameters = parameters or {}
+    today = (now or datetime.now()).date()
+    text = _normalize_template(query)
+
+    intents = _intents(text)
+    tags = {intent_tag(intent) for intent in intents}
+    tags.update(contact_tag(name) for name in _contacts_in_text(text))
+    tags.update(contact_tag(name) for name in _contacts_in_parameters(parameters))
+
+    ranges = _intent_ranges(intents, today) + _parameter_ranges(parameters)
+    explicit_days = sorted(day for day in map(to_local_date, _ISO_DATE.findall(text)) if day)
+    if len(explicit_days) >= 2:
+        ranges.append((explicit_days[0], explicit_days[-1]))
+    elif explicit_days:
+        ranges.append((explicit_days[0], explicit_days[0]))
+
+    if ranges:
+        for start, end in ranges:
+            tags.update(entry_date_tags(start, end))
+    else:
+        tags.add(UNDATED_TAG)
+    return tags
+
+
+def pattern_tags(pattern: str) -> Set[str]:
+    """Tags an answer must all carry to match an invalidation pattern like "events today"."""
+    text = _normalize_template(pattern)
+    tags = {intent_tag(intent) for intent in _intents(text)}
+    tags.update(contact_tag(name) for name in _contacts_in_text(text))
+    return tags
+
+
+def has_relative_dates(query: str) -> bool:
+    """Whether the query's dates depend on the day it is asked ("events today")."""
+    return any(intent in RELATIVE_DATE_INTENTS for intent in _intents(_normalize_template(query)))
+
+
+def has_date_parameters(parameters: Any) -> bool:
+    """Whether capability parameters carry a date anywhere in their values."""
+    if isinstance(parameters, (date, datetime)):
+        return True
+    if isinstance(parameters, str):
+        return to_local_date(parameters) is not None or _ISO_DATE.search(parameters) is not None
+    if isinstance(parameters, dict):
+        return any(has_date_parameters(value) for value in parameters.values())
+    if isinstance(parameters, (list, tuple)):
+        return any(has_date_parameters(value) for value in parameters)
+    return False
@@ -58,6 +58,7 @@ class CacheWarmingService:
             "warming_cycles": 0,
             "patterns_warmed": 0,
             "warming_errors": 0,
+            "patterns_replayed": 0,
             "last_warming_time": None,
             "avg_warming_duration": 0.0
         }
@@ -135,19 +136,30 @@ class CacheWarmingService:
         
         for pattern in self.calendar_warming_patterns:
             try:
-                # Use the agent's process_natural_language_query to warm the cache
-                if hasattr(self.agent, 'process_natural_language_query'):
-                    await self.agent.process_natural_language_query(pattern)
-                    self.warming_metrics["patterns_warmed"] += 1
+                if await self._warm(pattern) is not None:
                     self.logger.debug(f"Warmed cache for pattern: {pattern}")
-                    
-                    # Small delay to avoid overwhelming the system
-                    await asyncio.sleep(0.1)
-                    
+                
             except Exception as e:
                 self.logger.error(f"Error warming pattern '{pattern}': {e}")
                 self.warming_metrics["warming_errors"] += 1
     
+    async def _warm(self, pattern: str) -> Optional[Dict[str, Any]]:
+        """Warm one pattern, replaying its recorded capability call when the agent supports it."""
+        if hasattr(self.agent, 'warm_cached_query'):
+            result = await self.agent.warm_cached_query(pattern)
+        elif hasattr(self.agent, 'process_natural_language_query'):
+            result = await self.agent.process_natural_language_query(pattern, {"warming": True})
+        else:
+            return None
+        
+        self.warming_metrics["patterns_warmed"] += 1
+        if result.get("replayed"):
+            self.warming_metrics["patterns_replayed"] += 1
+        else:
+            # LLM-interpreted warm-ups get a small delay to avoid overwhelming Ollama
+            await asyncio.sleep(0.1)
+        return result
+    
     async def _warm_contact_patterns(self):
         """Warm cache with common contact resolution patterns."""
         # This would warm common contact queries if contacts agent is available
@@ -158,9 +170,7 @@ class CacheWarmingService:
         """Force warm cache for a specific pattern immediately."""
         self.logger.info(f"Force warming pattern: {pattern}")
         try:
-            if hasattr(self.agent, 'process_natural_language_query'):
-                await self.agent.process_natural_language_query(pattern)
-                self.warming_metrics["patterns_warmed"] += 1
+            if await self._warm(pattern) is not None:
                 self.logger.info(f"Successfully warmed pattern: {pattern}")
         except Exception as e:
             self.logger.error(f"Error force warming pattern '{pattern}': {e}")
@@ -7,6 +7,7 @@ actual calendar modifications.
 
 Key Features:
 - Real-time EventKit change notifications
+- Delta change feed (sync tokens + long-polling) so cost scales with change rate
 - Intelligent mapping of calendar changes to affected cache entries
 - Smart cache invalidation for affected date ranges
 - Cross-tier cache refresh coordination
@@ -53,6 +54,7 @@ class CacheInvalidationRange:
     affected_contacts: List[str]
     priority: float  # 0.0 to 1.0, higher means more urgent
     reasoning: str
+    invalidate_dates: bool = True  # False for ranges that only drive pre-warming
 
 
 class CalendarEventMonitor:
@@ -63,7 +65,7 @@ class CalendarEventMonitor:
     and coordinate intelligent cache updates across all cache tiers.
     """
     
-    def __init__(self, agent, bridge_url: str = "http://localhost:5100"):
+    def __init__(self, agent, bridge_url: str = "http://localhost:5100", change_source=None):
         """Initialize the calendar event monitor."""
         self.agent = agent
         self.bridge_url = bridge_url
@@ -74,6 +76,16 @@ class CalendarEventMonitor:
         self.polling_interval = 5.0  # seconds
         self.change_detection_window = 60  # seconds to batch changes
         
+        # Delta change feed: any object with async get_changes(since, wait, limit),
+        # by default the calendar bridge tool; falls back to full-window polling
+        self.change_source = change_source
+        self.change_token: Optional[str] = None
+        self.change_feed_enabled = False
+        self.change_feed_wait = 25.0  # seconds the source may hold a poll open
+        self.change_feed_page_limit = 500
+        self.change_feed_max_pages = 10  # per monitoring cycle
+        self.min_poll_interval = 1.0  # guards against tight loops on sources without long-polling
+        
         # Change tracking
         self.recent_changes: List[CalendarEvent] = []
         self.last_change_check = datetime.now()
@@ -90,7 +102,11 @@ class CalendarEventMonitor:
             "cache_invalidations": 0,
             "successful_refreshes": 0,
             "monitoring_errors": 0,
-            "avg_invalidation_time": 0.0
+            "avg_invalidation_time": 0.0,
+            "entries_invalidated": 0,
+            "delta_polls": 0,
+            "full_scans": 0,
+            "feed_resets": 0
         }
         
         # Calendar state tracking for intelligent change detection
@@ -143,6 +159,17 @@ class CalendarEventMonitor:
     async def register_change_notifications(self):
         """Register for EventKit change notifications via bridge."""
         try:
+            # Prefer the bridge's delta change feed; take the current token so
+            # only changes from now on are delivered
+            source = self._get_change_source()
+            if source is not None:
+                response = await source.get_changes(since=None, wait=0.0, limit=1)
+                if response.get("success", True) and response.get("next_token") is not None:
+                    self.change_token = response["next_token"]
+                    self.change_feed_enabled = True
+                    self.logger.info(f"Registered for calendar change feed at token {self.change_token}")
+                    return
+            
             # Since we can't directly access EventKit from Python,
             # we'll use polling-based change detection through the bridge
             await self._initialize_calendar_state()
@@ -170,7 +197,9 @@ class CalendarEventMonitor:
             
             # Trigger immediate refresh for high-priority changes
             if self._is_high_priority_change(event_change):
-                await self.trigger_intelligent_refresh([range_info.query_patterns[0] for range_info in affected_ranges])
+                for range_info in affected_ranges:
+                    if range_info.invalidate_dates:
+                        await self.trigger_intelligent_refresh(range_info.query_patterns[:1], range_info)
             
         except Exception as e:
             self.logger.error(f"Error handling calendar change: {e}")
@@ -215,14 +244,28 @@ class CalendarEventMonitor:
             )
             affected_ranges.append(primary_range)
             
-            # Create extended range for broader impact
+            # A moved event also changes answers covering its previous slot
+            previous_start = self._parse_date(change.metadata.get("previous_start_date")) if change.metadata else None
+            previous_end = self._parse_date(change.metadata.get("previous_end_date")) if change.metadata else None
+            if previous_start and previous_end and (previous_start, previous_end) != (change.start_date, change.end_date):
+                affected_ranges.append(CacheInvalidationRange(
+                    date_range=(previous_start - timedelta(hours=1), previous_end + timedelta(hours=1)),
+                    query_patterns=query_patterns[:3],
+                    affected_contacts=affected_contacts,
+                    priority=primary_range.priority,
+                    reasoning=f"Previous slot of {change.change_type.value}"
+                ))
+            
+            # Create extended range for broader impact; week and month answers are
+            # tagged with every day they cover, so this range only drives pre-warming
             if len(query_patterns) > 3:
                 extended_range = CacheInvalidationRange(
                     date_range=(extended_start, extended_end),
                     query_patterns=query_patterns[3:],  # Broader patterns
                     affected_contacts=affected_contacts,
                     priority=max(0.3, primary_range.priority - 0.3),
-                    reasoning=f"Extended impact from {change.change_type.value}"
+                    reasoning=f"Extended impact from {change.change_type.value}",
+                    invalidate_dates=False
                 )
                 affected_ranges.append(extended_range)
             
@@ -233,14 +276,23 @@ class CalendarEventMonitor:
             self.logger.error(f"Error identifying affected cache entries: {e}")
             return []
     
-    async def trigger_intelligent_refresh(self, cache_keys: List[str]):
-        """Trigger intelligent refresh of specified cache entries."""
+    async def trigger_intelligent_refresh(self, cache_keys: List[str],
+                                          invalidation_range: Optional[CacheInvalidationRange] = None):
+        """Trigger intelligent refresh of specified cache entries.
+        
+        With an invalidation range, entries depending on its dates are evicted
+        through the cache's tag index and the patterns are only pre-warmed;
+        without one, each pattern is invalidated before pre-warming.
+        """
         start_time = time.time()
         successful_refreshes = 0
         
         try:
             self.logger.info(f"Triggering intelligent refresh for {len(cache_keys)} cache keys")
             
+            if invalidation_range is not None and invalidation_range.invalidate_dates:
+                await self._invalidate_cache_range(invalidation_range)
+            
             # Group cache keys by pattern for efficient batch processing
             pattern_groups = self._group_cache_keys_by_pattern(cache_keys)
             
@@ -248,7 +300,8 @@ class CalendarEventMonitor:
             for pattern, keys in pattern_groups.items():
                 try:
                     # Invalidate existing cache entries first
-                    await self._invalidate_cache_pattern(pattern)
+                    if invalidation_range is None:
+                        await self._invalidate_cache_pattern(pattern)
                     
                     # Pre-warm with fresh data
                     await self._prewarm_cache_pattern(pattern)
@@ -285,7 +338,9 @@ class CalendarEventMonitor:
         """Main monitoring loop for detecting calendar changes."""
         while self.monitoring_enabled:
             try:
-                # Poll for calendar changes
+                poll_start = time.time()
+                
+                # Poll for calendar changes (long-polls when the change feed is enabled)
                 changes = await self._detect_calendar_changes()
                 
                 # Process detected changes
@@ -296,7 +351,10 @@ class CalendarEventMonitor:
                 self.last_change_check = datetime.now()
                 
                 # Wait for next polling interval
-                await asyncio.sleep(self.polling_interval)
+                if self.change_feed_enabled:
+                    await asyncio.sleep(max(0.0, self.min_poll_interval - (time.time() - poll_start)))
+                else:
+                    await asyncio.sleep(self.polling_interval)
                 
             except asyncio.CancelledError:
                 break
@@ -321,9 +379,20 @@ class CalendarEventMonitor:
                 self.logger.error(f"Error in invalidation loop: {e}")
                 await asyncio.sleep(1.0)
     
+    def _get_change_source(self):
+        """Resolve the change feed source, if any supports get_changes."""
+        source = self.change_source
+        if source is None:
+            source = getattr(self.agent, "tools", {}).get("calendar_bridge")
+        return source if hasattr(source, "get_changes") else None
+    
     async def _detect_calendar_changes(self) -> List[CalendarEvent]:
-        """Detect calendar changes by comparing current state with known state."""
+        """Detect calendar changes from the change feed, or by diffing full state."""
+        if self.change_feed_enabled:
+            return await self._fetch_change_deltas()
+        
         changes = []
+        self.monitoring_metrics["full_scans"] += 1
         
         try:
             # Get current calendar events via bridge
@@ -341,8 +410,8 @@ class CalendarEventMonitor:
                     change_type=CalendarChangeType.EVENT_ADDED,
                     event_id=event_id,
                     calendar_id=event_data.get("calendar_id"),
-                    start_date=self._parse_date(event_data.get("start_date")),
-                    end_date=self._parse_date(event_data.get("end_date")),
+                    start_date=self._parse_date(self._event_field(event_data, "start")),
+                    end_date=self._parse_date(self._event_field(event_data, "end")),
                     title=event_data.get("title"),
                     participants=event_data.get("participants", []),
                     timestamp=datetime.now(),
@@ -358,8 +427,8 @@ class CalendarEventMonitor:
                     change_type=CalendarChangeType.EVENT_DELETED,
                     event_id=event_id,
                     calendar_id=event_data.get("calendar_id"),
-                    start_date=self._parse_date(event_data.get("start_date")),
-                    end_date=self._parse_date(event_data.get("end_date")),
+                    start_date=self._parse_date(self._event_field(event_data, "start")),
+                    end_date=self._parse_date(self._event_field(event_data, "end")),
                     title=event_data.get("title"),
                     participants=event_data.get("participants", []),
                     timestamp=datetime.now(),
@@ -377,12 +446,16 @@ class CalendarEventMonitor:
                         change_type=CalendarChangeType.EVENT_MODIFIED,
                         event_id=event_id,
                         calendar_id=current_data.get("calendar_id"),
-                        start_date=self._parse_date(current_data.get("start_date")),
-                        end_date=self._parse_date(current_data.get("end_date")),
+                        start_date=self._parse_date(self._event_field(current_data, "start")),
+                        end_date=self._parse_date(self._event_field(current_data, "end")),
                         title=current_data.get("title"),
                         participants=current_data.get("participants", []),
                         timestamp=datetime.now(),
-                        metadata=current_data
+                        metadata={
+                            **current_data,
+                            "previous_start_date": self._event_field(known_data, "start"),
+                            "previous_end_date": self._event_field(known_data, "end")
+                        }
                     )
                     changes.append(change)
             
@@ -398,6 +471,105 @@ class CalendarEventMonitor:
             self.logger.error(f"Error detecting calendar changes: {e}")
             return []
     
+    async def _fetch_change_deltas(self) -> List[CalendarEvent]:
+        """Fetch only the changes since the last sync token."""
+        source = self._get_change_source()
+        changes = []
+        
+        try:
+            for page in range(self.change_feed_max_pages):
+                response = await source.get_changes(
+                    since=self.change_token,
+                    wait=self.change_feed_wait if page == 0 else 0.0,
+                    limit=self.change_feed_page_limit
+                )
+                self.monitoring_metrics["delta_polls"] += 1
+                
+                if not response.get("success", True):
+                    if response.get("unsupported"):
+                        # Source lost its change feed; fall back to full-window polling
+                        self.logger.warning("Calendar change feed unsupported, falling back to polling")
+                        self.change_feed_enabled = False
+                        await self._initialize_calendar_state()
+                    else:
+                        self.monitoring_metrics["monitoring_errors"] += 1
+                    break
+                
+                if response.get("reset_required"):
+                    # Token expired or the source restarted: changes were missed
+                    self.monitoring_metrics["feed_resets"] += 1
+                    self.change_token = response.get("next_token")
+                    changes.append(CalendarEvent(
+                        change_type=CalendarChangeType.STORE_CHANGED,
+                        event_id=None,
+                        calendar_id=None,
+                        start_date=None,
+                        end_date=None,
+                        title=None,
+                        participants=[],
+                        timestamp=datetime.now(),
+                        metadata={"reason": "change_feed_reset"}
+                    ))
+                    break
+                
+                for delta in response.get("changes", []):
+                    change = self._delta_to_calendar_event(delta)
+                    if change is not None:
+                        changes.append(change)
+                self.change_token = response.get("next_token", self.change_token)
+                
+                if not response.get("has_more"):
+                    break
+            
+            if changes:
+                self.logger.info(f"Received {len(changes)} calendar changes from change feed")
+            
+        except Exception as e:
+            self.logger.error(f"Error fetching calendar change deltas: {e}")
+            self.monitoring_metrics["monitoring_errors"] += 1
+        
+        return changes
+    
+    def _delta_to_calendar_event(self, delta: Dict[str, Any]) -> Optional[CalendarEvent]:
+        """Convert a change feed entry into a CalendarEvent and update known state."""
+        change_types = {
+            "created": CalendarChangeType.EVENT_ADDED,
+            "updated": CalendarChangeType.EVENT_MODIFIED,
+            "deleted": CalendarChangeType.EVENT_DELETED
+        }
+        change_type = change_types.get(delta.get("operation"))
+        if change_type is None:
+            return None
+        
+        event_data = delta.get("event") or {}
+        event_id = delta.get("event_id") or event_data.get("id")
+        metadata = dict(event_data)
+        previous = delta.get("previous")
+        if previous:
+            metadata["previous_start_date"] = previous.get("start")
+            metadata["previous_end_date"] = previous.get("end")
+        
+        if change_type == CalendarChangeType.EVENT_DELETED:
+            self.known_events.pop(event_id, None)
+        else:
+            self.known_events[event_id] = event_data
+        
+        return CalendarEvent(
+            change_type=change_type,
+            event_id=event_id,
+            calendar_id=event_data.get("calendar_id") or delta.get("calendar"),
+            start_date=self._parse_date(self._event_field(event_data, "start")),
+            end_date=self._parse_date(self._event_field(event_data, "end")),
+            title=event_data.get("title"),
+            participants=event_data.get("participants") or event_data.get("attendees") or [],
+            timestamp=datetime.now(),
+            metadata=metadata
+        )
+    
+    def _event_field(self, event_data: Dict[str, Any], field: str) -> Optional[str]:
+        """Read start/end across bridge ("start"), monitor ("start_date") and database ("start_time") shapes."""
+        return event_data.get(f"{field}_date") or event_data.get(field) or event_data.get(f"{field}_time")
+    
     async def _fetch_current_calendar_state(self) -> Dict[str, Dict]:
         """Fetch current calendar state via bridge."""
         try:
@@ -433,7 +605,7 @@ class CalendarEventMonitor:
     def _event_has_changed(self, current: Dict, known: Dict) -> bool:
         """Check if an event has meaningful changes."""
         # Check key fields for changes
-        key_fields = ["title", "start_date", "end_date", "location", "participants"]
+        key_fields = ["title", "start_date", "end_date", "start", "end", "location", "participants", "attendees"]
         
         for field in key_fields:
             if current.get(field) != known.get(field):
@@ -554,6 +726,10 @@ class CalendarEventMonitor:
         else:
             self.pending_invalidations[range_key] = range_info
     
+    async def flush_invalidations(self):
+        """Process pending invalidations now instead of waiting for the debounce loop."""
+        await self._process_pending_invalidations()
+    
     async def _process_pending_invalidations(self):
         """Process all pending cache invalidations."""
         if not self.pending_invalidations:
@@ -577,7 +753,7 @@ class CalendarEventMonitor:
                         continue  # Skip, too soon
                 
                 # Process invalidation
-                await self.trigger_intelligent_refresh(range_info.query_patterns)
+                await self.trigger_intelligent_refresh(range_info.query_patterns, range_info)
                 
                 # Update last invalidation time
                 self.last_invalidation_time[range_key] = time.time()
@@ -624,6 +800,18 @@ class CalendarEventMonitor:
         if hasattr(self.agent, 'semantic_cache'):
             await self.agent.semantic_cache.invalidate_cache_pattern(pattern, self.agent.agent_id)
     
+    async def _invalidate_cache_range(self, range_info: CacheInvalidationRange) -> int:
+        """Invalidate cache entries whose answers cover the range's dates."""
+        cache = getattr(self.agent, 'semantic_cache', None)
+        if cache is None or not hasattr(cache, 'invalidate_date_range'):
+            return 0
+        
+        start_date, end_date = range_info.date_range
+        invalidated = await cache.invalidate_date_range(start_date, end_date, self.agent.agent_id)
+        self.monitoring_metrics["entries_invalidated"] += invalidated
+        self.logger.debug(f"Invalidated {invalidated} cache entries for {start_date} - {end_date}")
+        return invalidated
+    
     async def _prewarm_cache_pattern(self, pattern: str):
         """Pre-warm cache for a specific pattern."""
         try:
@@ -666,6 +854,8 @@ class CalendarEventMonitor:
             "pending_invalidations": len(self.pending_invalidations),
             "known_events_count": len(self.known_events),
             "last_sync_time": self.last_sync_time.isoformat() if self.last_sync_time else None,
+            "change_feed_enabled": self.change_feed_enabled,
+            "change_token": self.change_token,
             "polling_interval": self.polling_interval,
             "invalidation_debounce": self.invalidation_debounce
         }
\ No newline at end of file
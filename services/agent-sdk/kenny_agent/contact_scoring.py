@@ -0,0 +1,410 @@
+"""
+Shared confidence scoring for contact resolution.
+
+The contacts database, the intelligent resolve handler and the bridge's live
+Contacts search all rank candidates with ContactScorer, so resolving "Sarah"
+gives the same confidences and the same order whichever path answers it.
+
+Each contact is prepared once: its name is normalized (case-folded, accents
+and punctuation stripped) and split into tokens, the tokens, full name,
+email parts and organization go into sorted token indexes, and the padded
+character trigrams of the name are posted to an inverted index. A query is
+then scored against the whole address book in one pass: a single bincount
+over the query's trigram posting lists gives every contact's trigram overlap,
+from which the fuzzy (Dice) similarity, substring and contained-name
+candidates all follow, while exact, word and prefix matches come straight
+from the token indexes. NumPy is used when installed; otherwise the same pass
+runs over a Counter and gives identical results.
+
+Confidence tiers (the highest one that applies wins):
+- 1.0   exact name
+- 0.95  exact email address
+- 0.9   whole words of the name (in any order), or the same phone number
+- 0.88  the name starts with the query
+- 0.85  words of the name start with the query's words
+- 0.8   the name contains the query, or the query contains the name
+- 0.7   part of an email address (local part or domain)
+- 0.65  organization
+- <0.6  fuzzy name similarity, FUZZY_WEIGHT * Dice when Dice >= FUZZY_MIN_SIMILARITY
+
+Contacts known on more than one platform get PLATFORM_BOOST per extra
+platform, capped at 1.0.
+"""
+
+import bisect
+import heapq
+import re
+import unicodedata
+from collections import Counter
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+EXACT_NAME = 1.0
+EXACT_EMAIL = 0.95
+NAME_WORD = 0.9
+PHONE = 0.9
+NAME_PREFIX = 0.88
+WORD_PREFIX = 0.85
+NAME_SUBSTRING = 0.8
+EMAIL_PART = 0.7
+ORGANIZATION = 0.65
+FUZZY_WEIGHT = 0.6
+FUZZY_MIN_SIMILARITY = 0.4
+PLATFORM_BOOST = 0.1
+
+NGRAM = 3
+# Shorter prefixes only match whole words of emails and organizations
+MIN_PREFIX_LENGTH = 3
+PHONE_TAIL_DIGITS = 7
+
+_APOSTROPHES = re.compile(r"['’`]")
+_NON_WORD = re.compile(r"[^\w\s]|_")
+_EMAIL_SEPARATORS = re.compile(r"[@._+\-]+")
+_PHONE_QUERY = re.compile(r"^\+?[\d\s\-\(\)\.]+$")
+
+
+def normalize_text(value: str) -> str:
+    """Case-fold, strip accents and punctuation, and collapse whitespace."""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(_NON_WORD.sub(" ", _APOSTROPHES.sub("", stripped.casefold())).split())
+
+
+def name_ngrams(normalized: str, n: int = NGRAM) -> set:
+    """Character n-grams of a normalized name, padded so word edges count."""
+    padded = f" {normalized} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def phone_digits(value: str) -> str:
+    """Digits of a phone number, without formatting."""
+    return "".join(ch for ch in value or "" if ch.isdigit())
+
+
+class _TokenIndex:
+    """Sorted vocabulary with postings, for exact and prefix lookups."""
+
+    def __init__(self):
+        self.postings: Dict[str, List[int]] = {}
+        self._vocab: List[str] = []
+        self._sorted = True
+
+    def add(self, token: str, index: int):
+        postings = self.postings.get(token)
+        if postings is None:
+            self.postings[token] = [index]
+            if self._vocab and token < self._vocab[-1]:
+                self._sorted = False
+            self._vocab.append(token)
+        else:
+            postings.append(index)
+
+    def exact(self, token: str) -> List[int]:
+        return self.postings.get(token, [])
+
+    def prefixed(self, prefix: str) -> Iterator[List[int]]:
+        if not self._sorted:
+            self._vocab.sort()
+            self._sorted = True
+        position = bisect.bisect_left(self._vocab, prefix)
+        while position < len(self._vocab) and self._vocab[position].startswith(prefix):
+            yield self.postings[self._vocab[position]]
+            position += 1
+
+
+class ContactScorer:
+    """Precomputed contact signatures for ranking a whole address book per query."""
+
+    def __init__(self, contacts: Iterable[Dict[str, Any]] = (), use_numpy: Optional[bool] = None):
+        """
+        Initialize the contact scorer.
+
+        Args:
+            contacts: Contacts with id, name and optionally emails, phones,
+                organization (or company) and platforms
+            use_numpy: Force the NumPy or pure-Python pass; defaults to NumPy when installed
+        """
+        self.use_numpy = NUMPY_AVAILABLE if use_numpy is None else bool(use_numpy and NUMPY_AVAILABLE)
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self._sizes: List[int] = []
+        self._boosts: List[float] = []
+        self._alive: List[bool] = []
+        self._positions: Dict[str, int] = {}
+
+        self._grams: Dict[str, List[int]] = {}
+        self._full_names = _TokenIndex()
+        self._words = _TokenIndex()
+        self._email_parts = _TokenIndex()
+        self._organizations = _TokenIndex()
+        self._emails: Dict[str, List[int]] = {}
+        self._phone_tails: Dict[str, List[Tuple[int, str]]] = {}
+
+        # NumPy views, rebuilt lazily after changes
+        self._gram_arrays: Dict[str, Any] = {}
+        self._arrays: Optional[Tuple[Any, Any, Any]] = None
+
+        for contact in contacts:
+            self.add(contact)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, contact_id: str) -> bool:
+        return contact_id in self._positions
+
+    def add(self, contact: Dict[str, Any]) -> int:
+        """Index a contact, replacing any earlier version with the same id."""
+        index = len(self.ids)
+        contact_id = str(contact.get("id") or index)
+        self.remove(contact_id)
+
+        name = normalize_text(contact.get("name") or "")
+        grams = name_ngrams(name) if name else set()
+        platforms = contact.get("platforms") or []
+
+        self.ids.append(contact_id)
+        self.names.append(name)
+        self._sizes.append(len(grams))
+        self._boosts.append(PLATFORM_BOOST * max(0, len(set(platforms)) - 1))
+        self._alive.append(True)
+        self._positions[contact_id] = index
+        self._arrays = None
+
+        for gram in grams:
+            self._grams.setdefault(gram, []).append(index)
+        if self._gram_arrays:
+            for gram in grams:
+                self._gram_arrays.pop(gram, None)
+        if name:
+            self._full_names.add(name, index)
+            for word in set(name.split()):
+                self._words.add(word, index)
+
+        for email in contact.get("emails") or []:
+            email = (email or "").strip().lower()
+            if email.startswith("mailto:"):
+                email = email[len("mailto:"):]
+            if not email:
+                continue
+            self._emails.setdefault(email, []).append(index)
+            for part in set(filter(None, _EMAIL_SEPARATORS.split(email))):
+                self._email_parts.add(part, index)
+
+        for phone in contact.get("phones") or []:
+            digits = phone_digits(phone)
+            if len(digits) >= PHONE_TAIL_DIGITS:
+                self._phone_tails.setdefault(digits[-PHONE_TAIL_DIGITS:], []).append((index, digits))
+
+        organization = normalize_text(contact.get("organization") or contact.get("company") or "")
+        if organization:
+            self._organizations.add(organization, index)
+            for word in set(organization.split()):
+                self._organizations.add(word, index)
+        return index
+
+    def remove(self, contact_id: str) -> bool:
+        """Drop a contact from future rankings."""
+        index = self._positions.pop(contact_id, None)
+        if index is None:
+            return False
+        self._alive[index] = False
+        self._arrays = None
+        return True
+
+    def rank(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float, str]]:
+        """
+        Score every contact against a query in one pass.
+
+        Args:
+            query: Name, email, phone number or organization
+            limit: Return only the top-k matches
+
+        Returns:
+            (contact_id, confidence, match_type) tuples, best first; ties are
+            ordered by normalized name, then id
+        """
+        normalized = normalize_text(query)
+        if not normalized or not self._positions:
+            return []
+
+        tiers = self._tier_matches(query, normalized)
+        grams = name_ngrams(normalized)
+        inner = {normalized[i:i + NGRAM] for i in range(len(normalized) - NGRAM + 1)}
+        if self.use_numpy:
+            scored = self._score_numpy(normalized, grams, inner, tiers, limit)
+        else:
+            scored = self._score_python(normalized, grams, inner, tiers)
+
+        order = lambda item: (-item[0], self.names[item[1]], self.ids[item[1]])
+        if limit is not None and len(scored) > limit:
+            scored = heapq.nsmallest(limit, scored, key=order)
+        else:
+            scored.sort(key=order)
+        return [(self.ids[index], score, match_type) for score, index, match_type in scored]
+
+    def rank_contacts(self, query: str, contacts: Dict[str, Dict[str, Any]],
+                      limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Rank contacts (keyed by id) and return copies with confidence and match_type set."""
+        ranked = []
+        for contact_id, confidence, match_type in self.rank(query, limit):
+            contact = contacts.get(contact_id)
+            if contact is not None:
+                ranked.append({**contact, "confidence": confidence, "match_type": match_type})
+        return ranked
+
+    def _tier_matches(self, query: str, normalized: str) -> List[Tuple[float, str, Iterable[int]]]:
+        """Exact, word, prefix and identifier matches from the token indexes, best tier first."""
+        words = normalized.split()
+        long_enough = len(normalized) >= MIN_PREFIX_LENGTH
+        email = query.strip().lower()
+        if email.startswith("mailto:"):
+            email = email[len("mailto:"):]
+
+        tiers = [(EXACT_NAME, "name", self._full_names.exact(normalized))]
+        if "@" in email:
+            tiers.append((EXACT_EMAIL, "email", self._emails.get(email, [])))
+        tiers.append((NAME_WORD, "name", self._all_words(words, self._words.exact)))
+        digits = phone_digits(query)
+        if len(digits) >= PHONE_TAIL_DIGITS and _PHONE_QUERY.match(query.strip()):
+            tiers.append((PHONE, "phone", [index for index, stored in self._phone_tails.get(digits[-PHONE_TAIL_DIGITS:], [])
+                                           if stored.endswith(digits) or digits.endswith(stored)]))
+        tiers.append((NAME_PREFIX, "name", chain.from_iterable(self._full_names.prefixed(normalized))))
+        tiers.append((WORD_PREFIX, "name", self._all_words(
+            words, lambda word: chain.from_iterable(self._words.prefixed(word)))))
+        # Substring and contained-name matches (NAME_SUBSTRING) come from the trigram pass
+        if len(words) == 1:
+            parts = self._email_parts.prefixed(normalized) if long_enough else [self._email_parts.exact(normalized)]
+            tiers.append((EMAIL_PART, "email", chain.from_iterable(parts)))
+        organizations = self._organizations.prefixed(normalized) if long_enough else [self._organizations.exact(normalized)]
+        tiers.append((ORGANIZATION, "organization", chain.from_iterable(organizations)))
+        return tiers
+
+    @staticmethod
+    def _all_words(words: List[str], lookup) -> Iterable[int]:
+        """Contacts matched by every query word (in any order)."""
+        if len(words) == 1:
+            return lookup(words[0])
+        matched = None
+        for word in words:
+            postings = set(lookup(word))
+            matched = postings if matched is None else matched & postings
+            if not matched:
+                return ()
+        return matched
+
+    def _is_substring_match(self, normalized: str, index: int) -> bool:
+        """Whether a trigram candidate's name really contains the query, or the query the name."""
+        name = self.names[index]
+        return normalized in name or f" {name} " in f" {normalized} "
+
+    def _score_numpy(self, normalized: str, grams: set, inner: set, tiers: List[Tuple[float, str, Iterable[int]]],
+                     limit: Optional[int]) -> List[Tuple[float, int, str]]:
+        sizes, boosts, alive = self._get_arrays()
+        count = len(self.ids)
+
+        # Tier matches, best first: a contact keeps the first tier that marks it
+        tier_scores = np.zeros(count, dtype=np.float64)
+        kinds = np.zeros(count, dtype=np.int8)
+        labels = [None]
+        for score, match_type, postings in tiers:
+            indexes = np.fromiter(postings, dtype=np.int64)
+            labels.append(match_type)
+            if len(indexes):
+                indexes = indexes[tier_scores[indexes] == 0]
+                tier_scores[indexes] = score
+                kinds[indexes] = len(labels) - 1
+        labels.append("name")
+
+        overlap = self._bincount(grams, count)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dice = np.where(sizes > 0, 2.0 * overlap / (len(grams) + sizes), 0.0)
+
+        # Names holding every trigram of the query, or whose trigrams all
+        # appear in the query, are checked for a real substring match
+        candidates = (overlap == sizes) & (sizes > 0)
+        if inner:
+            candidates |= self._bincount(inner, count) == len(inner)
+        for index in np.nonzero(candidates & (tier_scores < NAME_SUBSTRING))[0].tolist():
+            if self._is_substring_match(normalized, index):
+                tier_scores[index] = NAME_SUBSTRING
+                kinds[index] = len(labels) - 1
+
+        scores = np.where(tier_scores > 0, tier_scores,
+                          np.where(dice >= FUZZY_MIN_SIMILARITY, dice * FUZZY_WEIGHT, 0.0))
+        scores = np.where(alive & (scores > 0), np.minimum(1.0, scores + boosts), 0.0)
+
+        hits = np.nonzero(scores)[0]
+        if limit is not None and len(hits) > limit:
+            # Keep the top-k, plus anything that could round into a tie with the k-th score
+            kth = np.partition(scores[hits], len(hits) - limit)[len(hits) - limit]
+            hits = hits[scores[hits] >= kth - 0.005]
+        return [(round(score, 2), index, labels[kind] or "fuzzy")
+                for score, index, kind in zip(scores[hits].tolist(), hits.tolist(), kinds[hits].tolist())]
+
+    def _score_python(self, normalized: str, grams: set, inner: set,
+                      tiers: List[Tuple[float, str, Iterable[int]]]) -> List[Tuple[float, int, str]]:
+        best: Dict[int, Tuple[float, str]] = {}
+        for score, match_type, postings in tiers:
+            entry = (score, match_type)
+            for index in postings:
+                best.setdefault(index, entry)
+
+        overlap = Counter(chain.from_iterable(self._grams.get(gram, ()) for gram in grams))
+        candidates = {index for index, shared in overlap.items() if shared == self._sizes[index]}
+        if inner:
+            inner_overlap = Counter(chain.from_iterable(self._grams.get(gram, ()) for gram in inner))
+            candidates.update(index for index, shared in inner_overlap.items() if shared == len(inner))
+        for index in candidates:
+            if best.get(index, (0.0,))[0] < NAME_SUBSTRING and self._is_substring_match(normalized, index):
+                best[index] = (NAME_SUBSTRING, "name")
+
+        scored = {}
+        for index, shared in overlap.items():
+            dice = 2.0 * shared / (len(grams) + self._sizes[index])
+            if dice >= FUZZY_MIN_SIMILARITY:
+                scored[index] = (dice * FUZZY_WEIGHT, "fuzzy")
+        scored.update(best)
+        return [(round(min(1.0, score + self._boosts[index]), 2), index, match_type)
+                for index, (score, match_type) in scored.items() if self._alive[index] and score > 0]
+
+    def _bincount(self, grams: set, count: int):
+        arrays = []
+        for gram in grams:
+            if gram not in self._grams:
+                continue
+            array = self._gram_arrays.get(gram)
+            if array is None:
+                array = self._gram_arrays[gram] = np.array(self._grams[gram], dtype=np.int64)
+            arrays.append(array)
+        if not arrays:
+            return np.zeros(count, dtype=np.int64)
+        return np.bincount(np.concatenate(arrays), minlength=count)
+
+    def _get_arrays(self):
+        if self._arrays is None:
+            self._arrays = (np.array(self._sizes, dtype=np.int64),
+                            np.array(self._boosts, dtype=np.float64),
+                            np.array(self._alive, dtype=bool))
+        return self._arrays
+
+
+def rank_contacts(query: str, contacts: Iterable[Dict[str, Any]], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Rank a list of contacts for a query; contacts that do not match at all are dropped."""
+    contacts = list(contacts)
+    keyed = {str(contact.get("id") or index): contact for index, contact in enumerate(contacts)}
+    scorer = ContactScorer(({**contact, "id": key} for key, contact in keyed.items()))
+    return scorer.rank_contacts(query, keyed, limit)
+
+
+def match_confidence(query: str, contact: Dict[str, Any]) -> float:
+    """Confidence that a single contact matches a query, on the shared scale (0.0 for no match)."""
+    ranked = ContactScorer([{**contact, "id": "contact"}]).rank(query)
+    return ranked[0][1] if ranked else 0.0
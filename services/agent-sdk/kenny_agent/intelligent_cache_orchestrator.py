@@ -162,6 +162,7 @@ class IntelligentCacheOrchestrator:
         await self.predictive_warmer.stop()
         await self.event_monitor.stop_monitoring()
         await self.performance_monitor.stop_monitoring()
+        await self.pattern_analyzer.close()
         
         # Log final performance summary
         await self._log_final_performance_summary()
@@ -211,6 +212,7 @@ class IntelligentCacheOrchestrator:
             
             # Update pattern analyzer with actual results
             await self.pattern_analyzer.update_pattern_weights(query, success)
+            self.predictive_warmer.record_live_query(query, cached)
             
             # Record performance snapshot
             cache_stats = self.agent.semantic_cache.get_cache_stats()
@@ -262,8 +264,10 @@ class IntelligentCacheOrchestrator:
         self.logger.info(f"Orchestrating response to calendar event: {event.change_type.value}")
         
         try:
-            # Let event monitor handle basic invalidation
+            # Let event monitor handle basic invalidation, evicting the dependent
+            # answers now so event-driven warming cannot re-serve stale ones
             await self.event_monitor.handle_calendar_change(event)
+            await self.event_monitor.flush_invalidations()
             
             # Generate predictive warming based on the change
             await self._generate_event_driven_predictions(event)
@@ -643,13 +647,14 @@ class IntelligentCacheOrchestrator:
                     estimated_benefit=action.estimated_benefit
                 )
                 
-                self.predictive_warmer.warming_queue.append(job)
+                self.predictive_warmer.enqueue_job(job)
                 
             elif action.action_type == "invalidate":
-                # Invalidate cache pattern
-                await self.agent.semantic_cache.invalidate_cache_pattern(
+                # Invalidate entries tagged with the pattern's intents and contacts
+                invalidated = await self.agent.semantic_cache.invalidate_cache_pattern(
                     action.query, self.agent.agent_id
                 )
+                self.logger.debug(f"Invalidated {invalidated} entries for pattern: {action.query}")
                 
         except Exception as e:
             self.logger.error(f"Error executing cache action: {e}")
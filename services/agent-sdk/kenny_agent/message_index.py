@@ -0,0 +1,548 @@
+"""
+Local cross-platform message index for Kenny v2.
+
+Mail, iMessage and WhatsApp agents each feed their platform's messages into
+one SQLite store (WAL, shared by all agents on the host) so a question like
+"anything from Sarah about the offsite" can be answered locally instead of
+fanning out to three slow bridge calls. Each message is stored with:
+
+- the platform-shaped message (without its full body) so an agent can
+  return it in its own output format,
+- the normalized identifiers of its sender and recipients (lower-cased
+  emails, E.164-style phones, the same rules as the contacts agent) so a
+  contact resolves to all of their messages with one indexed lookup,
+- an FTS5 row over subject, a bounded prefix of the body and the sender's
+  display name.
+
+Searches rank FTS5 BM25 relevance blended with an exponential recency decay.
+Agents answer from the index and only go to the bridge to hydrate full
+bodies. MessageIndexSync feeds a platform incrementally from a cursor (the
+newest indexed timestamp) on an interval.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COUNTRY_CODE = os.getenv("CONTACTS_DEFAULT_COUNTRY_CODE", "1")
+PHONE_PATTERN = re.compile(r'^\+?[\d\s\-\(\)\.]+$')
+PHONE_MIN_DIGITS = 7
+WHATSAPP_DOMAINS = ("s.whatsapp.net", "c.us", "g.us")
+
+# FTS column weights for bm25(): subject, body, sender_name
+BM25_WEIGHTS = (3.0, 1.0, 2.0)
+# Rows fetched by BM25 before the recency blend re-ranks them
+CANDIDATE_MULTIPLIER = 5
+MAX_CANDIDATES = 500
+
+STOPWORDS = frozenset({
+    "a", "about", "an", "and", "any", "anything", "are", "at", "by", "for", "from", "in", "is",
+    "me", "my", "of", "on", "or", "re", "the", "to", "with"
+})
+
+
+def normalize_identifier(value: str) -> Optional[str]:
+    """
+    Normalize an email, phone number or WhatsApp JID to an index key.
+
+    "Sarah <Sarah@Example.com>" -> "sarah@example.com",
+    "(555) 123-4567" -> "+15551234567", "15551234567@s.whatsapp.net" -> "+15551234567".
+    Display names and other free text return None.
+    """
+    value = (value or "").strip()
+    bracketed = re.search(r"<([^<>]+)>", value)
+    if bracketed:
+        value = bracketed.group(1).strip()
+    lowered = value.lower()
+    for prefix in ("mailto:", "tel:"):
+        if lowered.startswith(prefix):
+            lowered = lowered[len(prefix):]
+            value = value[len(prefix):]
+
+    if "@" in lowered.strip("@"):
+        local, _, domain = lowered.partition("@")
+        if domain not in WHATSAPP_DOMAINS:
+            return lowered
+        value = f"+{local.split(':')[0]}"
+
+    if not PHONE_PATTERN.match(value):
+        return None
+    digits = re.sub(r'\D', '', value)
+    if len(digits) < PHONE_MIN_DIGITS:
+        return None
+    if value.startswith("+"):
+        return f"+{digits}"
+    if digits.startswith("00"):
+        return f"+{digits[2:]}"
+    if DEFAULT_COUNTRY_CODE == "1" and len(digits) == 11 and digits.startswith("1"):
+        return f"+{digits}"
+    if DEFAULT_COUNTRY_CODE == "1" and len(digits) == 10:
+        return f"+1{digits}"
+    if DEFAULT_COUNTRY_CODE != "1" and digits.startswith("0") and len(digits) >= 9:
+        return f"+{DEFAULT_COUNTRY_CODE}{digits[1:]}"
+    return digits
+
+
+def display_name(value: str) -> Optional[str]:
+    """The display-name part of "Sarah Chen <sarah@example.com>", or a bare name."""
+    value = (value or "").strip()
+    if "<" in value:
+        value = value.split("<", 1)[0].strip().strip('"')
+    if not value or normalize_identifier(value):
+        return None
+    return value
+
+
+def to_epoch(value: Any) -> Optional[float]:
+    """Convert an ISO string, datetime or epoch number to epoch seconds."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+    try:
+        parsed = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return (parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def fts_query(text: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: prefix-matched terms, any of which may match."""
+    terms = [t for t in re.findall(r"\w+", (text or "").lower()) if t not in STOPWORDS]
+    if not terms:
+        return None
+    return " OR ".join(f'"{term}"*' for term in dict.fromkeys(terms))
+
+
+class MessageIndex:
+    """SQLite/FTS5 index of messages from every messaging platform."""
+
+    def __init__(self, db_path: Optional[str] = None, max_indexed_chars: Optional[int] = None,
+                 recency_half_life_days: Optional[float] = None, recency_weight: Optional[float] = None):
+        """
+        Initialize the message index.
+
+        Args:
+            db_path: Index database (KENNY_MESSAGE_INDEX_PATH); defaults to the Kenny app support directory
+            max_indexed_chars: Body characters kept for full-text search (KENNY_MESSAGE_INDEX_MAX_CHARS)
+            recency_half_life_days: Age at which the recency boost halves (KENNY_MESSAGE_INDEX_HALF_LIFE_DAYS)
+            recency_weight: Share of the score given to recency, 0-1 (KENNY_MESSAGE_INDEX_RECENCY_WEIGHT)
+        """
+        default_path = Path.home() / "Library" / "Application Support" / "Kenny" / "message_index.db"
+        self.db_path = Path(db_path or os.getenv("KENNY_MESSAGE_INDEX_PATH", str(default_path)))
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_indexed_chars = max_indexed_chars or int(os.getenv("KENNY_MESSAGE_INDEX_MAX_CHARS", "2000"))
+        self.recency_half_life_days = recency_half_life_days or float(
+            os.getenv("KENNY_MESSAGE_INDEX_HALF_LIFE_DAYS", "30"))
+        self.recency_weight = recency_weight if recency_weight is not None else float(
+            os.getenv("KENNY_MESSAGE_INDEX_RECENCY_WEIGHT", "0.3"))
+
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self.metrics = {"upserted": 0, "searches": 0, "search_ms_total": 0.0, "last_search_ms": 0.0}
+        self._initialize_database()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10.0)
+            self._connection.row_factory = sqlite3.Row
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+        return self._connection
+
+    def _initialize_database(self):
+        with self._lock:
+            conn = self._get_connection()
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY,
+                    platform TEXT NOT NULL,
+                    message_id TEXT NOT NULL,
+                    thread_id TEXT,
+                    sender TEXT,
+                    sender_name TEXT,
+                    ts REAL NOT NULL,
+                    payload TEXT NOT NULL,
+                    indexed_at REAL NOT NULL,
+                    UNIQUE (platform, message_id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_messages_ts ON messages(ts);
+                CREATE INDEX IF NOT EXISTS idx_messages_platform_ts ON messages(platform, ts);
+
+                CREATE TABLE IF NOT EXISTS message_identifiers (
+                    identifier TEXT NOT NULL,
+                    message_rowid INTEGER NOT NULL,
+                    role TEXT NOT NULL,
+                    PRIMARY KEY (identifier, message_rowid, role)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_message_identifiers_rowid ON message_identifiers(message_rowid);
+
+                CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+                    subject, body, sender_name, tokenize = 'unicode61 remove_diacritics 2'
+                );
+
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    platform TEXT PRIMARY KEY,
+                    cursor TEXT,
+                    last_sync REAL NOT NULL,
+                    synced_messages INTEGER NOT NULL DEFAULT 0
+                );
+            ''')
+            conn.commit()
+
+    # Writing
+
+    def upsert_messages(self, platform: str, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Add or replace messages for a platform.
+
+        Each record has id and timestamp, and optionally thread_id, sender,
+        sender_name, recipients, subject, body and payload (the platform-shaped
+        message returned by searches; defaults to the record without its body).
+
+        Returns:
+            Number of messages written
+        """
+        now = time.time()
+        written = 0
+        with self._lock:
+            conn = self._get_connection()
+            with conn:
+                for record in records:
+                    message_id = str(record.get("id") or "")
+                    ts = to_epoch(record.get("timestamp"))
+                    if not message_id or ts is None:
+                        continue
+                    self._upsert(conn, platform, message_id, ts, record, now)
+                    written += 1
+        self.metrics["upserted"] += written
+        return written
+
+    def _upsert(self, conn: sqlite3.Connection, platform: str, message_id: str, ts: float,
+                record: Dict[str, Any], now: float):
+        sender_raw = record.get("sender") or ""
+        sender = normalize_identifier(sender_raw)
+        sender_name = record.get("sender_name") or display_name(sender_raw) or ""
+        payload = record.get("payload")
+        if payload is None:
+            payload = {k: v for k, v in record.items() if k != "body"}
+        body = (record.get("body") or "")[:self.max_indexed_chars]
+
+        existing = conn.execute(
+            "SELECT id FROM messages WHERE platform = ? AND message_id = ?", (platform, message_id)
+        ).fetchone()
+        values = (record.get("thread_id"), sender, sender_name, ts, json.dumps(payload, default=str), now)
+        if existing:
+            rowid = existing[0]
+            conn.execute(
+                "UPDATE messages SET thread_id = ?, sender = ?, sender_name = ?, ts = ?, payload = ?, indexed_at = ? "
+                "WHERE id = ?", (*values, rowid)
+            )
+            conn.execute("DELETE FROM messages_fts WHERE rowid = ?", (rowid,))
+            conn.execute("DELETE FROM message_identifiers WHERE message_rowid = ?", (rowid,))
+        else:
+            rowid = conn.execute(
+                "INSERT INTO messages (platform, message_id, thread_id, sender, sender_name, ts, payload, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (platform, message_id, *values)
+            ).lastrowid
+
+        conn.execute(
+            "INSERT INTO messages_fts (rowid, subject, body, sender_name) VALUES (?, ?, ?, ?)",
+            (rowid, record.get("subject") or "", body, sender_name)
+        )
+        identifiers = {(sender, "from")} if sender else set()
+        recipients = record.get("recipients") or []
+        for recipient in ([recipients] if isinstance(recipients, str) else recipients):
+            normalized = normalize_identifier(recipient)
+            if normalized:
+                identifiers.add((normalized, "to"))
+        conn.executemany(
+            "INSERT OR IGNORE INTO message_identifiers (identifier, message_rowid, role) VALUES (?, ?, ?)",
+            [(identifier, rowid, role) for identifier, role in identifiers]
+        )
+
+    def delete_messages(self, platform: str, message_ids: Iterable[str]) -> int:
+        """Remove messages (e.g. deleted on the device) from the index."""
+        deleted = 0
+        with self._lock:
+            conn = self._get_connection()
+            with conn:
+                for message_id in message_ids:
+                    row = conn.execute(
+                        "SELECT id FROM messages WHERE platform = ? AND message_id = ?", (platform, str(message_id))
+                    ).fetchone()
+                    if row:
+                        conn.execute("DELETE FROM messages_fts WHERE rowid = ?", (row[0],))
+                        conn.execute("DELETE FROM message_identifiers WHERE message_rowid = ?", (row[0],))
+                        conn.execute("DELETE FROM messages WHERE id = ?", (row[0],))
+                        deleted += 1
+        return deleted
+
+    # Sync state
+
+    def get_cursor(self, platform: str) -> Optional[str]:
+        """Newest timestamp synced for a platform, as an ISO string."""
+        with self._lock:
+            row = self._get_connection().execute(
+                "SELECT cursor FROM sync_state WHERE platform = ?", (platform,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def mark_synced(self, platform: str, cursor: Optional[str], synced_messages: int = 0):
+        """Record a completed sync pass and its cursor."""
+        with self._lock:
+            conn = self._get_connection()
+            with conn:
+                conn.execute('''
+                    INSERT INTO sync_state (platform, cursor, last_sync, synced_messages) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(platform) DO UPDATE SET
+                        cursor = COALESCE(excluded.cursor, sync_state.cursor),
+                        last_sync = excluded.last_sync,
+                        synced_messages = sync_state.synced_messages + excluded.synced_messages
+                ''', (platform, cursor, time.time(), synced_messages))
+
+    def has_synced(self, platform: str) -> bool:
+        """Whether a full sync pass has fed this platform, so the index can answer for it."""
+        with self._lock:
+            return self._get_connection().execute(
+                "SELECT 1 FROM sync_state WHERE platform = ?", (platform,)
+            ).fetchone() is not None
+
+    # Searching
+
+    def search(self, query: Optional[str] = None, identifiers: Optional[Iterable[str]] = None,
+               sender_name: Optional[str] = None, platforms: Optional[Iterable[str]] = None,
+               since: Any = None, until: Any = None, from_only: bool = False,
+               limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Search messages across platforms.
+
+        Args:
+            query: Free text matched against subject, body and sender name
+            identifiers: Contact emails/phones/JIDs; messages from or to any of them match
+            sender_name: Display name to match when no identifier is known
+            platforms: Restrict to these platforms (mail, imessage, whatsapp)
+            since: Oldest timestamp (ISO string, datetime or epoch)
+            until: Newest timestamp
+            from_only: Only match identifiers as the sender
+            limit: Maximum results
+
+        Returns:
+            Results best first, each with platform, id, thread_id, sender,
+            sender_name, timestamp, score, snippet and the platform-shaped message
+        """
+        started = time.perf_counter()
+        match = fts_query(query) if query else None
+        if sender_name:
+            name_terms = re.findall(r"\w+", sender_name.lower())
+            if name_terms:
+                name_match = " AND ".join(f'sender_name : "{term}"*' for term in name_terms)
+                match = f"({name_match}) AND ({match})" if match else name_match
+
+        clauses, params = [], []
+        if identifiers is not None:
+            keys = sorted({key for key in (normalize_identifier(i) for i in identifiers) if key})
+            if not keys:
+                return []
+            role = " AND role = 'from'" if from_only else ""
+            clauses.append(f"m.id IN (SELECT message_rowid FROM message_identifiers "
+                           f"WHERE identifier IN ({','.join('?' * len(keys))}){role})")
+            params.extend(keys)
+        if platforms:
+            platforms = list(platforms)
+            clauses.append(f"m.platform IN ({','.join('?' * len(platforms))})")
+            params.extend(platforms)
+        for column, bound, op in (("ts", to_epoch(since), ">="), ("ts", to_epoch(until), "<=")):
+            if bound is not None:
+                clauses.append(f"m.{column} {op} ?")
+                params.append(bound)
+        where = (" AND " + " AND ".join(clauses)) if clauses else ""
+
+        if match:
+            weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+            sql = (f"SELECT m.*, bm25(messages_fts, {weights}) AS bm25, "
+                   f"snippet(messages_fts, 1, '[', ']', '…', 12) AS snippet "
+                   f"FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid "
+                   f"WHERE messages_fts MATCH ?{where} ORDER BY bm25 LIMIT ?")
+            args = [match, *params, min(MAX_CANDIDATES, limit * CANDIDATE_MULTIPLIER)]
+        else:
+            sql = (f"SELECT m.*, NULL AS bm25, NULL AS snippet FROM messages m "
+                   f"WHERE 1 = 1{where} ORDER BY m.ts DESC LIMIT ?")
+            args = [*params, limit]
+
+        with self._lock:
+            try:
+                rows = self._get_connection().execute(sql, args).fetchall()
+            except sqlite3.OperationalError as e:
+                logger.warning(f"Message index search failed for {match!r}: {e}")
+                rows = []
+
+        results = self._rank(rows, match is not None)[:limit]
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.metrics["searches"] += 1
+        self.metrics["search_ms_total"] += elapsed_ms
+        self.metrics["last_search_ms"] = elapsed_ms
+        return results
+
+    def _rank(self, rows: List[sqlite3.Row], has_relevance: bool) -> List[Dict[str, Any]]:
+        """Blend BM25 relevance (normalized to the best candidate) with recency decay."""
+        now = time.time()
+        best = max((-row["bm25"] for row in rows), default=0.0) if has_relevance else 0.0
+        results = []
+        for row in rows:
+            age_days = max(0.0, now - row["ts"]) / 86400
+            recency = math.pow(0.5, age_days / self.recency_half_life_days)
+            if has_relevance and best > 0:
+                relevance = -row["bm25"] / best
+                score = (1 - self.recency_weight) * relevance + self.recency_weight * recency
+            else:
+                relevance = None
+                score = recency
+            results.append({
+                "platform": row["platform"],
+                "id": row["message_id"],
+                "thread_id": row["thread_id"],
+                "sender": row["sender"],
+                "sender_name": row["sender_name"],
+                "timestamp": datetime.fromtimestamp(row["ts"], timezone.utc).isoformat(),
+                "score": round(score, 4),
+                "relevance": round(relevance, 4) if relevance is not None else None,
+                "snippet": row["snippet"],
+                "message": json.loads(row["payload"])
+            })
+        results.sort(key=lambda r: r["score"], reverse=True)
+        return results
+
+    def answer(self, platform: str, query: Optional[str] = None, contact: Optional[str] = None,
+               since: Any = None, until: Any = None, limit: int = 20) -> Optional[List[Dict[str, Any]]]:
+        """
+        Answer a platform's search capability from the index.
+
+        Returns the platform-shaped messages, or None when the platform has
+        not been synced yet or nothing matched, so the caller can fall back
+        to the bridge.
+        """
+        if not self.has_synced(platform):
+            return None
+        identifier = normalize_identifier(contact) if contact else None
+        results = self.search(
+            query=query,
+            identifiers=[identifier] if identifier else None,
+            sender_name=contact if contact and not identifier else None,
+            platforms=[platform], since=since, until=until, limit=limit
+        )
+        return [result["message"] for result in results] or None
+
+    def count(self, platform: Optional[str] = None) -> int:
+        """Number of indexed messages, optionally for one platform."""
+        with self._lock:
+            conn = self._get_connection()
+            if platform:
+                return conn.execute("SELECT COUNT(*) FROM messages WHERE platform = ?", (platform,)).fetchone()[0]
+            return conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get per-platform counts, sync state and search timings."""
+        with self._lock:
+            conn = self._get_connection()
+            counts = dict(conn.execute("SELECT platform, COUNT(*) FROM messages GROUP BY platform").fetchall())
+            sync = {row["platform"]: {"cursor": row["cursor"], "last_sync": row["last_sync"],
+                                      "synced_messages": row["synced_messages"]}
+                    for row in conn.execute("SELECT * FROM sync_state")}
+        searches = self.metrics["searches"]
+        return {
+            **self.metrics,
+            "avg_search_ms": self.metrics["search_ms_total"] / searches if searches else 0.0,
+            "messages": counts,
+            "sync": sync
+        }
+
+    def close(self):
+        """Close the index connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class MessageIndexSync:
+    """Feeds one platform's new messages into the index on an interval."""
+
+    def __init__(self, index: MessageIndex, platform: str,
+                 fetch: Callable[[Optional[str]], Awaitable[List[Dict[str, Any]]]],
+                 interval_seconds: Optional[float] = None):
+        """
+        Initialize the sync loop.
+
+        Args:
+            index: Shared message index
+            platform: Platform name the records are stored under
+            fetch: Coroutine taking the cursor (newest synced ISO timestamp, or
+                None on the first pass) and returning index records
+            interval_seconds: Seconds between passes (KENNY_MESSAGE_INDEX_SYNC_INTERVAL)
+        """
+        self.index = index
+        self.platform = platform
+        self.fetch = fetch
+        self.interval_seconds = interval_seconds or float(os.getenv("KENNY_MESSAGE_INDEX_SYNC_INTERVAL", "300"))
+        self._task: Optional[asyncio.Task] = None
+        self.metrics = {"passes": 0, "errors": 0, "last_synced": 0, "last_duration_ms": 0.0}
+
+    async def sync_once(self) -> int:
+        """Fetch everything newer than the cursor and index it."""
+        started = time.perf_counter()
+        cursor = await asyncio.to_thread(self.index.get_cursor, self.platform)
+        records = await self.fetch(cursor)
+        written = await asyncio.to_thread(self.index.upsert_messages, self.platform, records)
+
+        newest = max((ts for ts in (to_epoch(r.get("timestamp")) for r in records) if ts is not None), default=None)
+        new_cursor = cursor
+        if newest is not None and (cursor is None or newest > (to_epoch(cursor) or 0)):
+            new_cursor = datetime.fromtimestamp(newest, timezone.utc).isoformat()
+        await asyncio.to_thread(self.index.mark_synced, self.platform, new_cursor, written)
+
+        self.metrics["passes"] += 1
+        self.metrics["last_synced"] = written
+        self.metrics["last_duration_ms"] = (time.perf_counter() - started) * 1000
+        return written
+
+    async def _run(self):
+        while True:
+            try:
+                synced = await self.sync_once()
+                if synced:
+                    logger.info(f"Indexed {synced} {self.platform} messages")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.metrics["errors"] += 1
+                logger.warning(f"{self.platform} message index sync failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        """Start syncing in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background sync."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,501 @@
+"""
+Shared, priority-aware client for the local Ollama server.
+
+Every service in a process sends its Ollama traffic through one scheduler per
+base URL. Requests wait in priority lanes (interactive > routing > warming >
+batch) for a slot under a global and a per-model concurrency cap, and a few
+slots are held back from the background lanes so that, within the process,
+a user-facing request does not queue behind cache warming or an embedding
+backfill.
+
+Schedulers are per process and do not coordinate: each agent service runs its
+own, and Ollama sees the sum of their in-flight requests. Background work is
+also capped per process (`max_background`) to bound what one service's
+backfill can add to the shared server, but a user request in one service can
+still wait at Ollama behind background requests sent by another.
+
+Model swaps are avoided with keep_alive: pinned models are kept loaded
+indefinitely, and models recently used by the interactive or routing lanes
+are kept loaded for `hot_keep_alive` seconds whichever lane uses them next.
+Embedding calls for the same model and lane that arrive within a short window
+are coalesced into one multi-input /api/embed request.
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import json
+import os
+import time
+import logging
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Lanes in priority order; a lower index is served first
+LANES = ("interactive", "routing", "warming", "batch")
+LANE_RANK = {lane: rank for rank, lane in enumerate(LANES)}
+BACKGROUND_LANES = ("warming", "batch")
+
+# Recent queue-time samples kept per lane for percentiles
+QUEUE_TIME_WINDOW = 500
+
+
+def _percentile(samples, fraction: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _parse_model_limits(spec: str) -> Dict[str, int]:
+    """Parse 'model=limit,model=limit' into a dict."""
+    limits = {}
+    for item in spec.split(","):
+        model, _, limit = item.strip().rpartition("=")
+        if model and limit.strip().isdigit():
+            limits[model.strip()] = int(limit)
+    return limits
+
+
+class OllamaScheduler:
+    """Priority-lane scheduler and pooled HTTP client for one Ollama base URL."""
+
+    def __init__(
+        self,
+        base_url: str,
+        max_concurrent: Optional[int] = None,
+        model_concurrency: Optional[Dict[str, int]] = None,
+        default_model_concurrency: Optional[int] = None,
+        reserved_slots: Optional[int] = None,
+        max_background: Optional[int] = None,
+        pinned_models: Optional[List[str]] = None,
+        keep_alive: Optional[int] = None,
+        hot_keep_alive: Optional[int] = None,
+        embed_batch_size: Optional[int] = None,
+        embed_batch_window: Optional[float] = None,
+        default_timeout: float = 120.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            base_url: Ollama base URL
+            max_concurrent: Requests in flight across all models
+            model_concurrency: Requests in flight per model, by model name
+            default_model_concurrency: Per-model cap for models without an entry
+            reserved_slots: Slots the warming and batch lanes may not use
+            max_background: Warming and batch requests in flight in this process
+            pinned_models: Models kept loaded indefinitely (keep_alive -1)
+            keep_alive: keep_alive in seconds for cold models (None uses the server default)
+            hot_keep_alive: keep_alive in seconds for models recently used interactively
+            embed_batch_size: Inputs per coalesced /api/embed request
+            embed_batch_window: Seconds to wait for compatible embedding calls
+            default_timeout: Read timeout in seconds for requests without a total timeout
+            transport: Optional transport, used by tests
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrent = max(1, int(os.getenv("OLLAMA_SCHEDULER_MAX_CONCURRENT", "4"))
+                                  if max_concurrent is None else max_concurrent)
+        self.model_concurrency = _parse_model_limits(os.getenv("OLLAMA_SCHEDULER_MODEL_CONCURRENCY", ""))
+        self.model_concurrency.update(model_concurrency or {})
+        self.default_model_concurrency = (int(os.getenv("OLLAMA_SCHEDULER_DEFAULT_MODEL_CONCURRENCY", "2"))
+                                          if default_model_concurrency is None else default_model_concurrency)
+        reserved = int(os.getenv("OLLAMA_SCHEDULER_RESERVED_SLOTS", "1")) if reserved_slots is None else reserved_slots
+        self.reserved_slots = min(max(reserved, 0), self.max_concurrent - 1)
+        self.max_background = max(1, int(os.getenv("OLLAMA_SCHEDULER_MAX_BACKGROUND", "2"))
+                                  if max_background is None else max_background)
+
+        pinned = os.getenv("OLLAMA_SCHEDULER_PINNED_MODELS", "") if pinned_models is None else ",".join(pinned_models)
+        self.pinned_models = {model.strip() for model in pinned.split(",") if model.strip()}
+        env_keep_alive = os.getenv("OLLAMA_SCHEDULER_KEEP_ALIVE")
+        self.keep_alive = keep_alive if keep_alive is not None else (int(env_keep_alive) if env_keep_alive else None)
+        self.hot_keep_alive = (int(os.getenv("OLLAMA_SCHEDULER_HOT_KEEP_ALIVE", "1800"))
+                               if hot_keep_alive is None else hot_keep_alive)
+        self.embed_batch_size = max(1, int(os.getenv("OLLAMA_SCHEDULER_EMBED_BATCH_SIZE", "32"))
+                                    if embed_batch_size is None else embed_batch_size)
+        self.embed_batch_window = (float(os.getenv("OLLAMA_SCHEDULER_EMBED_WINDOW_MS", "5")) / 1000
+                                   if embed_batch_window is None else embed_batch_window)
+        self.default_timeout = default_timeout
+        self._transport = transport
+
+        # httpx pools and the waiter futures are bound to one event loop
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiting: List[Tuple[int, int, str, str, asyncio.Future, float]] = []
+        self._sequence = itertools.count()
+        self._active_total = 0
+        self._active_background = 0
+        self._active_by_model: Dict[str, int] = {}
+        self._hot_until: Dict[str, float] = {}
+        self._embed_pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._tasks = set()
+
+        self.lane_metrics = {
+            lane: {"submitted": 0, "completed": 0, "errors": 0, "cancelled": 0} for lane in LANES
+        }
+        self._queue_samples = {lane: deque(maxlen=QUEUE_TIME_WINDOW) for lane in LANES}
+        self.embed_metrics = {"calls": 0, "inputs": 0, "requests": 0}
+
+    # Slot scheduling
+
+    def model_limit(self, model: str) -> int:
+        """Get the concurrency cap for a model."""
+        return max(1, self.model_concurrency.get(model, self.default_model_concurrency))
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Waiters and in-flight counts from a closed loop can never complete
+            self._client = None
+            self._waiting = []
+            self._active_total = self._active_background = 0
+            self._active_by_model = {}
+            self._embed_pending = {}
+            self._tasks = set()
+            self._loop = loop
+
+    def _can_start(self, model: str, lane: str) -> bool:
+        if self._active_total >= self.max_concurrent:
+            return False
+        if self._active_by_model.get(model, 0) >= self.model_limit(model):
+            return False
+        if lane in BACKGROUND_LANES and (self._active_total >= self.max_concurrent - self.reserved_slots
+                                         or self._active_background >= self.max_background):
+            return False
+        return True
+
+    def _start(self, model: str, lane: str):
+        self._active_total += 1
+        self._active_by_model[model] = self._active_by_model.get(model, 0) + 1
+        if lane in BACKGROUND_LANES:
+            self._active_background += 1
+
+    def _release(self, model: str, lane: str):
+        self._active_total -= 1
+        self._active_by_model[model] -= 1
+        if lane in BACKGROUND_LANES:
+            self._active_background -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Grant free slots to waiters in lane priority order, then arrival order."""
+        blocked = []
+        while self._waiting:
+            entry = heapq.heappop(self._waiting)
+            _, _, model, lane, future, enqueued = entry
+            if future.done():
+                continue
+            if self._can_start(model, lane):
+                self._start(model, lane)
+                self._queue_samples[lane].append(round((time.perf_counter() - enqueued) * 1000, 2))
+                future.set_result(None)
+            else:
+                blocked.append(entry)
+        for entry in blocked:
+            heapq.heappush(self._waiting, entry)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, model: str, lane: str = "interactive"):
+        """
+        Hold a request slot for a model while the block runs.
+
+        Raises:
+            ValueError: If the lane is unknown
+        """
+        if lane not in LANE_RANK:
+            raise ValueError(f"Unknown Ollama lane: {lane}")
+        self._bind_loop()
+        stats = self.lane_metrics[lane]
+        stats["submitted"] += 1
+
+        future = self._loop.create_future()
+        heapq.heappush(self._waiting, (LANE_RANK[lane], next(self._sequence), model, lane, future, time.perf_counter()))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been granted just before the caller was cancelled
+            if future.done() and not future.cancelled():
+                self._release(model, lane)
+            stats["cancelled"] += 1
+            raise
+
+        try:
+            yield
+        except (asyncio.CancelledError, GeneratorExit):
+            stats["cancelled"] += 1
+            raise
+        except Exception:
+            stats["errors"] += 1
+            raise
+        else:
+            stats["completed"] += 1
+        finally:
+            self._release(model, lane)
+
+    # keep_alive management
+
+    def pin(self, model: str):
+        """Keep a model loaded indefinitely."""
+        self.pinned_models.add(model)
+
+    def unpin(self, model: str):
+        """Let a pinned model unload on the normal keep_alive schedule."""
+        self.pinned_models.discard(model)
+
+    def keep_alive_for(self, model: str) -> Optional[int]:
+        """Get the keep_alive to send for a model, or None for the server default."""
+        if model in self.pinned_models:
+            return -1
+        if self._hot_until.get(model, 0) > time.monotonic():
+            return self.hot_keep_alive
+        return self.keep_alive
+
+    def _prepare(self, payload: Dict[str, Any], lane: str) -> Dict[str, Any]:
+        payload = dict(payload)
+        if lane in ("interactive", "routing"):
+            self._hot_until[payload["model"]] = time.monotonic() + self.hot_keep_alive
+        if "keep_alive" not in payload:
+            keep_alive = self.keep_alive_for(payload["model"])
+            if keep_alive is not None:
+                payload["keep_alive"] = keep_alive
+        return payload
+
+    # Requests
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(connect=2.0, read=self.default_timeout, write=10.0, pool=5.0),
+                trust_env=False,
+                transport=self._transport
+            )
+        return self._client
+
+    def _timeout(self, timeout: Optional[float]):
+        if timeout is None:
+            return httpx.USE_CLIENT_DEFAULT
+        return httpx.Timeout(connect=2.0, read=timeout, write=10.0, pool=5.0)
+
+    async def request(self, path: str, payload: Dict[str, Any], lane: str = "interactive",
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        POST a non-streaming request once a slot is free and decode the JSON body.
+
+        A timeout bounds the whole call, the wait for a slot included, so a
+        caller with a short deadline falls back instead of queueing behind
+        long-running requests on the same model.
+
+        Raises:
+            asyncio.TimeoutError: If the timeout passes while queued or in flight
+            httpx.RequestError: If Ollama cannot be reached
+            httpx.HTTPStatusError: If Ollama answers with an error status
+        """
+        if timeout is None:
+            return await self._request(path, payload, lane, None)
+        return await asyncio.wait_for(self._request(path, payload, lane, timeout), timeout)
+
+    async def _request(self, path: str, payload: Dict[str, Any], lane: str,
+                       timeout: Optional[float]) -> Dict[str, Any]:
+        payload = self._prepare(payload, lane)
+        async with self.slot(payload["model"], lane):
+            response = await self._get_client().post(path, json=payload, timeout=self._timeout(timeout))
+            response.raise_for_status()
+            return response.json()
+
+    async def generate(self, payload: Dict[str, Any], lane: str = "interactive",
+                       timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Run a non-streaming /api/generate request."""
+        return await self.request("/api/generate", {**payload, "stream": False}, lane, timeout)
+
+    async def chat(self, payload: Dict[str, Any], lane: str = "interactive",
+                   timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Run a non-streaming /api/chat request."""
+        return await self.request("/api/chat", {**payload, "stream": False}, lane, timeout)
+
+    async def stream(self, path: str, payload: Dict[str, Any], lane: str = "interactive",
+                     timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream NDJSON chunks from /api/generate or /api/chat.
+
+        The slot is held until the final chunk or until the caller closes the
+        generator, and chunks are read only as fast as the caller consumes them.
+        Here the timeout is a read timeout between chunks, not a total one.
+        """
+        payload = self._prepare({**payload, "stream": True}, lane)
+        async with self.slot(payload["model"], lane):
+            async with self._get_client().stream("POST", path, json=payload, timeout=self._timeout(timeout)) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    try:
+                        chunk = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    yield chunk
+                    if chunk.get("done", False):
+                        break
+
+    async def embeddings(self, model: str, prompt: str, lane: str = "batch",
+                         timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Run a single-prompt /api/embeddings request (unnormalized vectors)."""
+        return await self.request("/api/embeddings", {"model": model, "prompt": prompt}, lane, timeout)
+
+    async def embed(self, model: str, texts: List[str], lane: str = "batch") -> List[List[float]]:
+        """
+        Embed texts with /api/embed, coalescing compatible calls.
+
+        Calls for the same model and lane made within `embed_batch_window` share
+        one request of up to `embed_batch_size` inputs; larger calls are sent as
+        they are. Returns one vector per text, in order.
+        """
+        if not texts:
+            return []
+        if lane not in LANE_RANK:
+            raise ValueError(f"Unknown Ollama lane: {lane}")
+        self._bind_loop()
+        self.embed_metrics["calls"] += 1
+        self.embed_metrics["inputs"] += len(texts)
+
+        key = (model, lane)
+        batch = self._embed_pending.get(key)
+        if batch is not None and len(batch["inputs"]) + len(texts) > self.embed_batch_size:
+            self._flush_embed(key)
+            batch = None
+        if batch is None:
+            batch = self._embed_pending[key] = {"inputs": [], "waiters": []}
+            batch["timer"] = self._loop.call_later(self.embed_batch_window, self._flush_embed, key)
+
+        future = self._loop.create_future()
+        batch["waiters"].append((future, len(batch["inputs"]), len(texts)))
+        batch["inputs"].extend(texts)
+        if len(batch["inputs"]) >= self.embed_batch_size:
+            self._flush_embed(key)
+        return await future
+
+    def _flush_embed(self, key: Tuple[str, str]):
+        batch = self._embed_pending.pop(key, None)
+        if batch is None:
+            return
+        batch["timer"].cancel()
+        task = asyncio.ensure_future(self._run_embed_batch(key[0], key[1], batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_embed_batch(self, model: str, lane: str, batch: Dict[str, Any]):
+        waiters = batch["waiters"]
+        try:
+            self.embed_metrics["requests"] += 1
+            result = await self.request("/api/embed", {"model": model, "input": batch["inputs"]}, lane)
+            vectors = result.get("embeddings", [])
+            if len(vectors) != len(batch["inputs"]):
+                raise ValueError(f"Ollama returned {len(vectors)} embeddings for {len(batch['inputs'])} inputs")
+            for future, start, count in waiters:
+                if not future.done():
+                    future.set_result(vectors[start:start + count])
+        except Exception as e:
+            for future, _, _ in waiters:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def warm(self, model: str, lane: str = "warming") -> bool:
+        """Load a model ahead of use with its keep_alive; returns False if Ollama refused."""
+        try:
+            await self.request("/api/generate", {"model": model, "stream": False}, lane)
+            return True
+        except (httpx.RequestError, httpx.HTTPStatusError) as e:
+            logger.warning(f"Could not warm Ollama model {model}: {e}")
+            return False
+
+    async def list_models(self) -> List[str]:
+        """List installed model names (not scheduled)."""
+        self._bind_loop()
+        response = await self._get_client().get("/api/tags", timeout=self._timeout(5.0))
+        response.raise_for_status()
+        return [model.get("name", "") for model in response.json().get("models", [])]
+
+    # Metrics
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get per-lane queue times and counters, per-model load and embed batching."""
+        waiting = {lane: 0 for lane in LANES}
+        for _, _, _, lane, future, _ in self._waiting:
+            if not future.done():
+                waiting[lane] += 1
+
+        lanes = {}
+        for lane in LANES:
+            samples = self._queue_samples[lane]
+            lanes[lane] = {
+                **self.lane_metrics[lane],
+                "waiting": waiting[lane],
+                "queue_ms_avg": round(sum(samples) / len(samples), 2) if samples else None,
+                "queue_ms_p50": _percentile(samples, 0.5),
+                "queue_ms_p95": _percentile(samples, 0.95),
+                "queue_ms_max": max(samples) if samples else None
+            }
+
+        models = {}
+        for model in set(self._active_by_model) | self.pinned_models | set(self.model_concurrency):
+            models[model] = {
+                "active": self._active_by_model.get(model, 0),
+                "limit": self.model_limit(model),
+                "keep_alive": self.keep_alive_for(model),
+                "pinned": model in self.pinned_models
+            }
+
+        return {
+            "base_url": self.base_url,
+            "active": self._active_total,
+            "active_background": self._active_background,
+            "max_concurrent": self.max_concurrent,
+            "reserved_slots": self.reserved_slots,
+            "max_background": self.max_background,
+            "lanes": lanes,
+            "models": models,
+            "embed": {
+                **self.embed_metrics,
+                "coalesced": self.embed_metrics["calls"] - self.embed_metrics["requests"]
+            }
+        }
+
+    async def aclose(self):
+        """Close the connection pool."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+_schedulers: Dict[str, OllamaScheduler] = {}
+
+
+def get_ollama_scheduler(base_url: Optional[str] = None) -> OllamaScheduler:
+    """
+    Get the process-wide scheduler for an Ollama URL, creating it on first use.
+
+    Args:
+        base_url: Ollama base URL (default: OLLAMA_BASE_URL or http://localhost:11434)
+
+    Returns:
+        Shared OllamaScheduler instance
+    """
+    url = (base_url or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")).rstrip("/")
+    scheduler = _schedulers.get(url)
+    if scheduler is None:
+        scheduler = _schedulers[url] = OllamaScheduler(url)
+    return scheduler
+
+
+async def close_ollama_schedulers():
+    """Close every shared Ollama scheduler."""
+    for scheduler in list(_schedulers.values()):
+        await scheduler.aclose()
+    _schedulers.clear()
@@ -12,15 +12,21 @@ Key Features:
 - Recurring event pattern recognition
 - Seasonal/weekly pattern learning
 - Dynamic TTL adjustment based on query frequency
+
+Jobs are scheduled from a heap ordered by predicted benefit per hour of lead
+time, deduplicated against queued, in-flight and already cached queries, and
+run within an execution budget that yields to live traffic.
 """
 
 import asyncio
+import heapq
+import itertools
 import time
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Deque, Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
-from collections import defaultdict
+from collections import OrderedDict, defaultdict, deque
 import json
 
 from .query_pattern_analyzer import QueryPatternAnalyzer, PredictedQuery, CacheAction
@@ -73,11 +79,33 @@ class PredictiveCacheWarmer:
         self.adaptive_ttl_enabled = True
         self.contact_analysis_enabled = True
         
-        # Job management
-        self.warming_queue: List[WarmingJob] = []
+        # Job management: warming_queue is a heap of (-score, sequence, job);
+        # queued_jobs holds the live entry per query, superseded heap entries are skipped
+        self.warming_queue: List[Tuple[float, int, WarmingJob]] = []
+        self.queued_jobs: Dict[str, WarmingJob] = {}
         self.active_jobs: Dict[str, WarmingJob] = {}
-        self.completed_jobs: List[WarmingResult] = []
+        self.active_keys: Dict[str, str] = {}  # query key -> job_id
+        self.completed_jobs: Deque[WarmingResult] = deque(maxlen=100)
         self.job_counter = 0
+        self._sequence = itertools.count()
+        self._job_tasks: Dict[str, asyncio.Task] = {}
+        self._queue_signal = asyncio.Event()
+        self.scheduler_tick = 1.0  # Seconds between load re-checks while jobs wait
+        self.stale_after = timedelta(minutes=30)  # Drop jobs whose predicted time passed this long ago
+        
+        # Warming budget: execution seconds per window, paused under live load
+        self.budget_window = 60.0
+        self.budget_seconds = 15.0
+        self.max_live_queue_depth = 1  # Live queries in flight above which warming pauses
+        self.max_live_latency = 2.0  # Recent live average response time (s) above which warming pauses
+        self._budget_spend: Deque[Tuple[float, float]] = deque()  # (finished_at, execution_time)
+        self._yield_started: Optional[float] = None  # monotonic time the current yield began
+        
+        # Hit-after-warm accounting: warmed query keys awaiting a live query
+        self.hit_tracking_window = 3600.0
+        self.max_tracked_warm_keys = 1000
+        self.warmed_keys: "OrderedDict[str, float]" = OrderedDict()
+        self.warm_outcomes: Deque[bool] = deque(maxlen=500)  # True when a warmed entry served a live hit
         
         # Performance optimization
         self.warming_scheduler = None
@@ -106,12 +134,17 @@ class PredictiveCacheWarmer:
             "avg_warming_time": 0.0,
             "cache_hit_improvement": 0.0,
             "total_queries_warmed": 0,
-            "adaptive_ttl_adjustments": 0
+            "adaptive_ttl_adjustments": 0,
+            "jobs_deduplicated": 0,
+            "jobs_skipped_cached": 0,
+            "jobs_expired": 0,
+            "budget_yields": 0,
+            "yield_seconds": 0.0
         }
         
         # Learning and adaptation
         self.learning_enabled = True
-        self.accuracy_tracking: List[Tuple[str, bool, float]] = []  # query, success, timestamp
+        self.accuracy_tracking: Deque[Tuple[str, bool, float]] = deque(maxlen=1000)  # query, success, timestamp
     
     async def start(self):
         """Start the predictive cache warming service."""
@@ -151,12 +184,14 @@ class PredictiveCacheWarmer:
                 pass
         
         # Wait for active jobs to complete (with timeout)
-        if self.active_jobs:
-            self.logger.info(f"Waiting for {len(self.active_jobs)} active warming jobs to complete...")
-            try:
-                await asyncio.wait_for(self._wait_for_active_jobs(), timeout=30.0)
-            except asyncio.TimeoutError:
+        if self._job_tasks:
+            self.logger.info(f"Waiting for {len(self._job_tasks)} active warming jobs to complete...")
+            _, pending = await asyncio.wait(list(self._job_tasks.values()), timeout=30.0)
+            if pending:
                 self.logger.warning("Timeout waiting for active jobs, forcing shutdown")
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
         
         self.logger.info("Predictive cache warming service stopped")
     
@@ -178,11 +213,8 @@ class PredictiveCacheWarmer:
             )
             
             self.job_counter += 1
-            self.warming_queue.append(job)
-            jobs_created += 1
-        
-        # Sort queue by priority
-        self.warming_queue.sort(key=lambda x: x.priority, reverse=True)
+            if self.enqueue_job(job):
+                jobs_created += 1
         
         self.logger.info(f"Created {jobs_created} warming jobs from predictions")
         self.warming_metrics["predictions_generated"] += len(predictions)
@@ -217,11 +249,137 @@ class PredictiveCacheWarmer:
                 )
                 
                 self.job_counter += 1
-                self.warming_queue.append(job)
+                self.enqueue_job(job)
         
         if active_patterns:
             self.logger.info(f"Scheduled time-based warming for patterns: {active_patterns}")
     
+    def enqueue_job(self, job: WarmingJob) -> bool:
+        """Queue a warming job unless the same query is in flight or queued with a higher score."""
+        key = self._query_key(job.query)
+        if key in self.active_keys:
+            self.warming_metrics["jobs_deduplicated"] += 1
+            return False
+        
+        now = datetime.now()
+        score = self._job_score(job, now)
+        queued = self.queued_jobs.get(key)
+        if queued is not None:
+            self.warming_metrics["jobs_deduplicated"] += 1
+            if self._job_score(queued, now) >= score:
+                return False
+        
+        self.queued_jobs[key] = job
+        heapq.heappush(self.warming_queue, (-score, next(self._sequence), job))
+        self._queue_signal.set()
+        return True
+    
+    def record_live_query(self, query: str, cache_hit: bool):
+        """Account a live query against recently warmed entries (hit-after-warm)."""
+        self._expire_warmed_keys()
+        if self.warmed_keys.pop(self._query_key(query), None) is not None:
+            self.warm_outcomes.append(bool(cache_hit))
+    
+    def _query_key(self, query: str) -> str:
+        """Normalize a query the way the semantic cache keys it."""
+        return query.lower().strip()
+    
+    def _job_score(self, job: WarmingJob, now: datetime) -> float:
+        """Predicted benefit per hour of lead time before the job's predicted use."""
+        lead_hours = max((job.predicted_time - now).total_seconds(), 0.0) / 3600
+        return job.priority * max(job.estimated_benefit, 0.01) / (1.0 + lead_hours)
+    
+    def _pop_next_job(self) -> Optional[WarmingJob]:
+        """Pop the highest-scoring live job, dropping superseded and stale entries."""
+        now = datetime.now()
+        while self.warming_queue:
+            _, _, job = heapq.heappop(self.warming_queue)
+            key = self._query_key(job.query)
+            if self.queued_jobs.get(key) is not job:
+                continue
+            del self.queued_jobs[key]
+            if now - job.predicted_time > self.stale_after:
+                self.warming_metrics["jobs_expired"] += 1
+                continue
+            return job
+        return None
+    
+    def _live_load(self) -> Tuple[int, float]:
+        """Live queries in flight and recent live average response time."""
+        depth = getattr(self.agent, "active_queries", 0)
+        query_metrics = getattr(self.agent, "query_metrics", {})
+        latency = query_metrics.get("avg_response_time", 0.0)
+        last_updated = query_metrics.get("last_updated")
+        # Only trust the latency average while live traffic keeps it current
+        if last_updated is None or (datetime.now(last_updated.tzinfo) - last_updated).total_seconds() > self.budget_window:
+            latency = 0.0
+        return depth, latency
+    
+    def _budget_spent(self) -> float:
+        """Warming execution seconds spent in the current budget window."""
+        cutoff = time.time() - self.budget_window
+        while self._budget_spend and self._budget_spend[0][0] < cutoff:
+            self._budget_spend.popleft()
+        return sum(seconds for _, seconds in self._budget_spend)
+    
+    def _concurrency_limit(self) -> int:
+        """Full concurrency when idle, a single warming slot while live queries run."""
+        depth, _ = self._live_load()
+        return self.max_concurrent_jobs if depth == 0 else 1
+    
+    def _should_yield(self) -> bool:
+        """Whether warming should wait for live load to drop or the budget to refill.
+        
+        budget_yields counts the times warming started yielding, not the ticks
+        spent yielding; yield_seconds accumulates how long it held back.
+        """
+        depth, latency = self._live_load()
+        yielding = (depth > self.max_live_queue_depth or latency > self.max_live_latency
+                    or self._budget_spent() >= self.budget_seconds)
+        now = time.monotonic()
+        if yielding and self._yield_started is None:
+            self._yield_started = now
+            self.warming_metrics["budget_yields"] += 1
+        elif not yielding and self._yield_started is not None:
+            self.warming_metrics["yield_seconds"] += now - self._yield_started
+            self._yield_started = None
+        return yielding
+    
+    async def _is_cached(self, query: str) -> bool:
+        """Whether the query already has a fresh cache entry."""
+        cache = getattr(self.agent, "semantic_cache", None)
+        if cache is None or not hasattr(cache, "contains"):
+            return False
+        try:
+            return await cache.contains(query, self.agent.agent_id)
+        except Exception as e:
+            self.logger.debug(f"Cache check failed for {query}: {e}")
+            return False
+    
+    def _record_warmed(self, query: str):
+        """Start tracking a warmed query for hit-after-warm accounting."""
+        key = self._query_key(query)
+        self.warmed_keys.pop(key, None)
+        self.warmed_keys[key] = time.time()
+        while len(self.warmed_keys) > self.max_tracked_warm_keys:
+            self.warmed_keys.popitem(last=False)
+            self.warm_outcomes.append(False)
+    
+    def _expire_warmed_keys(self):
+        """Count warmed entries that went unused for the tracking window as misses."""
+        cutoff = time.time() - self.hit_tracking_window
+        while self.warmed_keys:
+            key, warmed_at = next(iter(self.warmed_keys.items()))
+            if warmed_at >= cutoff:
+                break
+            self.warmed_keys.popitem(last=False)
+            self.warm_outcomes.append(False)
+    
+    def _hit_after_warm_rate(self) -> float:
+        if not self.warm_outcomes:
+            return 0.0
+        return sum(self.warm_outcomes) / len(self.warm_outcomes)
+    
     async def optimize_cache_distribution(self, usage_patterns: Dict):
         """Optimize cache distribution based on usage patterns."""
         try:
@@ -299,13 +457,17 @@ class PredictiveCacheWarmer:
         while self.is_running:
             try:
                 # Process warming queue
+                self._queue_signal.clear()
                 await self._process_warming_queue()
                 
                 # Clean up completed jobs
                 await self._cleanup_completed_jobs()
                 
-                # Wait before next cycle
-                await asyncio.sleep(5.0)  # 5-second cycle
+                # Wake on new or finished jobs, or re-check load after a tick
+                try:
+                    await asyncio.wait_for(self._queue_signal.wait(), timeout=self.scheduler_tick)
+                except asyncio.TimeoutError:
+                    pass
                 
             except asyncio.CancelledError:
                 break
@@ -340,29 +502,36 @@ class PredictiveCacheWarmer:
                 await asyncio.sleep(60.0)
     
     async def _process_warming_queue(self):
-        """Process jobs in the warming queue."""
-        if not self.warming_queue or len(self.active_jobs) >= self.max_concurrent_jobs:
-            return
-        
-        # Take jobs from queue up to concurrency limit
-        jobs_to_start = []
-        while (self.warming_queue and 
-               len(self.active_jobs) + len(jobs_to_start) < self.max_concurrent_jobs):
-            job = self.warming_queue.pop(0)  # Take highest priority job
-            jobs_to_start.append(job)
-        
-        # Start warming jobs concurrently
-        if jobs_to_start:
-            warming_tasks = []
-            for job in jobs_to_start:
-                self.active_jobs[job.job_id] = job
-                task = asyncio.create_task(
-                    self._execute_warming_job(job),
-                    name=f"warm_{job.job_id}"
-                )
-                warming_tasks.append(task)
+        """Start the highest-value jobs that fit the concurrency limit and warming budget."""
+        started = 0
+        while self.warming_queue and len(self.active_jobs) < self._concurrency_limit():
+            if self._should_yield():
+                break
             
-            self.logger.debug(f"Started {len(jobs_to_start)} warming jobs")
+            job = self._pop_next_job()
+            if job is None:
+                break
+            if await self._is_cached(job.query):
+                self.warming_metrics["jobs_skipped_cached"] += 1
+                continue
+            
+            self._start_job(job)
+            started += 1
+        
+        if started:
+            self.logger.debug(f"Started {started} warming jobs")
+    
+    def _start_job(self, job: WarmingJob):
+        """Run a job in the background, keeping a reference to its task."""
+        self.active_jobs[job.job_id] = job
+        self.active_keys[self._query_key(job.query)] = job.job_id
+        task = asyncio.create_task(self._execute_warming_job(job), name=f"warm_{job.job_id}")
+        self._job_tasks[job.job_id] = task
+        
+        def on_done(_task, job_id=job.job_id):
+            self._job_tasks.pop(job_id, None)
+            self._queue_signal.set()
+        task.add_done_callback(on_done)
     
     async def _execute_warming_job(self, job: WarmingJob) -> WarmingResult:
         """Execute a single warming job."""
@@ -371,8 +540,11 @@ class PredictiveCacheWarmer:
         try:
             self.logger.debug(f"Executing warming job {job.job_id}: {job.query}")
             
-            # Execute query to warm cache
-            result = await self.agent.process_natural_language_query(job.query)
+            # Replay the recorded capability call when possible, skipping the LLM
+            if hasattr(self.agent, "warm_cached_query"):
+                result = await self.agent.warm_cached_query(job.query)
+            else:
+                result = await self.agent.process_natural_language_query(job.query, {"warming": True})
             
             execution_time = time.time() - start_time
             success = result.get("success", False)
@@ -391,6 +563,8 @@ class PredictiveCacheWarmer:
             if success:
                 self.warming_metrics["warming_jobs_completed"] += 1
                 self.warming_metrics["total_queries_warmed"] += 1
+                if not cached:
+                    self._record_warmed(job.query)
             else:
                 self.warming_metrics["warming_jobs_failed"] += 1
             
@@ -407,9 +581,6 @@ class PredictiveCacheWarmer:
             # Track prediction accuracy if this was a predicted query
             if job.job_type == "predicted":
                 self.accuracy_tracking.append((job.query, success, time.time()))
-                # Limit tracking history
-                if len(self.accuracy_tracking) > 1000:
-                    self.accuracy_tracking = self.accuracy_tracking[-500:]
             
             self.logger.debug(f"Warming job {job.job_id} completed: success={success}, time={execution_time:.3f}s")
             return warming_result
@@ -431,9 +602,10 @@ class PredictiveCacheWarmer:
             return warming_result
         
         finally:
-            # Remove from active jobs
-            if job.job_id in self.active_jobs:
-                del self.active_jobs[job.job_id]
+            # Remove from active jobs and charge the warming budget
+            self.active_jobs.pop(job.job_id, None)
+            self.active_keys.pop(self._query_key(job.query), None)
+            self._budget_spend.append((time.time(), time.time() - start_time))
             
             # Add to completed jobs
             if 'warming_result' in locals():
@@ -637,26 +809,35 @@ class PredictiveCacheWarmer:
             self.logger.error(f"Error applying adaptive TTL adjustments: {e}")
     
     async def _cleanup_completed_jobs(self):
-        """Clean up old completed jobs to prevent memory buildup."""
-        # Keep only last 100 completed jobs
-        if len(self.completed_jobs) > 100:
-            self.completed_jobs = self.completed_jobs[-50:]
-    
-    async def _wait_for_active_jobs(self):
-        """Wait for all active jobs to complete."""
-        while self.active_jobs:
-            await asyncio.sleep(0.5)
+        """Age out warmed entries that were never used; completed jobs are a bounded ring."""
+        self._expire_warmed_keys()
     
     def get_warming_stats(self) -> Dict[str, Any]:
         """Get comprehensive warming statistics."""
         return {
             "service_status": "running" if self.is_running else "stopped",
-            "warming_metrics": self.warming_metrics.copy(),
+            "warming_metrics": {
+                **self.warming_metrics,
+                "hit_after_warm_rate": self._hit_after_warm_rate()
+            },
             "queue_status": {
-                "queued_jobs": len(self.warming_queue),
+                "queued_jobs": len(self.queued_jobs),
+                "heap_entries": len(self.warming_queue),
                 "active_jobs": len(self.active_jobs),
                 "completed_jobs": len(self.completed_jobs)
             },
+            "budget": {
+                "window_seconds": self.budget_window,
+                "budget_seconds": self.budget_seconds,
+                "spent_seconds": round(self._budget_spent(), 3),
+                "live_queue_depth": self._live_load()[0]
+            },
+            "hit_after_warm": {
+                "tracked_warm_entries": len(self.warmed_keys),
+                "outcomes": len(self.warm_outcomes),
+                "hits": sum(self.warm_outcomes),
+                "rate": self._hit_after_warm_rate()
+            },
             "configuration": {
                 "warming_interval": self.warming_interval,
                 "prediction_window_hours": self.prediction_window_hours,
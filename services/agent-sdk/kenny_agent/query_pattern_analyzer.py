@@ -11,6 +11,10 @@ Key Features:
 - User behavior learning and adaptation
 - Probability scoring for predictive cache warming
 - Adaptive learning from cache hit/miss patterns
+
+Query history is buffered in memory and written in batches off the event
+loop. Each batch also updates per-day hour x weekday x template counts, so
+analysis reads those aggregates instead of re-scanning raw history.
 """
 
 import json
@@ -82,6 +86,26 @@ class QueryPatternAnalyzer:
         self.temporal_window_hours = 24  # Hours to consider for temporal patterns
         self.learning_rate = 0.1  # Weight for updating pattern probabilities
         self.prediction_confidence_threshold = 0.6  # Minimum confidence for predictions
+        self.analysis_window_days = 30  # Days of history considered by analysis
+        
+        # Buffered history ingestion
+        self.flush_batch_size = 100  # Buffered queries that trigger an immediate flush
+        self.flush_interval = 1.0  # Seconds a buffered query may wait before being written
+        self.max_buffered_rows = 10000  # Oldest rows are dropped past this while writes fail
+        self._history_buffer: List[Tuple] = []
+        self._pruned_through_day = 0  # Template counts before this day have been deleted
+        self._dirty_patterns: Dict[str, QueryPattern] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.ingestion_stats = {
+            "queries_buffered": 0,
+            "rows_written": 0,
+            "flushes": 0,
+            "last_flush_ms": 0.0,
+            "flush_errors": 0,
+            "rows_dropped": 0,
+            "count_buckets_pruned": 0
+        }
         
         # Pattern storage
         self.patterns: Dict[str, QueryPattern] = {}
@@ -122,6 +146,31 @@ class QueryPatternAnalyzer:
             )
         """)
         
+        # Covering index for windowed history reads per agent
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_query_history_agent_time
+            ON query_history(agent_id, timestamp, query_text, hour, weekday, success, cache_hit)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_query_history_agent_hash
+            ON query_history(agent_id, query_hash, timestamp)
+        """)
+        
+        # Incrementally maintained counts per day, template, hour and weekday
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS query_template_counts (
+                agent_id TEXT NOT NULL,
+                day INTEGER NOT NULL,
+                pattern_id TEXT NOT NULL,
+                hour INTEGER NOT NULL,
+                weekday INTEGER NOT NULL,
+                frequency INTEGER NOT NULL DEFAULT 0,
+                successes INTEGER NOT NULL DEFAULT 0,
+                cache_hits INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (agent_id, day, pattern_id, hour, weekday)
+            ) WITHOUT ROWID
+        """)
+        
         # Pattern analysis table
         conn.execute("""
             CREATE TABLE IF NOT EXISTS query_patterns (
@@ -161,8 +210,65 @@ class QueryPatternAnalyzer:
         """)
         
         conn.commit()
+        self._backfill_template_counts(conn)
         conn.close()
     
+    def _backfill_template_counts(self, conn: sqlite3.Connection):
+        """Build template counts from raw history recorded before they existed."""
+        has_counts = conn.execute(
+            "SELECT 1 FROM query_template_counts WHERE agent_id = ? LIMIT 1", (self.agent_id,)
+        ).fetchone()
+        if has_counts:
+            return
+        
+        window_start = time.time() - self.analysis_window_days * 24 * 3600
+        cursor = conn.execute("""
+            SELECT query_text, timestamp, hour, weekday, success, cache_hit
+            FROM query_history
+            WHERE agent_id = ? AND timestamp > ?
+        """, (self.agent_id, window_start))
+        
+        counts = self._aggregate_rows(
+            (query, timestamp, hour, weekday, success, cache_hit)
+            for query, timestamp, hour, weekday, success, cache_hit in cursor
+        )
+        if counts:
+            self._upsert_template_counts(conn, counts)
+            conn.commit()
+            self.logger.info(f"Backfilled {len(counts)} template count buckets from query history")
+    
+    def _aggregate_rows(self, rows) -> Dict[Tuple[int, str, int, int], List[int]]:
+        """Aggregate (query, timestamp, hour, weekday, success, cache_hit) rows into count buckets."""
+        counts: Dict[Tuple[int, str, int, int], List[int]] = {}
+        templates: Dict[str, str] = {}
+        for query, timestamp, hour, weekday, success, cache_hit in rows:
+            pattern_id = templates.get(query)
+            if pattern_id is None:
+                pattern_id = self._generate_pattern_id(self._extract_pattern_template(query))
+                templates[query] = pattern_id
+            day = datetime.fromtimestamp(timestamp).toordinal()
+            bucket = counts.setdefault((day, pattern_id, hour, weekday), [0, 0, 0])
+            bucket[0] += 1
+            bucket[1] += 1 if success else 0
+            bucket[2] += 1 if cache_hit else 0
+        return counts
+    
+    def _upsert_template_counts(self, conn: sqlite3.Connection,
+                                counts: Dict[Tuple[int, str, int, int], List[int]]):
+        """Add aggregated counts to the template count table."""
+        conn.executemany("""
+            INSERT INTO query_template_counts
+            (agent_id, day, pattern_id, hour, weekday, frequency, successes, cache_hits)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(agent_id, day, pattern_id, hour, weekday) DO UPDATE SET
+                frequency = frequency + excluded.frequency,
+                successes = successes + excluded.successes,
+                cache_hits = cache_hits + excluded.cache_hits
+        """, [
+            (self.agent_id, day, pattern_id, hour, weekday, frequency, successes, cache_hits)
+            for (day, pattern_id, hour, weekday), (frequency, successes, cache_hits) in counts.items()
+        ])
+    
     def _load_patterns(self):
         """Load existing patterns from database."""
         try:
@@ -177,8 +283,9 @@ class QueryPatternAnalyzer:
                 success_rate, cache_effectiveness, last_seen, variations, _ = row
                 
                 try:
-                    temporal_distribution = json.loads(temporal_dist)
-                    weekday_distribution = json.loads(weekday_dist)
+                    # JSON object keys are strings; distributions are keyed by int
+                    temporal_distribution = {int(k): v for k, v in json.loads(temporal_dist).items()}
+                    weekday_distribution = {int(k): v for k, v in json.loads(weekday_dist).items()}
                     variation_list = json.loads(variations)
                     
                     pattern = QueryPattern(
@@ -206,59 +313,156 @@ class QueryPatternAnalyzer:
     
     async def record_query(self, query: str, success: bool, cache_hit: bool, 
                          response_time: float, confidence: float):
-        """Record a query for pattern analysis."""
+        """Record a query for pattern analysis.
+        
+        The history row is buffered and written with the next batch; only the
+        in-memory pattern is updated inline.
+        """
         current_time = time.time()
         dt = datetime.fromtimestamp(current_time)
         query_hash = self._hash_query(query)
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.execute("""
-                INSERT INTO query_history 
-                (query_hash, query_text, timestamp, hour, weekday, success, 
-                 cache_hit, response_time, confidence, agent_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+            self._history_buffer.append((
                 query_hash, query, current_time, dt.hour, dt.weekday(),
                 success, cache_hit, response_time, confidence, self.agent_id
             ))
-            conn.commit()
-            conn.close()
+            self.ingestion_stats["queries_buffered"] += 1
+            self._cap_buffer()
             
-            # Update patterns asynchronously
             await self._update_patterns(query, dt, success, cache_hit)
+            self._schedule_flush()
             
         except Exception as e:
             self.logger.error(f"Error recording query: {e}")
     
+    def _cap_buffer(self):
+        """Drop the oldest buffered rows past max_buffered_rows."""
+        overflow = len(self._history_buffer) - self.max_buffered_rows
+        if overflow > 0:
+            del self._history_buffer[:overflow]
+            self.ingestion_stats["rows_dropped"] += overflow
+    
+    def _schedule_flush(self):
+        """Flush now if the batch is full, otherwise within flush_interval."""
+        if self._flush_task and not self._flush_task.done():
+            if len(self._history_buffer) < self.flush_batch_size:
+                return
+        try:
+            delay = 0.0 if len(self._history_buffer) >= self.flush_batch_size else self.flush_interval
+            self._flush_task = asyncio.get_running_loop().create_task(self._delayed_flush(delay))
+        except RuntimeError:
+            # No running loop; the buffer is written by the next explicit flush
+            pass
+    
+    async def _delayed_flush(self, delay: float):
+        """Wait for more queries to accumulate, then flush them."""
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await self.flush()
+    
+    async def flush(self) -> int:
+        """Write buffered history, template counts and changed patterns in one batch."""
+        async with self._flush_lock:
+            if not self._history_buffer and not self._dirty_patterns:
+                return 0
+            
+            rows, self._history_buffer = self._history_buffer, []
+            dirty, self._dirty_patterns = self._dirty_patterns, {}
+            patterns = [self._pattern_row(p) for p in dirty.values()]
+            
+            start = time.perf_counter()
+            try:
+                await asyncio.to_thread(self._write_batch, rows, patterns)
+            except Exception as e:
+                # Keep the rows and changed patterns for the next attempt
+                self._history_buffer = rows + self._history_buffer
+                self._cap_buffer()
+                self._dirty_patterns = {**dirty, **self._dirty_patterns}
+                self.ingestion_stats["flush_errors"] += 1
+                self.logger.error(f"Error flushing query history: {e}")
+                return 0
+            
+            self.ingestion_stats["rows_written"] += len(rows)
+            self.ingestion_stats["flushes"] += 1
+            self.ingestion_stats["last_flush_ms"] = (time.perf_counter() - start) * 1000
+            return len(rows)
+    
+    async def close(self):
+        """Cancel the pending flush and write everything still buffered."""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = None
+        await self.flush()
+    
+    def _write_batch(self, rows: List[Tuple], patterns: List[Tuple]):
+        """Insert a batch of history rows and update aggregates (runs in a worker thread)."""
+        window_start_day = (datetime.now() - timedelta(days=self.analysis_window_days)).toordinal()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                if window_start_day > self._pruned_through_day:
+                    # Counts outside the analysis window are never read again
+                    cursor = conn.execute(
+                        "DELETE FROM query_template_counts WHERE agent_id = ? AND day < ?",
+                        (self.agent_id, window_start_day)
+                    )
+                    self.ingestion_stats["count_buckets_pruned"] += cursor.rowcount
+                if rows:
+                    conn.executemany("""
+                        INSERT INTO query_history 
+                        (query_hash, query_text, timestamp, hour, weekday, success, 
+                         cache_hit, response_time, confidence, agent_id)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, rows)
+                    self._upsert_template_counts(conn, self._aggregate_rows(
+                        (row[1], row[2], row[3], row[4], row[5], row[6]) for row in rows
+                    ))
+                if patterns:
+                    conn.executemany("""
+                        INSERT OR REPLACE INTO query_patterns 
+                        (pattern_id, query_template, frequency, temporal_distribution, 
+                         weekday_distribution, success_rate, cache_effectiveness, 
+                         last_seen, variations, agent_id)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, patterns)
+            self._pruned_through_day = window_start_day
+        finally:
+            conn.close()
+    
+    def _read_template_counts(self, window_start_day: int) -> List[Tuple]:
+        """Read windowed counts per template, hour and weekday (runs in a worker thread)."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("""
+                SELECT pattern_id, hour, weekday, SUM(frequency), SUM(successes), SUM(cache_hits)
+                FROM query_template_counts
+                WHERE agent_id = ? AND day >= ?
+                GROUP BY pattern_id, hour, weekday
+            """, (self.agent_id, window_start_day)).fetchall()
+        finally:
+            conn.close()
+    
     async def analyze_historical_patterns(self) -> Dict[str, float]:
         """Analyze historical query patterns and return pattern weights."""
         try:
-            conn = sqlite3.connect(self.db_path)
+            await self.flush()
             
-            # Get query history for the last 30 days
-            thirty_days_ago = time.time() - (30 * 24 * 3600)
-            cursor = conn.execute("""
-                SELECT query_text, hour, weekday, success, cache_hit, COUNT(*) as frequency
-                FROM query_history 
-                WHERE agent_id = ? AND timestamp > ?
-                GROUP BY query_text, hour, weekday
-                ORDER BY frequency DESC
-            """, (self.agent_id, thirty_days_ago))
+            # Template counts for the analysis window (whole days)
+            window_start_day = (datetime.now() - timedelta(days=self.analysis_window_days)).toordinal()
+            rows = await asyncio.to_thread(self._read_template_counts, window_start_day)
             
             pattern_weights = {}
             temporal_analysis = defaultdict(lambda: defaultdict(float))
             
-            for row in cursor.fetchall():
-                query, hour, weekday, success, cache_hit, frequency = row
-                
-                # Extract pattern template
-                pattern_template = self._extract_pattern_template(query)
-                pattern_id = self._generate_pattern_id(pattern_template)
-                
-                # Calculate weight based on frequency and success
-                success_weight = 1.0 if success else 0.5
-                cache_weight = 1.2 if cache_hit else 1.0
+            for pattern_id, hour, weekday, frequency, successes, cache_hits in rows:
+                # Calculate weight based on frequency, success and cache hit rates
+                success_weight = 0.5 + 0.5 * (successes / frequency)
+                cache_weight = 1.0 + 0.2 * (cache_hits / frequency)
                 base_weight = frequency * success_weight * cache_weight
                 
                 pattern_weights[pattern_id] = pattern_weights.get(pattern_id, 0) + base_weight
@@ -267,8 +471,6 @@ class QueryPatternAnalyzer:
                 temporal_analysis[pattern_id][f"hour_{hour}"] += frequency
                 temporal_analysis[pattern_id][f"weekday_{weekday}"] += frequency
             
-            conn.close()
-            
             # Normalize weights
             if pattern_weights:
                 max_weight = max(pattern_weights.values())
@@ -370,8 +572,9 @@ class QueryPatternAnalyzer:
             pattern.frequency += 1
             pattern.last_seen = datetime.now()
             
-            # Save updated pattern
-            await self._save_pattern(pattern)
+            # Written with the next batch
+            self._mark_dirty(pattern)
+            self._schedule_flush()
             
             self.logger.debug(f"Updated pattern {pattern_id}: success_rate={pattern.success_rate:.3f}")
     
@@ -636,35 +839,32 @@ class QueryPatternAnalyzer:
             )
             self.patterns[pattern_id] = pattern
         
-        # Save pattern to database
-        await self._save_pattern(pattern)
+        # Written with the next history batch
+        self._mark_dirty(pattern)
+    
+    def _mark_dirty(self, pattern: QueryPattern):
+        """Queue a pattern to be saved with the next batch."""
+        self._dirty_patterns[pattern.pattern_id] = pattern
+    
+    def _pattern_row(self, pattern: QueryPattern) -> Tuple:
+        """Serialize a pattern for the query_patterns table."""
+        return (
+            pattern.pattern_id,
+            pattern.query_template,
+            pattern.frequency,
+            json.dumps(pattern.temporal_distribution),
+            json.dumps(pattern.weekday_distribution),
+            pattern.success_rate,
+            pattern.cache_effectiveness,
+            pattern.last_seen.timestamp(),
+            json.dumps(pattern.variations),
+            self.agent_id
+        )
     
     async def _save_pattern(self, pattern: QueryPattern):
         """Save pattern to database."""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.execute("""
-                INSERT OR REPLACE INTO query_patterns 
-                (pattern_id, query_template, frequency, temporal_distribution, 
-                 weekday_distribution, success_rate, cache_effectiveness, 
-                 last_seen, variations, agent_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                pattern.pattern_id,
-                pattern.query_template,
-                pattern.frequency,
-                json.dumps(pattern.temporal_distribution),
-                json.dumps(pattern.weekday_distribution),
-                pattern.success_rate,
-                pattern.cache_effectiveness,
-                pattern.last_seen.timestamp(),
-                json.dumps(pattern.variations),
-                self.agent_id
-            ))
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            self.logger.error(f"Error saving pattern: {e}")
+        self._mark_dirty(pattern)
+        await self.flush()
     
     def get_analysis_stats(self) -> Dict[str, Any]:
         """Get pattern analysis statistics."""
@@ -677,5 +877,10 @@ class QueryPatternAnalyzer:
             "prediction_accuracy": self.prediction_accuracy,
             "learning_rate": self.learning_rate,
             "confidence_threshold": self.prediction_confidence_threshold,
-            "temporal_patterns_count": len(self.temporal_patterns)
+            "temporal_patterns_count": len(self.temporal_patterns),
+            "ingestion": {
+                **self.ingestion_stats,
+                "buffered": len(self._history_buffer),
+                "dirty_patterns": len(self._dirty_patterns)
+            }
         }
\ No newline at end of file
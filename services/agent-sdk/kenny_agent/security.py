@@ -10,12 +10,15 @@ import asyncio
 import logging
 import ipaddress
 import re
-from typing import Dict, Any, List, Optional, Set, Callable
+from typing import Dict, Any, List, Optional, Set, Callable, Tuple, Iterator
 from datetime import datetime, timezone, timedelta
 from dataclasses import dataclass, asdict, field
+from collections import deque, OrderedDict
 from enum import Enum
 import json
 
+from .audit_log import SecurityAuditLog
+
 logger = logging.getLogger(__name__)
 
 
@@ -76,7 +79,19 @@ class EgressRule:
         self.allowed_domains = allowed_domains
         self.allowed_ips = allowed_ips or []
         self.ports = ports or []
-        self.enabled = True
+        self._enabled = True
+        self._change_listeners: List[Callable[[], None]] = []
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether the rule currently allows traffic."""
+        return self._enabled
+    
+    @enabled.setter
+    def enabled(self, value: bool):
+        self._enabled = value
+        for listener in self._change_listeners:
+            listener()
     
     def is_allowed(self, destination: str, port: Optional[int] = None) -> bool:
         """Check if destination is allowed by this rule."""
@@ -98,9 +113,9 @@ class EgressRule:
     def _matches_domain(self, destination: str, pattern: str) -> bool:
         """Check if destination matches domain pattern."""
         if pattern.startswith("*."):
-            # Wildcard subdomain matching
+            # Wildcard subdomain matching (the bare domain matches as well)
             domain_suffix = pattern[2:]
-            return destination.endswith(domain_suffix) or destination == domain_suffix[1:]
+            return destination == domain_suffix or destination.endswith("." + domain_suffix)
         else:
             return destination == pattern
     
@@ -125,6 +140,102 @@ class EgressRule:
         return port in self.ports if port else True
 
 
+class CompiledEgressPolicy:
+    """Egress rules compiled into lookup structures.
+    
+    Exact domains and IPs resolve through a dict, ``*.`` wildcard domains
+    through a trie over reversed domain labels, and CIDR ranges through a
+    binary radix trie per address family. ``match`` returns every rule whose
+    destination patterns cover the destination; enablement and ports are
+    checked by the caller.
+    """
+    
+    _RULES = "__rules__"
+    
+    def __init__(self, rules: List[EgressRule]):
+        """Compile the given rules."""
+        self.exact: Dict[str, List[EgressRule]] = {}
+        self.wildcard_trie: Dict[str, Any] = {}
+        self.cidr_tries: Dict[int, List[Any]] = {4: [None, None, []], 6: [None, None, []]}
+        self.pattern_count = 0
+        
+        for rule in rules:
+            for pattern in rule.allowed_domains:
+                if pattern.startswith("*."):
+                    suffix = pattern[2:]
+                    self._add_exact(suffix, rule)
+                    self._add_wildcard(suffix, rule)
+                else:
+                    self._add_exact(pattern, rule)
+                self.pattern_count += 1
+            
+            for allowed_ip in rule.allowed_ips:
+                if "/" in allowed_ip:
+                    try:
+                        network = ipaddress.ip_network(allowed_ip, strict=False)
+                    except ValueError:
+                        continue
+                    self._add_network(network, rule)
+                else:
+                    self._add_exact(allowed_ip, rule)
+                self.pattern_count += 1
+    
+    def _add_exact(self, destination: str, rule: EgressRule):
+        bucket = self.exact.setdefault(destination, [])
+        if rule not in bucket:
+            bucket.append(rule)
+    
+    def _add_wildcard(self, suffix: str, rule: EgressRule):
+        node = self.wildcard_trie
+        for label in reversed(suffix.split(".")):
+            node = node.setdefault(label, {})
+        bucket = node.setdefault(self._RULES, [])
+        if rule not in bucket:
+            bucket.append(rule)
+    
+    def _add_network(self, network, rule: EgressRule):
+        node = self.cidr_tries[network.version]
+        address = int(network.network_address)
+        for i in range(network.prefixlen):
+            bit = (address >> (network.max_prefixlen - 1 - i)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, []]
+            node = node[bit]
+        if rule not in node[2]:
+            node[2].append(rule)
+    
+    def match(self, destination: str) -> List[EgressRule]:
+        """Get the rules whose domain or IP patterns cover the destination."""
+        matched = list(self.exact.get(destination, ()))
+        
+        # Wildcards only match strict subdomains here; the bare domain is in exact
+        labels = destination.split(".")
+        node = self.wildcard_trie
+        for depth in range(len(labels) - 1, 0, -1):
+            node = node.get(labels[depth])
+            if node is None:
+                break
+            matched.extend(node.get(self._RULES, ()))
+        
+        if destination[:1].isdigit() or ":" in destination:
+            try:
+                address = ipaddress.ip_address(destination)
+            except ValueError:
+                address = None
+            if address is not None:
+                node = self.cidr_tries[address.version]
+                value = int(address)
+                bits = address.max_prefixlen
+                matched.extend(node[2])
+                for i in range(bits):
+                    node = node[(value >> (bits - 1 - i)) & 1]
+                    if node is None:
+                        break
+                    matched.extend(node[2])
+        
+        return matched
+
+
 class EgressMonitor:
     """Monitors network egress traffic for policy violations with real-time enforcement."""
     
@@ -134,13 +245,35 @@ class EgressMonitor:
         self.violation_handlers: List[Callable[[SecurityEvent], None]] = []
         self.blocked_services: Dict[str, Dict[str, Any]] = {}  # service_id -> block_info
         self.blocked_destinations: Dict[str, Dict[str, Any]] = {}  # destination -> block_info
-        self.enforcement_enabled = True
+        self._enforcement_enabled = True
         self.bypass_requests: Dict[str, Dict[str, Any]] = {}  # bypass_id -> request_info
+        
+        # Compiled rule lookup and LRU cache of allowed (service, destination, port)
+        # decisions; both are rebuilt/cleared whenever rules or blocks change.
+        self.compiled_policy = CompiledEgressPolicy([])
+        self.decision_cache: "OrderedDict[tuple, bool]" = OrderedDict()
+        self.decision_cache_size = 4096
+        self.decision_cache_hits = 0
+        self.decision_cache_misses = 0
+        self.decision_cache_invalidations = 0
+        
         self.load_default_rules()
     
+    @property
+    def enforcement_enabled(self) -> bool:
+        """Whether service/destination blocks are enforced."""
+        return self._enforcement_enabled
+    
+    @enforcement_enabled.setter
+    def enforcement_enabled(self, value: bool):
+        self._enforcement_enabled = value
+        self.invalidate_decision_cache()
+    
     def add_rule(self, rule: EgressRule):
         """Add an egress rule."""
         self.rules[rule.rule_id] = rule
+        rule._change_listeners.append(self.invalidate_decision_cache)
+        self.recompile_rules()
         logger.info(f"Added egress rule: {rule.name} ({rule.rule_id})")
     
     def remove_rule(self, rule_id: str) -> bool:
@@ -148,13 +281,47 @@ class EgressMonitor:
         if rule_id in self.rules:
             rule = self.rules[rule_id]
             del self.rules[rule_id]
+            if self.invalidate_decision_cache in rule._change_listeners:
+                rule._change_listeners.remove(self.invalidate_decision_cache)
+            self.recompile_rules()
             logger.info(f"Removed egress rule: {rule.name} ({rule_id})")
             return True
         return False
     
+    def recompile_rules(self):
+        """Rebuild the compiled rule lookup (call after editing a rule's patterns in place)."""
+        self.compiled_policy = CompiledEgressPolicy(list(self.rules.values()))
+        self.invalidate_decision_cache()
+    
+    def invalidate_decision_cache(self):
+        """Drop all cached egress decisions."""
+        self.decision_cache.clear()
+        self.decision_cache_invalidations += 1
+    
+    def get_decision_cache_stats(self) -> Dict[str, Any]:
+        """Get egress decision cache statistics."""
+        lookups = self.decision_cache_hits + self.decision_cache_misses
+        return {
+            "size": len(self.decision_cache),
+            "max_size": self.decision_cache_size,
+            "hits": self.decision_cache_hits,
+            "misses": self.decision_cache_misses,
+            "hit_rate": self.decision_cache_hits / lookups if lookups else 0.0,
+            "invalidations": self.decision_cache_invalidations,
+            "compiled_patterns": self.compiled_policy.pattern_count
+        }
+    
     def check_egress(self, source_service: str, destination: str, port: Optional[int] = None,
                     correlation_id: Optional[str] = None) -> bool:
         """Check if egress connection is allowed with real-time enforcement."""
+        # Fast path: allowed decisions stay valid until rules or blocks change
+        cache_key = (source_service, destination, port)
+        try:
+            self.decision_cache.move_to_end(cache_key)
+            self.decision_cache_hits += 1
+            return True
+        except KeyError:
+            self.decision_cache_misses += 1
         
         # Check if service is blocked
         if self.enforcement_enabled and source_service in self.blocked_services:
@@ -174,9 +341,12 @@ class EgressMonitor:
                 return False
         
         # Check against egress rules
-        for rule in self.rules.values():
-            if rule.is_allowed(destination, port):
+        for rule in self.compiled_policy.match(destination):
+            if rule.enabled and rule._check_port(port):
                 logger.debug(f"Egress allowed: {source_service} -> {destination}:{port or 'any'}")
+                self.decision_cache[cache_key] = True
+                if len(self.decision_cache) > self.decision_cache_size:
+                    self.decision_cache.popitem(last=False)
                 return True
         
         # Egress violation detected - apply enforcement if enabled
@@ -284,6 +454,7 @@ class EgressMonitor:
                 self.blocked_destinations[destination_key] = block_info
         else:
             self.blocked_destinations[destination_key] = block_info
+        self.invalidate_decision_cache()
         
         logger.critical(f"REAL-TIME ENFORCEMENT: Blocked destination {destination_key} for {block_info['duration_minutes']} minutes")
     
@@ -302,6 +473,7 @@ class EgressMonitor:
         }
         
         self.blocked_services[service_id] = block_info
+        self.invalidate_decision_cache()
         logger.critical(f"SERVICE BLOCKED: {service_id} for {duration_minutes} minutes - {reason}")
         
         return block_info["block_id"]
@@ -323,6 +495,7 @@ class EgressMonitor:
         }
         
         self.blocked_destinations[destination_key] = block_info
+        self.invalidate_decision_cache()
         logger.critical(f"DESTINATION BLOCKED: {destination_key} for {duration_minutes} minutes - {reason}")
         
         return block_info["block_id"]
@@ -332,6 +505,7 @@ class EgressMonitor:
         if service_id in self.blocked_services:
             block_info = self.blocked_services[service_id]
             del self.blocked_services[service_id]
+            self.invalidate_decision_cache()
             logger.info(f"SERVICE UNBLOCKED: {service_id} (block_id: {block_info.get('block_id', 'unknown')})")
             return True
         return False
@@ -342,6 +516,7 @@ class EgressMonitor:
         if destination_key in self.blocked_destinations:
             block_info = self.blocked_destinations[destination_key]
             del self.blocked_destinations[destination_key]
+            self.invalidate_decision_cache()
             logger.info(f"DESTINATION UNBLOCKED: {destination_key} (block_id: {block_info.get('block_id', 'unknown')})")
             return True
         return False
@@ -439,7 +614,8 @@ class EgressMonitor:
             "pending_bypass_requests": len([r for r in self.bypass_requests.values() if r["status"] == "pending"]),
             "approved_bypass_requests": len([r for r in self.bypass_requests.values() if r["status"] == "approved"]),
             "blocked_services": list(self.blocked_services.keys()),
-            "blocked_destinations": list(self.blocked_destinations.keys())
+            "blocked_destinations": list(self.blocked_destinations.keys()),
+            "decision_cache": self.get_decision_cache_stats()
         }
     
     def _cleanup_expired_blocks(self):
@@ -490,6 +666,7 @@ class DataAccessMonitor:
         ]
         self.access_handlers: List[Callable[[SecurityEvent], None]] = []
         self.max_log_entries = 10000
+        self.persistent_log: Optional[SecurityAuditLog] = None
     
     def log_data_access(self, service_name: str, resource: str, operation: str,
                        user_id: Optional[str] = None, data_size: Optional[int] = None,
@@ -506,6 +683,8 @@ class DataAccessMonitor:
         }
         
         self.access_log.append(access_entry)
+        if self.persistent_log is not None:
+            self.persistent_log.append("data_access", access_entry, kind=operation, source=service_name)
         
         # Check for suspicious patterns
         self._check_suspicious_access(access_entry)
@@ -590,10 +769,16 @@ class DataAccessMonitor:
         """Add handler for data access events."""
         self.access_handlers.append(handler)
     
-    def get_access_history(self, hours: int = 24) -> List[Dict[str, Any]]:
+    def get_access_history(self, hours: int = 24, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get data access history."""
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
         
+        if self.persistent_log is not None:
+            # Persisted log is queried newest first; keep the chronological order of access_log
+            entries = self.persistent_log.query("data_access", since=cutoff_time, limit=limit or self.max_log_entries)
+            entries.reverse()
+            return entries
+        
         recent_access = []
         for entry in self.access_log:
             entry_time = datetime.fromisoformat(entry["timestamp"].replace("Z", "+00:00"))
@@ -601,6 +786,12 @@ class DataAccessMonitor:
                 recent_access.append(entry)
         
         return recent_access
+    
+    async def get_access_history_async(self, hours: int = 24, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get data access history, reading the persistent log in a worker thread."""
+        if self.persistent_log is None:
+            return self.get_access_history(hours, limit)
+        return await asyncio.to_thread(self.get_access_history, hours, limit)
 
 
 class SecurityIncident:
@@ -638,22 +829,156 @@ class SecurityIncident:
         }
 
 
+class SlidingWindowCounter:
+    """Bucketed event counter answering "how many in the last N seconds" in O(buckets)."""
+    
+    def __init__(self, horizon_seconds: int = 3600, bucket_seconds: int = 10):
+        """Initialize sliding window counter."""
+        self.horizon_seconds = horizon_seconds
+        self.bucket_seconds = bucket_seconds
+        self.buckets: deque = deque()  # [bucket_start_epoch, count], oldest first
+        self.total = 0
+    
+    def add(self, timestamp: datetime, amount: int = 1):
+        """Record events at the given time."""
+        bucket_start = int(timestamp.timestamp()) // self.bucket_seconds * self.bucket_seconds
+        if self.buckets and self.buckets[-1][0] >= bucket_start:
+            self.buckets[-1][1] += amount
+        else:
+            self.buckets.append([bucket_start, amount])
+        self.total += amount
+        self._expire(bucket_start)
+    
+    def count(self, window_seconds: int, now: Optional[datetime] = None) -> int:
+        """Count events within the window (to bucket granularity)."""
+        now_epoch = (now or datetime.now(timezone.utc)).timestamp()
+        self._expire(now_epoch)
+        cutoff = now_epoch - window_seconds
+        
+        if window_seconds >= self.horizon_seconds:
+            return self.total
+        
+        count = 0
+        for bucket_start, bucket_count in reversed(self.buckets):
+            if bucket_start + self.bucket_seconds <= cutoff:
+                break
+            count += bucket_count
+        return count
+    
+    def _expire(self, now_epoch: float):
+        """Drop buckets older than the horizon."""
+        cutoff = now_epoch - self.horizon_seconds
+        buckets = self.buckets
+        while buckets and buckets[0][0] + self.bucket_seconds <= cutoff:
+            self.total -= buckets.popleft()[1]
+
+
+class SecurityEventStore:
+    """Bounded, time-ordered security event store.
+    
+    Events are kept in arrival order in a global deque and in per
+    (event_type, source_service) deques, so windowed lookups walk only the
+    matching events inside the window. Sliding window counters keyed by
+    (event_type, severity) serve rate checks without touching events.
+    """
+    
+    def __init__(self, max_events: int = 10000, counter_horizon_seconds: int = 86400,
+                 counter_bucket_seconds: int = 10):
+        """Initialize security event store."""
+        self.max_events = max_events
+        self.counter_horizon_seconds = counter_horizon_seconds
+        self.counter_bucket_seconds = counter_bucket_seconds
+        self.events: deque = deque()
+        self.by_source: Dict[Tuple[SecurityEventType, str], deque] = {}
+        self.counters: Dict[Tuple[SecurityEventType, SecuritySeverity], SlidingWindowCounter] = {}
+    
+    def __len__(self) -> int:
+        return len(self.events)
+    
+    def __iter__(self) -> Iterator[SecurityEvent]:
+        return iter(self.events)
+    
+    def append(self, event: SecurityEvent) -> List[SecurityEvent]:
+        """Add an event, returning any events evicted to stay within max_events."""
+        self.events.append(event)
+        self.by_source.setdefault((event.event_type, event.source_service), deque()).append(event)
+        
+        counter_key = (event.event_type, event.severity)
+        counter = self.counters.get(counter_key)
+        if counter is None:
+            counter = SlidingWindowCounter(self.counter_horizon_seconds, self.counter_bucket_seconds)
+            self.counters[counter_key] = counter
+        counter.add(event.timestamp)
+        
+        evicted = []
+        while len(self.events) > self.max_events:
+            oldest = self.events.popleft()
+            source_key = (oldest.event_type, oldest.source_service)
+            source_events = self.by_source[source_key]
+            if source_events and source_events[0] is oldest:
+                source_events.popleft()
+            else:
+                source_events.remove(oldest)
+            if not source_events:
+                del self.by_source[source_key]
+            evicted.append(oldest)
+        return evicted
+    
+    def recent_events(self, since: datetime) -> List[SecurityEvent]:
+        """Get events at or after since, most recent first."""
+        return self._take_since(self.events, since)
+    
+    def recent_for_source(self, event_type: SecurityEventType, source_service: str,
+                          since: datetime) -> List[SecurityEvent]:
+        """Get events of a type from one service at or after since, most recent first."""
+        source_events = self.by_source.get((event_type, source_service))
+        if not source_events:
+            return []
+        return self._take_since(source_events, since)
+    
+    def count_recent(self, event_type: SecurityEventType, severity: SecuritySeverity,
+                     window_seconds: int) -> int:
+        """Count events of a type and severity within the window."""
+        counter = self.counters.get((event_type, severity))
+        if counter is None:
+            return 0
+        return counter.count(window_seconds)
+    
+    def _take_since(self, events: deque, since: datetime) -> List[SecurityEvent]:
+        """Walk a time-ordered deque from the newest end until before since."""
+        result = []
+        for event in reversed(events):
+            if event.timestamp < since:
+                break
+            result.append(event)
+        return result
+
+
 class SecurityEventCollector:
     """Central collector for security events with incident management."""
     
     def __init__(self):
         """Initialize security event collector."""
-        self.events: List[SecurityEvent] = []
-        self.incidents: List[SecurityIncident] = []
         self.max_events = 10000
+        self.event_store = SecurityEventStore(max_events=self.max_events)
+        self.events = self.event_store.events
+        self.incidents: List[SecurityIncident] = []
+        self._incident_by_event: Dict[str, SecurityIncident] = {}
         self.max_incidents = 1000
         self.event_handlers: List[Callable[[SecurityEvent], None]] = []
         self.incident_handlers: List[Callable[[SecurityIncident], None]] = []
         self.correlation_window_minutes = 30  # Group related events within 30 minutes
+        self.persistent_log: Optional[SecurityAuditLog] = None
     
     def collect_event(self, event: SecurityEvent):
         """Collect a security event and potentially create incidents."""
-        self.events.append(event)
+        # Store the event (evicting the oldest beyond max_events)
+        self.event_store.append(event)
+        if self.persistent_log is not None:
+            self.persistent_log.append(
+                "security_event", event.to_dict(), timestamp=event.timestamp,
+                kind=event.event_type.value, severity=event.severity.value, source=event.source_service
+            )
         
         # Check for incident creation/correlation
         self._check_incident_correlation(event)
@@ -665,27 +990,26 @@ class SecurityEventCollector:
             except Exception as e:
                 logger.error(f"Error in security event handler: {e}")
         
-        # Trim events if needed
-        if len(self.events) > self.max_events:
-            self.events = self.events[-self.max_events:]
-        
         logger.warning(f"SECURITY EVENT [{event.severity.value.upper()}]: {event.title}")
     
     def _check_incident_correlation(self, new_event: SecurityEvent):
         """Check if event should create or correlate with existing incidents."""
-        # Check for similar events within correlation window
+        # Only events of the same type from the same service within the window are candidates
         cutoff_time = datetime.now(timezone.utc) - timedelta(minutes=self.correlation_window_minutes)
+        candidates = self.event_store.recent_for_source(
+            new_event.event_type, new_event.source_service, cutoff_time
+        )
         
-        related_events = []
-        for event in self.events:
-            if (event.timestamp >= cutoff_time and
-                event.event_type == new_event.event_type and
-                event.source_service == new_event.source_service and
-                event.severity in [SecuritySeverity.CRITICAL, SecuritySeverity.HIGH]):
-                related_events.append(event)
+        related_events = [
+            event for event in reversed(candidates)
+            if event is not new_event and event.severity in (SecuritySeverity.CRITICAL, SecuritySeverity.HIGH)
+        ]
+        high_severity_count = len(related_events)
+        if new_event.severity in (SecuritySeverity.CRITICAL, SecuritySeverity.HIGH):
+            high_severity_count += 1
         
         # If we have multiple related high-severity events, create incident
-        if len(related_events) >= 2:  # Including the new event
+        if high_severity_count >= 2:  # Including the new event
             self._create_incident(related_events + [new_event])
     
     def _create_incident(self, events: List[SecurityEvent]):
@@ -693,12 +1017,15 @@ class SecurityEventCollector:
         import uuid
         
         # Check if incident already exists for these events
-        event_ids = {e.event_id for e in events}
-        for incident in self.incidents:
-            if event_ids.intersection(set(incident.event_ids)):
+        for event in events:
+            incident = self._incident_by_event.get(event.event_id)
+            if incident is not None:
                 # Update existing incident with new events
-                new_event_ids = event_ids - set(incident.event_ids)
-                incident.event_ids.extend(list(new_event_ids))
+                known_event_ids = set(incident.event_ids)
+                new_event_ids = [e.event_id for e in events if e.event_id not in known_event_ids]
+                incident.event_ids.extend(new_event_ids)
+                for new_event_id in new_event_ids:
+                    self._incident_by_event[new_event_id] = incident
                 logger.warning(f"Updated security incident {incident.incident_id} with {len(new_event_ids)} new events")
                 return incident
         
@@ -729,9 +1056,15 @@ class SecurityEventCollector:
             incident.status = "investigating"
         
         self.incidents.append(incident)
+        for event_id in incident.event_ids:
+            self._incident_by_event[event_id] = incident
         
         # Trim incidents if needed
         if len(self.incidents) > self.max_incidents:
+            for dropped in self.incidents[:-self.max_incidents]:
+                for event_id in dropped.event_ids:
+                    if self._incident_by_event.get(event_id) is dropped:
+                        del self._incident_by_event[event_id]
             self.incidents = self.incidents[-self.max_incidents:]
         
         # Notify incident handlers
@@ -831,39 +1164,81 @@ class SecurityEventCollector:
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
         
         filtered_events = []
-        for event in self.events:
-            if event.timestamp >= cutoff_time:
-                if severity and event.severity != severity:
-                    continue
-                if event_type and event.event_type != event_type:
-                    continue
-                filtered_events.append(event)
+        for event in self.event_store.recent_events(cutoff_time):
+            if severity and event.severity != severity:
+                continue
+            if event_type and event.event_type != event_type:
+                continue
+            filtered_events.append(event)
         
         # Sort by timestamp (most recent first)
         filtered_events.sort(key=lambda e: e.timestamp, reverse=True)
         return filtered_events
     
-    def get_event_summary(self) -> Dict[str, Any]:
-        """Get summary of security events."""
-        recent_events = self.get_events(hours=24)
+    def get_event_records(self, hours: int = 24, severity: Optional[SecuritySeverity] = None,
+                          event_type: Optional[SecurityEventType] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Get security events as dictionaries, most recent first.
         
-        # Count by severity
-        severity_counts = {}
-        for severity in SecuritySeverity:
-            severity_counts[severity.value] = len([e for e in recent_events if e.severity == severity])
+        Reads from the persistent audit log when one is attached, so history
+        survives restarts and at most ``limit`` events are materialized.
+        """
+        if self.persistent_log is None:
+            events = self.get_events(hours, severity, event_type)[:limit]
+            return [event.to_dict() for event in events]
         
-        # Count by type
-        type_counts = {}
-        for event_type in SecurityEventType:
-            type_counts[event_type.value] = len([e for e in recent_events if e.event_type == event_type])
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+        return self.persistent_log.query(
+            "security_event",
+            since=cutoff_time,
+            kind=event_type.value if event_type else None,
+            severity=severity.value if severity else None,
+            limit=limit
+        )
+    
+    async def get_event_records_async(self, hours: int = 24, severity: Optional[SecuritySeverity] = None,
+                                      event_type: Optional[SecurityEventType] = None,
+                                      limit: int = 1000) -> List[Dict[str, Any]]:
+        """Get security events as dictionaries, reading the persistent log in a worker thread."""
+        if self.persistent_log is None:
+            return self.get_event_records(hours, severity, event_type, limit)
+        return await asyncio.to_thread(self.get_event_records, hours, severity, event_type, limit)
+    
+    def get_event_summary(self) -> Dict[str, Any]:
+        """Get summary of security events."""
+        if self.persistent_log is not None:
+            cutoff_time = datetime.now(timezone.utc) - timedelta(hours=24)
+            severity_totals = self.persistent_log.count_by("security_event", "severity", since=cutoff_time)
+            type_totals = self.persistent_log.count_by("security_event", "kind", since=cutoff_time)
+            total_events = sum(severity_totals.values())
+            severity_counts = {severity.value: severity_totals.get(severity.value, 0) for severity in SecuritySeverity}
+            type_counts = {event_type.value: type_totals.get(event_type.value, 0) for event_type in SecurityEventType}
+        else:
+            recent_events = self.get_events(hours=24)
+            total_events = len(recent_events)
+            
+            # Count by severity
+            severity_counts = {}
+            for severity in SecuritySeverity:
+                severity_counts[severity.value] = len([e for e in recent_events if e.severity == severity])
+            
+            # Count by type
+            type_counts = {}
+            for event_type in SecurityEventType:
+                type_counts[event_type.value] = len([e for e in recent_events if e.event_type == event_type])
         
         return {
-            "total_events_24h": len(recent_events),
+            "total_events_24h": total_events,
             "by_severity": severity_counts,
             "by_type": type_counts,
             "critical_count": severity_counts.get("critical", 0),
             "high_count": severity_counts.get("high", 0)
         }
+    
+    async def get_event_summary_async(self) -> Dict[str, Any]:
+        """Get summary of security events, reading the persistent log in a worker thread."""
+        if self.persistent_log is None:
+            return self.get_event_summary()
+        return await asyncio.to_thread(self.get_event_summary)
 
 
 @dataclass
@@ -892,8 +1267,9 @@ class ResponseRule:
 class AutomatedResponseEngine:
     """Handles automated incident response workflows."""
     
-    def __init__(self):
+    def __init__(self, event_store: Optional[SecurityEventStore] = None):
         """Initialize automated response engine."""
+        self.event_store = event_store
         self.rules: Dict[str, ResponseRule] = {}
         self.action_history: List[Dict[str, Any]] = []
         self.response_handlers: Dict[str, Callable] = {}
@@ -1333,9 +1709,9 @@ class AutomatedResponseEngine:
     
     def _count_recent_events(self, event_type: SecurityEventType, severity: SecuritySeverity, hours: int = 1) -> int:
         """Count recent events of specified type and severity."""
-        # This would typically query the event collector
-        # For now, return a placeholder count
-        return 1
+        if self.event_store is None:
+            return 0
+        return self.event_store.count_recent(event_type, severity, hours * 3600)
     
     def _get_last_action_time(self, action_id: str, source_service: str) -> Optional[datetime]:
         """Get the last time a specific action was executed for a service."""
@@ -1417,6 +1793,7 @@ class PrivacyComplianceValidator:
         self.compliance_rules = self._load_privacy_rules()
         self.violations: List[Dict[str, Any]] = []
         self.max_audit_entries = 10000
+        self.persistent_log: Optional[SecurityAuditLog] = None
     
     def _load_privacy_rules(self) -> Dict[str, Any]:
         """Load ADR-0019 privacy compliance rules."""
@@ -1564,6 +1941,11 @@ class PrivacyComplianceValidator:
     def _log_audit_entry(self, validation_result: Dict[str, Any]):
         """Log privacy compliance audit entry."""
         self.audit_log.append(validation_result)
+        if self.persistent_log is not None:
+            self.persistent_log.append(
+                "privacy_audit", validation_result,
+                kind="compliant" if validation_result["compliant"] else "violation"
+            )
         
         # Record violations
         if not validation_result["compliant"]:
@@ -1577,19 +1959,28 @@ class PrivacyComplianceValidator:
         """Generate privacy compliance report."""
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
         
-        recent_audits = [
-            entry for entry in self.audit_log
-            if datetime.fromisoformat(entry["timestamp"].replace("Z", "+00:00")) >= cutoff_time
-        ]
-        
-        recent_violations = [
-            entry for entry in recent_audits
-            if not entry["compliant"]
-        ]
+        if self.persistent_log is not None:
+            # Count in the persisted log and only load violation entries
+            total_operations = self.persistent_log.count("privacy_audit", since=cutoff_time)
+            violation_count = self.persistent_log.count("privacy_audit", since=cutoff_time, kind="violation")
+            recent_violations = self.persistent_log.query(
+                "privacy_audit", since=cutoff_time, kind="violation", limit=self.max_audit_entries
+            )
+        else:
+            recent_audits = [
+                entry for entry in self.audit_log
+                if datetime.fromisoformat(entry["timestamp"].replace("Z", "+00:00")) >= cutoff_time
+            ]
+            
+            recent_violations = [
+                entry for entry in recent_audits
+                if not entry["compliant"]
+            ]
+            total_operations = len(recent_audits)
+            violation_count = len(recent_violations)
         
         # Calculate compliance metrics
-        total_operations = len(recent_audits)
-        compliant_operations = total_operations - len(recent_violations)
+        compliant_operations = total_operations - violation_count
         compliance_rate = (compliant_operations / total_operations * 100) if total_operations > 0 else 100
         
         # Group violations by type
@@ -1603,35 +1994,60 @@ class PrivacyComplianceValidator:
             "compliance_rate_percent": compliance_rate,
             "total_operations": total_operations,
             "compliant_operations": compliant_operations,
-            "violations": len(recent_violations),
+            "violations": violation_count,
             "violation_types": violation_types,
             "time_period_hours": hours,
-            "adr_0019_compliant": len(recent_violations) == 0,
+            "adr_0019_compliant": violation_count == 0,
             "report_timestamp": datetime.now(timezone.utc).isoformat()
         }
     
-    def get_audit_trail(self, hours: int = 24) -> List[Dict[str, Any]]:
+    async def get_compliance_report_async(self, hours: int = 24) -> Dict[str, Any]:
+        """Generate privacy compliance report, reading the persistent log in a worker thread."""
+        if self.persistent_log is None:
+            return self.get_compliance_report(hours)
+        return await asyncio.to_thread(self.get_compliance_report, hours)
+    
+    def get_audit_trail(self, hours: int = 24, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get privacy audit trail."""
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
         
+        if self.persistent_log is not None:
+            entries = self.persistent_log.query("privacy_audit", since=cutoff_time, limit=limit or self.max_audit_entries)
+            entries.reverse()
+            return entries
+        
         return [
             entry for entry in self.audit_log
             if datetime.fromisoformat(entry["timestamp"].replace("Z", "+00:00")) >= cutoff_time
         ]
+    
+    async def get_audit_trail_async(self, hours: int = 24, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get privacy audit trail, reading the persistent log in a worker thread."""
+        if self.persistent_log is None:
+            return self.get_audit_trail(hours, limit)
+        return await asyncio.to_thread(self.get_audit_trail, hours, limit)
 
 
 class SecurityMonitor:
     """Main security monitoring engine."""
     
-    def __init__(self):
+    def __init__(self, audit_log_dir: Optional[str] = None, audit_retention_days: int = 30):
         """Initialize security monitor."""
         self.egress_monitor = EgressMonitor()
         self.data_access_monitor = DataAccessMonitor()
         self.event_collector = SecurityEventCollector()
         self.privacy_validator = PrivacyComplianceValidator()
-        self.response_engine = AutomatedResponseEngine()
+        self.response_engine = AutomatedResponseEngine(self.event_collector.event_store)
         self.analytics = SecurityAnalytics(self)
         
+        # Persist events, data access and privacy audits when a log directory is given
+        self.audit_log: Optional[SecurityAuditLog] = None
+        if audit_log_dir:
+            self.audit_log = SecurityAuditLog(audit_log_dir, retention_days=audit_retention_days)
+            self.event_collector.persistent_log = self.audit_log
+            self.data_access_monitor.persistent_log = self.audit_log
+            self.privacy_validator.persistent_log = self.audit_log
+        
         # Connect monitors to event collector
         self.egress_monitor.add_violation_handler(self.event_collector.collect_event)
         self.data_access_monitor.add_access_handler(self.event_collector.collect_event)
@@ -1647,6 +2063,11 @@ class SecurityMonitor:
         # Initialize default response handlers
         self._initialize_response_handlers()
     
+    def shutdown(self):
+        """Flush and close the persistent audit log."""
+        if self.audit_log is not None:
+            self.audit_log.close()
+    
     def _log_security_event(self, event: SecurityEvent):
         """Log security event to application logs."""
         log_level = {
@@ -1991,10 +2412,18 @@ class SecurityMonitor:
         """Get privacy compliance report."""
         return self.privacy_validator.get_compliance_report(hours)
     
+    async def get_privacy_compliance_report_async(self, hours: int = 24) -> Dict[str, Any]:
+        """Get privacy compliance report without blocking the event loop on the audit log."""
+        return await self.privacy_validator.get_compliance_report_async(hours)
+    
     def get_privacy_audit_trail(self, hours: int = 24) -> List[Dict[str, Any]]:
         """Get privacy compliance audit trail."""
         return self.privacy_validator.get_audit_trail(hours)
     
+    async def get_privacy_audit_trail_async(self, hours: int = 24) -> List[Dict[str, Any]]:
+        """Get privacy compliance audit trail without blocking the event loop on the audit log."""
+        return await self.privacy_validator.get_audit_trail_async(hours)
+    
     def get_incident_management_dashboard(self, hours: int = 24) -> Dict[str, Any]:
         """Get incident management dashboard."""
         return {
@@ -2007,15 +2436,33 @@ class SecurityMonitor:
     
     def get_security_dashboard(self, hours: int = 24) -> Dict[str, Any]:
         """Get comprehensive security dashboard."""
+        return self._security_dashboard(
+            hours,
+            self.event_collector.get_event_summary(),
+            self.privacy_validator.get_compliance_report(hours),
+            self.data_access_monitor.get_access_history(hours)
+        )
+    
+    async def get_security_dashboard_async(self, hours: int = 24) -> Dict[str, Any]:
+        """Get comprehensive security dashboard, reading the audit log in worker threads."""
+        event_summary, privacy_compliance, data_access_log = await asyncio.gather(
+            self.event_collector.get_event_summary_async(),
+            self.privacy_validator.get_compliance_report_async(hours),
+            self.data_access_monitor.get_access_history_async(hours)
+        )
+        return self._security_dashboard(hours, event_summary, privacy_compliance, data_access_log)
+    
+    def _security_dashboard(self, hours: int, event_summary: Dict[str, Any], privacy_compliance: Dict[str, Any],
+                            data_access_log: List[Dict[str, Any]]) -> Dict[str, Any]:
         return {
-            "event_summary": self.event_collector.get_event_summary(),
+            "event_summary": event_summary,
             "incident_summary": self.event_collector.get_incident_summary(),
-            "privacy_compliance": self.privacy_validator.get_compliance_report(hours),
+            "privacy_compliance": privacy_compliance,
             "automated_response_summary": self.response_engine.get_response_summary(),
             "recent_events": [e.to_dict() for e in self.event_collector.get_events(hours)],
             "recent_incidents": [i.to_dict() for i in self.event_collector.get_incidents(hours=hours)],
             "recent_response_actions": self.response_engine.get_action_history(hours),
-            "data_access_log": self.data_access_monitor.get_access_history(hours),
+            "data_access_log": data_access_log,
             "egress_rules": [
                 {
                     "rule_id": rule.rule_id,
@@ -2557,10 +3004,10 @@ class SecurityAnalytics:
 security_monitor: Optional[SecurityMonitor] = None
 
 
-def init_security() -> SecurityMonitor:
+def init_security(audit_log_dir: Optional[str] = None, audit_retention_days: int = 30) -> SecurityMonitor:
     """Initialize the global security monitor."""
     global security_monitor
-    security_monitor = SecurityMonitor()
+    security_monitor = SecurityMonitor(audit_log_dir, audit_retention_days)
     return security_monitor
 
 
@@ -0,0 +1,168 @@
+"""
+Publish/subscribe hub for live Server-Sent Event streams.
+
+Producers (event collectors, the alert engine, trace collection, periodic
+dashboard snapshots) publish each update once; the hub serializes it once
+and fans it out to per-client bounded queues. Slow clients drop their
+oldest queued messages instead of growing without bound, and messages
+published with a coalesce key replace any still-queued message with the
+same key, so a lagging dashboard only receives the latest snapshot.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, AsyncIterator, Set
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StreamMessage:
+    """A published message, serialized once for all subscribers."""
+    topic: str
+    message_type: str
+    data: str
+    coalesce_key: Optional[str] = None
+
+    def to_sse(self) -> str:
+        """Format the message as a Server-Sent Event frame."""
+        return f"data: {self.data}\n\n"
+
+
+class StreamSubscription:
+    """A single client's bounded queue on one topic."""
+
+    def __init__(self, hub: "StreamHub", topic: str, max_queue: int):
+        """Initialize subscription."""
+        self.hub = hub
+        self.topic = topic
+        self.max_queue = max_queue
+        self.queue: deque = deque()
+        self.dropped = 0
+        self.coalesced = 0
+        self.delivered = 0
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def offer(self, message: StreamMessage):
+        """Queue a message, coalescing by key and dropping the oldest when full."""
+        if message.coalesce_key is not None:
+            for index, queued in enumerate(self.queue):
+                if queued.coalesce_key == message.coalesce_key:
+                    self.queue[index] = message
+                    self.coalesced += 1
+                    return
+
+        if len(self.queue) >= self.max_queue:
+            self.queue.popleft()
+            self.dropped += 1
+        self.queue.append(message)
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[StreamMessage]:
+        """Wait for the next message; returns None on timeout or close."""
+        while not self.queue:
+            if self.closed:
+                return None
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        self.delivered += 1
+        return self.queue.popleft()
+
+    def close(self):
+        """Detach from the hub and wake any waiting consumer."""
+        if not self.closed:
+            self.closed = True
+            self.hub._unsubscribe(self)
+            self._ready.set()
+
+    async def sse_frames(self, heartbeat_seconds: float = 15.0) -> AsyncIterator[str]:
+        """Yield SSE frames, with comment heartbeats while idle."""
+        try:
+            while not self.closed:
+                message = await self.get(timeout=heartbeat_seconds)
+                if message is None:
+                    if self.closed:
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield message.to_sse()
+        finally:
+            self.close()
+
+
+class StreamHub:
+    """Topic-based fan-out of live updates to SSE clients."""
+
+    def __init__(self, max_queue_per_client: int = 100):
+        """Initialize stream hub."""
+        self.max_queue_per_client = max_queue_per_client
+        self.subscriptions: Dict[str, Set[StreamSubscription]] = {}
+        self.published = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def subscribe(self, topic: str, max_queue: Optional[int] = None) -> StreamSubscription:
+        """Register a client on a topic (call from the event loop)."""
+        subscription = StreamSubscription(self, topic, max_queue or self.max_queue_per_client)
+        self.subscriptions.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: StreamSubscription):
+        subscribers = self.subscriptions.get(subscription.topic)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            self.dropped += subscription.dropped
+            self.coalesced += subscription.coalesced
+            if not subscribers:
+                del self.subscriptions[subscription.topic]
+
+    def subscriber_count(self, topic: Optional[str] = None) -> int:
+        """Count subscribers on a topic, or on all topics."""
+        if topic is not None:
+            return len(self.subscriptions.get(topic, ()))
+        return sum(len(subscribers) for subscribers in self.subscriptions.values())
+
+    def has_subscribers(self, topic: str) -> bool:
+        """Whether anyone is listening on a topic (lets producers skip work)."""
+        return bool(self.subscriptions.get(topic))
+
+    def publish(self, topic: str, message_type: str, payload: Dict[str, Any],
+                coalesce_key: Optional[str] = None) -> int:
+        """Publish an update to a topic, returning the number of subscribers reached.
+
+        Must be called from the event loop thread.
+        """
+        subscribers = self.subscriptions.get(topic)
+        if not subscribers:
+            return 0
+
+        body = {"type": message_type, **payload, "timestamp": time.time()}
+        message = StreamMessage(topic, message_type, json.dumps(body, default=str), coalesce_key)
+
+        for subscription in subscribers:
+            subscription.offer(message)
+        self.published += 1
+        return len(subscribers)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get fan-out statistics."""
+        active: List[StreamSubscription] = [
+            subscription for subscribers in self.subscriptions.values() for subscription in subscribers
+        ]
+        return {
+            "topics": {topic: len(subscribers) for topic, subscribers in self.subscriptions.items()},
+            "subscribers": len(active),
+            "published": self.published,
+            "dropped": self.dropped + sum(s.dropped for s in active),
+            "coalesced": self.coalesced + sum(s.coalesced for s in active),
+            "max_queue_depth": max((len(s.queue) for s in active), default=0),
+            "max_queue_per_client": self.max_queue_per_client
+        }
@@ -0,0 +1,143 @@
+import time
+
+import pytest
+
+from kenny_agent.alerting import AlertEngine, AlertRule, AlertSeverity, AlertType
+
+
+def make_rule(rule_id: str, conditions, **kwargs) -> AlertRule:
+    return AlertRule(
+        rule_id=rule_id,
+        name=f"Rule {rule_id}",
+        description="Value {value}",
+        alert_type=AlertType.SYSTEM_ANOMALY,
+        severity=AlertSeverity.MEDIUM,
+        conditions=conditions,
+        **kwargs
+    )
+
+
+class TestCompiledConditions:
+    """Test compiled rule predicates"""
+
+    @pytest.mark.parametrize("conditions,data,expected", [
+        ({"v": {"gt": 10}}, {"v": 11}, True),
+        ({"v": {"gt": 10}}, {"v": 10}, False),
+        ({"v": {"lt": 10}}, {"v": 9}, True),
+        ({"v": {"gte": 10, "lte": 20}}, {"v": 20}, True),
+        ({"v": {"gte": 10, "lte": 20}}, {"v": 21}, False),
+        ({"v": {"eq": "x"}}, {"v": "x"}, True),
+        ({"v": {"ne": "x"}}, {"v": "x"}, False),
+        ({"v": {"contains": "err"}}, {"v": "timeout error"}, True),
+        ({"v": False}, {"v": False}, True),
+        ({"v": False}, {"v": True}, False),
+        ({"v": 1, "w": {"gt": 0}}, {"v": 1}, False),
+        ({"v": {"unknown": 5}}, {"v": 1}, True),
+    ])
+    def test_condition_semantics(self, conditions, data, expected):
+        rule = make_rule("r", conditions)
+        assert rule._evaluate_conditions(data) is expected
+
+    def test_recompile_after_condition_change(self):
+        rule = make_rule("r", {"v": {"gt": 10}})
+        assert rule._evaluate_conditions({"v": 5}) is False
+
+        rule.conditions = {"v": {"lt": 10}}
+        rule.recompile()
+        assert rule._evaluate_conditions({"v": 5}) is True
+
+
+class TestRuleIndex:
+    """Test key-indexed rule evaluation in the alert engine"""
+
+    def test_only_rules_with_present_keys_are_considered(self):
+        engine = AlertEngine()
+        engine.add_rule(make_rule("cpu", {"cpu": {"gt": 90}}))
+        engine.add_rule(make_rule("mem", {"mem": {"gt": 90}}))
+
+        alerts = engine.evaluate_data({"cpu": 95})
+
+        assert [a.title for a in alerts] == ["Rule cpu"]
+        assert engine.get_evaluation_stats()["rules_considered"] == 1
+
+    def test_alerts_follow_rule_insertion_order(self):
+        engine = AlertEngine()
+        engine.add_rule(make_rule("b", {"y": 1, "x": 1}))
+        engine.add_rule(make_rule("a", {"x": 1}))
+        engine.add_rule(make_rule("c", {}))
+
+        alerts = engine.evaluate_data({"x": 1, "y": 1})
+
+        assert [a.title for a in alerts] == ["Rule b", "Rule a", "Rule c"]
+
+    def test_removed_and_replaced_rules_leave_index(self):
+        engine = AlertEngine()
+        engine.add_rule(make_rule("r", {"x": {"gt": 0}}))
+        engine.add_rule(make_rule("r", {"y": {"gt": 0}}))
+
+        assert engine.evaluate_data({"x": 1}) == []
+        assert len(engine.evaluate_data({"y": 1})) == 1
+
+        assert engine.remove_rule("r") is True
+        assert engine.get_evaluation_stats()["indexed_keys"] == 0
+
+    def test_default_rules_still_trigger(self):
+        engine = AlertEngine()
+        engine.load_default_rules()
+
+        alerts = engine.evaluate_data({
+            "service_name": "mail-agent",
+            "response_time_ms": 2500,
+            "is_healthy": True
+        })
+
+        assert [a.alert_type for a in alerts] == [AlertType.SLA_VIOLATION]
+        assert alerts[0].description == "Response time 2500ms exceeds SLA threshold"
+
+    def test_evaluation_stats_in_summary(self):
+        engine = AlertEngine()
+        engine.load_default_rules()
+        engine.evaluate_data({"error_count": 1})
+
+        evaluation = engine.get_alert_summary()["evaluation"]
+        assert evaluation["evaluations"] == 1
+        assert evaluation["rules_total"] == 5
+        assert evaluation["avg_evaluation_time_ms"] >= 0.0
+
+
+class TestRuleEvaluationBenchmark:
+    """Benchmark rule evaluation at 1k rules x 100 agents"""
+
+    def test_1k_rules_100_agents(self):
+        engine = AlertEngine()
+        for i in range(1000):
+            engine.add_rule(make_rule(
+                f"rule_{i}",
+                {f"metric_{i % 200}": {"gt": 1_000_000}, "service_name": {"ne": ""}}
+            ))
+
+        payloads = [
+            {
+                "service_name": f"agent-{a}",
+                "agent_id": f"agent-{a}",
+                **{f"metric_{(a * 7 + m) % 200}": m for m in range(10)}
+            }
+            for a in range(100)
+        ]
+
+        start = time.perf_counter()
+        for payload in payloads:
+            engine.evaluate_data(payload)
+        elapsed = time.perf_counter() - start
+
+        stats = engine.get_evaluation_stats()
+        print(
+            f"\n1k rules x 100 agents: {elapsed * 1000:.2f}ms total, "
+            f"{stats['avg_rules_considered']:.1f} rules/payload, "
+            f"p95 {stats['p95_evaluation_time_ms']:.3f}ms"
+        )
+
+        assert stats["evaluations"] == 100
+        # Each payload carries 10 of 200 metric keys -> about 50 of the 1k rules
+        assert stats["avg_rules_considered"] <= 100
+        assert elapsed < 1.0
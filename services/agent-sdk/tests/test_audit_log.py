@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from kenny_agent.audit_log import SecurityAuditLog
+from kenny_agent.security import SecurityMonitor, SecurityEvent, SecurityEventType, SecuritySeverity
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    return str(tmp_path / "security_audit")
+
+
+def make_event(severity=SecuritySeverity.MEDIUM, source_service="mail-agent") -> SecurityEvent:
+    return SecurityEvent(
+        event_id=str(uuid.uuid4()),
+        event_type=SecurityEventType.POLICY_VIOLATION,
+        severity=severity,
+        title="Test event",
+        description="Test event",
+        source_service=source_service
+    )
+
+
+class TestSecurityAuditLog:
+    """Test the segmented append-only audit log"""
+
+    def test_query_newest_first_with_filters(self, log_dir):
+        log = SecurityAuditLog(log_dir, start_writer=False)
+        now = datetime.now(timezone.utc)
+        for i in range(5):
+            log.append("security_event", {"n": i}, timestamp=now - timedelta(minutes=5 - i),
+                       kind="a" if i % 2 else "b", severity="high")
+        log.append("data_access", {"n": 99}, timestamp=now)
+
+        assert [e["n"] for e in log.query("security_event")] == [4, 3, 2, 1, 0]
+        assert [e["n"] for e in log.query("security_event", kind="a")] == [3, 1]
+        assert [e["n"] for e in log.query("security_event", limit=2)] == [4, 3]
+        assert [e["n"] for e in log.query("security_event", since=now - timedelta(minutes=2, seconds=30))] == [4, 3]
+        assert log.count_by("security_event", "kind") == {"a": 2, "b": 3}
+        log.close()
+
+    def test_entries_survive_restart(self, log_dir):
+        log = SecurityAuditLog(log_dir, start_writer=False)
+        log.append("privacy_audit", {"audit_id": "x"}, kind="violation")
+        log.close()
+
+        reopened = SecurityAuditLog(log_dir, start_writer=False)
+        assert reopened.query("privacy_audit") == [{"audit_id": "x"}]
+        reopened.close()
+
+    def test_query_spans_day_segments(self, log_dir):
+        log = SecurityAuditLog(log_dir, start_writer=False)
+        now = datetime.now(timezone.utc)
+        for days_ago in (0, 1, 2):
+            log.append("security_event", {"days_ago": days_ago}, timestamp=now - timedelta(days=days_ago))
+        log.flush()
+
+        assert len(log.list_segments()) == 3
+        assert [e["days_ago"] for e in log.query("security_event")] == [0, 1, 2]
+        assert [e["days_ago"] for e in log.query("security_event", since=now - timedelta(hours=30))] == [0, 1]
+        log.close()
+
+    def test_retention_drops_whole_segments(self, log_dir):
+        log = SecurityAuditLog(log_dir, retention_days=7, start_writer=False)
+        now = datetime.now(timezone.utc)
+        log.append("security_event", {"age": "old"}, timestamp=now - timedelta(days=10))
+        log.append("security_event", {"age": "new"}, timestamp=now)
+        log.flush()
+
+        assert log.apply_retention() == 1
+        assert log.query("security_event") == [{"age": "new"}]
+        assert len(log.list_segments()) == 1
+        assert len(os.listdir(log_dir)) <= 3  # one segment plus its -wal/-shm files
+        log.close()
+
+    def test_background_writer_batches(self, log_dir):
+        log = SecurityAuditLog(log_dir, batch_size=10, flush_interval_seconds=0.05)
+        for i in range(25):
+            log.append("data_access", {"n": i})
+
+        deadline = time.monotonic() + 2
+        while log.entries_written < 25 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        stats = log.get_stats()
+        assert stats["entries_written"] == 25
+        assert stats["pending_entries"] == 0
+        log.close()
+
+
+class TestSecurityMonitorPersistence:
+    """Test security monitor components reading from the audit log"""
+
+    def test_events_and_summary_read_from_log(self, log_dir):
+        monitor = SecurityMonitor(audit_log_dir=log_dir)
+        monitor.event_collector.collect_event(make_event(SecuritySeverity.CRITICAL))
+        monitor.event_collector.collect_event(make_event(SecuritySeverity.LOW))
+        monitor.shutdown()
+
+        restarted = SecurityMonitor(audit_log_dir=log_dir)
+        records = restarted.event_collector.get_event_records(hours=1)
+        summary = restarted.event_collector.get_event_summary()
+
+        assert [r["severity"] for r in records] == ["low", "critical"]
+        assert summary["total_events_24h"] == 2
+        assert summary["critical_count"] == 1
+        assert summary["by_type"]["policy_violation"] == 2
+        restarted.shutdown()
+
+    def test_access_history_and_compliance_read_from_log(self, log_dir):
+        monitor = SecurityMonitor(audit_log_dir=log_dir)
+        monitor.log_data_access("mail-agent", "inbox/messages", "read", data_size=1024)
+        monitor.validate_privacy_compliance("sync", {"service_name": "kenny-mail"})
+        monitor.validate_privacy_compliance("export", {"service_name": "openai"})
+        monitor.shutdown()
+
+        restarted = SecurityMonitor(audit_log_dir=log_dir)
+        history = restarted.data_access_monitor.get_access_history(hours=1)
+        report = restarted.get_privacy_compliance_report(hours=1)
+
+        assert [h["resource"] for h in history] == ["inbox/messages"]
+        assert report["total_operations"] == 2
+        assert report["violations"] == 1
+        assert report["violation_types"] == {"unauthorized_external_api": 1}
+        assert [e["operation"] for e in restarted.get_privacy_audit_trail(hours=1)] == ["sync", "export"]
+        restarted.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_async_reads_run_off_the_event_loop(self, log_dir):
+        monitor = SecurityMonitor(audit_log_dir=log_dir)
+        monitor.event_collector.collect_event(make_event(SecuritySeverity.HIGH))
+        monitor.log_data_access("mail-agent", "inbox/messages", "read", data_size=1024)
+        monitor.validate_privacy_compliance("export", {"service_name": "openai"})
+
+        loop_thread = threading.get_ident()
+        query_threads = []
+        original_query = monitor.audit_log.query
+
+        def recording_query(*args, **kwargs):
+            query_threads.append(threading.get_ident())
+            return original_query(*args, **kwargs)
+
+        monitor.audit_log.query = recording_query
+        records = await monitor.event_collector.get_event_records_async(hours=1)
+        summary = await monitor.event_collector.get_event_summary_async()
+        dashboard = await monitor.get_security_dashboard_async(hours=1)
+        trail = await monitor.get_privacy_audit_trail_async(hours=1)
+
+        assert [r["severity"] for r in records] == ["high"]
+        assert summary["high_count"] == 1
+        assert dashboard["privacy_compliance"]["violations"] == 1
+        assert [h["resource"] for h in dashboard["data_access_log"]] == ["inbox/messages"]
+        assert [e["operation"] for e in trail] == ["export"]
+        assert query_threads and loop_thread not in query_threads
+        monitor.shutdown()
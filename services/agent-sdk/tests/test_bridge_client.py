@@ -0,0 +1,202 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from kenny_agent.base_tool import BaseTool
+from kenny_agent.bridge_client import BridgeClient, RetryBudget, get_bridge_client
+
+
+def make_client(handler, **kwargs) -> BridgeClient:
+    kwargs.setdefault("max_retries", 2)
+    client = BridgeClient("http://bridge.test/bridge", transport=httpx.MockTransport(handler), **kwargs)
+    client.retry_backoff = 0
+    return client
+
+
+class SlowTool(BaseTool):
+    def __init__(self):
+        super().__init__(name="slow", description="Blocks for a while")
+
+    def execute(self, parameters):
+        time.sleep(0.2)
+        return parameters["value"]
+
+
+class AsyncTool(BaseTool):
+    def __init__(self):
+        super().__init__(name="async", description="Native coroutine execute")
+
+    async def execute(self, parameters):
+        await asyncio.sleep(0.01)
+        return {"value": parameters["value"], "loop": asyncio.get_running_loop()}
+
+
+class TestBridgeClient:
+    """Test pooling, deduplication, timeouts and retry budgets"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_gets_share_one_request(self):
+        calls = []
+
+        async def handler(request):
+            calls.append(str(request.url))
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"messages": [{"id": "m1"}]})
+
+        client = make_client(handler)
+        results = await asyncio.gather(*[
+            client.get_json("/v1/mail/messages", params={"mailbox": "Inbox", "limit": 10}) for _ in range(5)
+        ])
+        other = await client.get_json("/v1/mail/messages", params={"mailbox": "Sent", "limit": 10})
+
+        assert all(r == {"messages": [{"id": "m1"}]} for r in results)
+        assert other == results[0]
+        assert len(calls) == 2
+        assert calls[0].startswith("http://bridge.test/v1/mail/messages?")
+        metrics = client.get_metrics()
+        assert metrics["deduplicated"] == 4
+        assert metrics["in_flight"] == 0
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_slow_endpoint_does_not_block_other_requests(self):
+        async def handler(request):
+            if request.url.path == "/v1/messages/imessage":
+                await asyncio.sleep(0.3)
+            return httpx.Response(200, json={"path": request.url.path})
+
+        client = make_client(handler)
+        slow = asyncio.create_task(client.get_json("/v1/messages/imessage"))
+        started = time.perf_counter()
+        fast = await client.get_json("/health")
+
+        assert fast == {"path": "/health"}
+        assert time.perf_counter() - started < 0.2
+        assert not slow.done()
+        assert await slow == {"path": "/v1/messages/imessage"}
+        await client.aclose()
+
+    def test_endpoint_timeouts_prefer_exact_then_longest_pattern(self):
+        client = BridgeClient("http://bridge.test", endpoint_timeouts={
+            "/v1/messages/imessage": 65.0,
+            "/v1/messages/imessage/search": 45.0,
+            "/v1/messages/imessage/*": 30.0,
+        }, default_timeout=12.0)
+
+        assert client.timeout_for("/v1/messages/imessage").read == 65.0
+        assert client.timeout_for("/v1/messages/imessage/search").read == 45.0
+        assert client.timeout_for("/v1/messages/imessage/thread/42").read == 30.0
+        assert client.timeout_for("/health").read == 12.0
+        assert client.timeout_for("/health").connect == 2.0
+
+    @pytest.mark.asyncio
+    async def test_transient_failures_are_retried(self):
+        attempts = []
+
+        async def handler(request):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise httpx.ConnectError("refused", request=request)
+            if len(attempts) == 2:
+                return httpx.Response(503)
+            return httpx.Response(200, json={"ok": True})
+
+        client = make_client(handler)
+        assert await client.get_json("/v1/whatsapp/messages") == {"ok": True}
+        assert len(attempts) == 3
+        assert client.get_metrics()["retries"] == 2
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_client_errors_and_posts_are_not_retried(self):
+        attempts = []
+
+        async def handler(request):
+            attempts.append(request.method)
+            return httpx.Response(404 if request.method == "GET" else 503)
+
+        client = make_client(handler)
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get_json("/v1/mail/message/missing")
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.request("POST", "/v1/mail/send", json={})
+
+        assert attempts == ["GET", "POST"]
+        assert client.get_metrics()["errors"] == 2
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_retry_budget_caps_retries_during_outage(self):
+        attempts = []
+
+        async def handler(request):
+            attempts.append(1)
+            return httpx.Response(503)
+
+        client = make_client(handler, retry_budget=RetryBudget(ratio=0.1, min_tokens=2))
+        for i in range(20):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.get_json("/v1/messages/imessage", params={"page": i})
+
+        metrics = client.get_metrics()
+        # 2 initial tokens plus 0.1 per request, instead of 2 retries for each of 20 requests
+        assert 2 <= metrics["retries"] <= 2 + 0.1 * 20
+        assert len(attempts) == 20 + metrics["retries"]
+        assert metrics["retries_denied"] > 0
+        await client.aclose()
+
+    def test_shared_client_per_bridge_url(self):
+        a = get_bridge_client("http://localhost:5199/bridge", {"/v1/mail/messages": 65.0})
+        b = get_bridge_client("http://localhost:5199/", {"/health": 10.0})
+
+        assert a is b
+        assert a.base_url == "http://localhost:5199"
+        assert a.timeout_for("/v1/mail/messages").read == 65.0
+        assert a.timeout_for("/health").read == 10.0
+        assert get_bridge_client("http://localhost:5198") is not a
+
+    @pytest.mark.asyncio
+    async def test_sync_requests_reuse_one_pooled_client(self):
+        attempts = []
+
+        def handler(request):
+            attempts.append((request.url.path, request.extensions["timeout"]["read"]))
+            if len(attempts) == 1:
+                return httpx.Response(503)
+            return httpx.Response(200, json={"messages": [{"id": "m1"}]})
+
+        client = make_client(handler, endpoint_timeouts={"/v1/messages/imessage": 65.0})
+        data = client.get_json_sync("/v1/messages/imessage", params={"limit": 10, "page": None})
+        pool = client._sync_client
+        client.request_sync("GET", "/health")
+
+        assert data == {"messages": [{"id": "m1"}]}
+        assert client._sync_client is pool
+        assert attempts == [("/v1/messages/imessage", 65.0), ("/v1/messages/imessage", 65.0), ("/health", 30.0)]
+        assert client.get_metrics()["retries"] == 1
+
+        await client.aclose()
+        assert pool.is_closed
+
+
+class TestBaseToolExecuteAsync:
+    """Test the default non-blocking execute path"""
+
+    @pytest.mark.asyncio
+    async def test_default_execute_async_runs_off_the_event_loop(self):
+        tool = SlowTool()
+        started = time.perf_counter()
+        results = await asyncio.gather(*[tool.execute_async({"value": i}) for i in range(3)])
+
+        assert results == [0, 1, 2]
+        assert time.perf_counter() - started < 0.5
+
+    @pytest.mark.asyncio
+    async def test_async_execute_is_awaited_on_the_running_loop(self):
+        tool = AsyncTool()
+        result = await tool.execute_async({"value": 7})
+
+        assert result["value"] == 7
+        assert result["loop"] is asyncio.get_running_loop()
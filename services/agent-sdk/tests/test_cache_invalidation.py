@@ -0,0 +1,202 @@
+from datetime import date, datetime
+
+import pytest
+
+from kenny_agent.agent_service_base import SemanticCache
+from kenny_agent.cache_tags import derive_cache_tags, UNDATED_TAG
+from kenny_agent.calendar_event_monitor import CalendarEventMonitor, CalendarEvent, CalendarChangeType
+
+AGENT_ID = "calendar-agent"
+
+QUERIES = [
+    "events on 2030-01-15",
+    "events on 2030-01-16",
+    "meetings between 2030-01-10 and 2030-01-20",
+    "events between 2030-03-01 and 2030-12-31",
+    "meetings with Sarah",
+    "events today",
+    "upcoming events",
+]
+
+
+class FakeAgent:
+    def __init__(self, cache):
+        self.agent_id = AGENT_ID
+        self.semantic_cache = cache
+        self.tools = {}
+
+
+class FakeRedisPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def setex(self, key, ttl, value):
+        self.commands.append(("setex", key, value))
+
+    def sadd(self, key, member):
+        self.commands.append(("sadd", key, member))
+
+    def expire(self, key, ttl):
+        pass
+
+    async def execute(self):
+        for command, key, value in self.commands:
+            if command == "setex":
+                self.redis.values[key] = value
+            else:
+                self.redis.sets.setdefault(key, set()).add(value)
+
+
+class FakeRedis:
+    """In-memory stand-in recording the commands SemanticCache issues."""
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+
+    def pipeline(self):
+        return FakeRedisPipeline(self)
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def sunion(self, keys):
+        return set().union(*(self.sets.get(key, set()) for key in keys))
+
+    async def sinter(self, keys):
+        return set.intersection(*(self.sets.get(key, set()) for key in keys))
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+            self.sets.pop(key, None)
+
+    async def keys(self, pattern):
+        raise AssertionError("invalidation must not scan the keyspace")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SemanticCache(cache_dir=str(tmp_path / AGENT_ID))
+
+
+async def populate(cache):
+    for query in QUERIES:
+        await cache.set(query, AGENT_ID, {"answer": query})
+
+
+async def cached_queries(cache):
+    return {query for query in QUERIES if await cache.get(query, AGENT_ID)}
+
+
+def change(change_type, start, end, **metadata):
+    return CalendarEvent(
+        change_type=change_type,
+        event_id="evt-1",
+        calendar_id="work",
+        start_date=start,
+        end_date=end,
+        title="Design review",
+        participants=["Sarah"],
+        timestamp=datetime.now(),
+        metadata=metadata
+    )
+
+
+class TestCacheTags:
+    """Test dependency tags derived for cached answers"""
+
+    def test_relative_dates_resolve_to_days(self):
+        now = datetime(2030, 1, 16, 9, 0)
+        assert derive_cache_tags("events today", now=now) == {"intent:events", "intent:today", "day:2030-01-16"}
+        assert "day:2030-01-20" in derive_cache_tags("schedule this week", now=now)
+        assert "day:2030-01-21" in derive_cache_tags("schedule next week", now=now)
+
+    def test_contacts_and_parameters(self):
+        tags = derive_cache_tags("meetings with Sarah Chen tomorrow", {"contact_filter": {"email": "S@x.com"}},
+                                 now=datetime(2030, 1, 16))
+        assert {"contact:sarah chen", "contact:s@x.com", "day:2030-01-17"} <= tags
+
+    def test_long_ranges_use_month_tags_and_undated_answers_are_marked(self):
+        assert derive_cache_tags("events between 2030-03-01 and 2030-12-31") == {
+            "intent:events", *(f"month:2030-{m:02d}" for m in range(3, 13))
+        }
+        assert derive_cache_tags("find the budget meeting") == {"intent:meetings", UNDATED_TAG}
+
+
+class TestTagInvalidation:
+    """Test tag-indexed invalidation across cache tiers"""
+
+    @pytest.mark.asyncio
+    async def test_calendar_change_evicts_exactly_dependent_answers(self, cache):
+        await populate(cache)
+        monitor = CalendarEventMonitor(FakeAgent(cache))
+
+        await monitor.handle_calendar_change(change(
+            CalendarChangeType.EVENT_ADDED, datetime(2030, 1, 16, 10), datetime(2030, 1, 16, 11)
+        ))
+        await monitor.flush_invalidations()
+
+        assert await cached_queries(cache) == {
+            "events on 2030-01-15",
+            "events between 2030-03-01 and 2030-12-31",
+            "events today",
+            "upcoming events",
+        }
+        assert monitor.monitoring_metrics["entries_invalidated"] == 3
+
+    @pytest.mark.asyncio
+    async def test_moved_event_evicts_old_and_new_slots(self, cache):
+        await populate(cache)
+        monitor = CalendarEventMonitor(FakeAgent(cache))
+
+        await monitor.handle_calendar_change(change(
+            CalendarChangeType.EVENT_MODIFIED, datetime(2030, 4, 2, 10), datetime(2030, 4, 2, 11),
+            previous_start_date="2030-01-15T10:00:00", previous_end_date="2030-01-15T11:00:00"
+        ))
+        await monitor.flush_invalidations()
+
+        assert "events on 2030-01-15" not in await cached_queries(cache)
+        assert "events between 2030-03-01 and 2030-12-31" not in await cached_queries(cache)
+        assert "events on 2030-01-16" in await cached_queries(cache)
+
+    @pytest.mark.asyncio
+    async def test_sqlite_tier_is_invalidated_after_restart(self, cache, tmp_path):
+        await populate(cache)
+        restarted = SemanticCache(cache_dir=cache.cache_dir)
+
+        invalidated = await restarted.invalidate_date_range(date(2030, 1, 16), date(2030, 1, 16), AGENT_ID)
+
+        assert invalidated == 3
+        assert await restarted.get("events on 2030-01-16", AGENT_ID) is None
+        assert await restarted.get("meetings with Sarah", AGENT_ID) is None
+        assert await restarted.get("events on 2030-01-15", AGENT_ID) is not None
+
+    @pytest.mark.asyncio
+    async def test_pattern_invalidation_matches_all_pattern_tags(self, cache):
+        await populate(cache)
+
+        assert await cache.invalidate_cache_pattern("events today", AGENT_ID) == 1
+        assert await cache.invalidate_cache_pattern("meetings with sarah", AGENT_ID) == 1
+        assert await cached_queries(cache) == set(QUERIES) - {"events today", "meetings with Sarah"}
+        assert cache.get_cache_stats()["invalidation"]["entries_invalidated"] == 2
+
+    @pytest.mark.asyncio
+    async def test_redis_tier_uses_tag_sets(self, cache):
+        redis = FakeRedis()
+        cache.redis_client = redis
+        await populate(cache)
+        cache.l1_cache.clear()
+        cache.l1_tag_index.clear()
+        cache.l1_entry_tags.clear()
+
+        assert await cache.invalidate_date_range("2030-01-16", "2030-01-16", AGENT_ID) == 3
+        remaining = {key.rsplit(":", 1)[1] for key in redis.values}
+        assert cache._hash_query("events on 2030-01-15", AGENT_ID) in remaining
+        assert cache._hash_query("events on 2030-01-16", AGENT_ID) not in remaining
+        assert f"kenny:cachetag:{AGENT_ID}:day:2030-01-16" not in redis.sets
+
+        # Promoted entries keep their tags
+        assert await cache.get("events on 2030-01-15", AGENT_ID) is not None
+        assert "day:2030-01-15" in cache.l1_entry_tags[cache._hash_query("events on 2030-01-15", AGENT_ID)][1]
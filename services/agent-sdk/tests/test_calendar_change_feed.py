@@ -0,0 +1,189 @@
+import asyncio
+
+import pytest
+
+from kenny_agent.calendar_event_monitor import CalendarEventMonitor, CalendarChangeType
+
+
+class FakeCalendarBridge:
+    """Local stand-in for the bridge change feed (GET /v1/calendar/changes)."""
+
+    def __init__(self, event_count=0, supports_feed=True):
+        self.supports_feed = supports_feed
+        self.events = {
+            f"evt-{i}": {"id": f"evt-{i}", "title": f"Event {i}", "calendar": "Work",
+                         "start": f"2030-01-{i % 28 + 1:02d}T10:00:00Z", "end": f"2030-01-{i % 28 + 1:02d}T11:00:00Z"}
+            for i in range(event_count)
+        }
+        self.log = []
+        self.feed_id = "feed1"
+        self.calls = []
+        self.changes_returned = 0
+        self.full_fetches = 0
+        self._signal = asyncio.Event()
+
+    def _record(self, operation, event, previous=None):
+        self.log.append({
+            "seq": len(self.log) + 1,
+            "operation": operation,
+            "event_id": event["id"],
+            "calendar": event.get("calendar"),
+            "event": event,
+            "previous": {"start": previous["start"], "end": previous["end"]} if previous else None,
+        })
+        self._signal.set()
+        self._signal = asyncio.Event()
+
+    def create(self, event_id, start, end, title="New"):
+        event = {"id": event_id, "title": title, "calendar": "Work", "start": start, "end": end,
+                 "attendees": ["sarah@example.com"]}
+        self.events[event_id] = event
+        self._record("created", event)
+
+    def move(self, event_id, start, end):
+        previous = self.events[event_id]
+        self.events[event_id] = {**previous, "start": start, "end": end}
+        self._record("updated", self.events[event_id], previous)
+
+    def delete(self, event_id):
+        self._record("deleted", self.events.pop(event_id))
+
+    async def get_events(self, parameters):
+        self.full_fetches += 1
+        return {"success": True, "events": list(self.events.values())}
+
+    async def get_changes(self, since=None, wait=0.0, limit=500):
+        self.calls.append((since, wait, limit))
+        if not self.supports_feed:
+            return {"success": False, "unsupported": True, "changes": [], "next_token": since}
+
+        latest = len(self.log)
+        if since is None:
+            return {"changes": [], "next_token": f"{self.feed_id}:{latest}", "has_more": False, "reset_required": False}
+
+        feed_id, _, seq = since.partition(":")
+        if feed_id != self.feed_id or int(seq) > latest:
+            return {"changes": [], "next_token": f"{self.feed_id}:{latest}", "has_more": False, "reset_required": True}
+
+        if int(seq) == latest and wait > 0:
+            try:
+                await asyncio.wait_for(self._signal.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+        changes = self.log[int(seq):int(seq) + limit]
+        self.changes_returned += len(changes)
+        next_seq = changes[-1]["seq"] if changes else int(seq)
+        return {"changes": changes, "next_token": f"{self.feed_id}:{next_seq}",
+                "has_more": next_seq < len(self.log), "reset_required": False}
+
+
+class FakeAgent:
+    def __init__(self, bridge):
+        self.agent_id = "calendar-agent"
+        self.tools = {"calendar_bridge": bridge}
+
+
+async def registered_monitor(bridge):
+    monitor = CalendarEventMonitor(FakeAgent(bridge))
+    monitor.change_feed_wait = 0.0
+    await monitor.register_change_notifications()
+    return monitor
+
+
+class TestCalendarChangeFeed:
+    """Test delta-based calendar change detection"""
+
+    @pytest.mark.asyncio
+    async def test_registration_takes_current_token_without_snapshot(self):
+        bridge = FakeCalendarBridge(event_count=5000)
+        bridge.create("before", "2030-02-01T10:00:00Z", "2030-02-01T11:00:00Z")
+        monitor = await registered_monitor(bridge)
+
+        assert monitor.change_feed_enabled
+        assert monitor.change_token == "feed1:1"
+        assert await monitor._detect_calendar_changes() == []
+        assert bridge.full_fetches == 0
+
+    @pytest.mark.asyncio
+    async def test_deltas_become_calendar_events(self):
+        bridge = FakeCalendarBridge(event_count=5000)
+        monitor = await registered_monitor(bridge)
+
+        bridge.create("new", "2030-02-01T10:00:00Z", "2030-02-01T11:00:00Z")
+        bridge.move("evt-3", "2030-03-05T09:00:00Z", "2030-03-05T10:00:00Z")
+        bridge.delete("evt-4")
+        changes = await monitor._detect_calendar_changes()
+
+        assert [c.change_type for c in changes] == [
+            CalendarChangeType.EVENT_ADDED, CalendarChangeType.EVENT_MODIFIED, CalendarChangeType.EVENT_DELETED
+        ]
+        assert changes[0].participants == ["sarah@example.com"]
+        assert changes[1].start_date.day == 5
+        assert changes[1].metadata["previous_start_date"] == "2030-01-04T10:00:00Z"
+        assert changes[2].event_id == "evt-4"
+
+        # Work scales with the change rate, not the 5000-event calendar
+        assert bridge.changes_returned == 3
+        assert bridge.full_fetches == 0
+        assert await monitor._detect_calendar_changes() == []
+        assert monitor.change_token == "feed1:3"
+
+    @pytest.mark.asyncio
+    async def test_pages_through_large_bursts(self):
+        bridge = FakeCalendarBridge()
+        monitor = await registered_monitor(bridge)
+        monitor.change_feed_page_limit = 10
+
+        for i in range(35):
+            bridge.create(f"burst-{i}", "2030-02-01T10:00:00Z", "2030-02-01T11:00:00Z")
+        changes = await monitor._detect_calendar_changes()
+
+        assert len(changes) == 35
+        assert len(bridge.calls) == 1 + 4
+
+    @pytest.mark.asyncio
+    async def test_reset_reports_store_change(self):
+        bridge = FakeCalendarBridge()
+        monitor = await registered_monitor(bridge)
+        bridge.feed_id = "feed2"  # bridge restarted
+
+        changes = await monitor._detect_calendar_changes()
+
+        assert [c.change_type for c in changes] == [CalendarChangeType.STORE_CHANGED]
+        assert monitor.change_token == "feed2:0"
+        assert monitor.monitoring_metrics["feed_resets"] == 1
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_polling_without_feed(self):
+        bridge = FakeCalendarBridge(event_count=3, supports_feed=False)
+        monitor = await registered_monitor(bridge)
+
+        assert not monitor.change_feed_enabled
+        assert bridge.full_fetches == 1
+        assert len(monitor.known_events) == 3
+
+    @pytest.mark.asyncio
+    async def test_long_poll_loop_delivers_changes(self):
+        bridge = FakeCalendarBridge(event_count=100)
+        monitor = CalendarEventMonitor(FakeAgent(bridge))
+        monitor.change_feed_wait = 5.0
+        monitor.min_poll_interval = 0.0
+        handled = []
+
+        async def record(change):
+            handled.append(change)
+        monitor.handle_calendar_change = record
+
+        await monitor.start_monitoring()
+        await asyncio.sleep(0.05)
+        bridge.create("live", "2030-02-01T10:00:00Z", "2030-02-01T11:00:00Z")
+        for _ in range(100):
+            if handled:
+                break
+            await asyncio.sleep(0.01)
+        await monitor.stop_monitoring()
+
+        assert [c.event_id for c in handled] == ["live"]
+        # The idle poll was held open by the bridge rather than repeated
+        assert len(bridge.calls) <= 4
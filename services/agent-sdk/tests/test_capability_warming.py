@@ -0,0 +1,205 @@
+import asyncio
+import sqlite3
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from kenny_agent.agent_service_base import AgentServiceBase
+from kenny_agent.cache_warming_service import CacheWarmingService
+from kenny_agent.predictive_cache_warmer import PredictiveCacheWarmer, WarmingJob
+
+QUERIES = [f"meetings about project {i}" for i in range(20)]
+
+
+class FakeLLM:
+    """Stands in for Ollama; each interpretation costs a round-trip."""
+
+    def __init__(self, latency=0.02):
+        self.latency = latency
+        self.calls = 0
+
+    async def interpret_query(self, query, available_capabilities, agent_context, lane="routing"):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return {"capability": "calendar.search", "parameters": {"query": query, "limit": 5},
+                "confidence": 0.9, "reasoning": "test"}
+
+    async def close(self):
+        pass
+
+
+class SearchHandler:
+    capability = "calendar.search"
+
+    def __init__(self):
+        self.calls = []
+
+    async def execute(self, parameters):
+        self.calls.append(parameters)
+        return {"events": [parameters["query"]], "revision": len(self.calls)}
+
+
+class CalendarTestAgent(AgentServiceBase):
+    def __init__(self, cache_dir):
+        super().__init__("calendar-agent", "Calendar", "Calendar test agent", cache_dir=cache_dir)
+        self.llm_processor = FakeLLM()
+        self.search = SearchHandler()
+        self.register_capability(self.search)
+
+    async def start(self):
+        pass
+
+    def get_agent_context(self):
+        return self.description
+
+
+@pytest.fixture
+def agent(tmp_path):
+    return CalendarTestAgent(str(tmp_path))
+
+
+class TestCapabilityWarming:
+    """Test warming by replaying recorded capability calls"""
+
+    @pytest.mark.asyncio
+    async def test_replay_skips_llm_and_refreshes_original_key(self, agent):
+        await agent.process_natural_language_query("meetings about budget")
+        assert agent.llm_processor.calls == 1
+
+        result = await agent.warm_cached_query("meetings about budget")
+
+        assert result["replayed"]
+        assert agent.llm_processor.calls == 1
+        # The "query" parameter is executed, not sent back through the LLM
+        assert agent.search.calls[-1] == {"query": "meetings about budget", "limit": 5}
+        cached, _ = await agent.semantic_cache.get("meetings about budget", agent.agent_id)
+        assert cached["capability_result"]["revision"] == 2
+
+    @pytest.mark.asyncio
+    async def test_plans_survive_restart(self, agent, tmp_path):
+        await agent.process_natural_language_query("meetings about budget")
+        restarted = CalendarTestAgent(str(tmp_path))
+
+        result = await restarted.warm_cached_query("meetings about budget")
+
+        assert result["replayed"]
+        assert restarted.llm_processor.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_relative_date_plans_expire_with_the_day(self, agent):
+        await agent.process_natural_language_query("events today")
+        plan = agent.semantic_cache.capability_plans[agent.semantic_cache._hash_query("events today", agent.agent_id)]
+        plan["resolved_on"] = (date.today() - timedelta(days=1)).isoformat()
+        await agent.semantic_cache.invalidate_cache_pattern("events today", agent.agent_id)
+
+        result = await agent.warm_cached_query("events today")
+
+        assert not result.get("replayed")
+        assert agent.llm_processor.calls == 2
+        assert agent.warming_metrics == {"replayed_warms": 0, "llm_warms": 1, "replay_failures": 0}
+        # Warming is kept out of live query metrics
+        assert agent.query_metrics["total_queries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_plans_with_date_parameters_expire_with_the_day(self, agent):
+        cache = agent.semantic_cache
+        await cache.record_capability_plan(
+            "what is on my plate", agent.agent_id, "calendar.list_events",
+            {"date_range": {"start": "2026-10-18T00:00:00", "end": "2026-10-19T00:00:00"}}, 0.9
+        )
+        await cache.record_capability_plan(
+            "meetings about budget", agent.agent_id, "calendar.search", {"query": "budget", "limit": 5}, 0.9
+        )
+        for plan in cache.capability_plans.values():
+            plan["resolved_on"] = (date.today() - timedelta(days=1)).isoformat()
+
+        assert await cache.get_capability_plan("what is on my plate", agent.agent_id) is None
+        assert await cache.get_capability_plan("meetings about budget", agent.agent_id) is not None
+        assert cache.plan_metrics["stale"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stored_plans_are_capped_by_count_and_age(self, agent):
+        cache = agent.semantic_cache
+        cache.plan_max_rows = 5
+        cache.plan_prune_interval = 1
+        await cache.record_capability_plan("old query", agent.agent_id, "calendar.search", {"query": "old"}, 0.9)
+        conn = sqlite3.connect(cache.db_path)
+        conn.execute("UPDATE capability_plans SET timestamp = ?", (time.time() - 31 * 24 * 3600,))
+        conn.commit()
+        conn.close()
+
+        for i in range(8):
+            await cache.record_capability_plan(f"query {i}", agent.agent_id, "calendar.search", {"query": str(i)}, 0.9)
+
+        conn = sqlite3.connect(cache.db_path)
+        stored = [row[0] for row in conn.execute("SELECT query_text FROM capability_plans ORDER BY timestamp")]
+        conn.close()
+        assert stored == [f"query {i}" for i in range(3, 8)]
+        assert cache.plan_metrics["pruned"] == 4
+
+    @pytest.mark.asyncio
+    async def test_failed_replay_is_not_cached(self, agent):
+        await agent.process_natural_language_query("meetings about budget")
+        agent.semantic_cache.l1_cache.clear()
+        agent.semantic_cache.capability_plans.clear()
+        del agent.capabilities["calendar.search"]  # capability no longer available
+
+        result = await agent.warm_cached_query("meetings about budget")
+
+        assert not result["success"]
+        assert agent.warming_metrics["replay_failures"] == 1
+
+    @pytest.mark.asyncio
+    async def test_replay_raises_warming_throughput(self, agent):
+        for query in QUERIES:
+            await agent.process_natural_language_query(query)
+
+        # Baseline: interpretation plus execution, as warming used to run it
+        agent.llm_processor.latency = 0.04
+        llm_calls = agent.llm_processor.calls
+        start = time.perf_counter()
+        for query in QUERIES:
+            interpretation = await agent.llm_processor.interpret_query(query, [], "")
+            await agent.execute_capability(interpretation["capability"], interpretation["parameters"])
+        llm_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for query in QUERIES:
+            assert (await agent.warm_cached_query(query))["replayed"]
+        replay_elapsed = time.perf_counter() - start
+
+        print(f"\nwarming {len(QUERIES)} queries: llm {llm_elapsed * 1000:.1f}ms, replay {replay_elapsed * 1000:.1f}ms")
+        assert agent.llm_processor.calls == llm_calls + len(QUERIES)
+        assert replay_elapsed * 10 < llm_elapsed
+
+
+class TestWarmersReplayPlans:
+    """Test both warming services use capability replay"""
+
+    @pytest.mark.asyncio
+    async def test_cache_warming_service_replays(self, agent):
+        service = CacheWarmingService(agent)
+        service.calendar_warming_patterns = QUERIES[:5]
+        for query in QUERIES[:5]:
+            await agent.process_natural_language_query(query)
+
+        await service._warm_calendar_patterns()
+
+        assert agent.llm_processor.calls == 5
+        assert service.warming_metrics["patterns_replayed"] == 5
+
+    @pytest.mark.asyncio
+    async def test_predictive_warmer_replays(self, agent):
+        await agent.process_natural_language_query("meetings about budget")
+        warmer = PredictiveCacheWarmer(agent, pattern_analyzer=None)
+
+        from datetime import datetime
+        result = await warmer._execute_warming_job(WarmingJob(
+            job_id="j1", query="meetings about budget", priority=0.9, predicted_time=datetime.now(),
+            reasoning="test", job_type="predicted", estimated_benefit=0.8
+        ))
+
+        assert result.success
+        assert agent.llm_processor.calls == 1
+        assert agent.warming_metrics["replayed_warms"] == 1
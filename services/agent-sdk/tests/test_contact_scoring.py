@@ -0,0 +1,115 @@
+import random
+import time
+
+import pytest
+
+from kenny_agent.contact_scoring import (
+    ContactScorer,
+    NUMPY_AVAILABLE,
+    match_confidence,
+    normalize_text,
+    rank_contacts,
+)
+
+CONTACTS = [
+    {"id": "sam", "name": "Sam Lee"},
+    {"id": "samantha", "name": "Samantha Jones"},
+    {"id": "pam", "name": "Pam Samuels"},
+    {"id": "sarah", "name": "Sarah Chen", "emails": ["Sarah.Chen@Example.com"], "phones": ["+1 (555) 123-4567"]},
+    {"id": "sarha", "name": "Sarha Connor", "organization": "Cyberdyne Systems"},
+    {"id": "jose", "name": "José O'Brien"},
+]
+
+MODES = [pytest.param(True, marks=pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")), False]
+
+
+def ids(ranked):
+    return [contact_id for contact_id, _, _ in ranked]
+
+
+def test_normalize_text():
+    assert normalize_text("  José  O'Brien-Smith ") == "jose obrien smith"
+    assert normalize_text("SARAH") == "sarah"
+
+
+@pytest.mark.parametrize("use_numpy", MODES)
+def test_tiers(use_numpy):
+    scorer = ContactScorer(CONTACTS, use_numpy=use_numpy)
+
+    assert scorer.rank("Sam") == [("sam", 0.9, "name"), ("samantha", 0.88, "name"), ("pam", 0.85, "name")]
+    assert scorer.rank("sarah chen") == [("sarah", 1.0, "name")]
+    assert scorer.rank("Chen Sarah") == [("sarah", 0.9, "name")]
+    assert scorer.rank("sarah.chen@example.com") == [("sarah", 0.95, "email")]
+    assert scorer.rank("555.123.4567") == [("sarah", 0.9, "phone")]
+    assert scorer.rank("example") == [("sarah", 0.7, "email")]
+    assert scorer.rank("cyberdyne") == [("sarha", 0.65, "organization")]
+    assert scorer.rank("jose obrien") == [("jose", 1.0, "name")]
+    assert scorer.rank("brie") == [("jose", 0.8, "name")]
+    assert scorer.rank("text sarah chen tomorrow")[0] == ("sarah", 0.8, "name")
+    assert scorer.rank("Nobody") == []
+
+
+@pytest.mark.parametrize("use_numpy", MODES)
+def test_fuzzy_typos(use_numpy):
+    scorer = ContactScorer(CONTACTS, use_numpy=use_numpy)
+
+    ranked = scorer.rank("Sarah Conner")
+
+    assert ids(ranked) == ["sarah", "sarha"]
+    assert all(match_type == "fuzzy" for _, _, match_type in ranked)
+    assert 0 < ranked[1][1] < ranked[0][1] < 0.6
+    assert ids(scorer.rank("Samanta Jones")) == ["samantha"]
+
+
+@pytest.mark.parametrize("use_numpy", MODES)
+def test_updates_and_platform_boost(use_numpy):
+    scorer = ContactScorer(CONTACTS, use_numpy=use_numpy)
+    assert scorer.rank("sam", limit=1) == [("sam", 0.9, "name")]
+
+    scorer.remove("sam")
+    scorer.add({"id": "samantha", "name": "Samantha Jones", "platforms": ["contacts", "imessage", "whatsapp"]})
+
+    assert "sam" not in scorer
+    assert len(scorer) == len(CONTACTS) - 1
+    assert scorer.rank("sam") == [("samantha", 1.0, "name"), ("pam", 0.85, "name")]
+
+
+def test_entry_points_agree():
+    contact = {"id": "sarah", "name": "Sarah Chen", "emails": ["sarah.chen@example.com"]}
+
+    ranked = rank_contacts("Sarah", CONTACTS)
+
+    assert [c["id"] for c in ranked] == ["sarah"]
+    assert ranked[0]["confidence"] == match_confidence("Sarah", contact) == 0.9
+    assert ranked[0]["name"] == "Sarah Chen"
+    assert match_confidence("Nobody", contact) == 0.0
+
+
+@pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+def test_numpy_and_python_passes_match():
+    rng = random.Random(3)
+    first = ["Sarah", "Sara", "Sam", "Samuel", "Michael", "Mike", "Ana", "Anna", "Chen"]
+    last = ["Chen", "Cheng", "Connor", "O'Neil", "Samuels", "Lee", "Jones"]
+    contacts = [{"id": str(i), "name": f"{rng.choice(first)} {rng.choice(last)}",
+                 "emails": [f"user{i}@example{i % 7}.com"]} for i in range(500)]
+    fast = ContactScorer(contacts, use_numpy=True)
+    slow = ContactScorer(contacts, use_numpy=False)
+
+    for query in ["sarah", "Sara Chen", "sam", "mike oneil", "anna conor", "example3", "chen"]:
+        assert fast.rank(query, limit=25) == slow.rank(query, limit=25)
+
+
+def test_whole_address_book_ranks_in_milliseconds():
+    rng = random.Random(5)
+    first = ["Sarah", "James", "Mary", "John", "Linda", "Wei", "Priya", "Sam", "Samantha", "Sara"]
+    contacts = [{"id": str(i), "name": f"{rng.choice(first)} {''.join(rng.choices('abcdefghij', k=7))}"}
+                for i in range(20000)]
+    scorer = ContactScorer(contacts)
+    scorer.rank("Sarah")
+
+    started = time.perf_counter()
+    ranked = scorer.rank("Sarah", limit=10)
+    elapsed = time.perf_counter() - started
+
+    assert ranked[0][1] == 0.9
+    assert elapsed < 0.25
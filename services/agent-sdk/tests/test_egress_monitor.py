@@ -0,0 +1,138 @@
+import time
+
+import pytest
+
+from kenny_agent.security import EgressMonitor, EgressRule, CompiledEgressPolicy
+
+
+DESTINATIONS = [
+    ("localhost", 8000),
+    ("localhost", 443),
+    ("kenny.local", 8001),
+    ("mail.kenny.local", 8002),
+    ("evilkenny.local", 8002),
+    ("127.0.0.1", 5100),
+    ("10.1.2.3", 8003),
+    ("11.1.2.3", 8003),
+    ("172.31.255.255", 8004),
+    ("172.32.0.1", 8004),
+    ("192.168.1.20", None),
+    ("::1", 8000),
+    ("time.apple.com", 123),
+    ("time.apple.com", 443),
+    ("api.openai.com", 443),
+    ("", None),
+]
+
+
+@pytest.fixture
+def monitor():
+    return EgressMonitor()
+
+
+class TestCompiledEgressPolicy:
+    """Test the compiled domain trie and CIDR radix lookup"""
+
+    @pytest.mark.parametrize("destination,port", DESTINATIONS)
+    def test_compiled_lookup_agrees_with_rules(self, monitor, destination, port):
+        compiled = any(
+            rule.enabled and rule._check_port(port)
+            for rule in monitor.compiled_policy.match(destination)
+        )
+        interpreted = any(rule.is_allowed(destination, port) for rule in monitor.rules.values())
+        assert compiled == interpreted
+
+    def test_wildcards_match_on_label_boundaries(self):
+        rule = EgressRule("r", "Rule", allowed_domains=["*.example.com"])
+        policy = CompiledEgressPolicy([rule])
+
+        assert policy.match("example.com") == [rule]
+        assert policy.match("a.b.example.com") == [rule]
+        assert policy.match("badexample.com") == []
+        assert policy.match("xample.com") == []
+
+    def test_nested_cidr_ranges(self):
+        wide = EgressRule("wide", "Wide", allowed_domains=[], allowed_ips=["10.0.0.0/8"])
+        narrow = EgressRule("narrow", "Narrow", allowed_domains=[], allowed_ips=["10.1.0.0/16", "2001:db8::/32"])
+        policy = CompiledEgressPolicy([wide, narrow])
+
+        assert policy.match("10.1.2.3") == [wide, narrow]
+        assert policy.match("10.2.0.1") == [wide]
+        assert policy.match("2001:db8::1") == [narrow]
+        assert policy.match("not-an-ip") == []
+
+
+class TestEgressDecisionCache:
+    """Test cached egress decisions and their invalidation"""
+
+    def test_allowed_decisions_are_cached(self, monitor):
+        assert monitor.check_egress("mail-agent", "localhost", 8000)
+        assert monitor.check_egress("mail-agent", "localhost", 8000)
+
+        stats = monitor.get_decision_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_service_block_invalidates_cache(self, monitor):
+        assert monitor.check_egress("mail-agent", "localhost", 8000)
+
+        monitor.block_service("mail-agent", duration_minutes=5)
+        assert not monitor.check_egress("mail-agent", "localhost", 8000)
+
+        monitor.unblock_service("mail-agent")
+        assert monitor.check_egress("mail-agent", "localhost", 8000)
+
+    def test_destination_block_invalidates_cache(self, monitor):
+        assert monitor.check_egress("mail-agent", "localhost", 8000)
+
+        monitor.block_destination("localhost", 8000)
+        assert not monitor.check_egress("mail-agent", "localhost", 8000)
+
+    def test_rule_changes_invalidate_cache(self, monitor):
+        assert monitor.check_egress("mail-agent", "time.apple.com", 123)
+
+        monitor.rules["system_essential"].enabled = False
+        assert not monitor.check_egress("calendar-agent", "time.apple.com", 123)
+
+        monitor.remove_rule("kenny_local")
+        assert not monitor.check_egress("mail-agent", "localhost", 8000)
+
+    def test_denials_are_not_cached(self, monitor):
+        monitor.enforcement_enabled = False
+        assert not monitor.check_egress("mail-agent", "api.openai.com", 443)
+        assert not monitor.check_egress("mail-agent", "api.openai.com", 443)
+
+        assert monitor.get_decision_cache_stats()["size"] == 0
+
+    def test_cache_is_bounded(self, monitor):
+        monitor.decision_cache_size = 10
+        for i in range(50):
+            monitor.check_egress(f"svc-{i}", "localhost", 8000)
+
+        assert len(monitor.decision_cache) == 10
+
+    def test_stats_in_enforcement_status(self, monitor):
+        monitor.check_egress("mail-agent", "localhost", 8000)
+        assert monitor.get_enforcement_status()["decision_cache"]["misses"] == 1
+
+
+class TestEgressCheckBenchmark:
+    """Benchmark amortized egress checks"""
+
+    def test_cached_check_throughput(self, monitor):
+        pairs = [(f"agent-{i % 10}", f"10.0.{i % 50}.1", 8000 + i % 8) for i in range(200)]
+        iterations = 100_000
+
+        start = time.perf_counter()
+        for i in range(iterations):
+            service, destination, port = pairs[i % 200]
+            monitor.check_egress(service, destination, port)
+        elapsed = time.perf_counter() - start
+
+        per_check_us = elapsed / iterations * 1e6
+        stats = monitor.get_decision_cache_stats()
+        print(f"\negress check: {per_check_us:.3f}us amortized, hit rate {stats['hit_rate']:.4f}")
+
+        assert stats["hit_rate"] > 0.99
+        assert per_check_us < 20
@@ -0,0 +1,132 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from kenny_agent.message_index import MessageIndex, MessageIndexSync, fts_query, normalize_identifier
+
+NOW = datetime.now(timezone.utc)
+
+
+def days_ago(days):
+    return (NOW - timedelta(days=days)).isoformat()
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = MessageIndex(db_path=str(tmp_path / "message_index.db"))
+    index.upsert_messages("mail", [
+        {"id": "m1", "thread_id": "t1", "sender": "Sarah Chen <Sarah.Chen@Example.com>",
+         "recipients": ["me@example.com"], "subject": "Offsite agenda", "body": "Draft agenda for the offsite",
+         "timestamp": days_ago(2), "payload": {"id": "m1", "subject": "Offsite agenda"}},
+        {"id": "m2", "sender": "ops@example.com", "subject": "Offsite catering", "body": "Menu options",
+         "timestamp": days_ago(120)},
+    ])
+    index.upsert_messages("imessage", [
+        {"id": "i1", "sender": "(555) 123-4567", "sender_name": "Sarah Chen", "body": "See you at the offsite!",
+         "timestamp": days_ago(1)},
+    ])
+    index.upsert_messages("whatsapp", [
+        {"id": "w1", "sender": "15551234567@s.whatsapp.net", "body": "Flight lands at 6", "timestamp": days_ago(0.5)},
+    ])
+    yield index
+    index.close()
+
+
+def test_normalize_identifier():
+    assert normalize_identifier("Sarah Chen <Sarah.Chen@Example.com>") == "sarah.chen@example.com"
+    assert normalize_identifier("mailto:bob@example.com") == "bob@example.com"
+    assert normalize_identifier("(555) 123-4567") == "+15551234567"
+    assert normalize_identifier("+44 20 7946 0958") == "+442079460958"
+    assert normalize_identifier("15551234567@s.whatsapp.net") == "+15551234567"
+    assert normalize_identifier("Sarah Chen") is None
+    assert fts_query("anything about the Offsite") == '"offsite"*'
+
+
+def test_search_across_platforms_by_contact(index):
+    results = index.search(identifiers=["+1 555 123 4567"])
+
+    assert [(r["platform"], r["id"]) for r in results] == [("whatsapp", "w1"), ("imessage", "i1")]
+    assert [r["id"] for r in index.search(identifiers=["sarah.chen@example.com"])] == ["m1"]
+    assert [r["id"] for r in index.search(identifiers=["me@example.com"], from_only=True)] == []
+
+
+def test_search_ranks_relevance_with_recency(index):
+    results = index.search("offsite")
+
+    assert [r["id"] for r in results] == ["m1", "m2", "i1"]
+    assert results[0]["message"] == {"id": "m1", "subject": "Offsite agenda"}
+    assert "[offsite]" in results[0]["snippet"].lower()
+    assert results[-1]["score"] < results[0]["score"]
+    assert [r["id"] for r in index.search("offsite", sender_name="sarah")] == ["m1", "i1"]
+    assert [r["id"] for r in index.search("offsite", platforms=["mail"], since=days_ago(30))] == ["m1"]
+    assert index.search('"; DROP TABLE messages') == []
+
+    index.upsert_messages("mail", [{"id": "m3", "sender": "ops@example.com", "subject": "Offsite catering",
+                                    "body": "Menu options", "timestamp": days_ago(1)}])
+
+    assert [r["id"] for r in index.search("catering")] == ["m3", "m2"]
+
+
+def test_upsert_replaces_and_delete_removes(index):
+    index.upsert_messages("mail", [{"id": "m2", "sender": "ops@example.com", "subject": "Lunch order",
+                                    "timestamp": days_ago(3)}])
+
+    assert [r["id"] for r in index.search("offsite", platforms=["mail"])] == ["m1"]
+    assert [r["id"] for r in index.search("lunch")] == ["m2"]
+    assert index.count("mail") == 2
+
+    assert index.delete_messages("mail", ["m2"]) == 1
+    assert index.search("lunch") == []
+    assert index.get_metrics()["messages"] == {"imessage": 1, "mail": 1, "whatsapp": 1}
+
+
+def test_answer_requires_a_completed_sync(index):
+    assert index.answer("mail", query="offsite") is None
+
+    index.mark_synced("mail", days_ago(2))
+
+    assert index.answer("mail", query="offsite", contact="Sarah.Chen@example.com") == [
+        {"id": "m1", "subject": "Offsite agenda"}]
+    assert index.answer("mail", contact="Sarah") == [{"id": "m1", "subject": "Offsite agenda"}]
+    assert index.answer("mail", query="nothing here") is None
+
+
+def test_sync_feeds_incrementally_from_cursor(tmp_path):
+    index = MessageIndex(db_path=str(tmp_path / "sync.db"))
+    batches = [[{"id": "a", "body": "hello", "timestamp": days_ago(2)},
+                {"id": "b", "body": "world", "timestamp": days_ago(1)}], []]
+    cursors = []
+
+    async def fetch(cursor):
+        cursors.append(cursor)
+        return batches.pop(0)
+
+    sync = MessageIndexSync(index, "whatsapp", fetch, interval_seconds=60)
+
+    assert asyncio.run(sync.sync_once()) == 2
+    assert asyncio.run(sync.sync_once()) == 0
+    assert cursors[0] is None
+    assert cursors[1] == index.get_cursor("whatsapp")
+    assert abs(datetime.fromisoformat(cursors[1]).timestamp() - datetime.fromisoformat(days_ago(1)).timestamp()) < 1
+    assert index.has_synced("whatsapp")
+    assert index.get_metrics()["sync"]["whatsapp"]["synced_messages"] == 2
+
+
+def test_search_scales_to_large_index(tmp_path):
+    index = MessageIndex(db_path=str(tmp_path / "large.db"))
+    words = ["budget", "offsite", "invoice", "dinner", "flight", "report", "launch", "review"]
+    index.upsert_messages("mail", [
+        {"id": str(i), "sender": f"user{i % 500}@example.com", "subject": f"{words[i % 8]} {words[(i * 3) % 8]}",
+         "body": " ".join(words[(i + k) % 8] for k in range(20)), "timestamp": time.time() - i * 60}
+        for i in range(20000)
+    ])
+
+    started = time.perf_counter()
+    results = index.search("offsite launch", limit=20)
+    by_contact = index.search(identifiers=["user42@example.com"], limit=20)
+    elapsed = time.perf_counter() - started
+
+    assert len(results) == 20 and len(by_contact) == 20
+    assert elapsed < 0.5
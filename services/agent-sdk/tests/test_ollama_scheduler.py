@@ -0,0 +1,235 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from kenny_agent.ollama_scheduler import OllamaScheduler
+
+
+class StubOllama:
+    """In-process Ollama stand-in that records what it served and how concurrently."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.served = []
+        self.active = {}
+        self.peak = {}
+        self.peak_total = 0
+        self.gate = None
+
+    def transport(self):
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request):
+        body = json.loads(request.content or b"{}")
+        model = body.get("model", "")
+        self.active[model] = self.active.get(model, 0) + 1
+        self.peak[model] = max(self.peak.get(model, 0), self.active[model])
+        self.peak_total = max(self.peak_total, sum(self.active.values()))
+        try:
+            if self.gate is not None:
+                await self.gate.wait()
+            await asyncio.sleep(self.delay)
+            self.served.append((request.url.path, body))
+            if request.url.path == "/api/embed":
+                return httpx.Response(200, json={"embeddings": [[float(len(text)), 1.0] for text in body["input"]]})
+            if request.url.path == "/api/chat":
+                return httpx.Response(200, json={"message": {"content": body["messages"][-1]["content"]}, "done": True})
+            if body.get("stream"):
+                lines = [json.dumps({"response": token, "done": False}) for token in ("a", "b", "c")]
+                lines.append(json.dumps({"response": "", "done": True}))
+                return httpx.Response(200, content="\n".join(lines).encode())
+            return httpx.Response(200, json={"response": body.get("prompt", ""), "done": True})
+        finally:
+            self.active[model] -= 1
+
+
+def make_scheduler(stub, **kwargs):
+    kwargs.setdefault("max_concurrent", 4)
+    kwargs.setdefault("default_model_concurrency", 2)
+    kwargs.setdefault("reserved_slots", 1)
+    kwargs.setdefault("pinned_models", [])
+    kwargs.setdefault("embed_batch_window", 0.01)
+    return OllamaScheduler("http://ollama.test", transport=stub.transport(), **kwargs)
+
+
+class TestOllamaScheduler:
+    """Test priority lanes, concurrency caps, keep_alive and embedding batching"""
+
+    @pytest.mark.asyncio
+    async def test_interactive_request_jumps_queued_batch_work(self):
+        stub = StubOllama()
+        scheduler = make_scheduler(stub, max_concurrent=1, reserved_slots=0)
+        stub.gate = asyncio.Event()
+
+        holder = asyncio.ensure_future(scheduler.generate({"model": "qwen3:8b", "prompt": "holder"}, lane="batch"))
+        await asyncio.sleep(0.01)
+        queued = [
+            asyncio.ensure_future(scheduler.generate({"model": "qwen3:8b", "prompt": f"batch-{i}"}, lane="batch"))
+            for i in range(3)
+        ]
+        queued.append(asyncio.ensure_future(scheduler.generate({"model": "qwen3:8b", "prompt": "warm"}, lane="warming")))
+        queued.append(asyncio.ensure_future(scheduler.generate({"model": "qwen3:8b", "prompt": "user"}, lane="interactive")))
+        await asyncio.sleep(0.01)
+        assert scheduler.get_metrics()["lanes"]["batch"]["waiting"] == 3
+
+        stub.gate.set()
+        await asyncio.gather(holder, *queued)
+
+        prompts = [body["prompt"] for _, body in stub.served]
+        assert prompts == ["holder", "user", "warm", "batch-0", "batch-1", "batch-2"]
+        lanes = scheduler.get_metrics()["lanes"]
+        assert lanes["interactive"]["completed"] == 1
+        assert lanes["batch"]["queue_ms_max"] >= lanes["interactive"]["queue_ms_max"]
+        await scheduler.aclose()
+
+    @pytest.mark.asyncio
+    async def test_per_model_caps_and_reserved_interactive_slot(self):
+        stub = StubOllama(delay=0.05)
+        scheduler = make_scheduler(stub, max_concurrent=3, reserved_slots=1,
+                                   model_concurrency={"qwen3:8b": 1, "nomic-embed-text": 2})
+
+        background = [
+            scheduler.request("/api/embeddings", {"model": "nomic-embed-text", "prompt": str(i)}, lane="batch")
+            for i in range(6)
+        ]
+        interactive = [scheduler.generate({"model": "qwen3:8b", "prompt": str(i)}) for i in range(3)]
+        await asyncio.gather(*background, *interactive)
+
+        assert stub.peak["qwen3:8b"] == 1
+        assert stub.peak["nomic-embed-text"] == 2
+        assert stub.peak_total <= 3
+        metrics = scheduler.get_metrics()
+        assert metrics["active"] == 0
+        assert metrics["models"]["qwen3:8b"]["limit"] == 1
+        await scheduler.aclose()
+
+    @pytest.mark.asyncio
+    async def test_background_lanes_leave_reserved_slot_free(self):
+        stub = StubOllama()
+        scheduler = make_scheduler(stub, max_concurrent=2, reserved_slots=1)
+        stub.gate = asyncio.Event()
+
+        batch = [asyncio.ensure_future(scheduler.generate({"model": f"m{i}", "prompt": "x"}, lane="batch"))
+                 for i in range(2)]
+        user = asyncio.ensure_future(scheduler.generate({"model": "qwen3:8b", "prompt": "user"}))
+        await asyncio.sleep(0.01)
+
+        metrics = scheduler.get_metrics()
+        assert metrics["active_background"] == 1
+        assert metrics["lanes"]["batch"]["waiting"] == 1
+        assert metrics["active"] == 2
+
+        stub.gate.set()
+        await asyncio.gather(user, *batch)
+        await scheduler.aclose()
+
+    @pytest.mark.asyncio
+    async def test_keep_alive_pins_and_keeps_hot_models_loaded(self):
+        stub = StubOllama(delay=0)
+        scheduler = make_scheduler(stub, pinned_models=["qwen3:8b"], keep_alive=None, hot_keep_alive=900)
+
+        await scheduler.generate({"model": "qwen3:8b", "prompt": "a"}, lane="batch")
+        await scheduler.generate({"model": "llama3.2:3b", "prompt": "b"}, lane="batch")
+        await scheduler.generate({"model": "llama3.2:3b", "prompt": "c"}, lane="routing")
+        await scheduler.generate({"model": "llama3.2:3b", "prompt": "d"}, lane="batch")
+        assert await scheduler.warm("mistral", lane="warming")
+
+        keep_alive = [body.get("keep_alive", "default") for _, body in stub.served]
+        assert keep_alive == [-1, "default", 900, 900, "default"]
+        assert stub.served[-1][1] == {"model": "mistral", "stream": False}
+        await scheduler.aclose()
+
+    @pytest.mark.asyncio
+    async def test_compatible_embedding_calls_share_one_request(self):
+        stub = StubOllama(delay=0)
+        scheduler = make_scheduler(stub, embed_batch_size=8)
+
+        results = await asyncio.gather(
+            scheduler.embed("nomic-embed-text", ["a", "bb"]),
+            scheduler.embed("nomic-embed-text", ["ccc"]),
+            scheduler.embed("nomic-embed-text", ["dddd", "e"]),
+            scheduler.embed("nomic-embed-text", ["ffffff"], lane="interactive"),
+        )
+
+        assert results[0] == [[1.0, 1.0], [2.0, 1.0]]
+        assert results[1] == [[3.0, 1.0]]
+        assert results[2] == [[4.0, 1.0], [1.0, 1.0]]
+        assert results[3] == [[6.0, 1.0]]
+        embed_requests = [body for path, body in stub.served if path == "/api/embed"]
+        assert sorted(len(body["input"]) for body in embed_requests) == [1, 5]
+        metrics = scheduler.get_metrics()["embed"]
+        assert metrics["requests"] == 2
+        assert metrics["coalesced"] == 2
+        await scheduler.aclose()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_and_closed_stream_release_slots(self):
+        stub = StubOllama()
+        scheduler = make_scheduler(stub, max_concurrent=1, reserved_slots=0)
+
+        stream = scheduler.stream("/api/generate", {"model": "qwen3:8b", "prompt": "hi"})
+        first = await stream.__anext__()
+        assert first["response"] == "a"
+
+        waiter = asyncio.ensure_future(scheduler.generate({"model": "qwen3:8b", "prompt": "queued"}, lane="batch"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        await stream.aclose()
+        metrics = scheduler.get_metrics()
+        assert metrics["active"] == 0
+        assert metrics["lanes"]["batch"]["cancelled"] == 1
+        assert metrics["lanes"]["interactive"]["cancelled"] == 1
+
+        result = await scheduler.generate({"model": "qwen3:8b", "prompt": "after"})
+        assert result["response"] == "after"
+        await scheduler.aclose()
+
+    @pytest.mark.asyncio
+    async def test_timeout_covers_the_wait_for_a_slot(self):
+        stub = StubOllama()
+        scheduler = make_scheduler(stub, model_concurrency={"qwen3:8b": 1})
+        stub.gate = asyncio.Event()
+
+        synthesis = asyncio.ensure_future(scheduler.generate({"model": "qwen3:8b", "prompt": "long"}))
+        await asyncio.sleep(0.01)
+        started = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError):
+            await scheduler.chat({"model": "qwen3:8b", "messages": [{"role": "user", "content": "route"}]},
+                                 lane="routing", timeout=0.05)
+
+        assert time.perf_counter() - started < 0.5
+        metrics = scheduler.get_metrics()
+        assert metrics["lanes"]["routing"]["cancelled"] == 1
+        assert metrics["lanes"]["routing"]["waiting"] == 0
+
+        stub.gate.set()
+        await synthesis
+        assert scheduler.get_metrics()["active"] == 0
+        await scheduler.aclose()
+
+    @pytest.mark.asyncio
+    async def test_background_in_flight_cap(self):
+        stub = StubOllama()
+        scheduler = make_scheduler(stub, max_concurrent=4, reserved_slots=1, max_background=1)
+        stub.gate = asyncio.Event()
+
+        batch = [asyncio.ensure_future(scheduler.generate({"model": f"m{i}", "prompt": "x"}, lane="batch"))
+                 for i in range(3)]
+        user = asyncio.ensure_future(scheduler.generate({"model": "qwen3:8b", "prompt": "user"}))
+        await asyncio.sleep(0.01)
+
+        metrics = scheduler.get_metrics()
+        assert metrics["active_background"] == 1
+        assert metrics["lanes"]["batch"]["waiting"] == 2
+        assert metrics["active"] == 2
+
+        stub.gate.set()
+        await asyncio.gather(user, *batch)
+        assert stub.peak_total == 2
+        await scheduler.aclose()
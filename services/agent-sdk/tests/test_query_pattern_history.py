@@ -0,0 +1,176 @@
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from kenny_agent.query_pattern_analyzer import QueryPatternAnalyzer
+
+AGENT_ID = "calendar-agent"
+
+
+def history_count(analyzer):
+    conn = sqlite3.connect(analyzer.db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM query_history").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    return QueryPatternAnalyzer(AGENT_ID, cache_dir=str(tmp_path))
+
+
+async def record(analyzer, query, times=1, success=True, cache_hit=False):
+    for _ in range(times):
+        await analyzer.record_query(query, success=success, cache_hit=cache_hit,
+                                    response_time=0.1, confidence=0.9)
+
+
+class TestBufferedIngestion:
+    """Test batched, off-loop query history writes"""
+
+    @pytest.mark.asyncio
+    async def test_queries_are_buffered_until_flush(self, analyzer):
+        analyzer.flush_interval = 60
+        await record(analyzer, "events today", times=5)
+
+        assert history_count(analyzer) == 0
+        assert analyzer.get_analysis_stats()["ingestion"]["buffered"] == 5
+
+        assert await analyzer.flush() == 5
+        assert history_count(analyzer) == 5
+        assert analyzer.ingestion_stats["flushes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_full_batches_flush_in_bulk(self, analyzer):
+        analyzer.flush_interval = 60
+        analyzer.flush_batch_size = 100
+        await record(analyzer, "meetings tomorrow", times=250)
+        await analyzer.close()
+
+        assert history_count(analyzer) == 250
+        assert analyzer.ingestion_stats["flushes"] <= 3
+
+    @pytest.mark.asyncio
+    async def test_pending_queries_flush_after_interval(self, analyzer):
+        analyzer.flush_interval = 0.01
+        await record(analyzer, "events today")
+        await analyzer._flush_task
+
+        assert history_count(analyzer) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_rows_and_patterns(self, analyzer, tmp_path):
+        analyzer.flush_interval = 60
+        await record(analyzer, "schedule next week", times=12)
+        write_batch = analyzer._write_batch
+
+        def failing_write(rows, patterns):
+            raise sqlite3.OperationalError("database is locked")
+
+        analyzer._write_batch = failing_write
+        assert await analyzer.flush() == 0
+        assert len(analyzer._history_buffer) == 12
+        assert len(analyzer._dirty_patterns) == 1
+
+        analyzer._write_batch = write_batch
+        assert await analyzer.flush() == 12
+        restarted = QueryPatternAnalyzer(AGENT_ID, cache_dir=str(tmp_path))
+        assert len(restarted.patterns) == 1
+
+
+    @pytest.mark.asyncio
+    async def test_buffer_drops_oldest_rows_while_writes_fail(self, analyzer):
+        analyzer.flush_interval = 60
+        analyzer.max_buffered_rows = 10
+
+        def failing_write(rows, patterns):
+            raise sqlite3.OperationalError("disk I/O error")
+
+        analyzer._write_batch = failing_write
+        await record(analyzer, "events today", times=8)
+        assert await analyzer.flush() == 0
+        await record(analyzer, "meetings tomorrow", times=6)
+
+        assert len(analyzer._history_buffer) == 10
+        assert analyzer._history_buffer[-1][1] == "meetings tomorrow"
+        assert analyzer._history_buffer[0][1] == "events today"
+        assert analyzer.get_analysis_stats()["ingestion"]["rows_dropped"] == 4
+
+class TestAggregatedAnalysis:
+    """Test analysis over incrementally maintained template counts"""
+
+    @pytest.mark.asyncio
+    async def test_analysis_reads_aggregates_not_raw_history(self, analyzer):
+        await record(analyzer, "events today", times=6, cache_hit=True)
+        await record(analyzer, "meetings with Sarah", times=3, success=False)
+        weights = await analyzer.analyze_historical_patterns()
+
+        conn = sqlite3.connect(analyzer.db_path)
+        conn.execute("DELETE FROM query_history")
+        conn.commit()
+        conn.close()
+
+        assert await analyzer.analyze_historical_patterns() == weights
+        today_id = analyzer._generate_pattern_id(analyzer._extract_pattern_template("events today"))
+        assert weights[today_id] == 1.0
+        assert 0 < min(weights.values()) < 1.0
+
+    def test_analysis_query_uses_primary_key(self, analyzer):
+        conn = sqlite3.connect(analyzer.db_path)
+        plan = " ".join(str(row) for row in conn.execute("""
+            EXPLAIN QUERY PLAN
+            SELECT pattern_id, hour, weekday, SUM(frequency) FROM query_template_counts
+            WHERE agent_id = ? AND day >= ? GROUP BY pattern_id, hour, weekday
+        """, (AGENT_ID, 0)))
+        conn.close()
+        assert "PRIMARY KEY" in plan
+
+    def test_existing_history_is_backfilled(self, tmp_path):
+        QueryPatternAnalyzer(AGENT_ID, cache_dir=str(tmp_path))
+        conn = sqlite3.connect(f"{tmp_path}/query_patterns_{AGENT_ID}.db")
+        conn.execute("DELETE FROM query_template_counts")
+        now = time.time()
+        dt = datetime.fromtimestamp(now)
+        conn.executemany("""
+            INSERT INTO query_history (query_hash, query_text, timestamp, hour, weekday,
+                                       success, cache_hit, response_time, confidence, agent_id)
+            VALUES ('h', ?, ?, ?, ?, 1, 0, 0.1, 0.9, ?)
+        """, [("events today", now, dt.hour, dt.weekday(), AGENT_ID)] * 4)
+        conn.commit()
+        conn.close()
+
+        restarted = QueryPatternAnalyzer(AGENT_ID, cache_dir=str(tmp_path))
+        rows = restarted._read_template_counts(0)
+        assert [row[3] for row in rows] == [4]
+
+    @pytest.mark.asyncio
+    async def test_counts_outside_the_window_are_pruned(self, analyzer):
+        old_day = (datetime.now() - timedelta(days=analyzer.analysis_window_days + 1)).toordinal()
+        conn = sqlite3.connect(analyzer.db_path)
+        conn.execute("""
+            INSERT INTO query_template_counts (agent_id, day, pattern_id, hour, weekday, frequency)
+            VALUES (?, ?, 'stale', 9, 0, 5)
+        """, (AGENT_ID, old_day))
+        conn.commit()
+        conn.close()
+
+        await record(analyzer, "events today")
+        await analyzer.flush()
+
+        assert all(row[0] != "stale" for row in analyzer._read_template_counts(0))
+        assert analyzer.ingestion_stats["count_buckets_pruned"] == 1
+
+    @pytest.mark.asyncio
+    async def test_restored_patterns_predict_by_hour(self, analyzer, tmp_path):
+        await record(analyzer, "schedule next week", times=12, cache_hit=True)
+        await analyzer.close()
+
+        restarted = QueryPatternAnalyzer(AGENT_ID, cache_dir=str(tmp_path))
+        pattern = next(iter(restarted.patterns.values()))
+        assert datetime.now().hour in pattern.temporal_distribution
+
+        predictions = await restarted.predict_likely_queries(datetime.now())
+        assert "schedule next week" in [p.query for p in predictions]
@@ -0,0 +1,150 @@
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+
+from kenny_agent.security import (
+    SecurityEvent, SecurityEventType, SecuritySeverity, SecurityEventCollector,
+    SecurityEventStore, SlidingWindowCounter, SecurityMonitor
+)
+
+
+def make_event(event_type=SecurityEventType.EGRESS_VIOLATION, severity=SecuritySeverity.HIGH,
+               source_service="mail-agent", timestamp=None) -> SecurityEvent:
+    event = SecurityEvent(
+        event_id=str(uuid.uuid4()),
+        event_type=event_type,
+        severity=severity,
+        title="Test event",
+        description="Test event",
+        source_service=source_service
+    )
+    if timestamp is not None:
+        event.timestamp = timestamp
+    return event
+
+
+class TestSlidingWindowCounter:
+    """Test bucketed sliding window counts"""
+
+    def test_counts_only_events_inside_window(self):
+        counter = SlidingWindowCounter(horizon_seconds=3600, bucket_seconds=10)
+        now = datetime.now(timezone.utc)
+
+        counter.add(now - timedelta(minutes=90))
+        counter.add(now - timedelta(minutes=30))
+        counter.add(now)
+        counter.add(now)
+
+        assert counter.count(60, now=now) == 2
+        assert counter.count(3600, now=now) == 3
+
+
+class TestSecurityEventStore:
+    """Test the time-indexed security event store"""
+
+    def test_eviction_keeps_indexes_consistent(self):
+        store = SecurityEventStore(max_events=3)
+        events = [make_event(source_service=f"svc-{i % 2}") for i in range(5)]
+        for event in events:
+            store.append(event)
+
+        assert list(store) == events[-3:]
+        since = datetime.now(timezone.utc) - timedelta(minutes=1)
+        assert store.recent_for_source(SecurityEventType.EGRESS_VIOLATION, "svc-0", since) == [events[4], events[2]]
+        assert store.recent_for_source(SecurityEventType.EGRESS_VIOLATION, "svc-1", since) == [events[3]]
+
+    def test_recent_for_source_stops_at_window(self):
+        store = SecurityEventStore()
+        now = datetime.now(timezone.utc)
+        old = make_event(timestamp=now - timedelta(hours=2))
+        new = make_event(timestamp=now)
+        store.append(old)
+        store.append(new)
+
+        since = now - timedelta(minutes=30)
+        assert store.recent_for_source(SecurityEventType.EGRESS_VIOLATION, "mail-agent", since) == [new]
+        assert store.recent_events(since) == [new]
+
+
+class TestIncidentCorrelation:
+    """Test correlation through the event store"""
+
+    def test_incident_created_from_related_events_only(self):
+        collector = SecurityEventCollector()
+        collector.collect_event(make_event(source_service="calendar-agent"))
+        first = make_event()
+        second = make_event()
+        collector.collect_event(first)
+        collector.collect_event(second)
+
+        assert len(collector.incidents) == 1
+        assert collector.incidents[0].event_ids == [first.event_id, second.event_id]
+
+    def test_low_severity_events_do_not_correlate(self):
+        collector = SecurityEventCollector()
+        for _ in range(5):
+            collector.collect_event(make_event(severity=SecuritySeverity.LOW))
+
+        assert collector.incidents == []
+
+    def test_events_list_is_bounded(self):
+        collector = SecurityEventCollector()
+        collector.event_store.max_events = 10
+        for _ in range(25):
+            collector.collect_event(make_event(severity=SecuritySeverity.INFO))
+
+        assert len(collector.events) == 10
+        assert len(collector.get_events(hours=1)) == 10
+
+
+class TestRateBasedResponse:
+    """Test response rules using real windowed counts"""
+
+    def test_rate_rule_triggers_at_threshold(self):
+        monitor = SecurityMonitor()
+        engine = monitor.response_engine
+
+        for i in range(2):
+            monitor.event_collector.collect_event(
+                make_event(severity=SecuritySeverity.CRITICAL, source_service=f"svc-{i}")
+            )
+        assert engine._count_recent_events(SecurityEventType.EGRESS_VIOLATION, SecuritySeverity.CRITICAL) == 2
+        assert not [r for r in engine.action_history if r["rule_id"] == "critical_egress_response"]
+
+        monitor.event_collector.collect_event(make_event(severity=SecuritySeverity.CRITICAL, source_service="svc-2"))
+        assert [r for r in engine.action_history if r["rule_id"] == "critical_egress_response"]
+
+
+class TestEventBurstBenchmark:
+    """Benchmark a burst of 10k events within one minute"""
+
+    def test_10k_events_per_minute_burst(self):
+        collector = SecurityEventCollector()
+        now = datetime.now(timezone.utc)
+        services = [f"agent-{i}" for i in range(20)]
+        types = list(SecurityEventType)
+        severities = list(SecuritySeverity)
+        events = [
+            make_event(
+                event_type=types[i % len(types)],
+                severity=severities[i % len(severities)],
+                source_service=services[i % len(services)],
+                timestamp=now - timedelta(seconds=60 - i * 0.006)
+            )
+            for i in range(10000)
+        ]
+
+        start = time.perf_counter()
+        for event in events:
+            collector.collect_event(event)
+        elapsed = time.perf_counter() - start
+
+        count_start = time.perf_counter()
+        count = collector.event_store.count_recent(types[0], severities[0], 3600)
+        count_elapsed = time.perf_counter() - count_start
+
+        print(f"\n10k event burst: {elapsed * 1000:.1f}ms, rate count {count_elapsed * 1e6:.1f}us")
+
+        assert len(collector.events) == 10000
+        assert count == sum(1 for e in events if e.event_type == types[0] and e.severity == severities[0])
+        assert elapsed < 10.0
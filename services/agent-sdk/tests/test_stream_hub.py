@@ -0,0 +1,125 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from kenny_agent.stream_hub import StreamHub
+
+
+def decode(frame: str) -> dict:
+    assert frame.startswith("data: ") and frame.endswith("\n\n")
+    return json.loads(frame[len("data: "):])
+
+
+class TestStreamHub:
+    """Test topic fan-out and per-client queue policies"""
+
+    @pytest.mark.asyncio
+    async def test_publish_fans_out_to_topic_subscribers(self):
+        hub = StreamHub()
+        alerts_a = hub.subscribe("alerts")
+        alerts_b = hub.subscribe("alerts")
+        traces = hub.subscribe("traces")
+
+        assert hub.publish("alerts", "new_alerts", {"alerts": [{"id": 1}]}) == 2
+
+        for subscription in (alerts_a, alerts_b):
+            message = await subscription.get(timeout=1)
+            body = json.loads(message.data)
+            assert body["type"] == "new_alerts"
+            assert body["alerts"] == [{"id": 1}]
+        assert await traces.get(timeout=0.01) is None
+
+    def test_publish_without_subscribers_is_skipped(self):
+        hub = StreamHub()
+        assert not hub.has_subscribers("alerts")
+        assert hub.publish("alerts", "new_alerts", {"alerts": []}) == 0
+        assert hub.published == 0
+
+    def test_slow_consumer_drops_oldest(self):
+        hub = StreamHub(max_queue_per_client=3)
+        subscription = hub.subscribe("security")
+        for i in range(10):
+            hub.publish("security", "new_security_events", {"n": i})
+
+        assert [json.loads(m.data)["n"] for m in subscription.queue] == [7, 8, 9]
+        assert subscription.dropped == 7
+        assert hub.get_stats()["dropped"] == 7
+
+    def test_coalesced_messages_replace_queued_ones(self):
+        hub = StreamHub()
+        subscription = hub.subscribe("health_dashboard")
+        hub.publish("health_dashboard", "dashboard_update", {"n": 1}, coalesce_key="dashboard_update")
+        hub.publish("health_dashboard", "note", {"n": 2})
+        hub.publish("health_dashboard", "dashboard_update", {"n": 3}, coalesce_key="dashboard_update")
+
+        assert [json.loads(m.data)["n"] for m in subscription.queue] == [3, 2]
+        assert subscription.coalesced == 1
+
+    @pytest.mark.asyncio
+    async def test_closing_stream_unsubscribes(self):
+        hub = StreamHub()
+        subscription = hub.subscribe("alerts")
+        frames = subscription.sse_frames(heartbeat_seconds=0.01)
+
+        assert await frames.__anext__() == ": keep-alive\n\n"
+        hub.publish("alerts", "alerts_updated", {"active_count": 2})
+        assert decode(await frames.__anext__())["active_count"] == 2
+
+        await frames.aclose()
+        assert hub.subscriber_count("alerts") == 0
+        assert hub.get_stats()["topics"] == {}
+
+
+class TestStreamHubLoad:
+    """Load test the hub with many concurrent SSE clients"""
+
+    @pytest.mark.asyncio
+    async def test_200_clients_receive_every_update(self):
+        hub = StreamHub(max_queue_per_client=1000)
+        clients = 200
+        updates = 100
+        received = [0] * clients
+
+        async def client(index: int):
+            frames = hub.subscribe("security").sse_frames(heartbeat_seconds=5)
+            try:
+                async for frame in frames:
+                    if decode(frame)["type"] == "done":
+                        break
+                    received[index] += 1
+            finally:
+                await frames.aclose()
+
+        tasks = [asyncio.create_task(client(i)) for i in range(clients)]
+        await asyncio.sleep(0)
+        assert hub.subscriber_count("security") == clients
+
+        start = time.perf_counter()
+        for i in range(updates):
+            hub.publish("security", "new_security_events", {"events": [{"n": i}], "count": 1})
+            if i % 10 == 0:
+                await asyncio.sleep(0)
+        hub.publish("security", "done", {})
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=10)
+        elapsed = time.perf_counter() - start
+
+        print(f"\nstream hub: {clients} clients x {updates} updates in {elapsed * 1000:.1f}ms")
+        assert received == [updates] * clients
+        assert hub.subscriber_count() == 0
+        assert hub.get_stats()["dropped"] == 0
+
+    @pytest.mark.asyncio
+    async def test_stalled_clients_stay_bounded(self):
+        hub = StreamHub(max_queue_per_client=10)
+        stalled = [hub.subscribe("traces") for _ in range(200)]
+
+        for i in range(1000):
+            hub.publish("traces", "new_traces", {"traces": [{"n": i}]}, coalesce_key=f"trace-{i % 50}")
+
+        stats = hub.get_stats()
+        assert stats["max_queue_depth"] <= 10
+        assert all(len(s.queue) <= 10 for s in stalled)
+        # Published payloads are serialized once and shared across queues
+        assert stalled[0].queue[-1] is stalled[-1].queue[-1]
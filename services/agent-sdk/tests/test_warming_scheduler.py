@@ -0,0 +1,171 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from kenny_agent.agent_service_base import SemanticCache
+from kenny_agent.predictive_cache_warmer import PredictiveCacheWarmer, WarmingJob
+
+AGENT_ID = "calendar-agent"
+
+
+class FakeAgent:
+    def __init__(self, cache, work_seconds=0.0):
+        self.agent_id = AGENT_ID
+        self.semantic_cache = cache
+        self.active_queries = 0
+        self.query_metrics = {"avg_response_time": 0.0, "last_updated": datetime.now(timezone.utc)}
+        self.work_seconds = work_seconds
+        self.warmed = []
+        self.contexts = []
+
+    async def process_natural_language_query(self, query, context=None):
+        self.contexts.append(context)
+        await asyncio.sleep(self.work_seconds)
+        self.warmed.append(query)
+        await self.semantic_cache.set(query, self.agent_id, {"answer": query})
+        return {"success": True, "cached": False, "confidence": 0.9}
+
+
+def job(query, priority=0.5, benefit=0.5, hours_ahead=0.0):
+    return WarmingJob(
+        job_id=f"job-{query}-{priority}",
+        query=query,
+        priority=priority,
+        predicted_time=datetime.now() + timedelta(hours=hours_ahead),
+        reasoning="test",
+        job_type="predicted",
+        estimated_benefit=benefit
+    )
+
+
+@pytest.fixture
+def agent(tmp_path):
+    return FakeAgent(SemanticCache(cache_dir=str(tmp_path / AGENT_ID)))
+
+
+@pytest.fixture
+def warmer(agent):
+    warmer = PredictiveCacheWarmer(agent, pattern_analyzer=None)
+    warmer.max_concurrent_jobs = 1
+    return warmer
+
+
+async def drain(warmer):
+    while warmer.warming_queue or warmer._job_tasks:
+        await warmer._process_warming_queue()
+        if warmer._job_tasks:
+            await asyncio.gather(*warmer._job_tasks.values())
+
+
+class TestWarmingScheduler:
+    """Test heap ordering, dedup and budget control of the warming scheduler"""
+
+    @pytest.mark.asyncio
+    async def test_jobs_run_by_benefit_per_lead_time(self, warmer, agent):
+        warmer.enqueue_job(job("events next week", priority=0.9, hours_ahead=48))
+        warmer.enqueue_job(job("events today", priority=0.6))
+        warmer.enqueue_job(job("meetings tomorrow", priority=0.9, hours_ahead=1))
+
+        await drain(warmer)
+
+        assert agent.warmed == ["events today", "meetings tomorrow", "events next week"]
+        assert all(context == {"warming": True} for context in agent.contexts)
+
+    @pytest.mark.asyncio
+    async def test_duplicates_keep_the_best_score(self, warmer, agent):
+        assert warmer.enqueue_job(job("Events Today", priority=0.3))
+        assert warmer.enqueue_job(job("events today", priority=0.9))
+        assert not warmer.enqueue_job(job("events today ", priority=0.1))
+
+        await drain(warmer)
+
+        assert agent.warmed == ["events today"]
+        assert warmer.warming_metrics["jobs_deduplicated"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_and_stale_jobs_are_skipped(self, warmer, agent):
+        await agent.semantic_cache.set("events today", AGENT_ID, {"answer": "cached"})
+        lookups = agent.semantic_cache.cache_metrics["total_queries"]
+        warmer.enqueue_job(job("events today"))
+        warmer.enqueue_job(job("events yesterday", hours_ahead=-2))
+
+        await drain(warmer)
+
+        assert agent.warmed == []
+        assert warmer.warming_metrics["jobs_skipped_cached"] == 1
+        assert warmer.warming_metrics["jobs_expired"] == 1
+        # The cache check is not counted as a lookup
+        assert agent.semantic_cache.cache_metrics["total_queries"] == lookups
+
+    @pytest.mark.asyncio
+    async def test_yields_to_live_queue_depth_and_latency(self, warmer, agent):
+        warmer.enqueue_job(job("events today"))
+
+        agent.active_queries = 3
+        await warmer._process_warming_queue()
+        assert not warmer.active_jobs
+
+        agent.active_queries = 0
+        agent.query_metrics["avg_response_time"] = 4.0
+        await warmer._process_warming_queue()
+        assert not warmer.active_jobs
+
+        # A stale latency average no longer holds warming back
+        agent.query_metrics["last_updated"] = datetime.now(timezone.utc) - timedelta(minutes=5)
+        await drain(warmer)
+        assert agent.warmed == ["events today"]
+        # Two yielding ticks in a row are one yield
+        assert warmer.warming_metrics["budget_yields"] == 1
+        assert warmer.warming_metrics["yield_seconds"] > 0
+
+    @pytest.mark.asyncio
+    async def test_execution_budget_limits_warming_per_window(self, warmer, agent):
+        agent.work_seconds = 0.05
+        warmer.budget_seconds = 0.12
+        for i in range(6):
+            warmer.enqueue_job(job(f"events in {i} days"))
+
+        for _ in range(6):
+            await warmer._process_warming_queue()
+            if warmer._job_tasks:
+                await asyncio.gather(*warmer._job_tasks.values())
+
+        assert len(agent.warmed) == 3
+        assert warmer.get_warming_stats()["queue_status"]["queued_jobs"] == 3
+
+    @pytest.mark.asyncio
+    async def test_hit_after_warm_rate_uses_bounded_buffers(self, warmer, agent):
+        warmer.max_tracked_warm_keys = 2
+        for query in ["events today", "meetings tomorrow", "events this week"]:
+            warmer.enqueue_job(job(query))
+        await drain(warmer)
+
+        warmer.record_live_query("meetings tomorrow", cache_hit=True)
+        warmer.record_live_query("events this week", cache_hit=False)
+        warmer.record_live_query("meetings tomorrow", cache_hit=True)  # already counted
+
+        stats = warmer.get_warming_stats()["hit_after_warm"]
+        # "events today" was evicted unused, one warmed entry served a hit
+        assert stats["outcomes"] == 3
+        assert stats["hits"] == 1
+        assert stats["tracked_warm_entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_scheduler_loop_wakes_on_enqueue(self, warmer, agent):
+        warmer.scheduler_tick = 10
+        warmer.is_running = True
+        loop_task = asyncio.create_task(warmer._warming_scheduler_loop())
+        await asyncio.sleep(0)
+
+        started = time.perf_counter()
+        warmer.enqueue_job(job("events today"))
+        while not agent.warmed and time.perf_counter() - started < 2:
+            await asyncio.sleep(0.01)
+
+        warmer.is_running = False
+        loop_task.cancel()
+        await asyncio.gather(loop_task, return_exceptions=True)
+        assert agent.warmed == ["events today"]
+        assert time.perf_counter() - started < 1
@@ -959,6 +959,10 @@ class IntelligentCalendarAgent(AgentServiceBase):
         Override base method to use orchestrated query processing with Phase 3.2.3 intelligence.
         """
         try:
+            # Cache warming runs the plain path so it is not recorded as user history
+            if (context or {}).get("warming"):
+                return await super().process_natural_language_query(query, context)
+            
             # Use orchestrated processing for enhanced performance
             if hasattr(self, 'cache_orchestrator') and self.cache_orchestrator.is_running:
                 return await self.cache_orchestrator.process_query_with_orchestration(query)
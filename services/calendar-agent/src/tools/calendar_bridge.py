@@ -31,7 +31,7 @@ class CalendarBridgeTool(BaseTool):
                 "properties": {
                     "operation": {
                         "type": "string", 
-                        "enum": ["list_calendars", "list_events", "get_event", "create_event", "health", "bulk_operations"]
+                        "enum": ["list_calendars", "list_events", "get_event", "create_event", "get_changes", "health", "bulk_operations"]
                     },
                     "calendar_name": {"type": "string"},
                     "start_date": {"type": "string", "format": "date-time"},
@@ -39,6 +39,8 @@ class CalendarBridgeTool(BaseTool):
                     "event_id": {"type": "string"},
                     "event_data": {"type": "object"},
                     "limit": {"type": "integer", "minimum": 1, "maximum": 500},
+                    "since": {"type": "string", "description": "Sync token from a previous get_changes call"},
+                    "wait": {"type": "number", "minimum": 0, "maximum": 60},
                     "bulk_requests": {"type": "array", "items": {"type": "object"}}
                 },
                 "required": ["operation"]
@@ -151,6 +153,8 @@ class CalendarBridgeTool(BaseTool):
             return await self._get_event_async(parameters)
         elif operation == "create_event":
             return await self._create_event_async(parameters)
+        elif operation == "get_changes":
+            return await self.get_changes(parameters.get("since"), parameters.get("wait", 0.0), parameters.get("limit", 500))
         elif operation == "health":
             return await self._health_check_async()
         elif operation == "bulk_operations":
@@ -389,6 +393,49 @@ class CalendarBridgeTool(BaseTool):
         
         return loop.run_until_complete(self._list_events_async(parameters))
     
+    async def get_changes(self, since: Optional[str] = None, wait: float = 0.0, limit: int = 500) -> Dict[str, Any]:
+        """
+        Get calendar changes since a sync token, long-polling up to wait seconds.
+        
+        Args:
+            since: Token from a previous call; None returns the current token only
+            wait: Seconds the bridge may hold the request open when nothing changed
+            limit: Maximum number of changes to return
+            
+        Returns:
+            Changes with next_token, has_more and reset_required flags
+        """
+        query_params = {"wait": wait, "limit": limit}
+        if since is not None:
+            query_params["since"] = since
+        
+        try:
+            client = await self._get_async_client()
+            response = await client.get(
+                f"{self.bridge_url}/v1/calendar/changes",
+                params=query_params,
+                headers={"Connection": "keep-alive"},
+                timeout=httpx.Timeout(wait + 30.0, connect=10.0)
+            )
+            response.raise_for_status()
+            
+            data = response.json()
+            data["operation"] = "get_changes"
+            data["success"] = True
+            return data
+            
+        except (httpx.RequestError, httpx.HTTPStatusError) as e:
+            print(f"[calendar_bridge] get_changes failed: {e}")
+            return {
+                "operation": "get_changes",
+                "success": False,
+                "error": str(e),
+                # Older bridges have no change feed
+                "unsupported": isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 404,
+                "changes": [],
+                "next_token": since
+            }
+    
     async def _get_event_async(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Get a specific event by ID (async version)."""
         event_id = parameters.get("event_id")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Contact lookup benchmark: normalized identifier index vs. LIKE scans.
+
+Creates N synthetic contacts, then resolves emails and phones written in a
+different format from how they were stored ("+1 (555) 010-0042" vs
+"555.010.0042", mixed-case emails). Reports latency and hit rate for
+ContactsDatabase.search_contacts and for the previous LIKE query over the
+JSON columns. Name queries ("Sarah", a full name, a full name with a typo)
+are ranked with the shared contact scorer and compared with a LIKE scan.
+
+Usage: python benchmark_contact_lookup.py --contacts 50000 --lookups 2000
+"""
+
+import argparse
+import logging
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the contacts agent to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.kenny_agent.database import ContactsDatabase
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("contact_lookup_benchmark")
+logging.getLogger("src.kenny_agent.database").setLevel(logging.WARNING)
+
+
+FIRST_NAMES = ["Sarah", "James", "Mary", "John", "Linda", "Wei", "Priya", "Sam", "Samantha", "Michael",
+               "David", "Susan", "Mohammed", "Yuki", "Elena", "Carlos", "Fatima", "Oliver", "Chloe", "Raj"]
+
+
+def surname(i: int) -> str:
+    syllables = ["an", "ber", "cal", "der", "fin", "gar", "hol", "jen", "kov", "lam", "mor", "son", "pet", "ros"]
+    return "".join(syllables[(i // len(syllables) ** k) % len(syllables)] for k in range(3)).capitalize()
+
+
+def typo(name: str) -> str:
+    return name[:-2] + name[-1] + name[-2]
+
+
+def legacy_search(db: ContactsDatabase, identifier: str):
+    """The LIKE-based identifier search this benchmark compares against."""
+    column = "emails" if "@" in identifier else "phones"
+    cursor = db._get_connection().execute(
+        f"SELECT id FROM contacts WHERE {column} LIKE ? AND is_deleted = 0", (f'%"{identifier}"%',)
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def time_lookups(search, identifiers, expected):
+    latencies, hits = [], 0
+    for identifier, contact_id in zip(identifiers, expected):
+        start = time.perf_counter()
+        found = search(identifier)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += contact_id in found
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "hit_rate": hits / len(identifiers)
+    }
+
+
+def report(label, stats):
+    logger.info(f"{label:<32} p50 {stats['p50_ms']:8.3f} ms   p95 {stats['p95_ms']:8.3f} ms   hit rate {stats['hit_rate']:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contacts", type=int, default=50000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ContactsDatabase(str(Path(tmp) / "contacts.db"))
+        start = time.perf_counter()
+        contacts = []
+        for i in range(args.contacts):
+            number = f"{200 + i // 10000:03d}{i % 10000:07d}"
+            email = f"person.{i}@example{i % 50}.com"
+            phone = f"+1 ({number[:3]}) {number[3:6]}-{number[6:]}"
+            name = f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {surname(i)}"
+            contact_id = db.create_contact(name, emails=[email], phones=[phone])
+            contacts.append((contact_id, email, number, name))
+        logger.info(f"Created {args.contacts} contacts in {time.perf_counter() - start:.1f}s")
+
+        sample = rng.sample(contacts, args.lookups)
+        exact_emails = [email for _, email, _, _ in sample]
+        mixed_emails = [email.upper() for _, email, _, _ in sample]
+        reformatted_phones = [f"{n[:3]}.{n[3:6]}.{n[6:]}" for _, _, n, _ in sample]
+        full_names = [name for _, _, _, name in sample]
+        typo_names = [typo(name) for name in full_names]
+        expected = [contact_id for contact_id, _, _, _ in sample]
+
+        def indexed(identifier):
+            return [c["id"] for c in db.search_contacts(identifier, fuzzy_match=False)]
+
+        def legacy(identifier):
+            return legacy_search(db, identifier)
+
+        report("indexed / email (exact)", time_lookups(indexed, exact_emails, expected))
+        report("LIKE scan / email (exact)", time_lookups(legacy, exact_emails, expected))
+        report("indexed / email (mixed case)", time_lookups(indexed, mixed_emails, expected))
+        report("LIKE scan / email (mixed case)", time_lookups(legacy, mixed_emails, expected))
+        report("indexed / phone (reformatted)", time_lookups(indexed, reformatted_phones, expected))
+        report("LIKE scan / phone (reformatted)", time_lookups(legacy, reformatted_phones, expected))
+
+        def ranked(name):
+            return [c["id"] for c in db.search_contacts(name, name_limit=10)]
+
+        def like_scan(name):
+            cursor = db._get_connection().execute(
+                "SELECT id FROM contacts WHERE name LIKE ? AND is_deleted = 0", (f"%{name}%",)
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+        start = time.perf_counter()
+        db._get_name_scorer()
+        logger.info(f"Built name scorer over {args.contacts} contacts in {time.perf_counter() - start:.2f}s")
+        report("scorer / full name", time_lookups(ranked, full_names, expected))
+        report("LIKE scan / full name", time_lookups(like_scan, full_names, expected))
+        report("scorer / full name (typo)", time_lookups(ranked, typo_names, expected))
+        report("LIKE scan / full name (typo)", time_lookups(like_scan, typo_names, expected))
+
+        # A bare first name matches thousands of contacts; time ranking the top 10
+        latencies = []
+        for name in FIRST_NAMES:
+            start = time.perf_counter()
+            ranked(name)
+            latencies.append((time.perf_counter() - start) * 1000)
+        logger.info(f"{'scorer / first name (top 10)':<32} p50 {statistics.median(latencies):8.3f} ms   "
+                    f"max {max(latencies):8.3f} ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
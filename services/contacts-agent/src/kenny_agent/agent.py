@@ -21,9 +21,11 @@ from kenny_agent.health import HealthMonitor
 from .handlers.resolve import ResolveContactsHandler
 from .handlers.enrich import EnrichContactsHandler
 from .handlers.merge import MergeContactsHandler
+from .handlers.find_duplicates import FindDuplicatesHandler
 from .tools.contacts_bridge import ContactsBridgeTool
 from .tools.message_analyzer import MessageAnalyzer
 from .tools.memory_client import MemoryClient
+from .dedup import ContactDedupEngine
 
 
 class ContactsAgent(BaseAgent):
@@ -34,6 +36,7 @@ class ContactsAgent(BaseAgent):
     - contacts.resolve: Find and disambiguate contacts
     - contacts.enrich: Add additional contact information
     - contacts.merge: Merge duplicate contacts
+    - contacts.find_duplicates: Find clusters of likely duplicate contacts
     """
     
     def __init__(self):
@@ -54,9 +57,11 @@ class ContactsAgent(BaseAgent):
         )
         
         # Initialize tools
-        self.message_analyzer = MessageAnalyzer()
-        self.memory_client = MemoryClient()
         self.contacts_bridge_tool = ContactsBridgeTool()
+        self.message_analyzer = MessageAnalyzer(contacts_db=self.contacts_bridge_tool.db)
+        self.memory_client = MemoryClient()
+        # Shared by find_duplicates and merge so merges keep the index current
+        self.dedup_engine = ContactDedupEngine()
         
         # Register tools
         self.register_tool(self.contacts_bridge_tool)
@@ -71,6 +76,7 @@ class ContactsAgent(BaseAgent):
             memory_client=self.memory_client
         ))
         self.register_capability(MergeContactsHandler(agent=self))
+        self.register_capability(FindDuplicatesHandler(agent=self))
         
         # Initialize health monitor
         self.health_monitor = HealthMonitor(self)
@@ -3,10 +3,17 @@ SQLite database implementation for Contacts Agent.
 
 Provides local contact storage at ~/Library/Application Support/Kenny/contacts.db
 following the data model specifications.
+
+Emails, phones and platform handles are also kept normalized in the
+contact_identifiers table (lower-cased emails, E.164-style phones, bare
+handles) so resolving an identifier is an indexed lookup rather than a
+LIKE scan over the JSON columns.
 """
 
 import sqlite3
 import os
+import re
+import sys
 import json
 import uuid
 from datetime import datetime, timezone
@@ -14,8 +21,75 @@ from pathlib import Path
 from typing import Dict, List, Optional, Any
 import logging
 
+# Add the agent-sdk to the path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "agent-sdk"))
+
+from kenny_agent.contact_scoring import ContactScorer, match_confidence, normalize_text
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_COUNTRY_CODE = os.getenv("CONTACTS_DEFAULT_COUNTRY_CODE", "1")
+PHONE_PATTERN = re.compile(r'^\+?[\d\s\-\(\)\.]+$')
+PHONE_TAIL_DIGITS = 7
+
+
+def normalize_email(email: str) -> Optional[str]:
+    """Lower-case an email address, dropping any mailto: prefix."""
+    value = (email or "").strip().lower()
+    if value.startswith("mailto:"):
+        value = value[len("mailto:"):]
+    return value if "@" in value.strip("@") else None
+
+
+def normalize_phone(phone: str, default_country_code: str = None) -> Optional[str]:
+    """
+    Normalize a phone number to E.164 style (+<country><number>).
+    
+    Numbers without a country code get the default one (CONTACTS_DEFAULT_COUNTRY_CODE);
+    a leading national trunk 0 is dropped. Short local numbers are kept as bare digits.
+    """
+    value = (phone or "").strip()
+    if value.lower().startswith("tel:"):
+        value = value[4:]
+    digits = re.sub(r'\D', '', value)
+    if len(digits) < PHONE_TAIL_DIGITS:
+        return None
+    
+    country_code = default_country_code or DEFAULT_COUNTRY_CODE
+    if value.startswith("+"):
+        return f"+{digits}"
+    if digits.startswith("00"):
+        return f"+{digits[2:]}"
+    if country_code == "1" and len(digits) == 11 and digits.startswith("1"):
+        return f"+{digits}"
+    if country_code == "1" and len(digits) == 10:
+        return f"+1{digits}"
+    if country_code != "1" and digits.startswith("0") and len(digits) >= 9:
+        return f"+{country_code}{digits[1:]}"
+    return digits
+
+
+def normalize_handle(handle: str) -> Optional[str]:
+    """Normalize a platform handle (e.g. '@Johnny' -> 'johnny')."""
+    value = (handle or "").strip().lstrip("@").lower()
+    return value or None
+
+
+def classify_identifier(identifier: str) -> tuple:
+    """Classify an identifier as ('email'|'phone'|'handle'|'name', normalized value)."""
+    value = (identifier or "").strip()
+    if value.startswith("@") and "@" not in value[1:]:
+        return "handle", normalize_handle(value)
+    if "@" in value:
+        email = normalize_email(value)
+        if email:
+            return "email", email
+    if PHONE_PATTERN.match(value):
+        phone = normalize_phone(value)
+        if phone:
+            return "phone", phone
+    return "name", value
+
 
 class ContactsDatabase:
     """SQLite database for contacts management."""
@@ -36,6 +110,8 @@ class ContactsDatabase:
             self.db_path = db_path
         
         self._connection = None
+        self._name_scorer: Optional[ContactScorer] = None
+        self._scorer_data_version = None
         self._initialize_database()
     
     def _get_connection(self) -> sqlite3.Connection:
@@ -128,6 +204,21 @@ class ContactsDatabase:
             )
         ''')
         
+        # Create contact_identifiers table (normalized lookup keys)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS contact_identifiers (
+                identifier_type TEXT NOT NULL,
+                normalized_value TEXT NOT NULL,
+                contact_id TEXT NOT NULL,
+                raw_value TEXT NOT NULL,
+                platform TEXT NULL,
+                phone_tail TEXT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (identifier_type, normalized_value, contact_id),
+                FOREIGN KEY (contact_id) REFERENCES contacts(id)
+            ) WITHOUT ROWID
+        ''')
+        
         # Create indexes
         conn.execute('CREATE INDEX IF NOT EXISTS idx_contacts_name ON contacts(name)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_contacts_external_id ON contacts(external_id)')  
@@ -136,8 +227,17 @@ class ContactsDatabase:
         conn.execute('CREATE INDEX IF NOT EXISTS idx_contact_enrichments_type ON contact_enrichments(enrichment_type)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_contact_relationships_contact_id ON contact_relationships(contact_id)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_contact_sync_log_status ON contact_sync_log(status)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_contact_identifiers_contact_id ON contact_identifiers(contact_id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_contact_identifiers_phone_tail ON contact_identifiers(phone_tail) WHERE phone_tail IS NOT NULL')
         
         conn.commit()
+        
+        # Index contacts created before the identifier table existed
+        has_contacts = conn.execute('SELECT 1 FROM contacts LIMIT 1').fetchone()
+        has_identifiers = conn.execute('SELECT 1 FROM contact_identifiers LIMIT 1').fetchone()
+        if has_contacts and not has_identifiers:
+            self.rebuild_identifier_index()
+        
         logger.info(f"Database initialized at {self.db_path}")
     
     def get_contact_by_id(self, contact_id: str) -> Optional[Dict[str, Any]]:
@@ -149,49 +249,255 @@ class ContactsDatabase:
             return self._row_to_contact_dict(row)
         return None
     
-    def search_contacts(self, identifier: str, platform: Optional[str] = None, fuzzy_match: bool = True) -> List[Dict[str, Any]]:
-        """Search for contacts by identifier (email, phone, name)."""
+    def search_contacts(self, identifier: str, platform: Optional[str] = None, fuzzy_match: bool = True,
+                        name_limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Search for contacts by identifier (email, phone, handle, name).
+        
+        Emails, phones and handles resolve through the normalized identifier
+        index. Names (and identifiers with no indexed match when fuzzy_match is
+        set) go through the separate, ranked name path.
+        """
+        identifier = (identifier or "").strip()
+        kind, normalized = classify_identifier(identifier)
+        unique_contacts = {}
+        
+        if kind != "name":
+            for contact in self.lookup_identifier(kind, normalized, platform):
+                unique_contacts.setdefault(contact['id'], contact)
+        
+        if kind == "name" or (fuzzy_match and not unique_contacts):
+            for contact in self._search_by_name(identifier, fuzzy_match, name_limit):
+                unique_contacts.setdefault(contact['id'], contact)
+        
+        return sorted(unique_contacts.values(),
+                      key=lambda c: (-c['confidence'], normalize_text(c.get('name') or ''), c['id']))
+    
+    def lookup_identifier(self, identifier_type: str, normalized_value: str,
+                          platform: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Exact indexed lookup of an already-normalized email, phone or handle."""
         conn = self._get_connection()
-        contacts = []
+        params = [identifier_type, normalized_value]
+        platform_clause = ""
+        if identifier_type == "handle" and platform:
+            platform_clause = " AND (i.platform = ? OR i.platform IS NULL)"
+            params.append(platform)
         
-        # Search by email (exact match in JSON array)
-        if "@" in identifier:
-            cursor = conn.execute(
-                "SELECT * FROM contacts WHERE emails LIKE ? AND is_deleted = 0",
-                (f'%"{identifier}"%',)
-            )
-            contacts.extend([self._row_to_contact_dict(row) for row in cursor.fetchall()])
+        rows = conn.execute(f'''
+            SELECT c.*, i.raw_value AS matched_value FROM contact_identifiers i
+            JOIN contacts c ON c.id = i.contact_id
+            WHERE i.identifier_type = ? AND i.normalized_value = ? AND c.is_deleted = 0{platform_clause}
+        ''', params).fetchall()
+        confidence = {"email": 0.95, "phone": 0.90, "handle": 0.90}[identifier_type]
+        matches = [self._identifier_match(row, identifier_type, confidence) for row in rows]
         
-        # Search by phone (exact match in JSON array)  
-        elif any(c.isdigit() for c in identifier):
-            cursor = conn.execute(
-                "SELECT * FROM contacts WHERE phones LIKE ? AND is_deleted = 0",
-                (f'%"{identifier}"%',)
-            )
-            contacts.extend([self._row_to_contact_dict(row) for row in cursor.fetchall()])
+        # A number written without its country code is a suffix of the stored one (or vice versa);
+        # numbers with different country codes do not match
+        if identifier_type == "phone" and not matches:
+            digits = normalized_value.lstrip("+")
+            rows = conn.execute('''
+                SELECT c.*, i.raw_value AS matched_value, i.normalized_value AS matched_normalized
+                FROM contact_identifiers i
+                JOIN contacts c ON c.id = i.contact_id
+                WHERE i.phone_tail = ? AND c.is_deleted = 0
+            ''', (digits[-PHONE_TAIL_DIGITS:],)).fetchall()
+            for row in rows:
+                stored = row['matched_normalized'].lstrip("+")
+                if stored.endswith(digits) or digits.endswith(stored):
+                    matches.append(self._identifier_match(row, "phone_suffix", 0.80))
         
-        # Search by name
-        if fuzzy_match:
-            cursor = conn.execute(
-                "SELECT * FROM contacts WHERE name LIKE ? AND is_deleted = 0",
-                (f'%{identifier}%',)
-            )
-        else:
+        unique = {}
+        for match in matches:
+            unique.setdefault(match['id'], match)
+        return list(unique.values())
+    
+    def _identifier_match(self, row: sqlite3.Row, match_type: str, confidence: float) -> Dict[str, Any]:
+        contact = dict(row)
+        matched_value = contact.pop('matched_value', None)
+        contact.pop('matched_normalized', None)
+        contact = self._row_to_contact_dict(contact)
+        contact['confidence'] = confidence
+        contact['match_type'] = match_type
+        contact['matched_identifier'] = matched_value
+        return contact
+    
+    def _search_by_name(self, name: str, fuzzy_match: bool, limit: int) -> List[Dict[str, Any]]:
+        """Ranked name matching with the shared contact scorer (exact, word, prefix, substring, fuzzy)."""
+        conn = self._get_connection()
+        if not fuzzy_match:
             cursor = conn.execute(
                 "SELECT * FROM contacts WHERE name = ? AND is_deleted = 0",
-                (identifier,)
+                (name,)
             )
-        contacts.extend([self._row_to_contact_dict(row) for row in cursor.fetchall()])
+            contacts = []
+            for row in cursor.fetchall():
+                contact = self._row_to_contact_dict(row)
+                contact['confidence'] = self._calculate_confidence(contact, name)
+                contact['match_type'] = "name"
+                contacts.append(contact)
+            return contacts
         
-        # Remove duplicates and add confidence scores
-        unique_contacts = {}
-        for contact in contacts:
-            contact_id = contact['id']
-            if contact_id not in unique_contacts:
-                contact['confidence'] = self._calculate_confidence(contact, identifier)
-                unique_contacts[contact_id] = contact
+        if not normalize_text(name):
+            # Nothing to score against: list every contact
+            cursor = conn.execute("SELECT * FROM contacts WHERE is_deleted = 0 ORDER BY name")
+            contacts = [self._row_to_contact_dict(row) for row in cursor.fetchall()]
+            for contact in contacts:
+                contact['confidence'] = 0.0
+                contact['match_type'] = "name"
+            return contacts
+        
+        ranked = self._get_name_scorer().rank(name, limit)
+        if not ranked:
+            return []
+        ids = [contact_id for contact_id, _, _ in ranked]
+        placeholders = ",".join("?" * len(ids))
+        rows = {row['id']: row for row in conn.execute(f"SELECT * FROM contacts WHERE id IN ({placeholders})", ids)}
+        
+        contacts = []
+        for contact_id, confidence, match_type in ranked:
+            if contact_id in rows:
+                contact = self._row_to_contact_dict(rows[contact_id])
+                contact['confidence'] = confidence
+                contact['match_type'] = match_type
+                contacts.append(contact)
+        return contacts
+    
+    def _get_name_scorer(self) -> ContactScorer:
+        """
+        Scorer over every live contact, built once and kept current by this
+        connection's writes; rebuilt if another connection changed the database.
+        """
+        conn = self._get_connection()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._name_scorer is None or data_version != self._scorer_data_version:
+            rows = conn.execute("SELECT id, name, emails, phones, company FROM contacts WHERE is_deleted = 0")
+            self._name_scorer = ContactScorer(self._scoring_fields(row) for row in rows)
+            self._scorer_data_version = data_version
+        return self._name_scorer
+    
+    def _scoring_fields(self, row) -> Dict[str, Any]:
+        try:
+            emails = json.loads(row['emails']) if row['emails'] else []
+            phones = json.loads(row['phones']) if row['phones'] else []
+        except json.JSONDecodeError:
+            emails, phones = [], []
+        return {"id": row['id'], "name": row['name'], "emails": emails, "phones": phones, "company": row['company']}
+    
+    def _identifier_rows(self, contact_id: str, emails: List[str], phones: List[str],
+                         handles: Optional[Dict[str, Any]], now: str) -> List[tuple]:
+        """Normalized identifier rows for a contact's emails, phones and handles."""
+        rows = []
+        for email in emails or []:
+            normalized = normalize_email(email)
+            if normalized:
+                rows.append(("email", normalized, contact_id, email, None, None, now))
+        for phone in phones or []:
+            normalized = normalize_phone(phone)
+            if normalized:
+                tail = normalized.lstrip("+")[-PHONE_TAIL_DIGITS:]
+                rows.append(("phone", normalized, contact_id, phone, None, tail, now))
+        for platform, values in (handles or {}).items():
+            for handle in ([values] if isinstance(values, str) else values):
+                normalized = normalize_handle(handle)
+                if normalized:
+                    rows.append(("handle", normalized, contact_id, handle, platform, None, now))
+        return rows
+    
+    def _index_identifiers(self, conn: sqlite3.Connection, rows: List[tuple]):
+        conn.executemany('''
+            INSERT OR IGNORE INTO contact_identifiers (
+                identifier_type, normalized_value, contact_id, raw_value, platform, phone_tail, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+    
+    def add_contact_identifiers(self, contact_id: str, emails: List[str] = None, phones: List[str] = None,
+                                handles: Optional[Dict[str, Any]] = None) -> int:
+        """Index additional identifiers (e.g. a platform handle) for an existing contact."""
+        rows = self._identifier_rows(contact_id, emails, phones, handles, datetime.now(timezone.utc).isoformat())
+        conn = self._get_connection()
+        self._index_identifiers(conn, rows)
+        conn.commit()
+        return len(rows)
+    
+    def rebuild_identifier_index(self) -> int:
+        """Rebuild the identifier index from the contacts table's emails and phones."""
+        conn = self._get_connection()
+        now = datetime.now(timezone.utc).isoformat()
+        indexed = 0
+        
+        # Keep handles, which only live in the index
+        conn.execute("DELETE FROM contact_identifiers WHERE identifier_type != 'handle'")
+        cursor = conn.execute("SELECT id, emails, phones FROM contacts")
+        while True:
+            batch = cursor.fetchmany(1000)
+            if not batch:
+                break
+            rows = []
+            for row in batch:
+                try:
+                    emails = json.loads(row['emails']) if row['emails'] else []
+                    phones = json.loads(row['phones']) if row['phones'] else []
+                except json.JSONDecodeError:
+                    continue
+                rows.extend(self._identifier_rows(row['id'], emails, phones, None, now))
+            self._index_identifiers(conn, rows)
+            indexed += len(rows)
+        conn.commit()
         
-        return list(unique_contacts.values())
+        logger.info(f"Rebuilt contact identifier index with {indexed} identifiers")
+        return indexed
+    
+    def merge_contacts(self, primary_contact_id: str, duplicate_contact_ids: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Merge duplicates into the primary contact.
+        
+        Emails and phones are unioned (deduplicated by normalized value), the
+        duplicates are soft-deleted and their identifiers move to the primary.
+        """
+        primary = self.get_contact_by_id(primary_contact_id)
+        if not primary:
+            return None
+        duplicates = [c for c in (self.get_contact_by_id(i) for i in duplicate_contact_ids if i != primary_contact_id) if c]
+        
+        def union(values, normalize):
+            merged, seen = [], set()
+            for value in values:
+                key = normalize(value) or value
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(value)
+            return merged
+        
+        emails = union(primary['emails'] + [e for c in duplicates for e in c['emails']], normalize_email)
+        phones = union(primary['phones'] + [p for c in duplicates for p in c['phones']], normalize_phone)
+        now = datetime.now(timezone.utc).isoformat()
+        duplicate_ids = [c['id'] for c in duplicates]
+        
+        conn = self._get_connection()
+        with conn:
+            conn.execute(
+                "UPDATE contacts SET emails = ?, phones = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(emails), json.dumps(phones), now, primary_contact_id)
+            )
+            if duplicate_ids:
+                placeholders = ",".join("?" * len(duplicate_ids))
+                conn.execute(
+                    f"UPDATE contacts SET is_deleted = 1, updated_at = ? WHERE id IN ({placeholders})",
+                    [now, *duplicate_ids]
+                )
+                conn.execute(
+                    f"UPDATE OR IGNORE contact_identifiers SET contact_id = ? WHERE contact_id IN ({placeholders})",
+                    [primary_contact_id, *duplicate_ids]
+                )
+                conn.execute(f"DELETE FROM contact_identifiers WHERE contact_id IN ({placeholders})", duplicate_ids)
+        
+        logger.info(f"Merged {len(duplicate_ids)} contacts into {primary_contact_id}")
+        merged = self.get_contact_by_id(primary_contact_id)
+        if self._name_scorer is not None:
+            for duplicate_id in duplicate_ids:
+                self._name_scorer.remove(duplicate_id)
+            self._name_scorer.add(merged)
+        return merged
     
     def create_contact(self, name: str, emails: List[str] = None, phones: List[str] = None, 
                       source_app: str = "contacts-agent", **kwargs) -> str:
@@ -222,8 +528,13 @@ class ContactsDatabase:
             kwargs.get('last_synced'),
             0
         ))
+        self._index_identifiers(conn, self._identifier_rows(contact_id, emails, phones, kwargs.get('handles'), now))
         conn.commit()
         
+        if self._name_scorer is not None:
+            self._name_scorer.add({"id": contact_id, "name": name, "emails": emails or [], "phones": phones or [],
+                                   "company": kwargs.get('company')})
+        
         logger.info(f"Created contact {contact_id}: {name}")
         return contact_id
     
@@ -272,7 +583,7 @@ class ContactsDatabase:
             self._connection.close()
             self._connection = None
     
-    def _row_to_contact_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+    def _row_to_contact_dict(self, row) -> Dict[str, Any]:
         """Convert SQLite row to contact dictionary."""
         contact = dict(row)
         
@@ -289,18 +600,5 @@ class ContactsDatabase:
         return contact
     
     def _calculate_confidence(self, contact: Dict[str, Any], identifier: str) -> float:
-        """Calculate confidence score for contact match."""
-        # Simple confidence scoring - can be enhanced
-        name = contact.get('name', '').lower()
-        identifier_lower = identifier.lower()
-        
-        if identifier_lower == name:
-            return 1.0
-        elif identifier_lower in name or name in identifier_lower:
-            return 0.85
-        elif "@" in identifier and any(identifier in email for email in contact.get('emails', [])):
-            return 0.95
-        elif any(c.isdigit() for c in identifier) and any(identifier in phone for phone in contact.get('phones', [])):
-            return 0.90
-        else:
-            return 0.70
\ No newline at end of file
+        """Calculate confidence score for a name match on the shared contact scoring scale."""
+        return match_confidence(identifier, contact)
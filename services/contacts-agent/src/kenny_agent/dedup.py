@@ -0,0 +1,479 @@
+"""
+Duplicate contact discovery for Contacts, iMessage handles and WhatsApp senders.
+
+Comparing every pair of records is O(n^2), so candidate pairs come from
+blocking instead:
+
+- exact blocks on normalized email, phone tail (last 7 digits), platform
+  handle and normalized full name
+- multi-pass sorted neighbourhood over name keys (tokens sorted, and
+  surname-first), comparing each record only with its nearest neighbours
+
+Only candidate pairs are scored. Pairs at or above the threshold become
+edges, and a union-find over the edges yields the duplicate clusters. Scores
+are kept per record, so when one contact changes only that record's
+candidates are re-scored.
+"""
+
+import asyncio
+import bisect
+import os
+import re
+import time
+import unicodedata
+import logging
+from difflib import SequenceMatcher
+from typing import Dict, List, Any, Optional, Iterable, Set, Tuple
+
+from .database import normalize_email, normalize_phone, normalize_handle, PHONE_TAIL_DIGITS
+
+logger = logging.getLogger(__name__)
+
+NAME_TOKEN_PATTERN = re.compile(r"[^\w\s]")
+
+# Pair scores for shared identifiers (in line with ContactsDatabase.lookup_identifier)
+IDENTIFIER_SCORES = {"email": 0.95, "phone": 0.90, "handle": 0.90, "phone_suffix": 0.80}
+# A name match alone is weaker evidence than a shared identifier
+NAME_ONLY_WEIGHT = 0.85
+# Shared identifier but clearly different full names (shared family or office number)
+CONFLICTING_NAME_WEIGHT = 0.75
+# Same name, but both records carry emails (or phones) and none are shared
+CONFLICTING_IDENTIFIER_WEIGHTS = {0: 1.0, 1: 0.95, 2: 0.8}
+# Edit-distance ratio rarely exceeds the name-bigram Dice coefficient by more than this
+BIGRAM_MARGIN = 0.15
+
+
+def normalize_name_tokens(name: str) -> List[str]:
+    """Lower-case, strip accents and punctuation, and split a name into tokens."""
+    value = unicodedata.normalize("NFKD", name or "")
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    return NAME_TOKEN_PATTERN.sub(" ", value.lower()).split()
+
+
+class UnionFind:
+    """Disjoint sets with path compression and union by size."""
+
+    def __init__(self):
+        """Initialize empty sets."""
+        self.parent: Dict[str, str] = {}
+        self.size: Dict[str, int] = {}
+
+    def find(self, item: str) -> str:
+        parent = self.parent.setdefault(item, item)
+        if parent == item:
+            self.size.setdefault(item, 1)
+            return item
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a: str, b: str):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size.pop(root_b)
+
+    def groups(self) -> List[List[str]]:
+        groups: Dict[str, List[str]] = {}
+        for item in self.parent:
+            groups.setdefault(self.find(item), []).append(item)
+        return list(groups.values())
+
+
+class ContactRecord:
+    """A contact (or bare platform sender) prepared for blocking and scoring."""
+
+    __slots__ = ("id", "name", "source", "tokens", "token_set", "name_key", "bigrams",
+                 "emails", "phones", "phone_tails", "handles")
+
+    def __init__(self, record: Dict[str, Any]):
+        """Normalize a record's name and identifiers."""
+        self.id = str(record["id"])
+        self.name = record.get("name") or ""
+        self.source = record.get("source", "contacts")
+        self.tokens = normalize_name_tokens(self.name)
+        self.token_set = set(self.tokens)
+        self.name_key = " ".join(sorted(self.tokens))
+        padded = f" {self.name_key} "
+        self.bigrams = {padded[i:i + 2] for i in range(len(padded) - 1)}
+        self.emails = {e for e in (normalize_email(v) for v in record.get("emails") or []) if e}
+        self.phones = {p for p in (normalize_phone(v) for v in record.get("phones") or []) if p}
+        self.phone_tails = {p.lstrip("+")[-PHONE_TAIL_DIGITS:] for p in self.phones}
+        handles = record.get("handles") or []
+        if isinstance(handles, dict):
+            handles = [h for values in handles.values() for h in ([values] if isinstance(values, str) else values)]
+        self.handles = {h for h in (normalize_handle(v) for v in handles) if h}
+
+    def block_keys(self) -> Set[str]:
+        keys = {f"e:{email}" for email in self.emails}
+        keys.update(f"p:{tail}" for tail in self.phone_tails)
+        keys.update(f"h:{handle}" for handle in self.handles)
+        if self.name_key:
+            keys.add(f"n:{self.name_key}")
+        return keys
+
+    def sort_keys(self) -> List[Tuple[int, str]]:
+        """(pass, key) pairs for the sorted-neighbourhood passes."""
+        if not self.tokens:
+            return []
+        keys = [(0, self.name_key)]
+        if len(self.tokens) > 1:
+            keys.append((1, " ".join([self.tokens[-1], *self.tokens[:-1]])))
+        return keys
+
+
+def name_similarity(a: ContactRecord, b: ContactRecord, cutoff: float = 0.0) -> float:
+    """
+    Similarity of two names in [0, 1], insensitive to token order.
+
+    Returns 0.0 as soon as the similarity is known (or, from the bigram
+    overlap, very likely) to be below cutoff, so most candidate pairs never
+    reach the slow edit-distance ratio.
+    """
+    if not a.tokens or not b.tokens:
+        return 0.0
+    if a.name_key == b.name_key:
+        return 1.0
+    jaccard = len(a.token_set & b.token_set) / len(a.token_set | b.token_set)
+    length_a, length_b = len(a.name_key), len(b.name_key)
+    if max(jaccard, 2 * min(length_a, length_b) / (length_a + length_b)) < cutoff:
+        return 0.0
+    dice = 2 * len(a.bigrams & b.bigrams) / (len(a.bigrams) + len(b.bigrams))
+    if max(jaccard, dice + BIGRAM_MARGIN) < cutoff:
+        return 0.0
+    similarity = max(jaccard, SequenceMatcher(None, a.name_key, b.name_key).ratio())
+    return similarity if similarity >= cutoff else 0.0
+
+
+def score_pair(a: ContactRecord, b: ContactRecord, threshold: float = 0.0) -> Tuple[float, List[str]]:
+    """
+    Score how likely two records are the same person.
+
+    Args:
+        threshold: Scores below this are not needed exactly, which lets
+            name comparison stop early
+
+    Returns:
+        (score in [0, 1], reasons)
+    """
+    reasons = []
+    identifier_score = 0.0
+    if a.emails & b.emails:
+        reasons.append("email")
+        identifier_score = max(identifier_score, IDENTIFIER_SCORES["email"])
+    if a.phones & b.phones:
+        reasons.append("phone")
+        identifier_score = max(identifier_score, IDENTIFIER_SCORES["phone"])
+    elif a.phone_tails & b.phone_tails:
+        # Same number with or without a country code
+        digits_a = [p.lstrip("+") for p in a.phones]
+        digits_b = [p.lstrip("+") for p in b.phones]
+        if any(x.endswith(y) or y.endswith(x) for x in digits_a for y in digits_b):
+            reasons.append("phone_suffix")
+            identifier_score = max(identifier_score, IDENTIFIER_SCORES["phone_suffix"])
+    if a.handles & b.handles:
+        reasons.append("handle")
+        identifier_score = max(identifier_score, IDENTIFIER_SCORES["handle"])
+
+    cutoff = 0.5 if identifier_score else min(1.0, threshold / NAME_ONLY_WEIGHT)
+    similarity = name_similarity(a, b, cutoff)
+    if similarity:
+        reasons.append(f"name:{similarity:.2f}")
+
+    if identifier_score:
+        # Single names ("Mike", "Mom") are often nicknames, so only two full names can conflict
+        if len(a.tokens) > 1 and len(b.tokens) > 1 and similarity < 0.5:
+            return identifier_score * CONFLICTING_NAME_WEIGHT, reasons
+        return min(1.0, identifier_score + 0.05 * similarity), reasons
+
+    # Two same-named people usually have different addresses and numbers
+    conflicts = (bool(a.emails and b.emails)) + (bool(a.phones and b.phones) and "phone_suffix" not in reasons)
+    if conflicts:
+        reasons.append("conflicting_identifiers")
+    return NAME_ONLY_WEIGHT * similarity * CONFLICTING_IDENTIFIER_WEIGHTS[conflicts], reasons
+
+
+class ContactDedupEngine:
+    """Blocked duplicate detection with union-find clustering and incremental updates."""
+
+    def __init__(self, threshold: Optional[float] = None, window: Optional[int] = None,
+                 max_block_size: Optional[int] = None):
+        """
+        Initialize the dedup engine.
+
+        Args:
+            threshold: Minimum pair score for a duplicate (CONTACTS_DEDUP_THRESHOLD)
+            window: Sorted-neighbourhood window on each side (CONTACTS_DEDUP_WINDOW)
+            max_block_size: Exact blocks larger than this are too common to
+                discriminate and are skipped (CONTACTS_DEDUP_MAX_BLOCK)
+        """
+        self.threshold = threshold if threshold is not None else float(os.getenv("CONTACTS_DEDUP_THRESHOLD", "0.8"))
+        self.window = window or int(os.getenv("CONTACTS_DEDUP_WINDOW", "4"))
+        self.max_block_size = max_block_size or int(os.getenv("CONTACTS_DEDUP_MAX_BLOCK", "50"))
+
+        self.records: Dict[str, ContactRecord] = {}
+        self._blocks: Dict[str, Set[str]] = {}
+        self._sorted: Dict[int, List[Tuple[str, str]]] = {0: [], 1: []}
+        # id -> {other id: (score, reasons)} for pairs at or above the threshold
+        self._edges: Dict[str, Dict[str, Tuple[float, List[str]]]] = {}
+        self.loaded = False
+        # Held by every caller that builds or updates the index, including merges
+        self.lock = asyncio.Lock()
+
+        self.metrics = {
+            "records": 0,
+            "candidate_pairs": 0,
+            "scored_pairs": 0,
+            "skipped_blocks": 0,
+            "last_build_time": 0.0,
+            "last_update_time": 0.0
+        }
+
+    # Building
+
+    def build(self, records: Iterable[Dict[str, Any]]):
+        """Index records and score all candidate pairs from scratch."""
+        started = time.perf_counter()
+        self.records = {}
+        self._blocks = {}
+        self._sorted = {0: [], 1: []}
+        self._edges = {}
+
+        for raw in records:
+            record = ContactRecord(raw)
+            self.records[record.id] = record
+            for key in record.block_keys():
+                self._blocks.setdefault(key, set()).add(record.id)
+            for pass_no, key in record.sort_keys():
+                self._sorted[pass_no].append((key, record.id))
+        for entries in self._sorted.values():
+            entries.sort()
+
+        pairs = self._all_candidate_pairs()
+        self.metrics["candidate_pairs"] = len(pairs)
+        for a, b in pairs:
+            self._score_and_link(a, b)
+
+        self.loaded = True
+        self.metrics["records"] = len(self.records)
+        self.metrics["last_build_time"] = time.perf_counter() - started
+        logger.info(f"Dedup index built over {len(self.records)} records, "
+                    f"{len(pairs)} candidate pairs in {self.metrics['last_build_time']:.2f}s")
+
+    def build_from_database(self, db, extra_records: Optional[Iterable[Dict[str, Any]]] = None):
+        """Build from stored contacts (with their indexed handles) plus optional platform senders."""
+        self.build([*contact_records_from_database(db), *(extra_records or [])])
+
+    def _all_candidate_pairs(self) -> Set[Tuple[str, str]]:
+        pairs: Set[Tuple[str, str]] = set()
+        skipped = 0
+        for key, members in self._blocks.items():
+            if len(members) < 2:
+                continue
+            if len(members) > self.max_block_size:
+                skipped += 1
+                continue
+            ordered = sorted(members)
+            for i, a in enumerate(ordered):
+                for b in ordered[i + 1:]:
+                    pairs.add((a, b))
+        for entries in self._sorted.values():
+            for i, (_, a) in enumerate(entries):
+                for _, b in entries[i + 1:i + 1 + self.window]:
+                    if a != b:
+                        pairs.add((a, b) if a < b else (b, a))
+        self.metrics["skipped_blocks"] = skipped
+        return pairs
+
+    def _candidates_for(self, record: ContactRecord) -> Set[str]:
+        candidates: Set[str] = set()
+        for key in record.block_keys():
+            members = self._blocks.get(key, ())
+            if 1 < len(members) <= self.max_block_size:
+                candidates.update(members)
+        for pass_no, key in record.sort_keys():
+            entries = self._sorted[pass_no]
+            position = bisect.bisect_left(entries, (key, record.id))
+            start = max(0, position - self.window)
+            candidates.update(other for _, other in entries[start:position + self.window + 1])
+        candidates.discard(record.id)
+        return candidates
+
+    def _score_and_link(self, a: str, b: str):
+        self.metrics["scored_pairs"] += 1
+        score, reasons = score_pair(self.records[a], self.records[b], self.threshold)
+        if score >= self.threshold:
+            self._edges.setdefault(a, {})[b] = (score, reasons)
+            self._edges.setdefault(b, {})[a] = (score, reasons)
+
+    # Incremental updates
+
+    def _unindex(self, record_id: str):
+        record = self.records.pop(record_id, None)
+        if record is None:
+            return
+        for key in record.block_keys():
+            members = self._blocks.get(key)
+            if members is not None:
+                members.discard(record_id)
+                if not members:
+                    del self._blocks[key]
+        for pass_no, key in record.sort_keys():
+            entries = self._sorted[pass_no]
+            position = bisect.bisect_left(entries, (key, record_id))
+            if position < len(entries) and entries[position] == (key, record_id):
+                entries.pop(position)
+        for other in self._edges.pop(record_id, {}):
+            self._edges.get(other, {}).pop(record_id, None)
+
+    def update(self, raw: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Add or replace one record and re-score only its candidates.
+
+        Returns:
+            Duplicate clusters that contain the record
+        """
+        started = time.perf_counter()
+        record = ContactRecord(raw)
+        self._unindex(record.id)
+
+        self.records[record.id] = record
+        for key in record.block_keys():
+            self._blocks.setdefault(key, set()).add(record.id)
+        for pass_no, key in record.sort_keys():
+            bisect.insort(self._sorted[pass_no], (key, record.id))
+
+        for other in self._candidates_for(record):
+            self._score_and_link(*sorted((record.id, other)))
+
+        self.metrics["records"] = len(self.records)
+        self.metrics["last_update_time"] = time.perf_counter() - started
+        return self.find_duplicates(contact_id=record.id)
+
+    def remove(self, record_ids: Iterable[str]):
+        """Drop records (e.g. after a merge) and their edges."""
+        for record_id in record_ids:
+            self._unindex(str(record_id))
+        self.metrics["records"] = len(self.records)
+
+    # Clusters
+
+    def find_duplicates(self, contact_id: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Group linked records into duplicate clusters.
+
+        Args:
+            contact_id: Only return the cluster containing this record
+            limit: Maximum number of clusters, largest and most confident first
+
+        Returns:
+            Clusters with member ids, a suggested primary, confidence and scored pairs
+        """
+        if contact_id is not None:
+            # One contact's cluster only needs a walk over its own component
+            groups = [self._component(str(contact_id))]
+        else:
+            union_find = UnionFind()
+            for a, neighbours in self._edges.items():
+                for b in neighbours:
+                    union_find.union(a, b)
+            groups = union_find.groups()
+
+        clusters = []
+        for members in groups:
+            if len(members) < 2:
+                continue
+            members.sort()
+            member_set = set(members)
+            pairs = [
+                {"contact_ids": [a, b], "score": round(score, 3), "reasons": reasons}
+                for a in members for b, (score, reasons) in self._edges.get(a, {}).items()
+                if a < b and b in member_set
+            ]
+            pairs.sort(key=lambda p: -p["score"])
+            clusters.append({
+                "contact_ids": members,
+                "primary_contact_id": self._suggest_primary(members),
+                "confidence": round(min(p["score"] for p in pairs), 3),
+                "sources": sorted({self.records[m].source for m in members}),
+                "pairs": pairs
+            })
+
+        clusters.sort(key=lambda c: (-len(c["contact_ids"]), -c["confidence"], c["contact_ids"][0]))
+        return clusters[:limit] if limit else clusters
+
+    def _component(self, record_id: str) -> List[str]:
+        seen = {record_id}
+        stack = [record_id]
+        while stack:
+            for other in self._edges.get(stack.pop(), {}):
+                if other not in seen:
+                    seen.add(other)
+                    stack.append(other)
+        return list(seen)
+
+    def _suggest_primary(self, members: List[str]) -> str:
+        """Prefer stored contacts, then the record with the most identifiers."""
+        def rank(record_id):
+            record = self.records[record_id]
+            identifiers = len(record.emails) + len(record.phones) + len(record.handles)
+            return (record.source != "contacts", -identifiers, -len(record.name), record_id)
+        return min(members, key=rank)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get index size and scoring counters."""
+        return {
+            **self.metrics,
+            "blocks": len(self._blocks),
+            "linked_records": len(self._edges),
+            "threshold": self.threshold,
+            "window": self.window
+        }
+
+
+def contact_records_from_database(db, contact_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Read stored contacts with their indexed platform handles as dedup records.
+
+    Args:
+        db: ContactsDatabase
+        contact_ids: Only these contacts (default: every live contact)
+    """
+    conn = db._get_connection()
+    id_clause, params = "", []
+    if contact_ids is not None:
+        if not contact_ids:
+            return []
+        id_clause = f" AND id IN ({','.join('?' * len(contact_ids))})"
+        params = list(contact_ids)
+
+    handles: Dict[str, List[str]] = {}
+    for row in conn.execute(
+        "SELECT contact_id, normalized_value FROM contact_identifiers WHERE identifier_type = 'handle'"
+        + id_clause.replace(" id IN", " contact_id IN"), params
+    ):
+        handles.setdefault(row[0], []).append(row[1])
+
+    rows = conn.execute(
+        "SELECT id, name, emails, phones, interests, family_members, events FROM contacts "
+        "WHERE is_deleted = 0" + id_clause, params
+    )
+    return [contact_record(db._row_to_contact_dict(row), handles.get(row["id"])) for row in rows]
+
+
+def contact_record(contact: Dict[str, Any], handles: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Dedup record for a stored contact."""
+    return {
+        "id": contact["id"],
+        "name": contact.get("name"),
+        "emails": contact.get("emails") or [],
+        "phones": contact.get("phones") or [],
+        "handles": handles or [],
+        "source": "contacts"
+    }
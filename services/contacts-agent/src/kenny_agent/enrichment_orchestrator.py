@@ -0,0 +1,233 @@
+"""
+Concurrent fan-out over contact enrichment sources.
+
+Each source (iMessage history, email, memories, other agents) is an async
+fetch function. The orchestrator starts every source at once under one
+shared deadline, returns whatever finished in time with the rest marked as
+timed out, and caches each (contact, source) result for a TTL so repeated
+enrichment of the same contact does not re-query every platform. Sources
+that can serve many contacts in one call (such as a single pass over
+chat.db) register a batch fetch used by enrich_batch.
+"""
+
+import asyncio
+import os
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Tuple
+
+logger = logging.getLogger(__name__)
+
+Fetch = Callable[[Dict[str, Any]], Awaitable[Any]]
+BatchFetch = Callable[[List[Dict[str, Any]]], Awaitable[Dict[str, Any]]]
+
+
+class TTLCache:
+    """Small in-memory cache with per-entry expiry and LRU eviction."""
+
+    def __init__(self, ttl: float, max_entries: int = 2048):
+        """Initialize the cache."""
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: Tuple, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, prefix: Optional[str] = None):
+        if prefix is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if k[0] == prefix or k[0].startswith(f"{prefix}|")]:
+            del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class EnrichmentOrchestrator:
+    """Run enrichment sources concurrently with a shared deadline and a result cache."""
+
+    def __init__(self, deadline: Optional[float] = None, cache_ttl: Optional[float] = None,
+                 max_concurrency: Optional[int] = None):
+        """
+        Initialize the enrichment orchestrator.
+
+        Args:
+            deadline: Seconds every source shares per enrichment (CONTACTS_ENRICH_DEADLINE)
+            cache_ttl: Seconds a (contact, source) result stays cached (CONTACTS_ENRICH_CACHE_TTL)
+            max_concurrency: Per-contact fetches in flight during batch enrichment
+        """
+        self.deadline = deadline if deadline is not None else float(os.getenv("CONTACTS_ENRICH_DEADLINE", "5.0"))
+        ttl = cache_ttl if cache_ttl is not None else float(os.getenv("CONTACTS_ENRICH_CACHE_TTL", "300"))
+        self.cache = TTLCache(ttl)
+        self.max_concurrency = max_concurrency or int(os.getenv("CONTACTS_ENRICH_CONCURRENCY", "8"))
+
+        self._sources: Dict[str, Fetch] = {}
+        self._batch_sources: Dict[str, BatchFetch] = {}
+
+        self.metrics = {
+            "enrichments": 0,
+            "source_calls": 0,
+            "cache_hits": 0,
+            "timeouts": 0,
+            "errors": 0
+        }
+
+    def register_source(self, name: str, fetch: Fetch, batch_fetch: Optional[BatchFetch] = None):
+        """
+        Register an enrichment source.
+
+        Args:
+            name: Source name used in results and cache keys
+            fetch: Async function taking a contact dict
+            batch_fetch: Optional async function taking a list of contact dicts and
+                returning results keyed by contact_id
+        """
+        self._sources[name] = fetch
+        if batch_fetch is not None:
+            self._batch_sources[name] = batch_fetch
+
+    @property
+    def sources(self) -> List[str]:
+        return list(self._sources)
+
+    @staticmethod
+    def _cache_key(contact: Dict[str, Any], source: str) -> Tuple[str, str]:
+        # cache_key lets callers vary the key by request shape, e.g. "<contact_id>|<lookback_days>"
+        return (str(contact.get("cache_key") or contact["contact_id"]), source)
+
+    def invalidate(self, contact_id: Optional[str] = None):
+        """Drop cached results for one contact, or for every contact."""
+        self.cache.invalidate(contact_id)
+
+    async def enrich(self, contact: Dict[str, Any], sources: Optional[List[str]] = None,
+                     deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Query every source for one contact concurrently.
+
+        Args:
+            contact: Dict with contact_id plus whatever the sources read
+                (contact_name, identifiers, ...); an optional cache_key
+                replaces contact_id in cache keys
+            sources: Source names to query (default: all registered)
+            deadline: Override for the shared deadline in seconds
+
+        Returns:
+            Dict with per-source data and status ("ok", "cached", "timeout",
+            "error") and whether the result is partial
+        """
+        results = await self.enrich_batch([contact], sources, deadline)
+        return results[contact["contact_id"]]
+
+    async def enrich_batch(self, contacts: List[Dict[str, Any]], sources: Optional[List[str]] = None,
+                           deadline: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Enrich many contacts at once under one shared deadline.
+
+        Sources with a batch fetch are called once for every uncached
+        contact; other sources run per contact with bounded concurrency.
+
+        Returns:
+            contact_id -> result in the shape returned by enrich
+        """
+        started = time.perf_counter()
+        sources = [s for s in (sources or self.sources) if s in self._sources]
+        budget = self.deadline if deadline is None else deadline
+
+        results = {
+            contact["contact_id"]: {"contact_id": contact["contact_id"], "sources": {}, "status": {}, "partial": False}
+            for contact in contacts
+        }
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks: Dict[asyncio.Task, Tuple[str, List[Dict[str, Any]], bool]] = {}
+
+        for source in sources:
+            pending = []
+            for contact in contacts:
+                hit, value = self.cache.get(self._cache_key(contact, source))
+                if hit:
+                    self.metrics["cache_hits"] += 1
+                    results[contact["contact_id"]]["sources"][source] = value
+                    results[contact["contact_id"]]["status"][source] = "cached"
+                else:
+                    pending.append(contact)
+            if not pending:
+                continue
+
+            if source in self._batch_sources and len(pending) > 1:
+                task = asyncio.create_task(self._batch_sources[source](pending))
+                tasks[task] = (source, pending, True)
+            else:
+                for contact in pending:
+                    task = asyncio.create_task(self._bounded(semaphore, self._sources[source], contact))
+                    tasks[task] = (source, [contact], False)
+            self.metrics["source_calls"] += len(pending)
+
+        if tasks:
+            done, not_done = await asyncio.wait(tasks, timeout=budget)
+            for task in not_done:
+                task.cancel()
+            for task, (source, batch, batched) in tasks.items():
+                self._collect(task, task in done, source, batch, batched, results)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for result in results.values():
+            result["partial"] = any(status in ("timeout", "error") for status in result["status"].values())
+            result["elapsed_ms"] = round(elapsed_ms, 1)
+        self.metrics["enrichments"] += len(contacts)
+        return results
+
+    @staticmethod
+    async def _bounded(semaphore: asyncio.Semaphore, fetch: Fetch, contact: Dict[str, Any]) -> Any:
+        async with semaphore:
+            return await fetch(contact)
+
+    def _collect(self, task: asyncio.Task, finished: bool, source: str,
+                 batch: List[Dict[str, Any]], batched: bool, results: Dict[str, Dict[str, Any]]):
+        if not finished:
+            self.metrics["timeouts"] += len(batch)
+            logger.warning(f"Enrichment source '{source}' missed the deadline for {len(batch)} contact(s)")
+            for contact in batch:
+                results[contact["contact_id"]]["status"][source] = "timeout"
+            return
+
+        error = task.exception()
+        if error is not None:
+            self.metrics["errors"] += len(batch)
+            logger.warning(f"Enrichment source '{source}' failed: {error}")
+            for contact in batch:
+                results[contact["contact_id"]]["status"][source] = "error"
+            return
+
+        value = task.result()
+        for contact in batch:
+            data = (value or {}).get(contact["contact_id"]) if batched else value
+            results[contact["contact_id"]]["sources"][source] = data
+            results[contact["contact_id"]]["status"][source] = "ok"
+            self.cache.set(self._cache_key(contact, source), data)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get orchestrator counters."""
+        return {
+            **self.metrics,
+            "sources": self.sources,
+            "deadline": self.deadline,
+            "cache_entries": len(self.cache),
+            "cache_ttl": self.cache.ttl
+        }
@@ -7,6 +7,7 @@ message analysis and cross-agent memory integration.
 """
 
 import sys
+import asyncio
 import logging
 from pathlib import Path
 from typing import Dict, Any, List
@@ -97,21 +98,16 @@ class EnrichContactsHandler(BaseCapabilityHandler):
         all_enrichments = []
         
         try:
-            # Get enrichments from memory first (fast)
+            # Memory lookups and message analysis run concurrently
+            sources = {}
             if use_memory_integration and self.memory_client:
-                memory_enrichments = await self._get_memory_enrichments(
-                    contact_id, contact_name, enrichment_type
-                )
-                all_enrichments.extend(memory_enrichments)
-                self.logger.info(f"Found {len(memory_enrichments)} memory enrichments for {contact_name}")
-            
-            # Get enrichments from message analysis (slower)
+                sources["memory"] = self._get_memory_enrichments(contact_id, contact_name, enrichment_type)
             if use_message_analysis and self.message_analyzer:
-                message_enrichments = await self._get_message_enrichments(
-                    contact_id, contact_name, enrichment_type
-                )
-                all_enrichments.extend(message_enrichments)
-                self.logger.info(f"Found {len(message_enrichments)} message enrichments for {contact_name}")
+                sources["message"] = self._get_message_enrichments(contact_id, contact_name, enrichment_type)
+            
+            for source, enrichments in zip(sources, await asyncio.gather(*sources.values())):
+                all_enrichments.extend(enrichments)
+                self.logger.info(f"Found {len(enrichments)} {source} enrichments for {contact_name}")
             
             # If no tools available, fallback to mock data
             if not all_enrichments and not self.message_analyzer and not self.memory_client:
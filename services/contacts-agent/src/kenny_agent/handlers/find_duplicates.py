@@ -0,0 +1,141 @@
+"""
+Duplicate discovery capability handler.
+
+This handler implements the contacts.find_duplicates capability, which
+suggests clusters of duplicate contacts (and platform senders) that can then
+be passed to contacts.merge.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+from typing import Dict, Any, List
+
+# Add the agent-sdk to the path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent / "agent-sdk"))
+
+from kenny_agent.base_handler import BaseCapabilityHandler
+
+from ..dedup import ContactDedupEngine, contact_records_from_database
+
+
+class FindDuplicatesHandler(BaseCapabilityHandler):
+    """Handler for the contacts.find_duplicates capability."""
+    
+    capability = "contacts.find_duplicates"
+    
+    def __init__(self, agent=None):
+        """Initialize the find duplicates handler."""
+        self.agent = agent  # Store reference to agent for tool access
+        super().__init__(
+            capability="contacts.find_duplicates",
+            description="Find clusters of likely duplicate contacts across Contacts, iMessage and WhatsApp",
+            input_schema={
+                "type": "object",
+                "properties": {
+                    "contact_id": {"type": "string", "description": "Re-score this contact and return only its cluster"},
+                    "records": {
+                        "type": "array",
+                        "description": "Platform senders to include, e.g. iMessage handles or WhatsApp senders",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "id": {"type": "string"},
+                                "name": {"type": "string"},
+                                "emails": {"type": "array", "items": {"type": "string"}},
+                                "phones": {"type": "array", "items": {"type": "string"}},
+                                "handles": {"type": "array", "items": {"type": "string"}},
+                                "source": {"type": "string", "enum": ["contacts", "imessage", "whatsapp", "mail"]}
+                            },
+                            "required": ["id"]
+                        }
+                    },
+                    "refresh": {"type": "boolean", "default": False, "description": "Rebuild the index from the database"},
+                    "limit": {"type": "integer", "minimum": 1, "default": 50}
+                },
+                "additionalProperties": False
+            },
+            output_schema={
+                "type": "object",
+                "properties": {
+                    "clusters": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "contact_ids": {"type": "array", "items": {"type": "string"}},
+                                "primary_contact_id": {"type": "string"},
+                                "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+                                "sources": {"type": "array", "items": {"type": "string"}},
+                                "pairs": {"type": "array", "items": {"type": "object"}}
+                            },
+                            "required": ["contact_ids", "primary_contact_id", "confidence"]
+                        }
+                    },
+                    "cluster_count": {"type": "integer"},
+                    "indexed_records": {"type": "integer"}
+                },
+                "required": ["clusters", "cluster_count"],
+                "additionalProperties": False
+            }
+        )
+        self._engine = None
+    
+    @property
+    def engine(self) -> ContactDedupEngine:
+        """The agent's shared dedup engine, so merges can keep it current."""
+        engine = getattr(self.agent, 'dedup_engine', None)
+        if engine is None:
+            if self._engine is None:
+                self._engine = ContactDedupEngine()
+            engine = self._engine
+        return engine
+    
+    async def execute(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute the contacts.find_duplicates capability.
+        
+        The first call (or refresh) indexes every stored contact off the event
+        loop; later calls only re-score what changed.
+        
+        Args:
+            parameters: Optional contact_id, extra platform records, refresh flag and limit
+        
+        Returns:
+            Dictionary with duplicate clusters
+        """
+        contact_id = (parameters.get("contact_id") or "").strip()
+        records: List[Dict[str, Any]] = parameters.get("records") or []
+        limit = parameters.get("limit", 50)
+        
+        bridge_tool = None
+        if hasattr(self, 'agent') and hasattr(self.agent, 'tools'):
+            bridge_tool = self.agent.tools.get('contacts_bridge')
+        db = getattr(bridge_tool, 'db', None)
+        if db is None:
+            print("[find-duplicates-handler] Contacts database not available")
+            return {"clusters": [], "cluster_count": 0, "indexed_records": 0}
+        
+        engine = self.engine
+        async with engine.lock:
+            if parameters.get("refresh") or not engine.loaded:
+                await asyncio.to_thread(engine.build_from_database, db, records)
+            else:
+                for record in records:
+                    engine.update(record)
+            
+            if contact_id:
+                stored = await asyncio.to_thread(contact_records_from_database, db, [contact_id])
+                if stored:
+                    clusters = engine.update(stored[0])
+                else:
+                    engine.remove([contact_id])
+                    clusters = []
+            else:
+                clusters = engine.find_duplicates()
+        
+        return {
+            "clusters": clusters[:limit],
+            "cluster_count": len(clusters),
+            "indexed_records": len(engine.records)
+        }
@@ -6,6 +6,7 @@ duplicate contacts with conflict resolution.
 """
 
 import sys
+import asyncio
 from pathlib import Path
 from typing import Dict, Any, List
 import uuid
@@ -15,6 +16,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent / "agen
 
 from kenny_agent.base_handler import BaseCapabilityHandler
 
+from ..dedup import contact_records_from_database
+
 
 class MergeContactsHandler(BaseCapabilityHandler):
     """Handler for the contacts.merge capability."""
@@ -31,8 +34,7 @@ class MergeContactsHandler(BaseCapabilityHandler):
                 "type": "object",
                 "properties": {
                     "primary_contact_id": {"type": "string", "description": "Primary contact to keep"},
-                    "duplicate_contact_ids": {"type": "array", "items": {"type": "string"}, "description": "Duplicate contacts to merge"},
-                    "merge_strategy": {"type": "string", "enum": ["merge_all", "selective", "manual"], "default": "merge_all", "description": "How to handle conflicts"}
+                    "duplicate_contact_ids": {"type": "array", "items": {"type": "string"}, "description": "Duplicate contacts to merge"}
                 },
                 "required": ["primary_contact_id", "duplicate_contact_ids"],
                 "additionalProperties": False
@@ -58,14 +60,13 @@ class MergeContactsHandler(BaseCapabilityHandler):
         Execute the contacts.merge capability.
         
         Args:
-            parameters: Input parameters containing contact IDs and merge strategy
+            parameters: Input parameters containing the primary and duplicate contact IDs
             
         Returns:
             Dictionary with merge results
         """
         primary_contact_id = parameters.get("primary_contact_id", "").strip()
         duplicate_contact_ids = parameters.get("duplicate_contact_ids", [])
-        merge_strategy = parameters.get("merge_strategy", "merge_all")
         
         if not primary_contact_id:
             return {
@@ -74,20 +75,79 @@ class MergeContactsHandler(BaseCapabilityHandler):
                 "conflicts_resolved": 0
             }
         
-        # For now, return mock data - this will be replaced with actual merging
-        # TODO: Integrate with contacts bridge tool for real contact merging
-        mock_result = self._generate_mock_merge_result(primary_contact_id, duplicate_contact_ids, merge_strategy)
+        # Merge in the local database when it is available
+        bridge_tool = None
+        if hasattr(self, 'agent') and hasattr(self.agent, 'tools'):
+            bridge_tool = self.agent.tools.get('contacts_bridge')
+        db = getattr(bridge_tool, 'db', None)
+        if db is not None:
+            result = None
+            try:
+                result = self._merge_in_database(db, primary_contact_id, duplicate_contact_ids)
+            except Exception as e:
+                print(f"[merge-handler] Error merging in database: {e}")
+            if result:
+                await self._update_dedup_index(db, primary_contact_id, duplicate_contact_ids)
+                return result
+        
+        # Fall back to mock data when the contacts are not stored locally
+        mock_result = self._generate_mock_merge_result(primary_contact_id, duplicate_contact_ids)
         
         return mock_result
     
-    def _generate_mock_merge_result(self, primary_contact_id: str, duplicate_contact_ids: List[str], merge_strategy: str) -> Dict[str, Any]:
+    def _merge_in_database(self, db, primary_contact_id: str, duplicate_contact_ids: List[str]) -> Dict[str, Any]:
+        """Merge stored contacts; the identifier index follows the merged contact."""
+        contacts = [db.get_contact_by_id(i) for i in [primary_contact_id, *duplicate_contact_ids]]
+        if contacts[0] is None:
+            return {}
+        
+        merged = db.merge_contacts(primary_contact_id, duplicate_contact_ids)
+        merged_count = sum(1 for c in contacts if c)
+        self._invalidate_enrichment([primary_contact_id, *duplicate_contact_ids])
+        identifiers_before = sum(len(c['emails']) + len(c['phones']) for c in contacts if c)
+        
+        return {
+            "merged_contact_id": primary_contact_id,
+            "merged_attributes": {
+                "name": merged["name"],
+                "emails": merged["emails"],
+                "phones": merged["phones"],
+                "merged_at": merged["updated_at"]
+            },
+            "merged_count": merged_count,
+            "conflicts_resolved": identifiers_before - len(merged["emails"]) - len(merged["phones"])
+        }
+    
+    async def _update_dedup_index(self, db, primary_contact_id: str, duplicate_contact_ids: List[str]):
+        """Drop merged duplicates from the dedup index and re-score the primary."""
+        engine = getattr(self.agent, 'dedup_engine', None)
+        if engine is None:
+            return
+        # Same lock as contacts.find_duplicates, so a merge never lands mid-build
+        async with engine.lock:
+            if not engine.loaded:
+                return
+            engine.remove(duplicate_contact_ids)
+            for record in await asyncio.to_thread(contact_records_from_database, db, [primary_contact_id]):
+                engine.update(record)
+    
+    def _invalidate_enrichment(self, contact_ids: List[str]):
+        """Drop cached enrichment results for contacts whose identifiers changed."""
+        analyzer = getattr(self.agent, 'tools', {}).get('message_analyzer')
+        for orchestrator in (getattr(self.agent, 'enrichment_orchestrator', None),
+                             getattr(analyzer, 'orchestrator', None)):
+            if orchestrator is None:
+                continue
+            for contact_id in contact_ids:
+                orchestrator.invalidate(contact_id)
+    
+    def _generate_mock_merge_result(self, primary_contact_id: str, duplicate_contact_ids: List[str]) -> Dict[str, Any]:
         """
         Generate mock merge result data for testing.
         
         Args:
             primary_contact_id: The primary contact ID to keep
             duplicate_contact_ids: List of duplicate contact IDs to merge
-            merge_strategy: Strategy for handling conflicts
             
         Returns:
             Mock merge result object
@@ -101,7 +161,6 @@ class MergeContactsHandler(BaseCapabilityHandler):
             "emails": ["john.doe@example.com", "j.doe@company.com"],
             "phones": ["+1-555-0123", "+1-555-4567"],
             "platforms": ["mail", "whatsapp", "imessage"],
-            "merge_strategy": merge_strategy,
             "merged_at": "2025-01-13T12:00:00Z"
         }
         
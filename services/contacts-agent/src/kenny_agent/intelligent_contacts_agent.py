@@ -13,6 +13,7 @@ Key Enhancements:
 
 import sys
 import os
+import asyncio
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
@@ -21,13 +22,17 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent / "agen
 
 from kenny_agent.agent_service_base import AgentServiceBase, ConfidenceResult
 from kenny_agent.registry import AgentRegistryClient
+from kenny_agent.contact_scoring import ContactScorer, normalize_text
 
 from .handlers.resolve import ResolveContactsHandler
 from .handlers.enrich import EnrichContactsHandler
 from .handlers.merge import MergeContactsHandler
+from .handlers.find_duplicates import FindDuplicatesHandler
 from .tools.contacts_bridge import ContactsBridgeTool
 from .tools.message_analyzer import MessageAnalyzer
 from .tools.memory_client import MemoryClient
+from .enrichment_orchestrator import EnrichmentOrchestrator
+from .dedup import ContactDedupEngine
 
 
 class IntelligentContactsAgent(AgentServiceBase):
@@ -65,9 +70,11 @@ class IntelligentContactsAgent(AgentServiceBase):
         print(f"Initializing Intelligent Contacts Agent with LLM: {llm_model}")
         
         # Initialize tools
-        self.message_analyzer = MessageAnalyzer()
-        self.memory_client = MemoryClient()
         self.contacts_bridge_tool = ContactsBridgeTool()
+        self.message_analyzer = MessageAnalyzer(contacts_db=self.contacts_bridge_tool.db)
+        self.memory_client = MemoryClient()
+        # Shared by find_duplicates and merge so merges keep the index current
+        self.dedup_engine = ContactDedupEngine()
         
         # Register tools
         self.register_tool(self.contacts_bridge_tool)
@@ -83,10 +90,16 @@ class IntelligentContactsAgent(AgentServiceBase):
             memory_client=self.memory_client
         ))
         self.register_capability(EnhancedMergeContactsHandler(agent=self))
+        self.register_capability(FindDuplicatesHandler(agent=self))
         
         # Register cross-platform dependencies
         self._register_cross_platform_dependencies()
         
+        # Concurrent, deadline-bound fan-out for cross-platform enrichment
+        self.enrichment_orchestrator = EnrichmentOrchestrator()
+        self.enrichment_orchestrator.register_source("mail", self._fetch_mail_interactions)
+        self.enrichment_orchestrator.register_source("calendar", self._fetch_meeting_interactions)
+        
         # Initialize registry client
         self.registry_client = AgentRegistryClient(
             base_url=os.getenv("AGENT_REGISTRY_URL", "http://localhost:8001")
@@ -214,55 +227,90 @@ I can understand queries like:
     
     async def enrich_contact_cross_platform(self, contact_id: str) -> Dict[str, Any]:
         """Enrich contact with data from all available platforms."""
-        enrichment_results = {"contact_id": contact_id, "enrichments": []}
-        
-        # Get cached relationships first
-        email_relationships = await self.get_entity_relationships(
-            entity_type="contact",
-            entity_id=contact_id,
-            related_entity_type="email"
-        )
-        
-        # Query mail agent for email interactions
-        if "mail-agent" in self.agent_dependencies and email_relationships:
-            for rel in email_relationships:
-                email = rel["related_entity_id"]
-                try:
-                    mail_data = await self.query_agent(
-                        agent_id="mail-agent",
-                        capability="messages.search",
-                        parameters={"from": email, "limit": 5},
-                        timeout=2.0
-                    )
-                    if mail_data:
-                        enrichment_results["enrichments"].append({
-                            "source": "mail",
-                            "type": "email_interaction",
-                            "data": mail_data,
-                            "confidence": 0.9
-                        })
-                except Exception as e:
-                    print(f"Mail enrichment error: {e}")
-        
-        # Query calendar agent for meeting interactions
-        try:
-            calendar_data = await self.query_agent(
-                agent_id="calendar-agent",
-                capability="calendar.read",
-                parameters={"attendee_search": contact_id, "limit": 5},
-                timeout=2.0
+        results = await self.enrich_contacts_cross_platform([contact_id])
+        return results[contact_id]
+    
+    async def enrich_contacts_cross_platform(self, contact_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Enrich many contacts from mail and calendar concurrently.
+        
+        Every platform query for every contact shares one deadline; sources
+        that miss it are reported in partial_sources instead of failing the
+        whole enrichment, and results are cached per (contact, source).
+        """
+        contacts = []
+        for contact_id in contact_ids:
+            # Get cached relationships first
+            email_relationships = await self.get_entity_relationships(
+                entity_type="contact",
+                entity_id=contact_id,
+                related_entity_type="email"
             )
-            if calendar_data:
-                enrichment_results["enrichments"].append({
+            contacts.append({
+                "contact_id": contact_id,
+                "emails": [rel["related_entity_id"] for rel in email_relationships or []]
+            })
+        
+        collected = await self.enrichment_orchestrator.enrich_batch(contacts)
+        
+        results = {}
+        for contact_id in contact_ids:
+            sources = collected[contact_id]["sources"]
+            enrichments = []
+            for mail_data in sources.get("mail") or []:
+                enrichments.append({
+                    "source": "mail",
+                    "type": "email_interaction",
+                    "data": mail_data,
+                    "confidence": 0.9
+                })
+            if sources.get("calendar"):
+                enrichments.append({
                     "source": "calendar",
                     "type": "meeting_attendance",
-                    "data": calendar_data,
+                    "data": sources["calendar"],
                     "confidence": 0.8
                 })
-        except Exception as e:
-            print(f"Calendar enrichment error: {e}")
-        
-        return enrichment_results
+            results[contact_id] = {
+                "contact_id": contact_id,
+                "enrichments": enrichments,
+                "partial_sources": [
+                    source for source, status in collected[contact_id]["status"].items()
+                    if status in ("timeout", "error")
+                ]
+            }
+        return results
+    
+    async def _fetch_mail_interactions(self, contact: Dict[str, Any]) -> List[Any]:
+        """Query the mail agent for every known email of a contact concurrently."""
+        if "mail-agent" not in self.agent_dependencies or not contact["emails"]:
+            return []
+        replies = await asyncio.gather(*[
+            self.query_agent(
+                agent_id="mail-agent",
+                capability="messages.search",
+                parameters={"from": email, "limit": 5},
+                timeout=2.0
+            )
+            for email in contact["emails"]
+        ], return_exceptions=True)
+        # query_agent returns None when the call failed; raise so the
+        # orchestrator reports an error instead of caching a partial answer
+        for email, reply in zip(contact["emails"], replies):
+            if isinstance(reply, Exception):
+                raise reply
+            if reply is None:
+                raise RuntimeError(f"mail-agent search failed for {email}")
+        return replies
+    
+    async def _fetch_meeting_interactions(self, contact: Dict[str, Any]) -> Any:
+        """Query the calendar agent for meetings with a contact."""
+        return await self.query_agent(
+            agent_id="calendar-agent",
+            capability="calendar.read",
+            parameters={"attendee_search": contact["contact_id"], "limit": 5},
+            timeout=2.0
+        )
     
     async def start(self):
         """Start the intelligent contacts agent."""
@@ -337,41 +385,22 @@ class EnhancedResolveContactsHandler(ResolveContactsHandler):
         
         result = await super().handle(enhanced_params)
         
-        # Add confidence scoring based on match quality
+        # Re-score on the shared scale so bridge and database results rank alike
         if result.get("contacts"):
-            for contact in result["contacts"]:
-                # Calculate confidence based on match strength
-                confidence = self._calculate_contact_confidence(query, contact)
-                contact["confidence"] = confidence
+            self._score_contacts(query, result["contacts"])
+            result["contacts"].sort(
+                key=lambda c: (-c["confidence"], normalize_text(c.get("name") or ""), c.get("id") or "")
+            )
         
         return result
     
-    def _calculate_contact_confidence(self, query: str, contact: Dict) -> float:
-        """Calculate confidence score for contact match."""
-        confidence = 0.5  # Base confidence
-        
-        name = contact.get("name", "").lower()
-        query_lower = query.lower()
-        
-        # Exact name match
-        if name == query_lower:
-            confidence = 1.0
-        # Partial name match
-        elif query_lower in name or name in query_lower:
-            confidence = 0.8
-        # Email domain match
-        elif any(query_lower in email.lower() for email in contact.get("emails", [])):
-            confidence = 0.9
-        # Phone number match
-        elif any(query_lower in phone for phone in contact.get("phones", [])):
-            confidence = 0.95
-        
-        # Boost confidence if multiple platforms have this contact
-        platform_count = len(contact.get("platforms", []))
-        if platform_count > 1:
-            confidence = min(1.0, confidence + (platform_count - 1) * 0.1)
-        
-        return round(confidence, 2)
+    def _score_contacts(self, query: str, contacts: List[Dict]):
+        """Score the whole result set against the query with one scorer."""
+        scorer = ContactScorer({**contact, "id": str(index)} for index, contact in enumerate(contacts))
+        scores = {contact_id: confidence for contact_id, confidence, _ in scorer.rank(query)}
+        for index, contact in enumerate(contacts):
+            # Contacts found through a field the scorer does not index keep their source's confidence
+            contact["confidence"] = scores.get(str(index)) or contact.get("confidence", 0.5)
 
 
 class EnhancedEnrichContactsHandler(EnrichContactsHandler):
@@ -383,22 +412,24 @@ class EnhancedEnrichContactsHandler(EnrichContactsHandler):
     
     async def handle(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Handle contact enrichment with cross-platform intelligence."""
-        # Get base enrichment
-        result = await super().handle(parameters)
-        
-        # Add cross-platform enrichment
         contact_id = parameters.get("contact_id")
-        if contact_id:
-            cross_platform_data = await self.intelligent_agent.enrich_contact_cross_platform(contact_id)
-            
-            # Merge cross-platform enrichments
-            if "enrichments" in result:
-                result["enrichments"].extend(cross_platform_data.get("enrichments", []))
-            else:
-                result["enrichments"] = cross_platform_data.get("enrichments", [])
-            
-            # Update enrichment count
-            result["enrichment_count"] = len(result.get("enrichments", []))
+        if not contact_id:
+            return await super().handle(parameters)
+        
+        # Base and cross-platform enrichment run concurrently
+        result, cross_platform_data = await asyncio.gather(
+            super().handle(parameters),
+            self.intelligent_agent.enrich_contact_cross_platform(contact_id)
+        )
+        
+        # Merge cross-platform enrichments
+        if "enrichments" in result:
+            result["enrichments"].extend(cross_platform_data.get("enrichments", []))
+        else:
+            result["enrichments"] = cross_platform_data.get("enrichments", [])
+        
+        # Update enrichment count
+        result["enrichment_count"] = len(result.get("enrichments", []))
         
         return result
 
@@ -0,0 +1,293 @@
+"""
+Read-only query layer over the macOS Messages database (chat.db).
+
+Handles are resolved to ROWIDs first, then the handle filter and the date
+window are pushed into SQL so the message(handle_id, date) indexes do the
+work, and rows are read newest-first in keyset pages. Connections are opened
+read-only, one per worker thread, and reused across calls; every query runs
+in a small thread pool so the event loop is never blocked on disk I/O.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, AsyncIterator
+
+from ..database import classify_identifier, normalize_email, normalize_phone
+
+logger = logging.getLogger(__name__)
+
+# chat.db dates count from 2001-01-01 UTC, in seconds on old macOS and nanoseconds since 10.13
+APPLE_EPOCH_OFFSET = 978307200
+NANOSECOND_DATE_THRESHOLD = 10 ** 12
+
+# SQLite's default limit on bound parameters in one statement
+MAX_SQL_PARAMETERS = 999
+
+
+def apple_to_unix(value: int, nanoseconds: bool) -> float:
+    """Convert a chat.db date to a Unix timestamp."""
+    seconds = value / 1e9 if nanoseconds else value
+    return seconds + APPLE_EPOCH_OFFSET
+
+
+def unix_to_apple(timestamp: float, nanoseconds: bool) -> int:
+    """Convert a Unix timestamp to a chat.db date."""
+    seconds = timestamp - APPLE_EPOCH_OFFSET
+    return int(seconds * 1e9) if nanoseconds else int(seconds)
+
+
+def normalize_chat_handle(handle: str) -> Optional[str]:
+    """Normalize a chat.db handle.id (phone number or email) for matching."""
+    value = (handle or "").strip()
+    if "@" in value:
+        return normalize_email(value)
+    return normalize_phone(value) or value.lower() or None
+
+
+class ChatDBReader:
+    """Pooled, read-only reader for iMessage history in chat.db."""
+
+    def __init__(self, db_path: Optional[str] = None, max_workers: Optional[int] = None):
+        """
+        Initialize the chat.db reader.
+
+        Args:
+            db_path: Path to chat.db. Defaults to IMESSAGE_DB_PATH or ~/Library/Messages/chat.db
+            max_workers: Reader threads (CHAT_DB_WORKERS)
+        """
+        default_path = Path.home() / "Library" / "Messages" / "chat.db"
+        self.db_path = Path(db_path or os.getenv("IMESSAGE_DB_PATH", str(default_path)))
+        self.page_size = int(os.getenv("CHAT_DB_PAGE_SIZE", "500"))
+        self.max_messages = int(os.getenv("CHAT_DB_MAX_MESSAGES", "2000"))
+
+        workers = max_workers or int(os.getenv("CHAT_DB_WORKERS", "2"))
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chat-db")
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+        # handle.ROWID lookup by normalized handle, refreshed when new handles appear
+        self._handles: Dict[str, List[int]] = {}
+        self._handle_ids: Dict[int, str] = {}
+        self._handles_max_rowid: Optional[int] = None
+        self._nanoseconds: Optional[bool] = None
+
+        self.metrics = {
+            "pages": 0,
+            "rows": 0,
+            "query_time": 0.0
+        }
+
+    def exists(self) -> bool:
+        return self.db_path.exists()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA query_only = ON")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    # Handle resolution
+
+    def _refresh_handles(self, conn: sqlite3.Connection):
+        max_rowid = conn.execute("SELECT MAX(ROWID) FROM handle").fetchone()[0]
+        if max_rowid == self._handles_max_rowid:
+            return
+        handles: Dict[str, List[int]] = {}
+        handle_ids: Dict[int, str] = {}
+        for rowid, handle in conn.execute("SELECT ROWID, id FROM handle"):
+            handle_ids[rowid] = handle
+            key = normalize_chat_handle(handle)
+            if key:
+                handles.setdefault(key, []).append(rowid)
+        with self._lock:
+            self._handles, self._handle_ids, self._handles_max_rowid = handles, handle_ids, max_rowid
+
+    def _date_unit(self, conn: sqlite3.Connection) -> bool:
+        if self._nanoseconds is None:
+            latest = conn.execute("SELECT MAX(date) FROM message").fetchone()[0] or 0
+            self._nanoseconds = latest > NANOSECOND_DATE_THRESHOLD
+        return self._nanoseconds
+
+    def _resolve_sync(self, identifiers: Iterable[str]) -> List[int]:
+        conn = self._connect()
+        self._refresh_handles(conn)
+        rowids = set()
+        for identifier in identifiers:
+            kind, value = classify_identifier(identifier)
+            if kind in ("email", "phone"):
+                rowids.update(self._handles.get(value, []))
+            elif value:
+                # Names and bare handles: the handle table is small, so match in memory
+                needle = value.lower()
+                rowids.update(r for r, h in self._handle_ids.items() if needle in h.lower())
+        return sorted(rowids)
+
+    async def resolve_handles(self, identifiers: Iterable[str]) -> List[int]:
+        """Resolve emails, phone numbers (any format) or names to handle ROWIDs."""
+        return await self._run(self._resolve_sync, list(identifiers))
+
+    # Message paging
+
+    def _page_sync(self, handle_rowids: List[int], since: Optional[float], cursor: Optional[tuple],
+                   limit: int) -> List[Dict[str, Any]]:
+        conn = self._connect()
+        nanoseconds = self._date_unit(conn)
+        started = time.perf_counter()
+
+        clauses = [f"m.handle_id IN ({','.join('?' * len(handle_rowids))})", "m.text IS NOT NULL"]
+        params: List[Any] = list(handle_rowids)
+        if since is not None:
+            clauses.append("m.date >= ?")
+            params.append(unix_to_apple(since, nanoseconds))
+        if cursor is not None:
+            clauses.append("(m.date < ? OR (m.date = ? AND m.ROWID < ?))")
+            params.extend([cursor[0], cursor[0], cursor[1]])
+        params.append(limit)
+
+        rows = conn.execute(f"""
+            SELECT m.ROWID AS rowid, m.text, m.date, m.is_from_me, m.handle_id,
+                   (SELECT c.guid FROM chat_message_join cmj JOIN chat c ON c.ROWID = cmj.chat_id
+                    WHERE cmj.message_id = m.ROWID LIMIT 1) AS chat_guid
+            FROM message m
+            WHERE {' AND '.join(clauses)}
+            ORDER BY m.date DESC, m.ROWID DESC
+            LIMIT ?
+        """, params).fetchall()
+
+        self.metrics["pages"] += 1
+        self.metrics["rows"] += len(rows)
+        self.metrics["query_time"] += time.perf_counter() - started
+
+        return [{
+            'platform': 'imessage',
+            'content': row['text'],
+            'timestamp': apple_to_unix(row['date'], nanoseconds),
+            'is_outgoing': bool(row['is_from_me']),
+            'sender_id': self._handle_ids.get(row['handle_id'], ''),
+            'thread_id': row['chat_guid'],
+            '_handle_rowid': row['handle_id'],
+            '_cursor': (row['date'], row['rowid'])
+        } for row in rows]
+
+    async def stream_messages(self, handle_rowids: List[int], since: Optional[float] = None,
+                              page_size: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield messages for the given handles newest-first, one page at a time.
+
+        Args:
+            handle_rowids: handle.ROWID values to include
+            since: Optional Unix timestamp lower bound
+            page_size: Rows per page (CHAT_DB_PAGE_SIZE)
+        """
+        page_size = page_size or self.page_size
+        for start in range(0, len(handle_rowids), MAX_SQL_PARAMETERS - 4):
+            chunk = handle_rowids[start:start + MAX_SQL_PARAMETERS - 4]
+            cursor = None
+            while True:
+                page = await self._run(self._page_sync, chunk, since, cursor, page_size)
+                if not page:
+                    break
+                cursor = page[-1]['_cursor']
+                for message in page:
+                    del message['_handle_rowid'], message['_cursor']
+                yield page
+                if len(page) < page_size:
+                    break
+
+    async def fetch_messages(self, identifiers: Iterable[str], lookback_days: Optional[int] = None,
+                             max_messages: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get the most recent messages exchanged with a contact.
+
+        Args:
+            identifiers: The contact's emails, phone numbers or name
+            lookback_days: Only messages newer than this many days
+            max_messages: Cap on returned messages (CHAT_DB_MAX_MESSAGES)
+
+        Returns:
+            Message dicts newest-first
+        """
+        results = await self.fetch_messages_batch({"_": list(identifiers)}, lookback_days, max_messages)
+        return results["_"]
+
+    async def fetch_messages_batch(self, identifiers_by_contact: Dict[str, List[str]],
+                                   lookback_days: Optional[int] = None,
+                                   max_messages: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get recent messages for many contacts in one pass over chat.db.
+
+        All contacts' handles go into the same paged query; rows are routed
+        back to their contact and each contact is capped at max_messages.
+
+        Args:
+            identifiers_by_contact: Contact id -> emails, phone numbers or name
+            lookback_days: Only messages newer than this many days
+            max_messages: Per-contact cap (CHAT_DB_MAX_MESSAGES)
+
+        Returns:
+            Contact id -> message dicts newest-first
+        """
+        results: Dict[str, List[Dict[str, Any]]] = {contact: [] for contact in identifiers_by_contact}
+        if not self.exists():
+            logger.warning("iMessage database not found")
+            return results
+
+        cap = max_messages or self.max_messages
+        owners: Dict[int, List[str]] = {}
+        for contact, identifiers in identifiers_by_contact.items():
+            for rowid in await self.resolve_handles(identifiers):
+                owners.setdefault(rowid, []).append(contact)
+        if not owners:
+            return results
+
+        since = time.time() - lookback_days * 86400 if lookback_days else None
+        handle_rowids = sorted(owners)
+        for start in range(0, len(handle_rowids), MAX_SQL_PARAMETERS - 4):
+            active = handle_rowids[start:start + MAX_SQL_PARAMETERS - 4]
+            cursor = None
+            while active:
+                page = await self._run(self._page_sync, active, since, cursor, self.page_size)
+                for message in page:
+                    handle_rowid = message.pop('_handle_rowid')
+                    cursor = message.pop('_cursor')
+                    for contact in owners[handle_rowid]:
+                        if len(results[contact]) < cap:
+                            results[contact].append(message)
+                if len(page) < self.page_size:
+                    break
+                # Keyset paging stays valid with fewer handles, so stop reading saturated contacts
+                active = [r for r in active if any(len(results[c]) < cap for c in owners[r])]
+        return results
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get query counters for the reader."""
+        return {
+            **self.metrics,
+            "db_path": str(self.db_path),
+            "handles_cached": len(self._handle_ids),
+            "connections": len(self._connections)
+        }
+
+    def close(self):
+        """Close pooled connections and stop the reader threads."""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
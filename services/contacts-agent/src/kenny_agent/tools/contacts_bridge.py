@@ -15,7 +15,7 @@ import asyncio
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent / "agent-sdk"))
 
 from kenny_agent.base_tool import BaseTool
-from ..database import ContactsDatabase
+from ..database import ContactsDatabase, classify_identifier
 
 
 class ContactsBridgeTool(BaseTool):
@@ -97,6 +97,16 @@ class ContactsBridgeTool(BaseTool):
             List of matching contacts
         """
         try:
+            # Emails, phones and handles resolve from the local identifier index
+            # without a bridge round trip; names still go to the bridge first
+            kind, normalized = classify_identifier(identifier)
+            if kind != "name":
+                indexed = self.db.lookup_identifier(kind, normalized, platform)
+                if indexed:
+                    for contact in indexed:
+                        contact.setdefault('platforms', ['local'])
+                    return indexed
+            
             # First try bridge for live macOS Contacts data
             bridge_contacts = await self._fetch_from_bridge(query=identifier)
             if bridge_contacts:
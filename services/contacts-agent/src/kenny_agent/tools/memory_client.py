@@ -7,7 +7,7 @@ the Memory Agent for storing and retrieving enrichment data.
 
 import sys
 import logging
-import requests
+import httpx
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timezone
@@ -29,6 +29,13 @@ class MemoryClient(BaseTool):
         )
         self.memory_agent_url = memory_agent_url
         self.logger = logging.getLogger(__name__)
+        self._http: Optional[httpx.AsyncClient] = None
+    
+    def _get_http(self) -> httpx.AsyncClient:
+        """Get the keep-alive client for memory agent calls."""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(trust_env=False)
+        return self._http
         
     async def store_contact_enrichment(
         self, 
@@ -70,7 +77,7 @@ class MemoryClient(BaseTool):
                 }
             }
             
-            response = requests.post(
+            response = await self._get_http().post(
                 f"{self.memory_agent_url}/capabilities/memory.store",
                 json=payload,
                 timeout=30
@@ -122,7 +129,7 @@ class MemoryClient(BaseTool):
                 }
             }
             
-            response = requests.post(
+            response = await self._get_http().post(
                 f"{self.memory_agent_url}/capabilities/memory.retrieve",
                 json=payload,
                 timeout=30
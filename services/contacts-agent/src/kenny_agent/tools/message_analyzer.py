@@ -6,27 +6,32 @@ to extract job information, interests, relationships, and interaction patterns
 for contact enrichment.
 """
 
+import os
 import sys
 import logging
-import sqlite3
 import json
 import re
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta, timezone
-import requests
+import httpx
 import asyncio
 
 # Add the agent-sdk to the path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent / "agent-sdk"))
 
 from kenny_agent.base_tool import BaseTool
+from kenny_agent.bridge_client import get_bridge_client
+from kenny_agent.ollama_scheduler import get_ollama_scheduler
+from .chat_db import ChatDBReader
+from ..enrichment_orchestrator import EnrichmentOrchestrator
 
 
 class MessageAnalyzer(BaseTool):
     """Tool for analyzing messages to extract contact enrichment data."""
     
-    def __init__(self, memory_client_url: str = "http://localhost:8003"):
+    def __init__(self, memory_client_url: str = "http://localhost:8003",
+                 imessage_db_path: Optional[str] = None, contacts_db=None):
         """Initialize the message analyzer tool."""
         super().__init__(
             name="message_analyzer",
@@ -34,15 +39,31 @@ class MessageAnalyzer(BaseTool):
         )
         self.memory_client_url = memory_client_url
         self.logger = logging.getLogger(__name__)
+        self.contacts_db = contacts_db
         
-        # iMessage database path
-        self.imessage_db_path = Path.home() / "Library" / "Messages" / "chat.db"
+        # Read-only, pooled reader for the iMessage database
+        self.chat_db = ChatDBReader(imessage_db_path)
+        self.imessage_db_path = self.chat_db.db_path
+        
+        # Shared async clients for the mail bridge and the memory agent
+        self.mail_bridge = get_bridge_client(os.getenv("MAC_BRIDGE_URL", "http://localhost:5100"))
+        self._http: Optional[httpx.AsyncClient] = None
+        
+        # Enrichment analysis is background work, so it runs in the scheduler's batch lane
+        self.llm = get_ollama_scheduler()
+        self.analysis_model = os.getenv("CONTACTS_ANALYSIS_MODEL", "llama3.2:3b")
+        
+        # Message sources are queried concurrently under one deadline
+        self.orchestrator = EnrichmentOrchestrator()
+        self.orchestrator.register_source("imessage", self._fetch_imessage, self._fetch_imessage_batch)
+        self.orchestrator.register_source("email", self._fetch_email)
         
     async def analyze_messages_for_contact(
         self, 
         contact_id: str, 
         contact_name: str,
-        lookback_days: int = 30
+        lookback_days: int = 30,
+        identifiers: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """
         Analyze messages for a specific contact to extract enrichment data.
@@ -51,39 +72,90 @@ class MessageAnalyzer(BaseTool):
             contact_id: Unique identifier for the contact
             contact_name: Display name of the contact
             lookback_days: Number of days to look back in message history
+            identifiers: Optional emails/phone numbers; looked up when omitted
             
         Returns:
             Dict containing extracted enrichment data
         """
         try:
             # Get contact identifiers (phone numbers, emails) for message matching
-            contact_identifiers = await self._get_contact_identifiers(contact_name)
+            contact_identifiers = identifiers or await self._get_contact_identifiers(contact_name, contact_id)
             
             # Get message data from multiple sources
-            message_data = await self._collect_message_data(contact_identifiers, lookback_days)
-            
-            if not message_data:
-                self.logger.info(f"No messages found for contact {contact_name}")
-                return self._empty_analysis_result()
-            
-            # Analyze message content for enrichment data
-            analysis_result = await self._analyze_message_content(message_data, contact_name)
+            message_data = await self._collect_message_data(contact_identifiers, lookback_days, contact_id)
             
-            # Store analysis in memory for future reference
-            await self._store_analysis_in_memory(contact_id, contact_name, analysis_result)
-            
-            return analysis_result
+            return await self._analyze_collected(contact_id, contact_name, message_data)
             
         except Exception as e:
             self.logger.error(f"Error analyzing messages for {contact_name}: {e}")
             return self._empty_analysis_result()
     
-    async def _get_contact_identifiers(self, contact_name: str) -> List[str]:
+    async def analyze_messages_for_contacts(
+        self,
+        contacts: List[Dict[str, Any]],
+        lookback_days: int = 30
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze messages for many contacts, reading chat.db in a single pass.
+        
+        Args:
+            contacts: Dicts with contact_id, contact_name and optional identifiers
+            lookback_days: Number of days to look back in message history
+            
+        Returns:
+            Dict mapping contact_id to extracted enrichment data
+        """
+        identifiers_by_contact = {}
+        for contact in contacts:
+            identifiers_by_contact[contact["contact_id"]] = contact.get("identifiers") or \
+                await self._get_contact_identifiers(contact.get("contact_name", ""), contact["contact_id"])
+        
+        # One pass over chat.db serves every contact; email is fetched per contact concurrently
+        collected = await self.orchestrator.enrich_batch([
+            self._source_request(contact_id, identifiers, lookback_days)
+            for contact_id, identifiers in identifiers_by_contact.items()
+        ])
+        
+        async def analyze(contact: Dict[str, Any]):
+            contact_id = contact["contact_id"]
+            contact_name = contact.get("contact_name", "")
+            try:
+                message_data = self._flatten_sources(collected[contact_id])
+                return contact_id, await self._analyze_collected(contact_id, contact_name, message_data)
+            except Exception as e:
+                self.logger.error(f"Error analyzing messages for {contact_name}: {e}")
+                return contact_id, self._empty_analysis_result()
+        
+        return dict(await asyncio.gather(*[analyze(contact) for contact in contacts]))
+    
+    async def _analyze_collected(self, contact_id: str, contact_name: str, message_data: List[Dict]) -> Dict[str, Any]:
+        """Analyze collected messages and store the result in memory."""
+        if not message_data:
+            self.logger.info(f"No messages found for contact {contact_name}")
+            return self._empty_analysis_result()
+        
+        # Analyze message content for enrichment data
+        analysis_result = await self._analyze_message_content(message_data, contact_name)
+        
+        # Store analysis in memory for future reference
+        await self._store_analysis_in_memory(contact_id, contact_name, analysis_result)
+        
+        return analysis_result
+    
+    async def _get_contact_identifiers(self, contact_name: str, contact_id: Optional[str] = None) -> List[str]:
         """Get phone numbers and emails associated with a contact."""
-        # For now, we'll extract potential identifiers from the contact name
-        # In a real implementation, this would query the contacts database
         identifiers = []
         
+        # Prefer the identifiers stored for the contact
+        if self.contacts_db is not None and contact_id:
+            contact = await asyncio.to_thread(self.contacts_db.get_contact_by_id, contact_id)
+            if contact:
+                identifiers.extend(contact.get("emails") or [])
+                identifiers.extend(contact.get("phones") or [])
+                if identifiers:
+                    return identifiers
+        
+        # Otherwise extract potential identifiers from the contact name
         # Basic email detection
         email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
         emails = re.findall(email_pattern, contact_name)
@@ -100,74 +172,72 @@ class MessageAnalyzer(BaseTool):
             
         return identifiers
     
-    async def _collect_message_data(self, identifiers: List[str], lookback_days: int) -> List[Dict]:
-        """Collect message data from various sources for the given identifiers."""
-        all_messages = []
-        
-        # Get iMessage data
-        imessage_data = await self._get_imessage_data(identifiers, lookback_days)
-        all_messages.extend(imessage_data)
-        
-        # Get email data (via mail agent if available)
-        email_data = await self._get_email_data(identifiers, lookback_days)
-        all_messages.extend(email_data)
-        
-        return all_messages
+    async def _collect_message_data(self, identifiers: List[str], lookback_days: int,
+                                    contact_id: Optional[str] = None) -> List[Dict]:
+        """Collect message data from all sources concurrently for the given identifiers."""
+        request = self._source_request(contact_id or "|".join(sorted(identifiers)), identifiers, lookback_days)
+        collected = await self.orchestrator.enrich(request)
+        if collected["partial"]:
+            self.logger.warning(f"Partial message data: {collected['status']}")
+        return self._flatten_sources(collected)
+    
+    def _source_request(self, contact_id: str, identifiers: List[str], lookback_days: int) -> Dict[str, Any]:
+        return {
+            "contact_id": contact_id,
+            "cache_key": f"{contact_id}|{lookback_days}",
+            "identifiers": identifiers,
+            "lookback_days": lookback_days
+        }
+    
+    @staticmethod
+    def _flatten_sources(collected: Dict[str, Any]) -> List[Dict]:
+        messages = []
+        for data in collected["sources"].values():
+            messages.extend(data or [])
+        return messages
+    
+    async def _fetch_imessage(self, request: Dict[str, Any]) -> List[Dict]:
+        if not self.chat_db.exists():
+            return []
+        return await self.chat_db.fetch_messages(request["identifiers"], request["lookback_days"])
+    
+    async def _fetch_imessage_batch(self, requests: List[Dict[str, Any]]) -> Dict[str, List[Dict]]:
+        if not self.chat_db.exists():
+            return {}
+        return await self.chat_db.fetch_messages_batch(
+            {r["contact_id"]: r["identifiers"] for r in requests}, requests[0]["lookback_days"]
+        )
+    
+    async def _fetch_email(self, request: Dict[str, Any]) -> List[Dict]:
+        emails = [i for i in request["identifiers"] if '@' in i]
+        if not emails:
+            return []
+        pages = await asyncio.gather(*[
+            self.mail_bridge.get_json("/v1/mail/messages", params={'from': email, 'limit': 100})
+            for email in emails
+        ])
+        messages = []
+        for mail_data in pages:
+            for msg in (mail_data.get('messages', []) if isinstance(mail_data, dict) else mail_data):
+                messages.append({
+                    'platform': 'email',
+                    'content': msg.get('snippet', ''),
+                    'timestamp': msg.get('ts', ''),
+                    'is_outgoing': False,  # Assume incoming for now
+                    'sender_id': msg.get('from', ''),
+                    'thread_id': msg.get('thread_id', ''),
+                    'subject': msg.get('subject', '')
+                })
+        return messages
     
     async def _get_imessage_data(self, identifiers: List[str], lookback_days: int) -> List[Dict]:
         """Get iMessage data for the contact identifiers."""
         try:
-            if not self.imessage_db_path.exists():
+            if not self.chat_db.exists():
                 self.logger.warning("iMessage database not found")
                 return []
             
-            since_date = datetime.now() - timedelta(days=lookback_days)
-            # Convert to Apple epoch (seconds since 2001-01-01)
-            apple_epoch = datetime(2001, 1, 1)
-            since_apple_time = int((since_date - apple_epoch).total_seconds())
-            
-            messages = []
-            
-            with sqlite3.connect(str(self.imessage_db_path)) as conn:
-                conn.row_factory = sqlite3.Row
-                
-                # Query for messages from/to the contact identifiers
-                query = """
-                SELECT 
-                    m.ROWID,
-                    m.text,
-                    m.date,
-                    m.is_from_me,
-                    h.id as handle_id,
-                    c.guid as chat_guid
-                FROM message m
-                JOIN chat_message_join cmj ON m.ROWID = cmj.message_id
-                JOIN chat c ON cmj.chat_id = c.ROWID
-                JOIN handle h ON m.handle_id = h.ROWID
-                WHERE m.date >= ? AND m.text IS NOT NULL
-                ORDER BY m.date DESC
-                LIMIT 500
-                """
-                
-                cursor = conn.execute(query, (since_apple_time,))
-                rows = cursor.fetchall()
-                
-                for row in rows:
-                    # Check if this message involves our contact
-                    handle_id = row['handle_id'].lower()
-                    if any(identifier.lower() in handle_id for identifier in identifiers):
-                        # Convert Apple time to Unix timestamp
-                        unix_time = since_apple_time + 978307200  # Apple epoch offset
-                        
-                        messages.append({
-                            'platform': 'imessage',
-                            'content': row['text'],
-                            'timestamp': unix_time,
-                            'is_outgoing': bool(row['is_from_me']),
-                            'sender_id': handle_id,
-                            'thread_id': row['chat_guid']
-                        })
-                        
+            messages = await self.chat_db.fetch_messages(identifiers, lookback_days)
             self.logger.info(f"Found {len(messages)} iMessage messages")
             return messages
             
@@ -178,40 +248,11 @@ class MessageAnalyzer(BaseTool):
     async def _get_email_data(self, identifiers: List[str], lookback_days: int) -> List[Dict]:
         """Get email data for the contact identifiers."""
         try:
-            # Try to get email data via the mail agent bridge
-            bridge_url = "http://localhost:5100/v1/mail/messages"
-            
-            # Query for messages from the contact identifiers
-            for identifier in identifiers:
-                if '@' in identifier:  # Only query emails
-                    try:
-                        response = requests.get(
-                            bridge_url,
-                            params={'from': identifier, 'limit': 100},
-                            timeout=10
-                        )
-                        
-                        if response.status_code == 200:
-                            mail_data = response.json()
-                            messages = []
-                            
-                            for msg in mail_data.get('messages', []):
-                                messages.append({
-                                    'platform': 'email',
-                                    'content': msg.get('snippet', ''),
-                                    'timestamp': msg.get('ts', ''),
-                                    'is_outgoing': False,  # Assume incoming for now
-                                    'sender_id': msg.get('from', ''),
-                                    'thread_id': msg.get('thread_id', ''),
-                                    'subject': msg.get('subject', '')
-                                })
-                            
-                            self.logger.info(f"Found {len(messages)} email messages")
-                            return messages
-                            
-                    except requests.RequestException as e:
-                        self.logger.warning(f"Could not fetch email data: {e}")
-                        
+            messages = await self._fetch_email({"identifiers": identifiers, "lookback_days": lookback_days})
+            self.logger.info(f"Found {len(messages)} email messages")
+            return messages
+        except httpx.HTTPError as e:
+            self.logger.warning(f"Could not fetch email data: {e}")
         except Exception as e:
             self.logger.error(f"Error getting email data: {e}")
             
@@ -264,11 +305,11 @@ class MessageAnalyzer(BaseTool):
             - relationships: list of {{value, confidence, source_evidence}}
             """
             
-            # Try to get analysis via memory agent embedding
-            memory_response = await self._query_memory_agent(analysis_prompt)
+            # Try to get analysis from the local LLM
+            llm_response = await self._query_llm(analysis_prompt)
             
-            if memory_response:
-                return self._parse_llm_response(memory_response)
+            if llm_response:
+                return self._parse_llm_response(llm_response)
             else:
                 # Fallback to pattern-based analysis
                 return self._pattern_based_analysis(content_list)
@@ -277,20 +318,29 @@ class MessageAnalyzer(BaseTool):
             self.logger.error(f"Error in LLM analysis: {e}")
             return self._pattern_based_analysis(content_list)
     
-    async def _query_memory_agent(self, prompt: str) -> Optional[str]:
-        """Query the memory agent for LLM-powered analysis."""
+    def _get_http(self) -> httpx.AsyncClient:
+        """Get the keep-alive client for memory agent calls."""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(trust_env=False)
+        return self._http
+    
+    async def _query_llm(self, prompt: str) -> Optional[str]:
+        """Run an analysis prompt on Ollama in the batch lane, behind interactive requests."""
         try:
-            response = requests.post(
-                f"{self.memory_client_url}/capabilities/memory.embed",
-                json={"input": {"text": prompt}},
-                timeout=30
+            result = await self.llm.generate(
+                {
+                    "model": self.analysis_model,
+                    "prompt": prompt,
+                    "format": "json",
+                    "options": {"temperature": 0.1}
+                },
+                lane="batch",
+                timeout=60
             )
-            
-            if response.status_code == 200:
-                return response.json().get('result', {}).get('analysis', '')
+            return result.get("response", "")
                 
-        except requests.RequestException as e:
-            self.logger.warning(f"Could not query memory agent: {e}")
+        except httpx.HTTPError as e:
+            self.logger.warning(f"Could not query Ollama for analysis: {e}")
             
         return None
     
@@ -427,7 +477,7 @@ class MessageAnalyzer(BaseTool):
         try:
             memory_content = f"Contact enrichment analysis for {contact_name}"
             
-            response = requests.post(
+            response = await self._get_http().post(
                 f"{self.memory_client_url}/capabilities/memory.store",
                 json={
                     "input": {
@@ -450,7 +500,7 @@ class MessageAnalyzer(BaseTool):
             else:
                 self.logger.warning(f"Failed to store analysis in memory: {response.status_code}")
                 
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             self.logger.warning(f"Could not store analysis in memory: {e}")
     
     def _empty_analysis_result(self) -> Dict[str, Any]:
@@ -481,12 +531,20 @@ class MessageAnalyzer(BaseTool):
         contact_name = parameters.get("contact_name", "")
         lookback_days = parameters.get("lookback_days", 30)
         
+        # Batch mode: {"contacts": [{"contact_id", "contact_name", "identifiers"?}, ...]}
+        if parameters.get("contacts"):
+            try:
+                analyses = await self.analyze_messages_for_contacts(parameters["contacts"], lookback_days)
+                return {"success": True, "analyses": analyses}
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+        
         if not contact_id and not contact_name:
             return {"error": "Either contact_id or contact_name is required"}
         
         try:
             analysis_result = await self.analyze_messages_for_contact(
-                contact_id, contact_name, lookback_days
+                contact_id, contact_name, lookback_days, parameters.get("identifiers")
             )
             return {"success": True, "analysis": analysis_result}
         except Exception as e:
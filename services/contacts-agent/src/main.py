@@ -159,6 +159,26 @@ async def merge_contacts(request: CapabilityRequest):
         raise HTTPException(status_code=500, detail=f"Capability execution failed: {str(e)}")
 
 
+@app.post("/capabilities/contacts.find_duplicates", response_model=CapabilityResponse)
+async def find_duplicate_contacts(request: CapabilityRequest):
+    """Execute the contacts.find_duplicates capability."""
+    if not contacts_agent:
+        raise HTTPException(status_code=503, detail="Agent not initialized")
+    
+    try:
+        result = await contacts_agent.execute_capability("contacts.find_duplicates", request.input)
+        return CapabilityResponse(
+            output=result,
+            metadata={
+                "capability": "contacts.find_duplicates",
+                "agent_id": contacts_agent.agent_id,
+                "timestamp": contacts_agent.last_updated.isoformat()
+            }
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Capability execution failed: {str(e)}")
+
+
 # Agent info endpoint
 @app.get("/agent/info")
 async def agent_info():
@@ -191,7 +211,8 @@ async def root():
         "capabilities": [
             "contacts.resolve",
             "contacts.enrich", 
-            "contacts.merge"
+            "contacts.merge",
+            "contacts.find_duplicates"
         ]
     }
 
@@ -10,6 +10,7 @@ This module tests the contacts agent functionality including:
 
 import pytest
 import asyncio
+import time
 import sys
 from pathlib import Path
 from unittest.mock import Mock, patch, AsyncMock
@@ -25,7 +26,13 @@ from kenny_agent.agent import ContactsAgent
 from kenny_agent.handlers.resolve import ResolveContactsHandler
 from kenny_agent.handlers.enrich import EnrichContactsHandler
 from kenny_agent.handlers.merge import MergeContactsHandler
+from kenny_agent.handlers.find_duplicates import FindDuplicatesHandler
 from kenny_agent.tools.contacts_bridge import ContactsBridgeTool
+from kenny_agent.database import ContactsDatabase, normalize_phone, normalize_email, classify_identifier
+from kenny_agent.tools.chat_db import ChatDBReader, unix_to_apple
+from kenny_agent.tools.message_analyzer import MessageAnalyzer
+from kenny_agent.enrichment_orchestrator import EnrichmentOrchestrator
+from kenny_agent.dedup import ContactDedupEngine, UnionFind
 
 
 class TestContactsAgent:
@@ -39,13 +46,14 @@ class TestContactsAgent:
         assert agent.name == "Contacts Agent"
         assert agent.description == "Contact management and enrichment with deduplication"
         assert agent.version == "1.0.0"
-        assert len(agent.capabilities) == 3
+        assert len(agent.capabilities) == 4
         assert len(agent.tools) == 3  # contacts_bridge, message_analyzer, memory_client
         
         # Check capabilities
         assert "contacts.resolve" in agent.capabilities
         assert "contacts.enrich" in agent.capabilities
         assert "contacts.merge" in agent.capabilities
+        assert "contacts.find_duplicates" in agent.capabilities
         
         # Check tools
         assert "contacts_bridge" in agent.tools
@@ -68,6 +76,11 @@ class TestContactsAgent:
         merge_handler = agent.capabilities["contacts.merge"]
         assert isinstance(merge_handler, MergeContactsHandler)
         assert merge_handler.capability == "contacts.merge"
+        
+        # Check find duplicates handler
+        duplicates_handler = agent.capabilities["contacts.find_duplicates"]
+        assert isinstance(duplicates_handler, FindDuplicatesHandler)
+        assert duplicates_handler.engine is agent.dedup_engine
     
     def test_tool_registration(self):
         """Test that tools are properly registered."""
@@ -128,7 +141,7 @@ class TestContactsAgent:
         assert manifest["agent_id"] == "contacts-agent"
         assert manifest["version"] == "1.0.0"
         assert manifest["display_name"] == "Contacts Agent"
-        assert len(manifest["capabilities"]) == 3
+        assert len(manifest["capabilities"]) == 4
         
         # Check capability structure
         resolve_cap = next(c for c in manifest["capabilities"] if c["verb"] == "contacts.resolve")
@@ -282,8 +295,7 @@ class TestMergeContactsHandler:
         
         result = await handler.execute({
             "primary_contact_id": "contact-001",
-            "duplicate_contact_ids": ["contact-002", "contact-003"],
-            "merge_strategy": "merge_all"
+            "duplicate_contact_ids": ["contact-002", "contact-003"]
         })
         
         assert "merged_contact_id" in result
@@ -302,6 +314,149 @@ class TestMergeContactsHandler:
         
         assert result["merged_count"] == 1  # just primary
         assert result["conflicts_resolved"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_merge_invalidates_cached_enrichment(self, tmp_path):
+        """Test that merging drops cached enrichment for every merged contact."""
+        db = ContactsDatabase(str(tmp_path / "contacts.db"))
+        primary = db.create_contact("Sarah Chen", emails=["sarah@example.com"])
+        duplicate = db.create_contact("S. Chen", emails=["schen@work.com"])
+        
+        calls = []
+        orchestrator = EnrichmentOrchestrator(deadline=1.0, cache_ttl=60)
+        orchestrator.register_source("mail", TestEnrichmentOrchestrator.make_source(0.01, value=["m"], calls=calls))
+        for contact_id in (primary, duplicate):
+            await orchestrator.enrich({"contact_id": contact_id})
+        
+        agent = Mock()
+        agent.tools = {"contacts_bridge": Mock(db=db)}
+        agent.dedup_engine = None
+        agent.enrichment_orchestrator = orchestrator
+        await MergeContactsHandler(agent=agent).execute({
+            "primary_contact_id": primary,
+            "duplicate_contact_ids": [duplicate]
+        })
+        
+        assert (await orchestrator.enrich({"contact_id": primary}))["status"] == {"mail": "ok"}
+        assert calls == [primary, duplicate, primary]
+        db.close()
+
+
+class TestContactDedupEngine:
+    """Test cases for blocked duplicate detection and contacts.find_duplicates."""
+    
+    RECORDS = [
+        {"id": "a", "name": "Sarah Chen", "emails": ["sarah.chen@example.com"], "phones": ["+1 (555) 123-4567"]},
+        {"id": "b", "name": "Chen Sarah", "phones": ["555.123.4567"]},
+        {"id": "c", "name": "Sara Chen", "emails": ["SARAH.CHEN@example.com"]},
+        {"id": "d", "name": "Sarah Connor", "emails": ["sconnor@example.com"], "phones": ["+1 555 999 0000"]},
+        {"id": "e", "name": "Sarah Connor", "emails": ["sarah.c@skynet.com"], "phones": ["+1 555 888 0000"]},
+        {"id": "wa:1", "name": "Mike", "phones": ["+44 20 7946 0958"], "source": "whatsapp"},
+        {"id": "f", "name": "Michael Brown", "phones": ["0044 20 7946 0958"]},
+    ]
+    
+    @pytest.fixture
+    def engine(self):
+        engine = ContactDedupEngine(threshold=0.8)
+        engine.build(self.RECORDS)
+        return engine
+    
+    def test_union_find(self):
+        """Test that unions merge components."""
+        union_find = UnionFind()
+        union_find.union("a", "b")
+        union_find.union("c", "d")
+        union_find.union("b", "d")
+        union_find.find("e")
+        
+        groups = sorted(sorted(g) for g in union_find.groups())
+        assert groups == [["a", "b", "c", "d"], ["e"]]
+    
+    def test_clusters_across_formats_and_platforms(self, engine):
+        """Test that identifiers in other formats, swapped names and typos cluster together."""
+        clusters = {tuple(c["contact_ids"]): c for c in engine.find_duplicates()}
+        
+        assert ("a", "b", "c") in clusters
+        assert clusters[("a", "b", "c")]["primary_contact_id"] == "a"
+        # Same name, conflicting emails and phones: two different people
+        assert ("d", "e") not in clusters
+        # WhatsApp sender with only a first name and the same number
+        assert ("f", "wa:1") in clusters
+        assert clusters[("f", "wa:1")]["sources"] == ["contacts", "whatsapp"]
+    
+    def test_only_blocked_pairs_are_scored(self):
+        """Test that unrelated records are never compared."""
+        records = [{"id": str(i), "name": f"Person{i} Name{i * 7919 % 1000}",
+                    "emails": [f"p{i}@example.com"]} for i in range(2000)]
+        engine = ContactDedupEngine(window=3)
+        engine.build(records)
+        
+        assert engine.get_metrics()["scored_pairs"] < 2000 * 2 * 3
+        assert engine.find_duplicates() == []
+    
+    def test_incremental_update_and_remove(self, engine):
+        """Test that changing one contact re-scores only that contact."""
+        scored = engine.get_metrics()["scored_pairs"]
+        
+        clusters = engine.update({"id": "e", "name": "Sarah Connor", "emails": ["sconnor@example.com"]})
+        assert [c["contact_ids"] for c in clusters] == [["d", "e"]]
+        assert engine.get_metrics()["scored_pairs"] - scored < len(self.RECORDS)
+        
+        engine.remove(["b", "c"])
+        assert engine.find_duplicates(contact_id="a") == []
+    
+    @pytest.mark.asyncio
+    async def test_find_duplicates_capability_and_merge(self, tmp_path):
+        """Test the capability against the database and index upkeep after a merge."""
+        db = ContactsDatabase(str(tmp_path / "contacts.db"))
+        primary = db.create_contact("Sarah Chen", emails=["sarah.chen@example.com"])
+        duplicate = db.create_contact("Sarah  Chen", phones=["555-123-4567"], handles={"whatsapp": "@sarahc"})
+        other = db.create_contact("John Smith", emails=["john@example.com"])
+        agent = Mock()
+        agent.tools = {"contacts_bridge": Mock(db=db)}
+        agent.dedup_engine = ContactDedupEngine()
+        handler = FindDuplicatesHandler(agent=agent)
+        
+        result = await handler.execute({
+            "records": [{"id": "imessage:+15551234567", "name": "Sarah", "phones": ["+15551234567"], "source": "imessage"}]
+        })
+        assert result["cluster_count"] == 1
+        assert set(result["clusters"][0]["contact_ids"]) == {primary, duplicate, "imessage:+15551234567"}
+        assert result["indexed_records"] == 4
+        
+        merge = await MergeContactsHandler(agent=agent).execute({
+            "primary_contact_id": primary, "duplicate_contact_ids": [duplicate]
+        })
+        assert merge["merged_count"] == 2
+        assert duplicate not in agent.dedup_engine.records
+        
+        result = await handler.execute({"contact_id": primary})
+        assert set(result["clusters"][0]["contact_ids"]) == {primary, "imessage:+15551234567"}
+        assert other in agent.dedup_engine.records
+        db.close()
+    
+    @pytest.mark.asyncio
+    async def test_merge_waits_for_the_dedup_lock(self, tmp_path):
+        """Test that a merge does not touch the index while find_duplicates holds it."""
+        db = ContactsDatabase(str(tmp_path / "contacts.db"))
+        primary = db.create_contact("Sarah Chen", emails=["sarah.chen@example.com"])
+        duplicate = db.create_contact("Sarah  Chen", phones=["555-123-4567"])
+        agent = Mock()
+        agent.tools = {"contacts_bridge": Mock(db=db)}
+        agent.dedup_engine = ContactDedupEngine()
+        await FindDuplicatesHandler(agent=agent).execute({})
+        
+        async with agent.dedup_engine.lock:
+            merge = asyncio.ensure_future(MergeContactsHandler(agent=agent).execute({
+                "primary_contact_id": primary, "duplicate_contact_ids": [duplicate]
+            }))
+            await asyncio.sleep(0.05)
+            assert not merge.done()
+            assert duplicate in agent.dedup_engine.records
+        
+        await merge
+        assert duplicate not in agent.dedup_engine.records
+        db.close()
 
 
 class TestContactsBridgeTool:
@@ -375,5 +530,335 @@ class TestContactsBridgeTool:
         assert isinstance(enrichments, list)  # Should always return a list
 
 
+class TestContactIdentifierIndex:
+    """Test cases for the normalized identifier index in ContactsDatabase."""
+    
+    @pytest.fixture
+    def db(self, tmp_path):
+        database = ContactsDatabase(str(tmp_path / "contacts.db"))
+        yield database
+        database.close()
+    
+    def test_normalization(self):
+        """Test that formatting differences normalize to one key."""
+        assert normalize_phone("+1 (555) 123-4567") == "+15551234567"
+        assert normalize_phone("555.123.4567") == "+15551234567"
+        assert normalize_phone("1-555-123-4567") == "+15551234567"
+        assert normalize_phone("0044 20 7946 0958") == "+442079460958"
+        assert normalize_phone("0412 345 678", default_country_code="61") == "+61412345678"
+        assert normalize_phone("12") is None
+        assert normalize_email("  Sarah.Chen@Example.COM ") == "sarah.chen@example.com"
+        assert classify_identifier("@SarahC") == ("handle", "sarahc")
+        assert classify_identifier("Sarah Chen") == ("name", "Sarah Chen")
+    
+    def test_email_and_phone_resolve_across_formats(self, db):
+        """Test indexed lookups that the LIKE search used to miss."""
+        contact_id = db.create_contact("Sarah Chen", emails=["Sarah.Chen@Example.com"], phones=["+1 (555) 123-4567"])
+        db.create_contact("Sarah Connor", emails=["sconnor@example.com"])
+        
+        by_email = db.search_contacts("sarah.chen@example.com")
+        by_phone = db.search_contacts("555-123-4567")
+        
+        assert [c["id"] for c in by_email] == [contact_id]
+        assert by_email[0]["match_type"] == "email"
+        assert by_email[0]["confidence"] == 0.95
+        assert [c["id"] for c in by_phone] == [contact_id]
+        assert by_phone[0]["matched_identifier"] == "+1 (555) 123-4567"
+    
+    def test_local_number_matches_by_suffix(self, db):
+        """Test that a number without its country code still resolves."""
+        contact_id = db.create_contact("Raj", phones=["+44 20 7946 0958"])
+        
+        matches = db.search_contacts("7946 0958", fuzzy_match=False)
+        
+        assert [c["id"] for c in matches] == [contact_id]
+        assert matches[0]["match_type"] == "phone_suffix"
+        assert matches[0]["confidence"] == 0.80
+    
+    def test_handles_and_ranked_names(self, db):
+        """Test platform handles and the separate ranked name path."""
+        first = db.create_contact("Sam Lee", handles={"telegram": "@SamL"})
+        second = db.create_contact("Samantha Jones")
+        third = db.create_contact("Pam Samuels")
+        
+        assert [c["id"] for c in db.search_contacts("@saml", platform="telegram")] == [first]
+        assert db.search_contacts("@saml", platform="whatsapp", fuzzy_match=False) == []
+        ranked = db.search_contacts("Sam")
+        assert [c["id"] for c in ranked] == [first, second, third]
+        assert ranked[0]["confidence"] > ranked[2]["confidence"]
+    
+    def test_merge_moves_identifiers(self, db):
+        """Test that merged duplicates resolve to the primary contact."""
+        primary = db.create_contact("Sarah Chen", emails=["sarah@example.com"], phones=["555-123-4567"])
+        duplicate = db.create_contact("S. Chen", emails=["SARAH@example.com", "schen@work.com"])
+        
+        merged = db.merge_contacts(primary, [duplicate])
+        
+        assert merged["emails"] == ["sarah@example.com", "schen@work.com"]
+        assert [c["id"] for c in db.search_contacts("schen@work.com")] == [primary]
+        assert db.get_contact_by_id(duplicate) is None
+    
+    def test_existing_contacts_are_backfilled(self, tmp_path):
+        """Test that a database created before the index gets indexed on open."""
+        path = str(tmp_path / "legacy.db")
+        legacy = ContactsDatabase(path)
+        contact_id = legacy.create_contact("Legacy", phones=["(555) 987-6543"])
+        legacy._get_connection().execute("DELETE FROM contact_identifiers")
+        legacy._get_connection().commit()
+        legacy.close()
+        
+        reopened = ContactsDatabase(path)
+        assert [c["id"] for c in reopened.search_contacts("+15559876543")] == [contact_id]
+        reopened.close()
+    
+    def test_name_search_uses_shared_scorer(self, db):
+        """Test typo-tolerant name ranking and that the scorer follows writes."""
+        sarah = db.create_contact("Sarah Chen", emails=["sarah@example.com"])
+        samantha = db.create_contact("Samantha Jones")
+        assert [c["id"] for c in db.search_contacts("Sarah")] == [sarah]
+        
+        typo = db.search_contacts("Samanta Jones")
+        assert [c["id"] for c in typo] == [samantha]
+        assert typo[0]["match_type"] == "fuzzy"
+        
+        later = db.create_contact("Sarah Connor")
+        assert [c["id"] for c in db.search_contacts("sarah")] == [sarah, later]
+        db.merge_contacts(sarah, [later])
+        assert [c["id"] for c in db.search_contacts("sarah")] == [sarah]
+    
+    def test_name_scorer_rebuilds_after_external_writes(self, db):
+        """Test that contacts written through another connection are picked up."""
+        db.create_contact("Sarah Chen")
+        assert len(db.search_contacts("Priya")) == 0
+        
+        other = ContactsDatabase(db.db_path)
+        priya = other.create_contact("Priya Patel")
+        other.close()
+        
+        assert [c["id"] for c in db.search_contacts("Priya")] == [priya]
+
+def build_chat_db(path, handles, messages):
+    """
+    Create a synthetic chat.db with the tables and indexes the reader uses.
+    
+    Args:
+        path: Where to write the database
+        handles: List of handle.id values (ROWIDs are assigned from 1)
+        messages: List of (handle_rowid, text, unix_time, is_from_me) tuples
+    """
+    import sqlite3
+    conn = sqlite3.connect(str(path))
+    conn.executescript("""
+        CREATE TABLE handle (ROWID INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL, service TEXT);
+        CREATE TABLE chat (ROWID INTEGER PRIMARY KEY AUTOINCREMENT, guid TEXT UNIQUE NOT NULL);
+        CREATE TABLE message (ROWID INTEGER PRIMARY KEY AUTOINCREMENT, text TEXT, date INTEGER,
+                              is_from_me INTEGER DEFAULT 0, handle_id INTEGER DEFAULT 0);
+        CREATE TABLE chat_message_join (chat_id INTEGER, message_id INTEGER, PRIMARY KEY (chat_id, message_id));
+        CREATE INDEX message_idx_handle ON message(handle_id, date);
+        CREATE INDEX message_idx_date ON message(date);
+        CREATE INDEX chat_message_join_idx_message_id ON chat_message_join(message_id);
+    """)
+    for handle in handles:
+        conn.execute("INSERT INTO handle (id, service) VALUES (?, 'iMessage')", (handle,))
+        conn.execute("INSERT INTO chat (guid) VALUES (?)", (f"iMessage;-;{handle}",))
+    for handle_rowid, text, unix_time, is_from_me in messages:
+        cursor = conn.execute(
+            "INSERT INTO message (text, date, is_from_me, handle_id) VALUES (?, ?, ?, ?)",
+            (text, unix_to_apple(unix_time, nanoseconds=True), is_from_me, handle_rowid)
+        )
+        conn.execute("INSERT INTO chat_message_join VALUES (?, ?)", (handle_rowid, cursor.lastrowid))
+    conn.commit()
+    conn.close()
+
+
+class TestChatDBReader:
+    """Test cases for the read-only chat.db query layer."""
+    
+    @pytest.fixture
+    def chat_db_path(self, tmp_path):
+        import time
+        now = time.time()
+        messages = [(1, f"busy thread {i}", now - 60 - i, i % 2) for i in range(1200)]
+        messages += [(2, f"sarah message {i}", now - 86400 * (i + 1), 0) for i in range(5)]
+        messages += [(3, "sarah by email", now - 3600, 1), (2, "too old", now - 86400 * 90, 0)]
+        path = tmp_path / "chat.db"
+        build_chat_db(path, ["+15550000001", "+15551234567", "sarah@example.com"], messages)
+        return path
+    
+    @pytest.fixture
+    def reader(self, chat_db_path):
+        reader = ChatDBReader(str(chat_db_path))
+        reader.page_size = 100
+        yield reader
+        reader.close()
+    
+    @pytest.mark.asyncio
+    async def test_handles_resolve_across_formats(self, reader):
+        """Test that reformatted phones and mixed-case emails map to handle ROWIDs."""
+        assert await reader.resolve_handles(["(555) 123-4567"]) == [2]
+        assert await reader.resolve_handles(["Sarah@Example.com", "555.123.4567"]) == [2, 3]
+        assert await reader.resolve_handles(["+15559999999"]) == []
+    
+    @pytest.mark.asyncio
+    async def test_contact_messages_not_crowded_out_by_busy_threads(self, reader):
+        """Test that the handle filter runs in SQL, ahead of the row limit."""
+        import time
+        messages = await reader.fetch_messages(["555-123-4567", "sarah@example.com"], lookback_days=30)
+        
+        assert [m["content"] for m in messages] == ["sarah by email"] + [f"sarah message {i}" for i in range(5)]
+        assert {m["sender_id"] for m in messages} == {"+15551234567", "sarah@example.com"}
+        assert messages[0]["thread_id"] == "iMessage;-;sarah@example.com"
+        # Timestamps come from each message's own date
+        assert abs(messages[1]["timestamp"] - (time.time() - 86400)) < 60
+        assert abs(messages[-1]["timestamp"] - (time.time() - 86400 * 5)) < 60
+        assert "_cursor" not in messages[0]
+    
+    @pytest.mark.asyncio
+    async def test_messages_are_paged_and_capped(self, reader):
+        """Test keyset paging through a large thread with a message cap."""
+        messages = await reader.fetch_messages(["+1 555 000 0001"], lookback_days=30, max_messages=250)
+        
+        assert len(messages) == 250
+        assert [m["content"] for m in messages[:2]] == ["busy thread 0", "busy thread 1"]
+        assert len({m["content"] for m in messages}) == 250
+        assert reader.get_metrics()["pages"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_batch_reads_all_contacts_in_one_pass(self, reader):
+        """Test that batch mode routes rows to contacts and stops reading saturated ones."""
+        results = await reader.fetch_messages_batch({
+            "busy": ["555-000-0001"],
+            "sarah": ["sarah@example.com", "+15551234567"],
+            "unknown": ["nobody@example.com"]
+        }, lookback_days=30, max_messages=150)
+        
+        assert len(results["busy"]) == 150
+        assert len(results["sarah"]) == 6
+        assert results["unknown"] == []
+        # The busy handle drops out once capped, so Sarah's older messages need no extra busy pages
+        assert reader.get_metrics()["pages"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_message_analyzer_batch_mode(self, chat_db_path):
+        """Test that MessageAnalyzer reads chat.db through the reader in batch mode."""
+        analyzer = MessageAnalyzer(imessage_db_path=str(chat_db_path))
+        analyzer.mail_bridge = Mock()
+        analyzer.mail_bridge.get_json = AsyncMock(return_value={"messages": []})
+        analyzer._store_analysis_in_memory = AsyncMock()
+        analyzer._query_llm = AsyncMock(return_value=None)
+        
+        result = await analyzer.execute({
+            "contacts": [
+                {"contact_id": "c1", "contact_name": "Sarah", "identifiers": ["sarah@example.com"]},
+                {"contact_id": "c2", "contact_name": "Nobody", "identifiers": ["+15559999999"]}
+            ],
+            "lookback_days": 30
+        })
+        
+        assert result["success"]
+        assert result["analyses"]["c1"]["interaction_patterns"]["recency"] == "today"
+        assert result["analyses"]["c2"]["interaction_patterns"]["frequency"] == "none"
+        # Both contacts were served by one batched chat.db pass
+        assert analyzer.orchestrator.get_metrics()["source_calls"] == 4
+        analyzer.chat_db.close()
+
+
+class TestEnrichmentOrchestrator:
+    """Test concurrent enrichment fan-out, deadlines and caching"""
+    
+    @staticmethod
+    def make_source(delay, value=None, calls=None, error=None):
+        async def fetch(contact):
+            if calls is not None:
+                calls.append(contact["contact_id"])
+            await asyncio.sleep(delay)
+            if error:
+                raise error
+            return value if value is not None else contact["contact_id"]
+        return fetch
+    
+    @pytest.mark.asyncio
+    async def test_sources_run_concurrently(self):
+        orchestrator = EnrichmentOrchestrator(deadline=2.0)
+        for name in ("mail", "imessage", "calendar"):
+            orchestrator.register_source(name, self.make_source(0.2, value=[name]))
+        
+        started = time.perf_counter()
+        result = await orchestrator.enrich({"contact_id": "c1"})
+        
+        assert time.perf_counter() - started < 0.5
+        assert result["sources"] == {"mail": ["mail"], "imessage": ["imessage"], "calendar": ["calendar"]}
+        assert set(result["status"].values()) == {"ok"}
+        assert not result["partial"]
+    
+    @pytest.mark.asyncio
+    async def test_deadline_returns_partial_results(self):
+        orchestrator = EnrichmentOrchestrator(deadline=0.2)
+        orchestrator.register_source("fast", self.make_source(0.01, value=["fast"]))
+        orchestrator.register_source("slow", self.make_source(5.0))
+        orchestrator.register_source("broken", self.make_source(0.01, error=RuntimeError("down")))
+        
+        started = time.perf_counter()
+        result = await orchestrator.enrich({"contact_id": "c1"})
+        
+        assert time.perf_counter() - started < 1.0
+        assert result["sources"] == {"fast": ["fast"]}
+        assert result["status"] == {"fast": "ok", "slow": "timeout", "broken": "error"}
+        assert result["partial"]
+        metrics = orchestrator.get_metrics()
+        assert metrics["timeouts"] == 1
+        assert metrics["errors"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_results_are_cached_until_invalidated(self):
+        calls = []
+        orchestrator = EnrichmentOrchestrator(deadline=1.0, cache_ttl=60)
+        orchestrator.register_source("mail", self.make_source(0.01, value=["m"], calls=calls))
+        
+        await orchestrator.enrich({"contact_id": "c1"})
+        cached = await orchestrator.enrich({"contact_id": "c1"})
+        assert cached["status"] == {"mail": "cached"}
+        assert calls == ["c1"]
+        
+        orchestrator.invalidate("c1")
+        await orchestrator.enrich({"contact_id": "c1"})
+        assert calls == ["c1", "c1"]
+        assert orchestrator.get_metrics()["cache_hits"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_batch_source_called_once(self):
+        batch_calls = []
+        
+        async def fetch_batch(contacts):
+            batch_calls.append([c["contact_id"] for c in contacts])
+            return {c["contact_id"]: [c["contact_id"].upper()] for c in contacts}
+        
+        orchestrator = EnrichmentOrchestrator(deadline=1.0)
+        orchestrator.register_source("imessage", self.make_source(0.01), fetch_batch)
+        
+        results = await orchestrator.enrich_batch([{"contact_id": f"c{i}"} for i in range(5)])
+        
+        assert batch_calls == [["c0", "c1", "c2", "c3", "c4"]]
+        assert results["c3"]["sources"]["imessage"] == ["C3"]
+
+    
+    @pytest.mark.asyncio
+    async def test_failed_mail_lookup_is_an_error_not_cached(self):
+        from kenny_agent.intelligent_contacts_agent import IntelligentContactsAgent
+        agent = IntelligentContactsAgent.__new__(IntelligentContactsAgent)
+        agent.agent_dependencies = {"mail-agent": Mock()}
+        agent.query_agent = AsyncMock(side_effect=[{"results": []}, None, {"results": []}, {"results": []}])
+        orchestrator = EnrichmentOrchestrator(deadline=1.0, cache_ttl=60)
+        orchestrator.register_source("mail", agent._fetch_mail_interactions)
+        contact = {"contact_id": "c1", "emails": ["a@example.com", "b@example.com"]}
+        
+        failed = await orchestrator.enrich(contact)
+        assert failed["status"] == {"mail": "error"}
+        
+        retried = await orchestrator.enrich(contact)
+        assert retried["status"] == {"mail": "ok"}
+        assert retried["sources"]["mail"] == [{"results": []}, {"results": []}]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
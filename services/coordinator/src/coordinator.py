@@ -1,4 +1,4 @@
-from typing import Dict, Any, List, Optional, TypedDict, AsyncGenerator
+from typing import Dict, Any, List, Optional, TypedDict, AsyncGenerator, Tuple
 from langgraph.graph import StateGraph, END
 import asyncio
 import logging
@@ -180,18 +180,16 @@ class Coordinator:
                 "timestamp": asyncio.get_event_loop().time()
             }
             
-            # Execute with streaming from individual agents
+            # Execute with streaming from individual agents; state is updated in place
             async for agent_update in self._execute_with_streaming(current_state):
                 yield agent_update
             
-            # Get final state after streaming execution
-            current_state = current_state  # State is updated in place during streaming
-            
+            execution_results = current_state["results"].get("execution_results", [])
             yield {
                 "type": "node_complete",
                 "node": "executor", 
                 "result": current_state["results"],
-                "message": f"Execution completed with {len(current_state['results'])} agent results",
+                "message": f"Execution completed with {len(execution_results)} agent results",
                 "timestamp": asyncio.get_event_loop().time()
             }
             
@@ -244,63 +242,122 @@ class Coordinator:
             }
     
     async def _execute_with_streaming(self, state: CoordinatorState) -> AsyncGenerator[Dict[str, Any], None]:
-        """Execute agents with streaming progress updates"""
+        """Execute agents with streaming progress updates
+        
+        Steps run concurrently as soon as the steps they depend on have finished
+        (with those results passed in as from_<step_id> parameters, as the
+        sequential executor does), and each agent result is streamed as it
+        completes rather than after the whole plan.
+        """
         execution_plan = state["context"].get("execution_plan", [])
+        if not execution_plan:
+            # Fallback to legacy plan format, as the executor node does
+            execution_plan = self.executor_node._convert_legacy_plan(state["context"].get("plan", []), state)
         
+        state["execution_path"].append("executor")
+        state["results"]["execution_results"] = []
         if not execution_plan:
             return
         
-        # Execute agents and stream individual results
-        for i, step in enumerate(execution_plan):
-            agent_id = step.get("agent_id")
-            capability = step.get("capability")
-            
-            yield {
-                "type": "agent_start",
-                "agent_id": agent_id,
-                "capability": capability,
-                "message": f"Executing {capability} on {agent_id}...",
-                "progress": f"{i+1}/{len(execution_plan)}",
-                "timestamp": asyncio.get_event_loop().time()
-            }
-            
-            try:
-                # Execute the individual agent task using the executor
-                agent_id = step.get("agent_id") 
-                capability = step.get("capability")
-                parameters = step.get("parameters", {})
-                
-                result = await self.executor_node.executor.execute_capability(agent_id, capability, parameters)
-                
-                yield {
-                    "type": "agent_complete",
-                    "agent_id": agent_id,
-                    "capability": capability,
-                    "result": result,
-                    "message": f"Completed {capability} on {agent_id}",
-                    "progress": f"{i+1}/{len(execution_plan)}",
-                    "timestamp": asyncio.get_event_loop().time()
-                }
-                
-                # Update state with result
-                if agent_id not in state["results"]:
-                    state["results"][agent_id] = {}
-                state["results"][agent_id][capability] = result
+        known_steps = {step.get("step_id") for step in execution_plan}
+        pending = list(enumerate(execution_plan))
+        step_outputs: Dict[str, Any] = {}
+        running: Dict[asyncio.Task, Tuple[int, Dict[str, Any]]] = {}
+        completed = 0
+        
+        try:
+            while pending or running:
+                # Start every step whose dependencies have completed
+                for i, step in list(pending):
+                    dependencies = [d for d in step.get("dependencies", []) if d in known_steps]
+                    if not all(d in step_outputs for d in dependencies):
+                        continue
+                    pending.remove((i, step))
+                    
+                    parameters = dict(step.get("parameters", {}))
+                    for dep_step_id in dependencies:
+                        parameters[f"from_{dep_step_id}"] = step_outputs[dep_step_id]
+                    
+                    if step.get("agent_id") and step.get("capability"):
+                        yield {
+                            "type": "agent_start",
+                            "agent_id": step.get("agent_id"),
+                            "capability": step.get("capability"),
+                            "message": f"Executing {step.get('capability')} on {step.get('agent_id')}...",
+                            "progress": f"{i+1}/{len(execution_plan)}",
+                            "timestamp": asyncio.get_event_loop().time()
+                        }
+                    running[asyncio.create_task(self._execute_step(step, parameters))] = (i, step)
                 
-            except Exception as e:
-                error_msg = f"Agent {agent_id} failed: {str(e)}"
-                logger.error(error_msg)
-                state["errors"].append(error_msg)
+                if not running:
+                    # Remaining steps wait on each other; nothing can make progress
+                    for _, step in pending:
+                        state["errors"].append(f"Step {step.get('step_id')}: unresolved dependencies")
+                    break
                 
-                yield {
-                    "type": "agent_error",
-                    "agent_id": agent_id,
-                    "capability": capability,
-                    "error": str(e),
-                    "message": f"Failed {capability} on {agent_id}: {str(e)}",
-                    "progress": f"{i+1}/{len(execution_plan)}",
-                    "timestamp": asyncio.get_event_loop().time()
-                }
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    i, step = running.pop(task)
+                    completed += 1
+                    result = task.result()
+                    result["step_id"] = step.get("step_id")
+                    step_outputs[step.get("step_id")] = result.get("result", {})
+                    state["results"]["execution_results"].append(result)
+                    
+                    agent_id = step.get("agent_id")
+                    capability = step.get("capability")
+                    if not (agent_id and capability):
+                        continue
+                    
+                    # Update state with result
+                    if agent_id not in state["results"]:
+                        state["results"][agent_id] = {}
+                    state["results"][agent_id][capability] = result
+                    
+                    if result.get("status") == "error":
+                        error_msg = f"Agent {agent_id} failed: {result.get('error')}"
+                        logger.error(error_msg)
+                        state["errors"].append(error_msg)
+                        yield {
+                            "type": "agent_error",
+                            "agent_id": agent_id,
+                            "capability": capability,
+                            "error": result.get("error"),
+                            "message": f"Failed {capability} on {agent_id}: {result.get('error')}",
+                            "progress": f"{completed}/{len(execution_plan)}",
+                            "timestamp": asyncio.get_event_loop().time()
+                        }
+                    else:
+                        yield {
+                            "type": "agent_complete",
+                            "agent_id": agent_id,
+                            "capability": capability,
+                            "result": result,
+                            "message": f"Completed {capability} on {agent_id}",
+                            "progress": f"{completed}/{len(execution_plan)}",
+                            "timestamp": asyncio.get_event_loop().time()
+                        }
+        finally:
+            # The client went away mid-stream; stop agent calls nobody will read
+            for task in running:
+                task.cancel()
+    
+    async def _execute_step(self, step: Dict[str, Any], parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute one plan step, returning an error result instead of raising"""
+        agent_id = step.get("agent_id")
+        capability = step.get("capability")
+        if not (agent_id and capability):
+            return self.executor_node.general_step_result(step)
+        
+        try:
+            return await self.executor_node.executor.execute_capability(agent_id, capability, parameters)
+        except Exception as e:
+            return {
+                "status": "error",
+                "error": str(e),
+                "agent_id": agent_id,
+                "capability": capability
+            }
     
     def get_graph_info(self) -> Dict[str, Any]:
         """Get information about the coordinator graph"""
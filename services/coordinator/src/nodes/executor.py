@@ -286,36 +286,40 @@ class ExecutorNode:
                 result['step_id'] = step.get('step_id')
                 results.append(result)
             else:
-                # Handle conversational responses and general processing
-                action = step.get('action', '')
-                if action == "conversational_response" or parameters.get('requires_llm_enhancement'):
-                    # This is a conversational query that should be handled by Ollama
-                    results.append({
-                        "status": "success",
-                        "step_id": step.get('step_id'),
-                        "action": action,
-                        "result": {
-                            "message": f"CONVERSATIONAL_QUERY: {parameters.get('query', 'N/A')}",
-                            "requires_llm_enhancement": True,
-                            "query_type": "conversational",
-                            "intent": parameters.get('intent', 'unknown')
-                        }
-                    })
-                else:
-                    # Handle other general processing - indicate this needs Gateway enhancement
-                    results.append({
-                        "status": "success",
-                        "step_id": step.get('step_id'),
-                        "action": action,
-                        "result": {
-                            "message": f"GENERAL_QUERY: {parameters.get('query', 'N/A')}",
-                            "requires_llm_enhancement": True,
-                            "query_type": "general"
-                        }
-                    })
+                results.append(self.general_step_result(step))
         
         return results
     
+    @staticmethod
+    def general_step_result(step: Dict[str, Any]) -> Dict[str, Any]:
+        """Result for a plan step without an agent, marking it for Gateway LLM enhancement"""
+        action = step.get('action', '')
+        parameters = step.get('parameters', {})
+        if action == "conversational_response" or parameters.get('requires_llm_enhancement'):
+            # This is a conversational query that should be handled by Ollama
+            return {
+                "status": "success",
+                "step_id": step.get('step_id'),
+                "action": action,
+                "result": {
+                    "message": f"CONVERSATIONAL_QUERY: {parameters.get('query', 'N/A')}",
+                    "requires_llm_enhancement": True,
+                    "query_type": "conversational",
+                    "intent": parameters.get('intent', 'unknown')
+                }
+            }
+        # Handle other general processing - indicate this needs Gateway enhancement
+        return {
+            "status": "success",
+            "step_id": step.get('step_id'),
+            "action": action,
+            "result": {
+                "message": f"GENERAL_QUERY: {parameters.get('query', 'N/A')}",
+                "requires_llm_enhancement": True,
+                "query_type": "general"
+            }
+        }
+    
     async def _execute_multi_agent_plan(self, plan: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Execute multi-agent plan with enhanced parallel execution for calendar operations"""
         start_time = asyncio.get_event_loop().time()
@@ -162,6 +162,38 @@ class TestCoordinatorService:
         remaining_rules = engine.get_rules()
         assert len(remaining_rules) == 1
 
+    def test_streaming_execution_yields_agent_results_as_they_complete(self):
+        """Test that progressive execution runs independent agents concurrently and streams each result"""
+        from src.coordinator import Coordinator
+        
+        coordinator = Coordinator()
+        delays = {"slow-agent": 0.3, "fast-agent": 0.05, "dependent-agent": 0.05}
+        
+        async def fake_execute(agent_id, capability, parameters):
+            await asyncio.sleep(delays[agent_id])
+            return {"status": "success", "agent_id": agent_id, "capability": capability, "result": dict(parameters)}
+        
+        plan = [
+            {"step_id": "slow", "agent_id": "slow-agent", "capability": "a.run", "parameters": {}, "dependencies": []},
+            {"step_id": "fast", "agent_id": "fast-agent", "capability": "a.run", "parameters": {}, "dependencies": []},
+            {"step_id": "dep", "agent_id": "dependent-agent", "capability": "a.run", "parameters": {},
+             "dependencies": ["fast"]}
+        ]
+        state = {"user_input": "x", "context": {"execution_plan": plan}, "messages": [], "current_node": None,
+                 "execution_path": [], "errors": [], "results": {}}
+        
+        async def collect():
+            with patch.object(coordinator.executor_node.executor, "execute_capability", side_effect=fake_execute):
+                return [update async for update in coordinator._execute_with_streaming(state)]
+        
+        updates = asyncio.run(collect())
+        completed = [u["agent_id"] for u in updates if u["type"] == "agent_complete"]
+        
+        assert completed == ["fast-agent", "dependent-agent", "slow-agent"]
+        assert [u for u in updates if u["type"] == "agent_complete"][1]["result"]["result"] == {"from_fast": {}}
+        assert [r["step_id"] for r in state["results"]["execution_results"]] == ["fast", "dep", "slow"]
+        assert "executor" in state["execution_path"]
+
 class TestLangGraphIntegration:
     """Test LangGraph orchestration functionality"""
     
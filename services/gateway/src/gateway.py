@@ -1,12 +1,14 @@
 import asyncio
 import json
 import logging
-from typing import Dict, Any, List, Optional, AsyncGenerator
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, AsyncGenerator, Tuple
 import httpx
 from datetime import datetime
 
 from .schemas import AgentInfo, CapabilityInfo, SystemHealth
-from .ollama_llm import OllamaLLM
+from .ollama_llm import OllamaLLM, TTFT_WINDOW, percentile
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +28,15 @@ class KennyGateway:
         self._capabilities_cache: List[CapabilityInfo] = []
         self._cache_timestamp = 0
         self.cache_ttl = 30  # 30 seconds
+        
+        # End-to-end streaming metrics, measured from the start of orchestration
+        self.stream_metrics = {
+            "streams": 0,
+            "last_ttft_ms": None,
+            "last_first_event_ms": None,
+            "last_total_ms": None
+        }
+        self._ttft_samples = deque(maxlen=TTFT_WINDOW)
     
     async def initialize(self):
         """Initialize gateway components"""
@@ -377,7 +388,15 @@ class KennyGateway:
         }
     
     async def orchestrate_request_stream(self, query: str, context: Dict[str, Any]) -> AsyncGenerator[Dict[str, Any], None]:
-        """Orchestrate request with streaming results"""
+        """Orchestrate request with streaming results
+        
+        Coordinator events (each agent result as it completes) are forwarded as
+        they arrive, then the reply is synthesized token by token from Ollama.
+        The stream ends with a final_result carrying the time to first token.
+        """
+        stream_start = time.perf_counter()
+        self.stream_metrics["streams"] += 1
+        
         try:
             if not self.http_client:
                 raise RuntimeError("Gateway not initialized")
@@ -386,7 +405,7 @@ class KennyGateway:
             if not await self._is_coordinator_available():
                 logger.warning("Coordinator unavailable for streaming, using direct Ollama")
                 # Fall back to direct Ollama streaming
-                async for chunk in self._stream_ollama_response(query, context):
+                async for chunk in self._stream_ollama_response(query, context, stream_start):
                     yield chunk
                 return
             
@@ -404,7 +423,7 @@ class KennyGateway:
                 
                 if response.status_code != 200:
                     logger.warning(f"Coordinator stream failed: {response.status_code}, falling back to Ollama")
-                    async for chunk in self._stream_ollama_response(query, context):
+                    async for chunk in self._stream_ollama_response(query, context, stream_start):
                         yield chunk
                     return
                 
@@ -412,51 +431,76 @@ class KennyGateway:
                 got_coordinator_response = False
                 
                 async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        try:
-                            data = json.loads(line[6:])  # Remove "data: " prefix
-                            
-                            # Check if this is a final result with generic processing
-                            if data.get("type") == "final_result":
-                                result = data.get("result", {})
-                                results = result.get("results", {})
-                                
-                                # If it's just generic processing, enhance with Ollama
-                                if not self._has_meaningful_agent_results(results):
-                                    logger.info("Got generic coordinator result, enhancing with Ollama")
-                                    async for chunk in self._stream_ollama_response(query, context):
-                                        yield chunk
-                                    return
-                            
-                            yield data
-                            got_coordinator_response = True
-                            
-                        except json.JSONDecodeError as e:
-                            logger.debug(f"Failed to parse streaming data: {line}, error: {e}")
-                            continue
+                    if not line.startswith("data: "):
+                        continue
+                    try:
+                        data = json.loads(line[6:])  # Remove "data: " prefix
+                    except json.JSONDecodeError as e:
+                        logger.debug(f"Failed to parse streaming data: {line}, error: {e}")
+                        continue
+                    
+                    if data.get("type") == "complete":
+                        # The stream completes after synthesis, not when the coordinator finishes
+                        continue
+                    
+                    if data.get("type") == "final_result":
+                        # Synthesize the reply from the agent results, streaming tokens
+                        async for chunk in self._stream_synthesis(query, data.get("result", {}), stream_start):
+                            yield chunk
+                        return
+                    
+                    if not got_coordinator_response:
+                        self.stream_metrics["last_first_event_ms"] = self._elapsed_ms(stream_start)
+                    yield data
+                    got_coordinator_response = True
                 
                 # If we didn't get any coordinator response, fall back to Ollama
                 if not got_coordinator_response:
                     logger.info("No coordinator response received, using Ollama")
-                    async for chunk in self._stream_ollama_response(query, context):
+                    async for chunk in self._stream_ollama_response(query, context, stream_start):
                         yield chunk
                         
         except Exception as e:
             logger.error(f"Coordinator streaming failed: {e}")
             # Fall back to Ollama streaming instead of error
-            async for chunk in self._stream_ollama_response(query, context):
+            async for chunk in self._stream_ollama_response(query, context, stream_start):
                 yield chunk
     
-    async def _stream_ollama_response(self, query: str, context: Dict[str, Any]) -> AsyncGenerator[Dict[str, Any], None]:
+    async def _stream_ollama_response(self, query: str, context: Dict[str, Any],
+                                      stream_start: Optional[float] = None) -> AsyncGenerator[Dict[str, Any], None]:
         """Stream response directly from Ollama LLM"""
+        # Prepare context for Ollama
+        ollama_context = {
+            "user_input": query,
+            "available_agents": list(self._agents_cache.values()),
+            **context
+        }
+        
+        async for chunk in self._stream_tokens(query, ollama_context, stream_start or time.perf_counter(), {
+            "intent": "conversational",
+            "plan": ["ollama_response"],
+            "execution_path": ["ollama"]
+        }):
+            yield chunk
+    
+    async def _stream_synthesis(self, user_input: str, coordinator_result: Dict[str, Any],
+                                stream_start: float) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream the reply synthesized from the coordinator's agent results"""
+        prompt, ollama_context = self._synthesis_request(coordinator_result, user_input)
+        
+        async for chunk in self._stream_tokens(prompt, ollama_context, stream_start, {
+            "intent": coordinator_result.get("intent", "unknown"),
+            "plan": coordinator_result.get("plan", []),
+            "execution_path": coordinator_result.get("execution_path", []),
+            "results": coordinator_result.get("results", {}),
+            "errors": coordinator_result.get("errors", [])
+        }):
+            yield chunk
+    
+    async def _stream_tokens(self, prompt: str, ollama_context: Dict[str, Any], stream_start: float,
+                             result_fields: Dict[str, Any]) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream Ollama tokens as events, ending with a final_result and timing metrics"""
         try:
-            # Prepare context for Ollama
-            ollama_context = {
-                "user_input": query,
-                "available_agents": list(self._agents_cache.values()),
-                **context
-            }
-            
             # Start streaming
             yield {
                 "type": "ollama_start",
@@ -465,24 +509,37 @@ class KennyGateway:
             }
             
             response_content = ""
-            async for token in self.ollama_llm.generate_response_stream(query, ollama_context):
+            token_count = 0
+            ttft_ms = None
+            async for token in self.ollama_llm.generate_response_stream(prompt, ollama_context):
+                if ttft_ms is None:
+                    ttft_ms = self._elapsed_ms(stream_start)
+                    self.stream_metrics["last_ttft_ms"] = ttft_ms
+                    self._ttft_samples.append(ttft_ms)
                 response_content += token
+                token_count += 1
                 yield {
                     "type": "token",
                     "content": token,
                     "timestamp": asyncio.get_event_loop().time()
                 }
             
+            total_ms = self._elapsed_ms(stream_start)
+            self.stream_metrics["last_total_ms"] = total_ms
+            
             # Send final result
             yield {
                 "type": "final_result",
                 "result": {
                     "message": response_content,
-                    "intent": "conversational",
-                    "plan": ["ollama_response"],
-                    "execution_path": ["ollama"],
+                    **result_fields,
                     "status": "success"
                 },
+                "metrics": {
+                    "ttft_ms": ttft_ms,
+                    "total_ms": total_ms,
+                    "tokens": token_count
+                },
                 "message": "Response completed",
                 "timestamp": asyncio.get_event_loop().time()
             }
@@ -495,6 +552,19 @@ class KennyGateway:
                 "timestamp": asyncio.get_event_loop().time()
             }
     
+    @staticmethod
+    def _elapsed_ms(start: float) -> float:
+        return round((time.perf_counter() - start) * 1000, 1)
+    
+    def get_stream_metrics(self) -> Dict[str, Any]:
+        """Get end-to-end streaming metrics, including time-to-first-token percentiles"""
+        return {
+            **self.stream_metrics,
+            "ttft_p50_ms": percentile(self._ttft_samples, 0.5),
+            "ttft_p95_ms": percentile(self._ttft_samples, 0.95),
+            "ollama": self.ollama_llm.get_metrics()
+        }
+    
     def _has_meaningful_agent_results(self, results: Dict[str, Any]) -> bool:
         """Check if results contain meaningful agent outputs vs generic processing"""
         execution_results = results.get("execution_results", [])
@@ -589,92 +659,56 @@ class KennyGateway:
     async def _extract_conversational_message(self, coordinator_result: Dict[str, Any], user_input: str) -> str:
         """Extract conversational message using Ollama LLM for natural responses"""
         try:
-            results = coordinator_result.get("results", {})
-            execution_results = results.get("execution_results", [])
-            
-            # Check for GENERAL_QUERY pattern from coordinator
-            for result in execution_results:
-                if isinstance(result, dict):
-                    result_data = result.get("result", {})
-                    if isinstance(result_data, dict):
-                        message = result_data.get("message", "")
-                        requires_enhancement = result_data.get("requires_llm_enhancement", False)
-                        
-                        # If this is a query that needs LLM enhancement
-                        if requires_enhancement or message.startswith("GENERAL_QUERY:") or message.startswith("CONVERSATIONAL_QUERY:"):
-                            logger.info("Detected query requiring LLM enhancement, using Ollama for natural response")
-                            context = {
-                                "user_input": user_input,
-                                "available_agents": list(self._agents_cache.values()),
-                                "coordinator_result": coordinator_result
-                            }
-                            return await self.ollama_llm.generate_response(user_input, context)
-            
-            # Check if we have actual agent results vs generic processing
-            has_agent_results = self._has_meaningful_agent_results(results)
-            
-            # If we have actual agent results, format them naturally
-            if has_agent_results:
-                return await self._format_agent_results(execution_results, user_input)
-            
-            # For other fallback scenarios, use Ollama
-            context = {
-                "user_input": user_input,
-                "available_agents": list(self._agents_cache.values()),
-                "coordinator_result": coordinator_result
-            }
-            
-            ollama_response = await self.ollama_llm.generate_response(user_input, context)
-            return ollama_response
+            prompt, context = self._synthesis_request(coordinator_result, user_input)
+            return await self.ollama_llm.generate_response(prompt, context)
             
         except Exception as e:
             logger.warning(f"Failed to extract conversational message: {e}")
             return "I'm having some trouble processing that right now. Could you try asking me something else?"
     
-    async def _format_agent_results(self, execution_results: List[Dict[str, Any]], user_input: str) -> str:
-        """Format agent execution results into natural language using Ollama"""
-        try:
-            # Extract meaningful results from agent executions
-            agent_outputs = []
-            for result in execution_results:
-                if result.get("status") == "success":
-                    agent_id = result.get("agent_id", "unknown")
-                    capability = result.get("capability", "unknown")
-                    result_data = result.get("result", {})
+    def _synthesis_request(self, coordinator_result: Dict[str, Any], user_input: str) -> Tuple[str, Dict[str, Any]]:
+        """Build the Ollama prompt and context that turn coordinator results into a reply"""
+        results = coordinator_result.get("results", {})
+        execution_results = results.get("execution_results", [])
+        general_context = {
+            "user_input": user_input,
+            "available_agents": list(self._agents_cache.values()),
+            "coordinator_result": coordinator_result
+        }
+        
+        # Check for GENERAL_QUERY pattern from coordinator
+        for result in execution_results:
+            if isinstance(result, dict):
+                result_data = result.get("result", {})
+                if isinstance(result_data, dict):
+                    message = result_data.get("message", "")
+                    requires_enhancement = result_data.get("requires_llm_enhancement", False)
                     
-                    # Add to outputs for Ollama to format
-                    agent_outputs.append({
-                        "agent": agent_id,
-                        "capability": capability,
-                        "data": result_data
-                    })
-            
-            if agent_outputs:
-                # Use Ollama to format the results naturally
-                context = {
-                    "user_input": user_input,
-                    "agent_results": agent_outputs,
-                    "task": "format_agent_results"
+                    # If this is a query that needs LLM enhancement
+                    if requires_enhancement or message.startswith("GENERAL_QUERY:") or message.startswith("CONVERSATIONAL_QUERY:"):
+                        logger.info("Detected query requiring LLM enhancement, using Ollama for natural response")
+                        return user_input, general_context
+        
+        # If we have actual agent results, format them naturally
+        if self._has_meaningful_agent_results(results):
+            agent_outputs = [
+                {
+                    "agent": result.get("agent_id", "unknown"),
+                    "capability": result.get("capability", "unknown"),
+                    "data": result.get("result", {})
                 }
-                
-                formatted_prompt = f"""The user asked: "{user_input}"
-
-Here are the results from my agents:
-{json.dumps(agent_outputs, indent=2)}
-
-Please provide a natural, helpful response to the user based on these results."""
-                
-                return await self.ollama_llm.generate_response(formatted_prompt, context)
-            else:
-                # No successful agent results, fall back to general response
-                return await self.ollama_llm.generate_response(user_input, {
-                    "user_input": user_input,
-                    "available_agents": list(self._agents_cache.values())
-                })
-                
-        except Exception as e:
-            logger.error(f"Failed to format agent results: {e}")
-            return f"I was able to process your request but had trouble formatting the response. The operation completed successfully."
+                for result in execution_results if result.get("status") == "success"
+            ]
+            
+            # The prompt builder compacts these into a budgeted results section
+            return user_input, {
+                "user_input": user_input,
+                "agent_results": agent_outputs,
+                "task": "format_agent_results"
+            }
+        
+        # For other fallback scenarios, use Ollama
+        return user_input, general_context
     
     def _add_kenny_personality(self, raw_message: str) -> str:
         """Legacy personality enhancement - now mostly replaced by Ollama LLM"""
@@ -4,6 +4,7 @@ from fastapi.responses import StreamingResponse
 import uvicorn
 from typing import Dict, Any, List, Optional
 import asyncio
+import contextlib
 import logging
 import json
 
@@ -62,6 +63,14 @@ async def health_check() -> Dict[str, Any]:
         logger.error(f"Health check failed: {e}")
         raise HTTPException(status_code=503, detail="Gateway unhealthy")
 
+@app.get("/metrics/streaming")
+async def streaming_metrics() -> Dict[str, Any]:
+    """Streaming metrics, including end-to-end and Ollama time to first token"""
+    return {
+        "status": "success",
+        "metrics": gateway.get_stream_metrics()
+    }
+
 @app.get("/")
 async def root() -> Dict[str, str]:
     """Root endpoint"""
@@ -224,19 +233,26 @@ async def websocket_endpoint(websocket: WebSocket):
             }))
             
             if routing_decision.route == "coordinator":
-                # Stream coordinator results with proper error handling
+                # Stream coordinator results with proper error handling. Each update is
+                # pulled only after the previous send completes, so a slow client slows
+                # the upstream streams instead of buffering them; aclosing() tears the
+                # upstream requests down if the client disconnects mid-stream.
                 try:
-                    async for update in gateway.orchestrate_request_stream(query, context):
-                        await websocket.send_text(json.dumps(update))
-                        
-                        # Send completion signal when we get final_result
-                        if update.get("type") == "final_result":
-                            await websocket.send_text(json.dumps({
-                                "type": "complete",
-                                "message": "Coordinator workflow completed",
-                                "timestamp": asyncio.get_event_loop().time()
-                            }))
-                            break
+                    async with contextlib.aclosing(gateway.orchestrate_request_stream(query, context)) as updates:
+                        async for update in updates:
+                            await websocket.send_text(json.dumps(update))
+                            
+                            # Send completion signal when we get final_result
+                            if update.get("type") == "final_result":
+                                await websocket.send_text(json.dumps({
+                                    "type": "complete",
+                                    "message": "Coordinator workflow completed",
+                                    "metrics": update.get("metrics", {}),
+                                    "timestamp": asyncio.get_event_loop().time()
+                                }))
+                                break
+                except WebSocketDisconnect:
+                    raise
                 except Exception as e:
                     await websocket.send_text(json.dumps({
                         "type": "error",
@@ -1,11 +1,74 @@
 import asyncio
+import contextlib
 import json
 import logging
+import time
+from collections import deque
 from typing import Dict, Any, AsyncGenerator, Optional
 import httpx
 
+from .prompt_builder import PromptBuilder
+
 logger = logging.getLogger(__name__)
 
+# Shared Ollama scheduler from the agent SDK, when it is installed
+try:
+    from kenny_agent.ollama_scheduler import get_ollama_scheduler
+    SCHEDULER_AVAILABLE = True
+except ImportError:
+    SCHEDULER_AVAILABLE = False
+
+# Recent time-to-first-token samples kept for percentiles
+TTFT_WINDOW = 200
+
+
+def percentile(samples, fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of a sample window, or None when empty"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ThinkingFilter:
+    """Drops <think>...</think> blocks from a token stream, including tags split across tokens"""
+    
+    OPEN_TAG = "<think>"
+    CLOSE_TAG = "</think>"
+    
+    def __init__(self):
+        self.buffer = ""
+        self.thinking = False
+    
+    def feed(self, token: str) -> str:
+        """Add a token and return the text that is safe to show"""
+        self.buffer += token
+        visible = []
+        while self.buffer:
+            tag = self.CLOSE_TAG if self.thinking else self.OPEN_TAG
+            index = self.buffer.find(tag)
+            if index >= 0:
+                if not self.thinking:
+                    visible.append(self.buffer[:index])
+                self.buffer = self.buffer[index + len(tag):]
+                self.thinking = not self.thinking
+                continue
+            # Hold back a trailing partial tag until the next token decides it
+            held = next((k for k in range(min(len(tag) - 1, len(self.buffer)), 0, -1)
+                         if tag.startswith(self.buffer[-k:])), 0)
+            if not self.thinking:
+                visible.append(self.buffer[:len(self.buffer) - held])
+            self.buffer = self.buffer[len(self.buffer) - held:]
+            break
+        return "".join(visible)
+    
+    def flush(self) -> str:
+        """Return any held-back text once the stream ends"""
+        text = "" if self.thinking else self.buffer
+        self.buffer = ""
+        return text
+
+
 class OllamaLLM:
     """Direct Ollama integration for conversational responses using Qwen3:8b"""
     
@@ -15,6 +78,26 @@ class OllamaLLM:
         self.http_client: Optional[httpx.AsyncClient] = None
         self.is_available = False
         
+        # Synthesis runs in the scheduler's interactive lane, ahead of warming and batch work
+        self.scheduler = get_ollama_scheduler(base_url) if SCHEDULER_AVAILABLE else None
+        self._warm_task: Optional[asyncio.Task] = None
+        
+        # Streaming metrics; time to first token is measured to the first visible token
+        self.metrics = {
+            "stream_requests": 0,
+            "stream_errors": 0,
+            "tokens_streamed": 0,
+            "last_ttft_ms": None,
+            "last_stream_ms": None,
+            "last_prompt": None
+        }
+        self._ttft_samples = deque(maxlen=TTFT_WINDOW)
+        
+        # Prompts share a stable system prefix; per-request token counts and eval times are kept
+        self.prompts = PromptBuilder()
+        self.prompt_stats = deque(maxlen=TTFT_WINDOW)
+        self._last_prefix_hash: Optional[str] = None
+        
     async def initialize(self):
         """Initialize the Ollama connection"""
         self.http_client = httpx.AsyncClient(timeout=30.0)
@@ -29,6 +112,10 @@ class OllamaLLM:
                 if any(self.model in name for name in model_names):
                     self.is_available = True
                     logger.info(f"Ollama LLM initialized successfully with model {self.model}")
+                    if self.scheduler:
+                        # Keep the synthesis model loaded so other models can't evict it
+                        self.scheduler.pin(self.model)
+                        self._warm_task = asyncio.ensure_future(self.scheduler.warm(self.model))
                 else:
                     logger.warning(f"Model {self.model} not found in Ollama. Available models: {model_names}")
             else:
@@ -38,6 +125,8 @@ class OllamaLLM:
     
     async def cleanup(self):
         """Cleanup HTTP client"""
+        if self._warm_task and not self._warm_task.done():
+            self._warm_task.cancel()
         if self.http_client:
             await self.http_client.aclose()
     
@@ -47,11 +136,11 @@ class OllamaLLM:
             return self._fallback_response(user_input)
         
         try:
-            system_prompt = self._build_system_prompt(context)
+            prompt, sections = self.prompts.build(user_input, context)
             
             request_data = {
                 "model": self.model,
-                "prompt": f"{system_prompt}\n\nUser: {user_input}\nKenny:",
+                "prompt": prompt,
                 "stream": False,
                 "options": {
                     "temperature": 0.7,
@@ -61,43 +150,47 @@ class OllamaLLM:
                 }
             }
             
-            response = await self.http_client.post(
-                f"{self.base_url}/api/generate",
-                json=request_data
-            )
+            result = await self._generate(request_data)
+            self._record_prompt_stats(sections, result)
+            generated_text = result.get("response", "").strip()
             
-            if response.status_code == 200:
-                result = response.json()
-                generated_text = result.get("response", "").strip()
-                
-                # Filter out thinking blocks from the response
-                filtered_text = self._filter_thinking_blocks(generated_text)
-                
-                if filtered_text:
-                    return filtered_text
-                else:
-                    logger.warning("Empty response from Ollama")
-                    return self._fallback_response(user_input)
+            # Filter out thinking blocks from the response
+            filtered_text = self._filter_thinking_blocks(generated_text)
+            
+            if filtered_text:
+                return filtered_text
             else:
-                logger.error(f"Ollama API error: {response.status_code} - {response.text}")
+                logger.warning("Empty response from Ollama")
                 return self._fallback_response(user_input)
                 
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Ollama API error: {e.response.status_code} - {e.response.text}")
+            return self._fallback_response(user_input)
         except Exception as e:
             logger.error(f"Failed to generate Ollama response: {e}")
             return self._fallback_response(user_input)
     
     async def generate_response_stream(self, user_input: str, context: Dict[str, Any]) -> AsyncGenerator[str, None]:
-        """Generate a streaming conversational response using Qwen3:8b"""
+        """Generate a streaming conversational response using Qwen3:8b
+        
+        Tokens are read from Ollama only as fast as the caller consumes them,
+        so a slow websocket client applies backpressure all the way upstream.
+        """
+        start_time = time.perf_counter()
+        self.metrics["stream_requests"] += 1
+        first_token = True
+        
         if not self.is_available or not self.http_client:
+            self._record_first_token(start_time)
             yield self._fallback_response(user_input)
             return
         
         try:
-            system_prompt = self._build_system_prompt(context)
+            prompt, sections = self.prompts.build(user_input, context)
             
             request_data = {
                 "model": self.model,
-                "prompt": f"{system_prompt}\n\nUser: {user_input}\nKenny:",
+                "prompt": prompt,
                 "stream": True,
                 "options": {
                     "temperature": 0.7,
@@ -107,69 +200,121 @@ class OllamaLLM:
                 }
             }
             
-            async with self.http_client.stream(
-                "POST",
-                f"{self.base_url}/api/generate",
-                json=request_data
-            ) as response:
-                
-                if response.status_code != 200:
-                    yield self._fallback_response(user_input)
-                    return
-                
-                async for line in response.aiter_lines():
-                    if line.strip():
-                        try:
-                            data = json.loads(line)
-                            token = data.get("response", "")
-                            done = data.get("done", False)
-                            
-                            if token:
-                                yield token
-                            
-                            if done:
-                                break
-                                
-                        except json.JSONDecodeError:
-                            continue
+            thinking_filter = ThinkingFilter()
+            async with contextlib.aclosing(self._stream_chunks(request_data)) as chunks:
+                async for data in chunks:
+                    text = thinking_filter.feed(data.get("response", ""))
+                    if data.get("done", False):
+                        text += thinking_filter.flush()
+                        self._record_prompt_stats(sections, data)
+                    if first_token:
+                        # Drop whitespace left between a thinking block and the answer
+                        text = text.lstrip()
+                    
+                    if text:
+                        if first_token:
+                            self._record_first_token(start_time)
+                            first_token = False
+                        self.metrics["tokens_streamed"] += 1
+                        yield text
+            
+            if first_token:
+                logger.warning("Empty streaming response from Ollama")
+                self._record_first_token(start_time)
+                yield self._fallback_response(user_input)
                             
         except Exception as e:
             logger.error(f"Failed to generate streaming Ollama response: {e}")
-            yield self._fallback_response(user_input)
+            self.metrics["stream_errors"] += 1
+            if first_token:
+                self._record_first_token(start_time)
+                yield self._fallback_response(user_input)
+        finally:
+            self.metrics["last_stream_ms"] = round((time.perf_counter() - start_time) * 1000, 1)
     
-    def _build_system_prompt(self, context: Dict[str, Any]) -> str:
-        """Build system prompt with Kenny's personality and context"""
-        available_agents = context.get("available_agents", [])
-        user_query = context.get("user_input", "")
-        
-        # Build dynamic capabilities list
-        capabilities_text = ""
-        if available_agents:
-            capabilities_text = "I have access to these specialized agents and capabilities:\n"
-            for agent in available_agents:
-                agent_name = agent.get("display_name", agent.get("agent_id", "Unknown"))
-                capabilities = agent.get("capabilities", [])
-                if capabilities:
-                    capabilities_text += f"• {agent_name}: {', '.join(capabilities)}\n"
-        
-        system_prompt = f"""You are Kenny, a helpful and friendly personal AI assistant. You have a casual, tech-savvy personality and you're great at helping users with various tasks.
-
-{capabilities_text}
-
-Your key traits:
-- Helpful and efficient
-- Friendly but not overly chatty  
-- Tech-savvy and knowledgeable
-- Can coordinate multiple services
-- Always try to provide actionable help
-
-When users ask about your capabilities or tools, explain what you can actually do with the agents and services available to you. Be specific about the types of tasks you can help with.
-
-If a user's request can be handled by one of your specialized agents, mention that you can help with that specific task. Otherwise, provide general assistance and conversation.
-
-Keep responses concise and natural. Don't be overly formal."""
-
-        return system_prompt
+    async def _generate(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a non-streaming generate request, through the scheduler when available"""
+        if self.scheduler:
+            return await self.scheduler.generate(request_data, lane="interactive")
+        response = await self.http_client.post(f"{self.base_url}/api/generate", json=request_data)
+        response.raise_for_status()
+        return response.json()
+    
+    async def _stream_chunks(self, request_data: Dict[str, Any]) -> AsyncGenerator[Dict[str, Any], None]:
+        """Yield decoded generate chunks up to the final one, through the scheduler when available"""
+        if self.scheduler:
+            async with contextlib.aclosing(self.scheduler.stream("/api/generate", request_data, lane="interactive")) as chunks:
+                async for data in chunks:
+                    yield data
+            return
+        
+        async with self.http_client.stream("POST", f"{self.base_url}/api/generate", json=request_data) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.strip():
+                    try:
+                        data = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    yield data
+                    if data.get("done", False):
+                        break
+    
+    def _record_first_token(self, start_time: float):
+        """Record time to first token for a streaming request"""
+        ttft_ms = round((time.perf_counter() - start_time) * 1000, 1)
+        self.metrics["last_ttft_ms"] = ttft_ms
+        self._ttft_samples.append(ttft_ms)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get streaming metrics including time-to-first-token percentiles"""
+        return {
+            **self.metrics,
+            "model": self.model,
+            "available": self.is_available,
+            "ttft_p50_ms": percentile(self._ttft_samples, 0.5),
+            "ttft_p95_ms": percentile(self._ttft_samples, 0.95),
+            "prompt": self._prompt_summary(),
+            "scheduler": self.scheduler.get_metrics() if self.scheduler else None
+        }
+    
+    def _prompt_summary(self) -> Dict[str, Any]:
+        """Summarize recent prompt sizes, prompt eval times and prefix reuse"""
+        eval_ms = [s["prompt_eval_ms"] for s in self.prompt_stats if s["prompt_eval_ms"] is not None]
+        eval_counts = [s["prompt_eval_count"] for s in self.prompt_stats if s["prompt_eval_count"] is not None]
+        estimated = [s["estimated_tokens"]["total"] for s in self.prompt_stats]
+        return {
+            "requests": len(self.prompt_stats),
+            "budgets": dict(self.prompts.budgets),
+            "prefix_builds": self.prompts.prefix_builds,
+            "prefix_reuse_rate": (round(sum(s["prefix_reused"] for s in self.prompt_stats) / len(self.prompt_stats), 3)
+                                  if self.prompt_stats else None),
+            "estimated_tokens_p50": percentile(estimated, 0.5),
+            "prompt_eval_count_p50": percentile(eval_counts, 0.5),
+            "prompt_eval_ms_p50": percentile(eval_ms, 0.5),
+            "prompt_eval_ms_p95": percentile(eval_ms, 0.95)
+        }
+    
+    def _record_prompt_stats(self, sections: Dict[str, int], response: Dict[str, Any]):
+        """Record estimated section sizes and Ollama's prompt and eval timings for one request"""
+        def to_ms(nanoseconds):
+            return round(nanoseconds / 1e6, 1) if nanoseconds is not None else None
+        
+        prefix_hash = self.prompts.prefix_hash
+        stats = {
+            "estimated_tokens": {**sections, "total": sum(sections.values())},
+            "prefix_hash": prefix_hash,
+            "prefix_reused": prefix_hash == self._last_prefix_hash,
+            "prompt_eval_count": response.get("prompt_eval_count"),
+            "prompt_eval_ms": to_ms(response.get("prompt_eval_duration")),
+            "eval_count": response.get("eval_count"),
+            "eval_ms": to_ms(response.get("eval_duration")),
+            "load_ms": to_ms(response.get("load_duration")),
+            "total_ms": to_ms(response.get("total_duration"))
+        }
+        self._last_prefix_hash = prefix_hash
+        self.prompt_stats.append(stats)
+        self.metrics["last_prompt"] = stats
     
     def _filter_thinking_blocks(self, text: str) -> str:
         """Remove thinking blocks from LLM responses to show only user-facing content"""
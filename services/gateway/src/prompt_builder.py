@@ -0,0 +1,175 @@
+import hashlib
+import json
+import math
+import os
+from typing import Dict, Any, List, Optional, Tuple
+
+# Rough characters per token for budget estimates; Ollama reports the real counts afterwards
+CHARS_PER_TOKEN = float(os.getenv("OLLAMA_PROMPT_CHARS_PER_TOKEN", "4"))
+
+# List lengths and string lengths tried, in order, when compacting an agent result
+COMPACTION_STEPS = [(10, 200), (5, 120), (3, 80), (2, 50), (1, 30)]
+
+PERSONALITY = """You are Kenny, a helpful and friendly personal AI assistant. You have a casual, tech-savvy personality and you're great at helping users with various tasks.
+
+Your key traits:
+- Helpful and efficient
+- Friendly but not overly chatty
+- Tech-savvy and knowledgeable
+- Can coordinate multiple services
+- Always try to provide actionable help
+
+When users ask about your capabilities or tools, explain what you can actually do with the agents and services available to you. Be specific about the types of tasks you can help with.
+
+If a user's request can be handled by one of your specialized agents, mention that you can help with that specific task. Otherwise, provide general assistance and conversation.
+
+When agent results are included, answer from them and don't invent details they don't contain.
+
+Keep responses concise and natural. Don't be overly formal."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a text"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Cut a text to a token budget, marking the cut"""
+    max_chars = int(budget * CHARS_PER_TOKEN)
+    if len(text) <= max_chars:
+        return text
+    return text[:max(max_chars - 1, 0)].rstrip() + "…"
+
+
+def compact_value(value: Any, max_chars: int) -> str:
+    """Render a value as compact JSON no longer than max_chars
+
+    Long lists keep their first items plus a count of the rest and long strings
+    are shortened, trying progressively tighter limits until the value fits.
+    """
+    rendered = ""
+    for max_items, max_string in COMPACTION_STEPS:
+        rendered = json.dumps(_shrink(value, max_items, max_string), ensure_ascii=False,
+                              separators=(",", ":"), default=str)
+        if len(rendered) <= max_chars:
+            return rendered
+    return rendered[:max(max_chars - 1, 0)] + "…"
+
+
+def _shrink(value: Any, max_items: int, max_string: int) -> Any:
+    if isinstance(value, dict):
+        return {key: _shrink(item, max_items, max_string) for key, item in value.items()
+                if item not in (None, "", [], {})}
+    if isinstance(value, (list, tuple)):
+        items = [_shrink(item, max_items, max_string) for item in value[:max_items]]
+        if len(value) > max_items:
+            items.append(f"+{len(value) - max_items} more")
+        return items
+    if isinstance(value, str) and len(value) > max_string:
+        return value[:max_string - 1] + "…"
+    return value
+
+
+def _agent_fields(agent: Any) -> Tuple[str, List[str]]:
+    """Name and capabilities of a registry agent, given as a dict or an AgentInfo"""
+    if isinstance(agent, dict):
+        name = agent.get("display_name") or agent.get("agent_id", "Unknown")
+        capabilities = agent.get("capabilities", [])
+    else:
+        name = getattr(agent, "display_name", None) or getattr(agent, "agent_id", "Unknown")
+        capabilities = getattr(agent, "capabilities", [])
+    return name, sorted(capabilities or [])
+
+
+class PromptBuilder:
+    """Assembles Ollama prompts as a stable system prefix followed by budgeted sections
+
+    The prefix (personality and capability list) only changes when the agent
+    registry does, so consecutive prompts share it and Ollama can reuse its
+    evaluated context instead of re-reading thousands of tokens per request.
+    Agent results and the user turn come after it, each held to a token budget.
+    """
+
+    def __init__(self, system_tokens: Optional[int] = None, results_tokens: Optional[int] = None,
+                 user_tokens: Optional[int] = None):
+        self.budgets = {
+            "system": system_tokens or int(os.getenv("OLLAMA_PROMPT_SYSTEM_TOKENS", "600")),
+            "results": results_tokens or int(os.getenv("OLLAMA_PROMPT_RESULTS_TOKENS", "1500")),
+            "user": user_tokens or int(os.getenv("OLLAMA_PROMPT_USER_TOKENS", "400"))
+        }
+        self._agents_key: Optional[Tuple] = None
+        self._prefix = PERSONALITY
+        self.prefix_hash = self._hash(self._prefix)
+        self.prefix_builds = 0
+
+    def system_prefix(self, available_agents: Optional[List[Any]] = None) -> str:
+        """Get the system prefix, rebuilt only when the agent list changes
+
+        Contexts without available_agents reuse the last known agent list, so
+        conversational and result-synthesis prompts share one prefix.
+        """
+        if available_agents is None:
+            return self._prefix
+
+        agents = sorted(_agent_fields(agent) for agent in available_agents)
+        key = tuple((name, tuple(capabilities)) for name, capabilities in agents)
+        if key != self._agents_key:
+            self._agents_key = key
+            self._prefix = self._render_prefix(agents)
+            self.prefix_hash = self._hash(self._prefix)
+            self.prefix_builds += 1
+        return self._prefix
+
+    def _render_prefix(self, agents: List[Tuple[str, List[str]]]) -> str:
+        lines = [f"• {name}: {', '.join(capabilities)}" for name, capabilities in agents if capabilities]
+        if not lines:
+            return PERSONALITY
+
+        budget = self.budgets["system"] - estimate_tokens(PERSONALITY)
+        header = "I have access to these specialized agents and capabilities:"
+        kept = []
+        used = estimate_tokens(header)
+        for index, line in enumerate(lines):
+            cost = estimate_tokens(line) + 1
+            if used + cost > budget:
+                kept.append(f"• …and {len(lines) - index} more agents")
+                break
+            kept.append(line)
+            used += cost
+
+        capabilities_text = "\n".join([header] + kept)
+        return PERSONALITY.replace("\n\nYour key traits:", f"\n\n{capabilities_text}\n\nYour key traits:", 1)
+
+    def summarize_results(self, agent_results: List[Dict[str, Any]]) -> str:
+        """Compact agent results into summaries that together fit the results budget"""
+        if not agent_results:
+            return ""
+
+        per_result_chars = int(self.budgets["results"] * CHARS_PER_TOKEN / len(agent_results))
+        lines = []
+        for result in agent_results:
+            label = f"[{result.get('agent', 'unknown')} {result.get('capability', 'unknown')}] "
+            lines.append(label + compact_value(result.get("data", {}), max(per_result_chars - len(label), 40)))
+        return truncate_to_tokens("\n".join(lines), self.budgets["results"])
+
+    def build(self, user_input: str, context: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+        """Assemble the full prompt and the estimated tokens of each section"""
+        prefix = self.system_prefix(context.get("available_agents"))
+        results = self.summarize_results(context.get("agent_results") or [])
+        user = truncate_to_tokens(user_input, self.budgets["user"])
+
+        parts = [prefix]
+        if results:
+            parts.append(f"Results from my agents:\n{results}")
+        parts.append(f"User: {user}\nKenny:")
+
+        sections = {
+            "system": estimate_tokens(prefix),
+            "results": estimate_tokens(results),
+            "user": estimate_tokens(user)
+        }
+        return "\n\n".join(parts), sections
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha1(text.encode()).hexdigest()[:12]
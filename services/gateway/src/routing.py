@@ -8,6 +8,13 @@ from .schemas import RoutingDecision, RoutingType
 
 logger = logging.getLogger(__name__)
 
+# Shared Ollama scheduler from the agent SDK, when it is installed
+try:
+    from kenny_agent.ollama_scheduler import get_ollama_scheduler
+    SCHEDULER_AVAILABLE = True
+except ImportError:
+    SCHEDULER_AVAILABLE = False
+
 class IntentClassifier:
     """Intent classification for routing decisions"""
     
@@ -57,8 +64,9 @@ class IntentClassifier:
             "coordinate", "orchestrate", "integrate"
         ]
         
-        # Ollama client for complex classification
+        # Ollama client for complex classification, scheduled in the routing lane
         self.ollama_url = "http://localhost:11434"
+        self.scheduler = get_ollama_scheduler(self.ollama_url) if SCHEDULER_AVAILABLE else None
     
     async def classify_intent(self, query: str) -> RoutingDecision:
         """Classify user intent and determine routing"""
@@ -187,35 +195,37 @@ Return JSON with:
 If the query requires multiple agents or is complex, use route: "coordinator".
 If it's a simple single-agent task, use route: "direct" with the specific agent and capability."""
 
-            async with httpx.AsyncClient(timeout=2.0) as client:
-                response = await client.post(
-                    f"{self.ollama_url}/api/chat",
-                    json={
-                        "model": "qwen3:8b",  # Use available model
-                        "messages": [{"role": "user", "content": prompt}],
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.1,
-                            "top_p": 0.9
-                        }
-                    }
-                )
-                
-                if response.status_code == 200:
+            request_data = {
+                "model": "qwen3:8b",  # Use available model
+                "messages": [{"role": "user", "content": prompt}],
+                "stream": False,
+                "options": {
+                    "temperature": 0.1,
+                    "top_p": 0.9
+                }
+            }
+            
+            if self.scheduler:
+                result = await self.scheduler.chat(request_data, lane="routing", timeout=2.0)
+            else:
+                async with httpx.AsyncClient(timeout=2.0) as client:
+                    response = await client.post(f"{self.ollama_url}/api/chat", json=request_data)
+                    response.raise_for_status()
                     result = response.json()
-                    response_text = result.get("message", {}).get("content", "")
-                    
-                    # Try to parse JSON from response
-                    import json
-                    try:
-                        # Extract JSON from response
-                        json_start = response_text.find("{")
-                        json_end = response_text.rfind("}") + 1
-                        if json_start >= 0 and json_end > json_start:
-                            json_str = response_text[json_start:json_end]
-                            return json.loads(json_str)
-                    except json.JSONDecodeError:
-                        logger.warning(f"Failed to parse Ollama JSON response: {response_text}")
+            
+            response_text = result.get("message", {}).get("content", "")
+            
+            # Try to parse JSON from response
+            import json
+            try:
+                # Extract JSON from response
+                json_start = response_text.find("{")
+                json_end = response_text.rfind("}") + 1
+                if json_start >= 0 and json_end > json_start:
+                    json_str = response_text[json_start:json_end]
+                    return json.loads(json_str)
+            except json.JSONDecodeError:
+                logger.warning(f"Failed to parse Ollama JSON response: {response_text}")
                 
         except Exception as e:
             logger.warning(f"Ollama classification failed: {e}")
@@ -0,0 +1,151 @@
+"""
+Stub Ollama server for streaming tests.
+
+Serves the two endpoints the gateway uses, GET /api/tags and
+POST /api/generate (streamed NDJSON or a single JSON body), replaying
+scripted tokens with configurable delays. Each chunk is drained before the
+next is generated, so a client that stops reading stops the generation.
+Reported prompt_eval_count covers only the prompt past the prefix shared
+with the previous request, as when Ollama reuses its evaluated context.
+
+Run standalone to point a local gateway at it:
+    python tests/stub_ollama.py --port 11434
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+
+class StubOllamaServer:
+    """Minimal HTTP/1.1 server speaking enough of the Ollama API for tests"""
+    
+    def __init__(self, tokens: List[str], model: str = "qwen3:8b", first_token_delay: float = 0.0,
+                 token_delay: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.tokens = tokens
+        self.model = model
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.host = host
+        self.port = port
+        self.requests: List[Dict[str, Any]] = []
+        self.loads: List[Dict[str, Any]] = []
+        self._cached_prompt = ""
+        self._prompt_eval_count = 0
+        self.tokens_sent = 0
+        self.disconnects = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+    
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+    
+    async def start(self) -> str:
+        """Start listening and return the base URL"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.base_url
+    
+    async def stop(self):
+        """Stop the server"""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            request_line, *header_lines = head.decode().split("\r\n")
+            method, path, _ = request_line.split(" ", 2)
+            headers = {k.strip().lower(): v.strip() for k, v in
+                       (line.split(":", 1) for line in header_lines if ":" in line)}
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            
+            if method == "GET" and path == "/api/tags":
+                await self._send_json(writer, {"models": [{"name": self.model}]})
+            elif method == "POST" and path == "/api/generate":
+                request = json.loads(body or b"{}")
+                if "prompt" not in request:
+                    # A load-only request, as sent to warm a model
+                    self.loads.append(request)
+                    await self._send_json(writer, {"model": self.model, "response": "", "done": True,
+                                                   "done_reason": "load"})
+                    return
+                self.requests.append(request)
+                self._evaluate_prompt(request.get("prompt", ""))
+                if request.get("stream", True):
+                    await self._stream_generate(writer)
+                else:
+                    await asyncio.sleep(self.first_token_delay + self.token_delay * len(self.tokens))
+                    await self._send_json(writer, self._chunk("".join(self.tokens), done=True))
+            else:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self.disconnects += 1
+        finally:
+            writer.close()
+    
+    async def _stream_generate(self, writer: asyncio.StreamWriter):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                     b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        await asyncio.sleep(self.first_token_delay)
+        for i, token in enumerate(self.tokens):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            await self._write_chunk(writer, self._chunk(token))
+            self.tokens_sent += 1
+        await self._write_chunk(writer, self._chunk("", done=True))
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+    
+    def _evaluate_prompt(self, prompt: str):
+        """Count only the prompt past the prefix shared with the previous one, like Ollama's context reuse"""
+        shared = 0
+        for a, b in zip(prompt, self._cached_prompt):
+            if a != b:
+                break
+            shared += 1
+        self._prompt_eval_count = -(-(len(prompt) - shared) // 4)
+        self._cached_prompt = prompt
+    
+    def _chunk(self, text: str, done: bool = False) -> Dict[str, Any]:
+        chunk = {"model": self.model, "response": text, "done": done}
+        if done:
+            chunk.update({
+                "eval_count": len(self.tokens),
+                "eval_duration": int(self.token_delay * len(self.tokens) * 1e9),
+                "prompt_eval_count": self._prompt_eval_count,
+                "prompt_eval_duration": self._prompt_eval_count * 100_000
+            })
+        return chunk
+    
+    @staticmethod
+    async def _write_chunk(writer: asyncio.StreamWriter, payload: Dict[str, Any]):
+        data = (json.dumps(payload) + "\n").encode()
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        await writer.drain()
+    
+    @staticmethod
+    async def _send_json(writer: asyncio.StreamWriter, payload: Dict[str, Any]):
+        data = json.dumps(payload).encode()
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                     + f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data)
+        await writer.drain()
+
+
+async def _serve(port: int, delay: float):
+    server = StubOllamaServer(["Hello", " from", " the", " stub", " Ollama", "!"],
+                              first_token_delay=delay, token_delay=delay / 4, port=port)
+    print(f"Stub Ollama listening on {await server.start()}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub Ollama server for streaming tests")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--delay", type=float, default=0.2, help="Seconds before the first token")
+    args = parser.parse_args()
+    asyncio.run(_serve(args.port, args.delay))
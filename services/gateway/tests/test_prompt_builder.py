@@ -0,0 +1,125 @@
+"""
+Prompt assembly tests: stable system prefix, budgeted agent result summaries
+and per-request prompt statistics against the stub Ollama server.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.ollama_llm import OllamaLLM
+from src.prompt_builder import PromptBuilder, compact_value, estimate_tokens
+from src.schemas import AgentInfo
+from tests.stub_ollama import StubOllamaServer
+
+
+def agent(agent_id, capabilities):
+    return AgentInfo(agent_id=agent_id, display_name=agent_id.title(), status="active",
+                     is_healthy=True, capabilities=capabilities, last_seen="")
+
+
+AGENTS = [agent("mail-agent", ["messages.search", "messages.read"]),
+          agent("calendar-agent", ["calendar.read"])]
+
+
+def test_system_prefix_is_stable_and_accepts_registry_agents():
+    builder = PromptBuilder()
+
+    first = builder.system_prefix(AGENTS)
+    # Same agents in another order, as dicts, and a context with no agent list
+    again = builder.system_prefix([
+        {"display_name": "Calendar-Agent", "capabilities": ["calendar.read"]},
+        {"display_name": "Mail-Agent", "capabilities": ["messages.read", "messages.search"]}
+    ])
+
+    assert "• Mail-Agent: messages.read, messages.search" in first
+    assert again == first
+    assert builder.system_prefix() == first
+    assert builder.prefix_builds == 1
+
+    builder.system_prefix(AGENTS + [agent("memory-agent", ["memory.retrieve"])])
+    assert builder.prefix_builds == 2
+
+
+def test_capability_list_is_held_to_the_system_budget():
+    builder = PromptBuilder(system_tokens=400)
+    agents = [agent(f"agent-{i:02d}", [f"capability.{j}" for j in range(6)]) for i in range(40)]
+
+    prefix = builder.system_prefix(agents)
+
+    assert estimate_tokens(prefix) <= 400
+    assert "more agents" in prefix
+
+
+def test_agent_results_are_compacted_to_the_results_budget():
+    builder = PromptBuilder(results_tokens=300)
+    emails = [{"subject": f"Offsite agenda {i}", "body": "word " * 400, "id": i} for i in range(50)]
+    results = [
+        {"agent": "mail-agent", "capability": "messages.search", "data": {"results": emails, "count": 50}},
+        {"agent": "calendar-agent", "capability": "calendar.read", "data": {"events": [{"title": "Offsite"}]}}
+    ]
+
+    summary = builder.summarize_results(results)
+
+    assert estimate_tokens(summary) <= 300
+    assert "[mail-agent messages.search]" in summary
+    assert "Offsite agenda 0" in summary
+    assert "more" in summary
+    assert '[calendar-agent calendar.read] {"events":[{"title":"Offsite"}]}' in summary
+
+
+def test_compact_value_drops_empty_fields_and_fits():
+    rendered = compact_value({"a": None, "b": "", "c": list(range(100)), "d": "x" * 500}, 120)
+
+    assert len(rendered) <= 120
+    assert '"a"' not in rendered and '"b"' not in rendered
+    assert "more" in rendered
+
+
+def test_build_puts_the_prefix_first_and_reports_sections():
+    builder = PromptBuilder(user_tokens=20)
+
+    prompt, sections = builder.build("hi " * 100, {
+        "available_agents": AGENTS,
+        "agent_results": [{"agent": "mail-agent", "capability": "messages.search", "data": {"count": 1}}]
+    })
+
+    assert prompt.startswith(builder.system_prefix())
+    assert prompt.endswith("\nKenny:")
+    assert "Results from my agents:" in prompt
+    assert sections["user"] <= 20
+    assert set(sections) == {"system", "results", "user"}
+
+
+def test_synthesis_requests_share_the_prefix_and_record_prompt_stats():
+    async def run():
+        server = StubOllamaServer(["Done", "."])
+        llm = OllamaLLM(base_url=await server.start())
+        await llm.initialize()
+
+        await llm.generate_response("hello", {"available_agents": AGENTS})
+        for query in ("any email about the offsite?", "what's on my calendar?"):
+            tokens = [token async for token in llm.generate_response_stream(query, {
+                "agent_results": [{"agent": "mail-agent", "capability": "messages.search",
+                                   "data": {"results": [{"subject": query}]}}]
+            })]
+            assert "".join(tokens) == "Done."
+        metrics = llm.get_metrics()
+        await llm.cleanup()
+        await server.stop()
+
+        stats = list(llm.prompt_stats)
+        assert len(stats) == 3
+        assert all(s["prefix_hash"] == stats[0]["prefix_hash"] for s in stats)
+        assert [s["prefix_reused"] for s in stats] == [False, True, True]
+        # Only the part after the shared prefix has to be evaluated again
+        last = stats[-1]
+        assert 0 < last["prompt_eval_count"] < last["estimated_tokens"]["total"] - last["estimated_tokens"]["system"] + 5
+        assert last["prompt_eval_ms"] is not None
+        assert metrics["prompt"]["requests"] == 3
+        assert metrics["prompt"]["prefix_builds"] == 1
+        assert metrics["last_prompt"] == last
+
+    asyncio.run(run())
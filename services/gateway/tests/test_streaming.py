@@ -0,0 +1,158 @@
+"""
+Streaming pipeline tests: Ollama tokens and coordinator agent events through
+the gateway, against a stub Ollama server and a scripted coordinator stream.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.gateway import KennyGateway
+from src.ollama_llm import OllamaLLM, ThinkingFilter
+from tests.stub_ollama import StubOllamaServer
+
+AGENT_RESULT = {
+    "status": "success",
+    "agent_id": "mail-agent",
+    "capability": "messages.search",
+    "result": {"results": [{"subject": "Offsite agenda"}], "count": 1}
+}
+
+
+def coordinator_transport(events):
+    """Mock coordinator answering /health and streaming the given SSE events"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/health":
+            return httpx.Response(200, json={"status": "healthy"})
+        body = "".join(f"data: {json.dumps(event)}\n\n" for event in events)
+        return httpx.Response(200, text=body, headers={"Content-Type": "text/event-stream"})
+    return httpx.MockTransport(handler)
+
+
+async def start_llm(server: StubOllamaServer) -> OllamaLLM:
+    llm = OllamaLLM(base_url=await server.start())
+    await llm.initialize()
+    assert llm.is_available
+    return llm
+
+
+def test_thinking_filter_handles_tags_split_across_tokens():
+    thinking_filter = ThinkingFilter()
+    tokens = ["Hi <th", "ink>plan the", " reply</th", "ink> there", " <", "b>"]
+    
+    visible = "".join(thinking_filter.feed(token) for token in tokens) + thinking_filter.flush()
+    
+    assert visible == "Hi  there <b>"
+
+
+def test_ollama_streams_tokens_incrementally_and_records_ttft():
+    async def run():
+        server = StubOllamaServer(["<think>", "checking", "</think>\n\n", "Hello", " there", "!"],
+                                  first_token_delay=0.2, token_delay=0.05)
+        llm = await start_llm(server)
+        
+        start = time.perf_counter()
+        arrivals = []
+        async for token in llm.generate_response_stream("hi", {"available_agents": []}):
+            arrivals.append((token, time.perf_counter() - start))
+        await llm.cleanup()
+        await server.stop()
+        
+        assert "".join(token for token, _ in arrivals) == "Hello there!"
+        # Tokens arrive as they are generated, not all at the end
+        assert arrivals[-1][1] - arrivals[0][1] >= 0.08
+        metrics = llm.get_metrics()
+        assert 200 <= metrics["last_ttft_ms"] < arrivals[-1][1] * 1000
+        assert metrics["ttft_p50_ms"] == metrics["last_ttft_ms"]
+        assert server.requests[0]["stream"] is True
+    
+    asyncio.run(run())
+
+
+def test_gateway_streams_agent_results_then_synthesis_tokens():
+    async def run():
+        server = StubOllamaServer(["You", " have", " one", " email", "."], first_token_delay=0.05)
+        gateway = KennyGateway()
+        gateway.ollama_llm = await start_llm(server)
+        gateway.http_client = httpx.AsyncClient(transport=coordinator_transport([
+            {"type": "agent_start", "agent_id": "mail-agent", "capability": "messages.search"},
+            {"type": "agent_complete", "agent_id": "mail-agent", "capability": "messages.search",
+             "result": AGENT_RESULT},
+            {"type": "final_result", "result": {"intent": "mail_operation", "execution_path": ["executor"],
+                                                "results": {"execution_results": [AGENT_RESULT]}}},
+            {"type": "complete"}
+        ]))
+        
+        events = [event async for event in gateway.orchestrate_request_stream("any new email?", {})]
+        await gateway.cleanup()
+        await server.stop()
+        
+        types = [event["type"] for event in events]
+        assert types == ["agent_start", "agent_complete", "ollama_start"] + ["token"] * 5 + ["final_result"]
+        final = events[-1]
+        assert final["result"]["message"] == "You have one email."
+        assert final["result"]["intent"] == "mail_operation"
+        assert 0 < final["metrics"]["ttft_ms"] <= final["metrics"]["total_ms"]
+        assert final["metrics"]["tokens"] == 5
+        # The synthesis prompt carries the agent results
+        assert "Offsite agenda" in server.requests[0]["prompt"]
+        assert gateway.get_stream_metrics()["last_ttft_ms"] == final["metrics"]["ttft_ms"]
+    
+    asyncio.run(run())
+
+
+def test_closing_stream_stops_ollama_generation():
+    async def run():
+        server = StubOllamaServer([f" t{i}" for i in range(300)], token_delay=0.01)
+        gateway = KennyGateway()
+        gateway.ollama_llm = await start_llm(server)
+        gateway.http_client = httpx.AsyncClient(transport=coordinator_transport([]))
+        
+        stream = gateway.orchestrate_request_stream("tell me a story", {})
+        tokens = 0
+        async for event in stream:
+            if event["type"] == "token":
+                tokens += 1
+                if tokens == 3:
+                    break
+        await stream.aclose()
+        await asyncio.sleep(0.3)
+        await gateway.cleanup()
+        await server.stop()
+        
+        assert server.disconnects == 1
+        assert server.tokens_sent < 300
+    
+    asyncio.run(run())
+
+
+def test_synthesis_runs_pinned_in_the_interactive_lane():
+    pytest.importorskip("kenny_agent.ollama_scheduler")
+    
+    async def run():
+        server = StubOllamaServer(["Hi", "!"])
+        llm = await start_llm(server)
+        await llm._warm_task
+        
+        tokens = [token async for token in llm.generate_response_stream("hi", {"available_agents": []})]
+        reply = await llm.generate_response("hello", {"available_agents": []})
+        scheduler = llm.get_metrics()["scheduler"]
+        await llm.cleanup()
+        await server.stop()
+        
+        assert "".join(tokens) == "Hi!" and reply == "Hi!"
+        # The model is loaded at startup and kept resident
+        assert server.loads == [{"model": "qwen3:8b", "stream": False, "keep_alive": -1}]
+        assert all(request["keep_alive"] == -1 for request in server.requests)
+        assert scheduler["lanes"]["interactive"]["completed"] == 2
+        assert scheduler["lanes"]["warming"]["completed"] == 1
+        assert scheduler["models"]["qwen3:8b"]["pinned"]
+    
+    asyncio.run(run())
@@ -135,7 +135,7 @@ class ProposeReplyCapabilityHandler(BaseCapabilityHandler):
             
             if message_id:
                 # Get specific message
-                result = bridge_tool.execute({
+                result = await bridge_tool.execute_async({
                     "operation": "read",
                     "message_id": message_id
                 })
@@ -143,7 +143,7 @@ class ProposeReplyCapabilityHandler(BaseCapabilityHandler):
             
             if thread_id:
                 # Get latest message from thread
-                result = bridge_tool.execute({
+                result = await bridge_tool.execute_async({
                     "operation": "read",
                     "thread_id": thread_id
                 })
@@ -240,7 +240,7 @@ class ProposeReplyCapabilityHandler(BaseCapabilityHandler):
                 return []
             
             # Get recent messages from thread
-            result = bridge_tool.execute({
+            result = await bridge_tool.execute_async({
                 "operation": "read",
                 "thread_id": thread_id
             })
@@ -110,13 +110,13 @@ class ReadCapabilityHandler(BaseCapabilityHandler):
             thread_id = parameters.get("thread_id")
             
             if message_id:
-                bridge_result = imessage_bridge_tool.execute({
+                bridge_result = await imessage_bridge_tool.execute_async({
                     "operation": "read",
                     "message_id": message_id
                 })
             elif thread_id:
                 # Get thread information and latest message
-                bridge_result = imessage_bridge_tool.execute({
+                bridge_result = await imessage_bridge_tool.execute_async({
                     "operation": "read",
                     "thread_id": thread_id
                 })
@@ -217,7 +217,7 @@ class ReadCapabilityHandler(BaseCapabilityHandler):
         """Get context messages around the current message in a thread."""
         try:
             # Get recent messages from the thread
-            context_result = bridge_tool.execute({
+            context_result = await bridge_tool.execute_async({
                 "operation": "read",
                 "thread_id": thread_id
             })
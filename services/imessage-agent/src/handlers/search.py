@@ -1,13 +1,16 @@
 """
 Search capability handler for iMessage messages.
 
-This handler provides search functionality for iMessage messages using
-the macOS Bridge integration.
+This handler answers from the local message index once iMessage has been
+synced, and falls back to the macOS Bridge integration otherwise.
 """
 
-from typing import Dict, Any, List
+import asyncio
+from typing import Dict, Any, List, Optional
 from kenny_agent.base_handler import BaseCapabilityHandler
 
+from ..tools.imessage_bridge import index_record
+
 
 class SearchCapabilityHandler(BaseCapabilityHandler):
     """Handler for searching iMessage messages."""
@@ -76,13 +79,18 @@ class SearchCapabilityHandler(BaseCapabilityHandler):
                 # Fallback to mock data if no agent context
                 return self._get_mock_search_results(parameters)
             
+            # Answer locally when the message index has iMessage
+            indexed = await self._search_index(parameters)
+            if indexed is not None:
+                return indexed
+            
             imessage_bridge_tool = self._agent.tools.get("imessage_bridge")
             if not imessage_bridge_tool:
                 # Fallback to mock data if iMessage bridge tool not available
                 return self._get_mock_search_results(parameters)
             
             # Execute iMessage bridge tool with search operation
-            bridge_result = imessage_bridge_tool.execute({
+            bridge_result = await imessage_bridge_tool.execute_async({
                 "operation": "search",
                 **parameters
             })
@@ -90,6 +98,7 @@ class SearchCapabilityHandler(BaseCapabilityHandler):
             # Convert bridge response to capability format
             if isinstance(bridge_result, dict) and bridge_result.get("results"):
                 messages = bridge_result["results"]
+                await self._index_messages(messages)
                 return {
                     "results": messages,
                     "count": len(messages)
@@ -103,6 +112,43 @@ class SearchCapabilityHandler(BaseCapabilityHandler):
             print(f"iMessage search error: {e}")
             return self._get_mock_search_results(parameters)
     
+    async def _search_index(self, parameters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Search the agent's message index; None when it cannot answer."""
+        index = getattr(self._agent, "message_index", None)
+        if index is None:
+            return None
+        try:
+            messages = await asyncio.to_thread(
+                index.answer, "imessage",
+                query=parameters.get("query"),
+                contact=parameters.get("contact"),
+                since=parameters.get("since"),
+                until=parameters.get("until"),
+                limit=parameters.get("limit", 20)
+            )
+        except Exception as e:
+            print(f"[imessage_search] Message index search failed: {e}")
+            return None
+        if messages is None:
+            return None
+        thread_id = parameters.get("thread_id")
+        if thread_id:
+            messages = [m for m in messages if m.get("thread_id") == thread_id]
+        return {
+            "results": messages,
+            "count": len(messages)
+        }
+    
+    async def _index_messages(self, messages: List[Dict[str, Any]]):
+        """Write bridge results through to the message index."""
+        index = getattr(self._agent, "message_index", None)
+        if index is None or not messages:
+            return
+        try:
+            await asyncio.to_thread(index.upsert_messages, "imessage", [index_record(m) for m in messages])
+        except Exception as e:
+            print(f"[imessage_search] Could not index messages: {e}")
+    
     def _get_mock_search_results(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """
         Generate mock search results as fallback.
@@ -21,11 +21,15 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent / "agen
 
 from kenny_agent.agent_service_base import AgentServiceBase, ConfidenceResult
 from kenny_agent.registry import AgentRegistryClient
+from kenny_agent.message_index import MessageIndex, MessageIndexSync, to_epoch
 
 from .handlers.search import SearchCapabilityHandler
 from .handlers.read import ReadCapabilityHandler
 from .handlers.propose_reply import ProposeReplyCapabilityHandler
-from .tools.imessage_bridge import iMessageBridgeTool
+from .tools.imessage_bridge import iMessageBridgeTool, index_record
+
+# Recent messages listed on each message index sync pass
+INDEX_SYNC_LIMIT = int(os.getenv("IMESSAGE_INDEX_SYNC_LIMIT", "200"))
 
 
 class IntelligentiMessageAgent(AgentServiceBase):
@@ -76,6 +80,32 @@ class IntelligentiMessageAgent(AgentServiceBase):
         bridge_url = os.getenv("MAC_BRIDGE_URL", "http://localhost:5100")
         print(f"Registering iMessage bridge tool with URL: {bridge_url}")
         self.register_tool(iMessageBridgeTool(bridge_url))
+        
+        # Local message index shared with the other messaging agents
+        self.message_index = MessageIndex()
+        self.message_index_sync = MessageIndexSync(self.message_index, "imessage", self._fetch_for_index)
+    
+    async def _fetch_for_index(self, cursor: Optional[str]) -> List[Dict[str, Any]]:
+        """List recent iMessages newer than the index cursor."""
+        result = await self.tools["imessage_bridge"].execute_async({"operation": "list", "limit": INDEX_SYNC_LIMIT})
+        if result.get("error"):
+            raise RuntimeError(result["error"])
+        newest = to_epoch(cursor) or 0
+        # The bridge cannot filter by date, so drop what the cursor already covers
+        return [index_record(m) for m in result.get("results", []) if (to_epoch(m.get("timestamp")) or 0) > newest]
+    
+    async def start(self):
+        """Start the Intelligent iMessage Agent."""
+        print(f"Starting {self.name}...")
+        self.message_index_sync.start()
+        self.update_health_status("healthy", "Intelligent iMessage Agent started successfully")
+    
+    async def stop(self):
+        """Stop the Intelligent iMessage Agent."""
+        print(f"Stopping {self.name}...")
+        await self.message_index_sync.stop()
+        self.message_index.close()
+        await super().stop()
     
     def _initialize_handlers(self):
         """Initialize capability handlers."""
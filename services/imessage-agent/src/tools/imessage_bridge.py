@@ -7,6 +7,29 @@ This tool provides access to iMessage functionality through the macOS Bridge ser
 import httpx
 from typing import Dict, Any, Optional, List
 from kenny_agent.base_tool import BaseTool
+from kenny_agent.bridge_client import get_bridge_client
+
+# Read timeouts per bridge endpoint; listing goes through slow JXA
+ENDPOINT_TIMEOUTS = {
+    "/v1/messages/imessage": 65.0,
+    "/v1/messages/imessage/search": 45.0,
+    "/v1/messages/imessage/*": 30.0,
+    "/health": 10.0
+}
+
+
+def index_record(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a bridge iMessage to a message index record."""
+    return {
+        "id": message.get("id"),
+        "thread_id": message.get("thread_id"),
+        "sender": message.get("from") or "",
+        "sender_name": message.get("contact_name") if message.get("from") != "Me" else None,
+        "recipients": [r for r in (message.get("to"), message.get("phone_number")) if r],
+        "body": message.get("content"),
+        "timestamp": message.get("timestamp"),
+        "payload": message
+    }
 
 
 class iMessageBridgeTool(BaseTool):
@@ -42,6 +65,7 @@ class iMessageBridgeTool(BaseTool):
         if norm.endswith('/bridge'):
             norm = norm[:-len('/bridge')]
         self.bridge_url = norm
+        self.client = get_bridge_client(norm, ENDPOINT_TIMEOUTS)
     
     def execute(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -66,6 +90,47 @@ class iMessageBridgeTool(BaseTool):
         else:
             raise ValueError(f"Unknown operation: {operation}")
     
+    async def execute_async(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute the iMessage bridge operation over the shared async bridge client.
+        
+        Args:
+            parameters: Operation parameters
+            
+        Returns:
+            Result of the operation
+        """
+        operation = parameters.get("operation")
+        
+        if operation == "list":
+            return await self._list_messages_async(parameters)
+        elif operation == "read":
+            return await self._read_message_async(parameters)
+        elif operation == "search":
+            return await self._search_messages_async(parameters)
+        elif operation == "health":
+            return await self._health_check_async()
+        else:
+            raise ValueError(f"Unknown operation: {operation}")
+    
+    def _list_result(self, data: Any, limit: int, page: int) -> Dict[str, Any]:
+        # Accept either {messages: [...]} or a raw list
+        if isinstance(data, list):
+            messages = data
+            total = len(messages)
+        else:
+            messages = data.get("messages", [])
+            total = data.get("total", len(messages))
+        
+        return {
+            "operation": "list",
+            "results": messages,
+            "count": len(messages),
+            "total": total,
+            "page": page,
+            "limit": limit
+        }
+    
     def _list_messages(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """List recent iMessages."""
         limit = parameters.get("limit", 100)
@@ -78,59 +143,33 @@ class iMessageBridgeTool(BaseTool):
         }
         
         try:
-            url = f"{self.bridge_url}/v1/messages/imessage"
-            print(f"[imessage_bridge] GET {url} params={query_params}")
-            # Disable env proxy settings; allow longer read timeout for slow JXA
-            with httpx.Client(trust_env=False, http2=False, timeout=httpx.Timeout(connect=2.0, read=65.0, write=5.0, pool=3.0)) as client:
-                response = client.get(url, params=query_params, headers={"Connection": "close"}, follow_redirects=False)
-                response.raise_for_status()
-                
-                data = response.json()
-                # Accept either {messages: [...]} or a raw list
-                if isinstance(data, list):
-                    messages = data
-                    total = len(messages)
-                else:
-                    messages = data.get("messages", [])
-                    total = data.get("total", len(messages))
-                
-                return {
-                    "operation": "list",
-                    "results": messages,
-                    "count": len(messages),
-                    "total": total,
-                    "page": page,
-                    "limit": limit
-                }
+            print(f"[imessage_bridge] GET {self.bridge_url}/v1/messages/imessage params={query_params}")
+            data = self.client.get_json_sync("/v1/messages/imessage", params=query_params)
+            return self._list_result(data, limit, page)
                 
         except httpx.RequestError as e:
             print(f"[imessage_bridge] RequestError type={type(e)} detail={e}")
-            # Fallback: shell out to curl (works reliably on this host)
-            try:
-                import json as _json
-                import shlex, subprocess as _sp
-                fallback_base = self.bridge_url.replace('127.0.0.1', 'localhost')
-                url = f"{fallback_base}/v1/messages/imessage?limit={limit}&page={page}"
-                cmd = ["curl", "-sS", "--max-time", "8", url]
-                print(f"[imessage_bridge] fallback curl: {' '.join(shlex.quote(c) for c in cmd)}")
-                res = _sp.run(cmd, stdout=_sp.PIPE, stderr=_sp.PIPE, text=True)
-                if res.returncode == 0 and res.stdout.strip():
-                    data = _json.loads(res.stdout)
-                    messages = data if isinstance(data, list) else data.get("messages", [])
-                    return {
-                        "operation": "list",
-                        "results": messages,
-                        "count": len(messages),
-                        "total": len(messages),
-                        "page": page,
-                        "limit": limit,
-                        "_fallback": "curl"
-                    }
-                else:
-                    print(f"[imessage_bridge] fallback curl failed rc={res.returncode} err={res.stderr.strip()}")
-            except Exception as fe:
-                print(f"[imessage_bridge] fallback error: {fe}")
-
+            return {
+                "operation": "list",
+                "error": f"Request failed: {str(e)}"
+            }
+        except httpx.HTTPStatusError as e:
+            print(f"[imessage_bridge] HTTPStatusError code={e.response.status_code} body={e.response.text}")
+            return {
+                "operation": "list",
+                "error": f"HTTP error {e.response.status_code}: {e.response.text}"
+            }
+    
+    async def _list_messages_async(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """List recent iMessages without blocking the event loop."""
+        limit = parameters.get("limit", 100)
+        page = parameters.get("page", 0)
+        
+        try:
+            data = await self.client.get_json("/v1/messages/imessage", params={"limit": limit, "page": page})
+            return self._list_result(data, limit, page)
+        except httpx.RequestError as e:
+            print(f"[imessage_bridge] RequestError type={type(e)} detail={e}")
             return {
                 "operation": "list",
                 "error": f"Request failed: {str(e)}"
@@ -156,20 +195,13 @@ class iMessageBridgeTool(BaseTool):
             else:
                 endpoint = f"/v1/messages/imessage/thread/{thread_id}"
             
-            with httpx.Client(trust_env=False, timeout=30.0) as client:
-                response = client.get(
-                    f"{self.bridge_url}{endpoint}",
-                    headers={"Connection": "close"}
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                return {
-                    "operation": "read",
-                    "message_id": message_id,
-                    "thread_id": thread_id,
-                    "result": data
-                }
+            data = self.client.get_json_sync(endpoint)
+            return {
+                "operation": "read",
+                "message_id": message_id,
+                "thread_id": thread_id,
+                "result": data
+            }
                 
         except httpx.RequestError as e:
             return {
@@ -186,48 +218,106 @@ class iMessageBridgeTool(BaseTool):
                 "thread_id": thread_id
             }
     
+    async def _read_message_async(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Read a specific message or thread by ID without blocking the event loop."""
+        message_id = parameters.get("message_id")
+        thread_id = parameters.get("thread_id")
+        
+        if not message_id and not thread_id:
+            raise ValueError("Either message_id or thread_id is required for read operation")
+        
+        if message_id:
+            endpoint = f"/v1/messages/imessage/{message_id}"
+        else:
+            endpoint = f"/v1/messages/imessage/thread/{thread_id}"
+        
+        try:
+            data = await self.client.get_json(endpoint)
+            return {
+                "operation": "read",
+                "message_id": message_id,
+                "thread_id": thread_id,
+                "result": data
+            }
+        except httpx.RequestError as e:
+            return {
+                "operation": "read",
+                "error": f"Request failed: {str(e)}",
+                "message_id": message_id,
+                "thread_id": thread_id
+            }
+        except httpx.HTTPStatusError as e:
+            return {
+                "operation": "read",
+                "error": f"HTTP error {e.response.status_code}: {e.response.text}",
+                "message_id": message_id,
+                "thread_id": thread_id
+            }
+    
     def _search_messages(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Search iMessages by query."""
+        query_params = self._search_query(parameters)
+        query, limit = query_params["q"], query_params["limit"]
+        
+        try:
+            print(f"[imessage_bridge] GET {self.bridge_url}/v1/messages/imessage/search params={query_params}")
+            data = self.client.get_json_sync("/v1/messages/imessage/search", params=query_params)
+            return self._search_result(data, query, limit)
+                
+        except httpx.RequestError as e:
+            print(f"[imessage_bridge] RequestError type={type(e)} detail={e}")
+            return {
+                "operation": "search",
+                "query": query,
+                "error": f"Request failed: {str(e)}"
+            }
+        except httpx.HTTPStatusError as e:
+            print(f"[imessage_bridge] HTTPStatusError code={e.response.status_code} body={e.response.text}")
+            return {
+                "operation": "search",
+                "query": query,
+                "error": f"HTTP error {e.response.status_code}: {e.response.text}"
+            }
+    
+    def _search_query(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         query = parameters.get("query")
         if not query:
             raise ValueError("query is required for search operation")
         
-        limit = parameters.get("limit", 50)
-        context = parameters.get("context", "")
-        
-        # Build query parameters
         query_params = {
             "q": query,
+            "limit": parameters.get("limit", 50)
+        }
+        if parameters.get("context"):
+            query_params["context"] = parameters["context"]
+        return query_params
+    
+    def _search_result(self, data: Any, query: str, limit: int) -> Dict[str, Any]:
+        # Accept either {results: [...]} or a raw list
+        if isinstance(data, list):
+            results = data
+            total = len(results)
+        else:
+            results = data.get("results", data.get("messages", []))
+            total = data.get("total", len(results))
+        
+        return {
+            "operation": "search",
+            "query": query,
+            "results": results,
+            "count": len(results),
+            "total": total,
             "limit": limit
         }
-        if context:
-            query_params["context"] = context
+    
+    async def _search_messages_async(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Search iMessages by query without blocking the event loop."""
+        query_params = self._search_query(parameters)
+        query = query_params["q"]
         
         try:
-            url = f"{self.bridge_url}/v1/messages/imessage/search"
-            print(f"[imessage_bridge] GET {url} params={query_params}")
-            with httpx.Client(trust_env=False, http2=False, timeout=httpx.Timeout(connect=2.0, read=45.0, write=5.0, pool=3.0)) as client:
-                response = client.get(url, params=query_params, headers={"Connection": "close"}, follow_redirects=False)
-                response.raise_for_status()
-                
-                data = response.json()
-                # Accept either {results: [...]} or a raw list
-                if isinstance(data, list):
-                    results = data
-                    total = len(results)
-                else:
-                    results = data.get("results", data.get("messages", []))
-                    total = data.get("total", len(results))
-                
-                return {
-                    "operation": "search",
-                    "query": query,
-                    "results": results,
-                    "count": len(results),
-                    "total": total,
-                    "limit": limit
-                }
-                
+            data = await self.client.get_json("/v1/messages/imessage/search", params=query_params)
+            return self._search_result(data, query, query_params["limit"])
         except httpx.RequestError as e:
             print(f"[imessage_bridge] RequestError type={type(e)} detail={e}")
             return {
@@ -246,18 +336,12 @@ class iMessageBridgeTool(BaseTool):
     def _health_check(self) -> Dict[str, Any]:
         """Check bridge connectivity and health."""
         try:
-            with httpx.Client(trust_env=False, timeout=10.0) as client:
-                response = client.get(
-                    f"{self.bridge_url}/health",
-                    headers={"Connection": "close"}
-                )
-                response.raise_for_status()
-                
-                return {
-                    "operation": "health",
-                    "status": "ok",
-                    "bridge_url": self.bridge_url
-                }
+            self.client.request_sync("GET", "/health")
+            return {
+                "operation": "health",
+                "status": "ok",
+                "bridge_url": self.bridge_url
+            }
                 
         except Exception as e:
             return {
@@ -265,4 +349,25 @@ class iMessageBridgeTool(BaseTool):
                 "status": "error",
                 "error": str(e),
                 "bridge_url": self.bridge_url
-            }
\ No newline at end of file
+            }
+    
+    async def _health_check_async(self) -> Dict[str, Any]:
+        """Check bridge connectivity and health without blocking the event loop."""
+        try:
+            await self.client.request("GET", "/health")
+            return {
+                "operation": "health",
+                "status": "ok",
+                "bridge_url": self.bridge_url
+            }
+        except Exception as e:
+            return {
+                "operation": "health",
+                "status": "error",
+                "error": str(e),
+                "bridge_url": self.bridge_url
+            }
+    
+    def get_client_metrics(self) -> Dict[str, Any]:
+        """Get metrics of the shared bridge client."""
+        return self.client.get_metrics()
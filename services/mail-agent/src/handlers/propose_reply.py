@@ -66,7 +66,7 @@ class ProposeReplyCapabilityHandler(BaseCapabilityHandler):
                 return self._get_mock_reply_suggestions(context)
             
             # First, read the message to get its content
-            read_result = await mail_bridge_tool.execute({
+            read_result = await mail_bridge_tool.execute_async({
                 "operation": "read_message",
                 "id": message_id
             })
@@ -64,13 +64,13 @@ class ReadCapabilityHandler(BaseCapabilityHandler):
                 return self._get_mock_message(message_id)
             
             # Execute mail bridge tool with read operation
-            bridge_result = await mail_bridge_tool.execute({
-                "operation": "read_message",
-                "id": message_id
+            bridge_result = await mail_bridge_tool.execute_async({
+                "operation": "read",
+                "message_id": message_id
             })
             
             # Convert bridge response to capability format
-            if bridge_result.get("success") and "message" in bridge_result:
+            if "message" in bridge_result and not bridge_result.get("error"):
                 return bridge_result["message"]
             else:
                 # Fallback to mock data on bridge failure
@@ -1,12 +1,17 @@
 """
 Search capability handler for mail messages.
 
-This handler provides search functionality for mail messages using
-the macOS Bridge integration.
+This handler answers from the local message index once the mailbox has
+been synced, and falls back to the macOS Bridge integration otherwise.
 """
 
-from typing import Dict, Any, List
+import asyncio
+import re
+from typing import Dict, Any, List, Optional
 from kenny_agent.base_handler import BaseCapabilityHandler
+from kenny_agent.message_index import STOPWORDS, normalize_identifier
+
+from ..tools.mail_bridge import index_record
 
 
 class SearchCapabilityHandler(BaseCapabilityHandler):
@@ -74,20 +79,30 @@ class SearchCapabilityHandler(BaseCapabilityHandler):
                 # Fallback to mock data if no agent context
                 return self._get_mock_search_results(parameters)
             
+            # Answer locally when the message index has this mailbox
+            indexed = await self._search_index(parameters)
+            if indexed is not None:
+                return indexed
+            
             mail_bridge_tool = self._agent.tools.get("mail_bridge")
             if not mail_bridge_tool:
                 # Fallback to mock data if mail bridge tool not available
                 return self._get_mock_search_results(parameters)
             
-            # Execute mail bridge tool with search operation
-            bridge_result = await mail_bridge_tool.execute({
-                "operation": "list_messages",
-                **parameters
+            # List the mailbox through the bridge
+            bridge_result = await mail_bridge_tool.execute_async({
+                "operation": "list",
+                "mailbox": parameters.get("mailbox", "Inbox"),
+                "since": parameters.get("since"),
+                "limit": parameters.get("limit", 100)
             })
             
             # Convert bridge response to capability format
-            if bridge_result.get("success") and "messages" in bridge_result:
-                messages = bridge_result["messages"]
+            if "results" in bridge_result and not bridge_result.get("error"):
+                messages = bridge_result["results"]
+                await self._index_messages(messages)
+                # The bridge only lists the mailbox, so apply the search filters here
+                messages = self._filter_messages(messages, parameters)
                 return {
                     "results": messages,
                     "count": len(messages)
@@ -100,6 +115,75 @@ class SearchCapabilityHandler(BaseCapabilityHandler):
             # Fallback to mock data on any error
             return self._get_mock_search_results(parameters)
     
+    async def _search_index(self, parameters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Search the agent's message index; None when it cannot answer."""
+        index = getattr(self._agent, "message_index", None)
+        if index is None:
+            return None
+        try:
+            messages = await asyncio.to_thread(
+                index.answer, "mail",
+                query=parameters.get("query"),
+                contact=parameters.get("from") or parameters.get("to"),
+                since=parameters.get("since"),
+                until=parameters.get("until"),
+                limit=parameters.get("limit", 100)
+            )
+        except Exception as e:
+            print(f"[mail_search] Message index search failed: {e}")
+            return None
+        if messages is None:
+            return None
+        mailbox = parameters.get("mailbox")
+        if mailbox:
+            messages = [m for m in messages if m.get("mailbox") in (None, mailbox)]
+        return {
+            "results": messages,
+            "count": len(messages)
+        }
+    
+    @staticmethod
+    def _filter_messages(messages: List[Dict[str, Any]], parameters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Keep listed messages matching the query and from/to filters."""
+        terms = [t for t in re.findall(r"\w+", (parameters.get("query") or "").lower()) if t not in STOPWORDS]
+        
+        def matches_contact(values: List[str], contact: Optional[str]) -> bool:
+            if not contact:
+                return True
+            identifier = normalize_identifier(contact)
+            for value in values:
+                if identifier and normalize_identifier(value) == identifier:
+                    return True
+                if not identifier and contact.lower() in value.lower():
+                    return True
+            return False
+        
+        filtered = []
+        for message in messages:
+            recipients = message.get("to") or []
+            if isinstance(recipients, str):
+                recipients = [recipients]
+            if not matches_contact([message.get("from") or ""], parameters.get("from")):
+                continue
+            if not matches_contact(recipients, parameters.get("to")):
+                continue
+            if terms:
+                text = " ".join(str(message.get(field) or "") for field in ("subject", "snippet", "from")).lower()
+                if not any(term in text for term in terms):
+                    continue
+            filtered.append(message)
+        return filtered
+    
+    async def _index_messages(self, messages: List[Dict[str, Any]]):
+        """Write bridge results through to the message index."""
+        index = getattr(self._agent, "message_index", None)
+        if index is None or not messages:
+            return
+        try:
+            await asyncio.to_thread(index.upsert_messages, "mail", [index_record(m) for m in messages])
+        except Exception as e:
+            print(f"[mail_search] Could not index messages: {e}")
+    
     def _get_mock_search_results(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """
         Generate mock search results as fallback.
@@ -12,11 +12,15 @@ import os
 from typing import Dict, Any
 from kenny_agent.agent_service_base import AgentServiceBase
 from kenny_agent.registry import AgentRegistryClient
+from kenny_agent.message_index import MessageIndex, MessageIndexSync
 
 from .handlers.search import SearchCapabilityHandler
 from .handlers.read import ReadCapabilityHandler
 from .handlers.propose_reply import ProposeReplyCapabilityHandler
-from .tools.mail_bridge import MailBridgeTool
+from .tools.mail_bridge import MailBridgeTool, index_record
+
+# Messages listed per mailbox on each message index sync pass
+INDEX_SYNC_LIMIT = int(os.getenv("MAIL_INDEX_SYNC_LIMIT", "200"))
 
 
 class IntelligentMailAgent(AgentServiceBase):
@@ -46,6 +50,10 @@ class IntelligentMailAgent(AgentServiceBase):
         print(f"Registering mail bridge tool with URL: {bridge_url}")
         self.register_tool(MailBridgeTool(bridge_url))
         
+        # Local message index shared with the other messaging agents
+        self.message_index = MessageIndex()
+        self.message_index_sync = MessageIndexSync(self.message_index, "mail", self._fetch_for_index)
+        
         # Register capabilities with agent reference
         print("Registering intelligent capabilities...")
         search_handler = SearchCapabilityHandler()
@@ -76,6 +84,19 @@ class IntelligentMailAgent(AgentServiceBase):
         """Return context for LLM interpretation."""
         return "mail management system that can search emails, read specific messages, and propose replies"
     
+    async def _fetch_for_index(self, cursor):
+        """List Inbox and Sent messages newer than the index cursor."""
+        mail_bridge = self.tools["mail_bridge"]
+        records = []
+        for mailbox in ("Inbox", "Sent"):
+            result = await mail_bridge.execute_async({
+                "operation": "list", "mailbox": mailbox, "since": cursor, "limit": INDEX_SYNC_LIMIT
+            })
+            if result.get("error"):
+                raise RuntimeError(result["error"])
+            records.extend(index_record(message) for message in result.get("results", []))
+        return records
+    
     def setup_intelligent_health_monitoring(self):
         """Set up enhanced health checks for intelligent agent."""
         from kenny_agent.health import HealthMonitor, HealthCheck, HealthStatus
@@ -269,6 +290,9 @@ class IntelligentMailAgent(AgentServiceBase):
             print(f"[intelligent-mail-agent] Warning: Could not register with registry: {registry_error}")
             print(f"[intelligent-mail-agent] Continuing without registry registration")
         
+        # Keep the local message index fed from the bridge
+        self.message_index_sync.start()
+        
         # Update health status
         self.update_health_status("healthy", "Intelligent Mail Agent started successfully")
         print("Intelligent Mail Agent started successfully!")
@@ -278,6 +302,9 @@ class IntelligentMailAgent(AgentServiceBase):
         print(f"Stopping {self.name}...")
         self.update_health_status("degraded", "Intelligent Mail Agent stopping")
         
+        await self.message_index_sync.stop()
+        self.message_index.close()
+        
         # Cleanup LLM and cache resources
         await super().stop()
         
@@ -218,7 +218,7 @@ async def execute_capability(verb: str, request: CapabilityRequest):
             "limit": request.input.get("limit", 100),
             "page": request.input.get("page", 0),
         }
-        tool_result = mail_agent.execute_tool("mail_bridge", params)
+        tool_result = await mail_agent.execute_tool_async("mail_bridge", params)
         # Surface tool errors directly for debugging
         if isinstance(tool_result, dict) and tool_result.get("error"):
             error_detail = tool_result.get("error")
@@ -109,6 +109,32 @@ class TestSearchCapabilityHandler:
         assert isinstance(result["results"], list)
         assert isinstance(result["count"], int)
         assert result["count"] > 0
+    
+    @pytest.mark.asyncio
+    async def test_bridge_listing_is_filtered_by_query_and_contact(self):
+        """Test that mailbox listings from the bridge are filtered before returning."""
+        class FakeBridge:
+            async def execute_async(self, parameters):
+                return {"results": [
+                    {"id": "1", "from": "Sarah <sarah@example.com>", "to": ["me@example.com"],
+                     "subject": "Offsite agenda", "snippet": "", "ts": "2025-08-13T00:00:00Z"},
+                    {"id": "2", "from": "bob@example.com", "to": ["me@example.com"],
+                     "subject": "Offsite travel", "snippet": "", "ts": "2025-08-13T00:00:00Z"},
+                    {"id": "3", "from": "sarah@example.com", "to": ["me@example.com"],
+                     "subject": "Lunch", "snippet": "", "ts": "2025-08-13T00:00:00Z"}
+                ]}
+        
+        class FakeAgent:
+            tools = {"mail_bridge": FakeBridge()}
+        
+        handler = SearchCapabilityHandler()
+        handler._agent = FakeAgent()
+        
+        result = await handler.execute({"query": "offsite", "from": "Sarah@Example.com"})
+        assert [m["id"] for m in result["results"]] == ["1"]
+        
+        result = await handler.execute({"query": "quarterly report"})
+        assert result == {"results": [], "count": 0}
 
 
 class TestReadCapabilityHandler:
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Retention benchmark: partitioned, chunked expiry over a large memory store.
+
+Records N memories spread over D days into the RetentionEngine partition
+index, then expires everything older than the retention window. Python heap
+use is sampled with tracemalloc while each chunk is deleted, and compared
+with materializing every expired id at once, which is what a single
+collection.get + delete does.
+
+The engine's own cost is what is measured: deletes go to a sink collection
+that only counts ids, unless --chroma is given and chromadb is installed
+(slow for 1M memories).
+
+Usage: python benchmark_retention.py --count 1000000 --days 730 --retention-days 365
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add the agent-sdk and the memory agent to the path
+sys.path.insert(0, str(Path(__file__).parent.parent / "agent-sdk"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.kenny_agent.tools.retention import RetentionEngine
+from src.kenny_agent.tools.chroma_client import chromadb
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("retention_benchmark")
+
+
+class SinkCollection:
+    """Counts deleted ids and samples heap use at every delete."""
+
+    def __init__(self):
+        self.deleted = 0
+        self.heap_samples = []
+
+    def delete(self, ids):
+        self.deleted += len(ids)
+        self.heap_samples.append(tracemalloc.get_traced_memory()[0])
+
+
+class ChromaHolder:
+    def __init__(self, collection):
+        self.collection = collection
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1000000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--retention-days", type=int, default=365)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--chroma", action="store_true", help="Delete from an ephemeral ChromaDB collection")
+    args = parser.parse_args()
+
+    sink = SinkCollection()
+    collection = sink
+    if args.chroma and chromadb is not None:
+        collection = chromadb.EphemeralClient().get_or_create_collection("kenny_retention_benchmark")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = RetentionEngine(ChromaHolder(collection), db_path=str(Path(tmp) / "retention.db"))
+        engine.chunk_size = args.chunk_size
+        engine.max_deletes_per_second = 0  # measure raw throughput; production runs rate-limited
+
+        now = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        batch = 10000
+        for offset in range(0, args.count, batch):
+            ids = [f"mem-{i}" for i in range(offset, min(offset + batch, args.count))]
+            metadatas = [{"created_at": (now - timedelta(days=i % args.days, seconds=i % 86400)).isoformat()} for i in range(offset, offset + len(ids))]
+            if collection is not sink:
+                collection.add(ids=ids, embeddings=[[0.0, 1.0]] * len(ids), metadatas=metadatas)
+            await engine.record(ids, metadatas)
+        logger.info(f"Indexed {args.count} memories over {args.days} days in {time.perf_counter() - start:.1f}s")
+
+        # Baseline: holding every expired id at once
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        expired_ids = [f"mem-{i}" for i in range(args.count) if i % args.days >= args.retention_days]
+        naive_peak = tracemalloc.get_traced_memory()[1] - base
+        del expired_ids
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = await engine.run_once(retention_days=args.retention_days)
+        elapsed = time.perf_counter() - start
+        engine_peak = tracemalloc.get_traced_memory()[1] - base
+        samples = [s - base for s in sink.heap_samples] if sink.heap_samples else [0]
+        tracemalloc.stop()
+
+        progress = engine.get_progress()
+        logger.info(f"Deleted {result['deleted_count']} memories from {result['partitions_deleted']} partitions "
+                    f"in {elapsed:.1f}s ({result['deleted_count'] / elapsed:,.0f} deletes/sec)")
+        logger.info(f"Remaining indexed memories: {progress['indexed_memories']} in {progress['partitions']} partitions")
+        logger.info(f"Heap while deleting (per chunk): first {samples[0] / 1024:.0f} KiB, "
+                    f"median {sorted(samples)[len(samples) // 2] / 1024:.0f} KiB, last {samples[-1] / 1024:.0f} KiB")
+        logger.info(f"Peak heap, partitioned sweep: {engine_peak / 1024 / 1024:.1f} MiB")
+        logger.info(f"Peak heap, all expired ids at once: {naive_peak / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
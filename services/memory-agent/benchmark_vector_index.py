@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Retrieval benchmark: local vector index vs. the ChromaDB search path.
+
+Loads the same synthetic, normalized embeddings into LocalVectorIndex and
+(when chromadb is installed) an ephemeral ChromaDB collection, then times
+unfiltered and scope-filtered queries through each tool's similarity_search.
+Also reports how many of the exact top-k Chroma returns for filtered queries.
+
+Usage: python benchmark_vector_index.py --count 100000 --dim 768 --queries 200
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the agent-sdk and the memory agent to the path
+sys.path.insert(0, str(Path(__file__).parent.parent / "agent-sdk"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.kenny_agent.tools.vector_index import LocalVectorIndex
+from src.kenny_agent.tools.chroma_client import ChromaClientTool, chromadb
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("vector_index_benchmark")
+
+SCOPES = ["mail", "contacts", "calendar", "messages", "notes"]
+
+
+def synthetic_corpus(count: int, dim: int, seed: int = 42):
+    """Clustered embeddings so thresholds and filters behave like real memories."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(64, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, 64, count)] + 0.5 * rng.normal(size=(count, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"mem-{i}" for i in range(count)]
+    metadatas = [
+        {"data_scope": SCOPES[i % len(SCOPES)], "created_at": f"2025-{(i % 12) + 1:02d}-01T00:00:00+00:00"}
+        for i in range(count)
+    ]
+    queries = centers[rng.integers(0, 64, 1000)] + 0.5 * rng.normal(size=(1000, dim)).astype(np.float32)
+    return ids, vectors, metadatas, queries
+
+
+async def time_queries(tool, queries, **search_args):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        result = await tool.similarity_search(query_embedding=query.tolist(), **search_args)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append([r["id"] for r in result["results"]])
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "mean_ms": statistics.mean(latencies)
+    }, results
+
+
+def report(label, stats):
+    logger.info(f"{label:<28} p50 {stats['p50_ms']:8.2f} ms   p95 {stats['p95_ms']:8.2f} ms   mean {stats['mean_ms']:8.2f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    ids, vectors, metadatas, queries = synthetic_corpus(args.count, args.dim)
+    queries = queries[:args.queries]
+    contents = [f"memory {i}" for i in range(args.count)]
+    unfiltered = {"limit": args.limit, "similarity_threshold": 0.0}
+    filtered = {"limit": args.limit, "similarity_threshold": 0.0, "data_scopes": ["contacts"]}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = LocalVectorIndex(data_dir=tmp)
+        await index.initialize()
+        start = time.perf_counter()
+        for i in range(0, args.count, 10000):
+            await index.add(ids[i:i + 10000], vectors[i:i + 10000], contents[i:i + 10000], metadatas[i:i + 10000])
+        logger.info(f"Local index: loaded {args.count} x {args.dim} in {time.perf_counter() - start:.1f}s")
+
+        local_unfiltered, _ = await time_queries(index, queries, **unfiltered)
+        local_filtered, exact_filtered = await time_queries(index, queries, **filtered)
+        report("local / unfiltered", local_unfiltered)
+        report("local / data_scope filter", local_filtered)
+        await index.cleanup()
+
+    if chromadb is None:
+        logger.info("chromadb not installed; skipping the ChromaDB comparison")
+        return
+
+    chroma = ChromaClientTool()
+    chroma.collection = chromadb.EphemeralClient().get_or_create_collection(
+        name="kenny_memories_benchmark", metadata={"hnsw:space": "l2"}
+    )
+    start = time.perf_counter()
+    for i in range(0, args.count, 5000):
+        chroma.collection.add(
+            ids=ids[i:i + 5000], embeddings=vectors[i:i + 5000].tolist(),
+            documents=contents[i:i + 5000], metadatas=metadatas[i:i + 5000]
+        )
+    logger.info(f"ChromaDB: loaded {args.count} x {args.dim} in {time.perf_counter() - start:.1f}s")
+
+    chroma_unfiltered, _ = await time_queries(chroma, queries, **unfiltered)
+    chroma_filtered, chroma_results = await time_queries(chroma, queries, **filtered)
+    report("chroma / unfiltered", chroma_unfiltered)
+    report("chroma / data_scope filter", chroma_filtered)
+
+    recall = statistics.mean(
+        len(set(found) & set(exact)) / len(exact) for found, exact in zip(chroma_results, exact_filtered) if exact
+    )
+    logger.info(f"ChromaDB filtered recall@{args.limit} vs exact: {recall:.3f}")
+    logger.info(f"Filtered speedup (p50): {chroma_filtered['p50_ms'] / local_filtered['p50_ms']:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
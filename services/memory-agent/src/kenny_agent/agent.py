@@ -5,6 +5,7 @@ This agent provides memory and retrieval capabilities including:
 - Semantic search across stored memories
 - Text embedding generation using local models
 - Memory storage with metadata and retention policies
+- Bulk ingestion with deduplication and resumable checkpoints
 """
 
 import sys
@@ -23,8 +24,11 @@ from typing import Dict, Any, List, Optional
 from .handlers.retrieve import MemoryRetrieveHandler
 from .handlers.embed import MemoryEmbedHandler
 from .handlers.store import MemoryStoreHandler
+from .handlers.store_batch import MemoryStoreBatchHandler
 from .tools.ollama_client import OllamaClientTool
 from .tools.chroma_client import ChromaClientTool
+from .tools.vector_index import LocalVectorIndex
+from .tools.retention import RetentionEngine
 
 
 class MemoryAgent(BaseAgent):
@@ -35,6 +39,7 @@ class MemoryAgent(BaseAgent):
     - memory.retrieve: Semantic search across stored data
     - memory.embed: Generate embeddings for text
     - memory.store: Store new memories with metadata
+    - memory.store_batch: Bulk-store memories with dedupe and checkpoints
     """
     
     def __init__(self):
@@ -61,13 +66,21 @@ class MemoryAgent(BaseAgent):
         # Register tools first
         ollama_tool = OllamaClientTool()
         chroma_tool = ChromaClientTool()
+        # Registered after ChromaDB so an empty index can backfill from it on start
+        vector_index = LocalVectorIndex(source=chroma_tool)
+        retention = RetentionEngine(chroma_tool, vector_index)
         self.register_tool(ollama_tool)
         self.register_tool(chroma_tool)
+        self.register_tool(vector_index)
+        self.register_tool(retention)
         
         # Register capability handlers with tool references
-        self.register_capability(MemoryRetrieveHandler(ollama_tool, chroma_tool))
+        self.register_capability(MemoryRetrieveHandler(ollama_tool, chroma_tool, vector_index))
         self.register_capability(MemoryEmbedHandler(ollama_tool))
-        self.register_capability(MemoryStoreHandler(ollama_tool, chroma_tool))
+        self.register_capability(MemoryStoreHandler(ollama_tool, chroma_tool, vector_index, retention))
+        store_batch = MemoryStoreBatchHandler(ollama_tool, chroma_tool, vector_index, retention)
+        self.register_capability(store_batch)
+        retention.ledger = store_batch.ledger
     
     async def start(self):
         """Start the memory agent and initialize services."""
@@ -143,5 +156,6 @@ class MemoryAgent(BaseAgent):
                 for name, tool in self.tools.items()
             },
             'capabilities_count': len(self.capabilities),
-            'tools_count': len(self.tools)
+            'tools_count': len(self.tools),
+            'ingestion': self.capabilities['memory.store_batch'].get_ingest_metrics()
         }
\ No newline at end of file
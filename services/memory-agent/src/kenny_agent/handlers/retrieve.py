@@ -3,8 +3,13 @@ Memory retrieval capability handler.
 
 Provides semantic search capabilities across stored memories using
 vector similarity and metadata filtering.
+
+Searches go to the local vector index when it is ready (exact, pre-filtered
+top-k off the event loop) and fall back to ChromaDB otherwise. Set
+MEMORY_RETRIEVAL_BACKEND=chroma to always use ChromaDB.
 """
 
+import os
 import sys
 import time
 import logging
@@ -20,10 +25,12 @@ from typing import Dict, Any, List
 class MemoryRetrieveHandler(BaseCapabilityHandler):
     """Handler for memory.retrieve capability - semantic search across stored data."""
     
-    def __init__(self, ollama_client=None, chroma_client=None):
+    def __init__(self, ollama_client=None, chroma_client=None, vector_index=None):
         """Initialize the memory retrieve handler."""
         self.ollama_client = ollama_client
         self.chroma_client = chroma_client
+        self.vector_index = vector_index
+        self.preferred_backend = os.getenv("MEMORY_RETRIEVAL_BACKEND", "local").lower()
         self.logger = logging.getLogger(__name__)
         
         super().__init__(
@@ -99,13 +106,21 @@ class MemoryRetrieveHandler(BaseCapabilityHandler):
                         "properties": {
                             "query_embedding_time": {"type": "number"},
                             "search_time": {"type": "number"},
-                            "embedding_model": {"type": "string"}
+                            "embedding_model": {"type": "string"},
+                            "search_backend": {"type": "string"}
                         }
                     }
                 }
             }
         )
     
+    def _select_backend(self):
+        """Pick the local index when it can serve the query, else ChromaDB."""
+        if (self.preferred_backend != "chroma" and self.vector_index is not None
+                and self.vector_index.is_ready()):
+            return self.vector_index, "local"
+        return self.chroma_client, "chroma"
+    
     async def execute(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute memory retrieval with semantic search.
@@ -126,7 +141,8 @@ class MemoryRetrieveHandler(BaseCapabilityHandler):
             # Check if tools are available
             if not self.ollama_client:
                 raise ValueError("Ollama client tool not available")
-            if not self.chroma_client:
+            search_backend, backend_name = self._select_backend()
+            if not search_backend:
                 raise ValueError("ChromaDB client tool not available")
             
             # Generate embedding for the query
@@ -136,7 +152,7 @@ class MemoryRetrieveHandler(BaseCapabilityHandler):
             
             # Perform vector search
             search_start_time = time.time()
-            search_results = await self.chroma_client.similarity_search(
+            search_results = await search_backend.similarity_search(
                 query_embedding=query_embedding,
                 limit=limit,
                 similarity_threshold=similarity_threshold,
@@ -161,7 +177,8 @@ class MemoryRetrieveHandler(BaseCapabilityHandler):
                 "search_metadata": {
                     "query_embedding_time": embedding_time,
                     "search_time": search_time,
-                    "embedding_model": self.ollama_client.get_current_model()
+                    "embedding_model": self.ollama_client.get_current_model(),
+                    "search_backend": backend_name
                 }
             }
             
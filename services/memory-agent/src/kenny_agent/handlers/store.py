@@ -22,10 +22,12 @@ from typing import Dict, Any, List, Optional
 class MemoryStoreHandler(BaseCapabilityHandler):
     """Handler for memory.store capability - store new memories with metadata."""
     
-    def __init__(self, ollama_client=None, chroma_client=None):
+    def __init__(self, ollama_client=None, chroma_client=None, vector_index=None, retention=None):
         """Initialize the memory store handler."""
         self.ollama_client = ollama_client
         self.chroma_client = chroma_client
+        self.vector_index = vector_index
+        self.retention = retention
         self.logger = logging.getLogger(__name__)
         
         super().__init__(
@@ -150,11 +152,23 @@ class MemoryStoreHandler(BaseCapabilityHandler):
                 metadata=memory_metadata
             )
             
-            storage_time = time.time() - start_time
-            
+            # ChromaDB is the source of truth (and of index backfill), so a
+            # memory it did not persist is not stored, whatever the index says
             if not storage_result.get("success"):
                 raise Exception(f"Failed to store memory: {storage_result.get('error')}")
             
+            # Mirror into the local index for fast retrieval
+            if embedding and self.vector_index is not None and self.vector_index.is_ready():
+                try:
+                    await self.vector_index.add([memory_id], [embedding], [content], [memory_metadata])
+                except Exception as e:
+                    self.logger.warning(f"Failed to index memory {memory_id} locally: {e}")
+            
+            storage_time = time.time() - start_time
+            
+            if self.retention is not None:
+                await self.retention.record([memory_id], [memory_metadata])
+            
             return {
                 "memory_id": memory_id,
                 "stored_at": stored_at.isoformat(),
@@ -0,0 +1,511 @@
+"""
+Bulk memory storage capability handler.
+
+Ingests large backfills (mail, iMessage, WhatsApp history) by chunking the
+input, skipping content already stored (by content hash), embedding several
+chunks concurrently and writing each chunk to the store with a single add.
+Progress is checkpointed per stream so an interrupted ingest can be resumed
+by replaying the same input with the same stream_id.
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+import uuid
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add the agent-sdk to the path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent.parent / "agent-sdk"))
+
+from kenny_agent.base_handler import BaseCapabilityHandler
+from typing import Dict, Any, List, Optional, Iterable, AsyncIterator, Union, Set
+
+MEMORY_NAMESPACE = uuid.UUID("6f1c2a4e-8b7d-4c55-9a43-2f0e8d4b7c11")
+
+
+def content_hash(content: str, data_scope: str) -> str:
+    """Hash identifying a memory's content within its data scope."""
+    return hashlib.sha256(f"{data_scope}\n{content.strip()}".encode("utf-8")).hexdigest()
+
+
+class IngestLedger:
+    """SQLite record of ingested content hashes and per-stream checkpoints."""
+
+    def __init__(self, db_path: str):
+        """Initialize the ingest ledger."""
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ingested_hashes (
+                    content_hash TEXT PRIMARY KEY,
+                    memory_id TEXT NOT NULL,
+                    ingested_at REAL
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ingested_memory ON ingested_hashes (memory_id)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+                    stream_id TEXT PRIMARY KEY,
+                    position INTEGER NOT NULL,
+                    stored INTEGER DEFAULT 0,
+                    duplicates INTEGER DEFAULT 0,
+                    rejected INTEGER DEFAULT 0,
+                    failed INTEGER DEFAULT 0,
+                    updated_at REAL
+                )
+            """)
+
+    def known_hashes(self, hashes: List[str]) -> Set[str]:
+        """Return the subset of hashes that are already stored."""
+        known = set()
+        with sqlite3.connect(self.db_path) as conn:
+            for i in range(0, len(hashes), 500):
+                chunk = hashes[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                known.update(row[0] for row in conn.execute(
+                    f"SELECT content_hash FROM ingested_hashes WHERE content_hash IN ({placeholders})", chunk
+                ))
+        return known
+
+    def forget(self, memory_ids: List[str]) -> int:
+        """Drop the hashes of deleted memories so their content can be ingested again."""
+        removed = 0
+        with sqlite3.connect(self.db_path) as conn:
+            for i in range(0, len(memory_ids), 500):
+                chunk = memory_ids[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                removed += conn.execute(
+                    f"DELETE FROM ingested_hashes WHERE memory_id IN ({placeholders})", chunk
+                ).rowcount
+        return removed
+
+    def get_checkpoint(self, stream_id: str) -> Optional[Dict[str, Any]]:
+        """Get the last committed checkpoint for a stream."""
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT position, stored, duplicates, rejected, failed, updated_at "
+                "FROM ingest_checkpoints WHERE stream_id = ?", (stream_id,)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            "stream_id": stream_id, "position": row[0], "stored": row[1], "duplicates": row[2],
+            "rejected": row[3], "failed": row[4],
+            "updated_at": datetime.fromtimestamp(row[5], timezone.utc).isoformat()
+        }
+
+    def commit(self, stream_id: Optional[str], position: int, stored: List[tuple], counts: Dict[str, int]):
+        """Record stored hashes and advance the stream checkpoint in one transaction."""
+        now = time.time()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO ingested_hashes (content_hash, memory_id, ingested_at) VALUES (?, ?, ?)",
+                [(digest, memory_id, now) for digest, memory_id in stored]
+            )
+            if stream_id:
+                conn.execute("""
+                    INSERT INTO ingest_checkpoints (stream_id, position, stored, duplicates, rejected, failed, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(stream_id) DO UPDATE SET
+                        position = excluded.position,
+                        stored = stored + excluded.stored,
+                        duplicates = duplicates + excluded.duplicates,
+                        rejected = rejected + excluded.rejected,
+                        failed = failed + excluded.failed,
+                        updated_at = excluded.updated_at
+                """, (stream_id, position, counts["stored"], counts["duplicates"],
+                      counts["rejected"], counts["failed"], now))
+
+
+class MemoryStoreBatchHandler(BaseCapabilityHandler):
+    """Handler for memory.store_batch capability - bulk ingestion with dedupe and checkpoints."""
+
+    def __init__(self, ollama_client=None, chroma_client=None, vector_index=None, retention=None,
+                 ledger_path: Optional[str] = None):
+        """Initialize the memory store batch handler."""
+        self.ollama_client = ollama_client
+        self.chroma_client = chroma_client
+        self.vector_index = vector_index
+        self.retention = retention
+        self.logger = logging.getLogger(__name__)
+
+        default_ledger = Path.home() / "Library" / "Application Support" / "Kenny" / "memory_ingest.db"
+        self.ledger_path = ledger_path or os.getenv("MEMORY_INGEST_DB", str(default_ledger))
+        self._ledger: Optional[IngestLedger] = None
+        self.batch_size = int(os.getenv("MEMORY_INGEST_BATCH_SIZE", "256"))
+        self.embed_concurrency = int(os.getenv("MEMORY_INGEST_EMBED_CONCURRENCY", "4"))
+        self.max_reported_errors = 20
+
+        self.ingest_metrics = {
+            "runs": 0,
+            "active_runs": 0,
+            "documents_received": 0,
+            "stored": 0,
+            "duplicates": 0,
+            "rejected": 0,
+            "failed": 0,
+            "batches": 0,
+            "busy_time": 0.0,
+            "last_run_docs_per_sec": 0.0,
+            "last_run_at": None
+        }
+
+        super().__init__(
+            capability="memory.store_batch",
+            description="Bulk-store memories with content deduplication, batched embedding and resumable checkpoints",
+            input_schema={
+                "type": "object",
+                "properties": {
+                    "memories": {
+                        "type": "array",
+                        "description": "Memories to store, each with content and metadata as for memory.store",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "content": {"type": "string", "minLength": 1, "maxLength": 10000},
+                                "metadata": {"type": "object"}
+                            },
+                            "required": ["content", "metadata"]
+                        },
+                        "maxItems": 10000
+                    },
+                    "stream_id": {
+                        "type": "string",
+                        "description": "Checkpoint key; replaying the same input with it resumes after the last committed batch"
+                    },
+                    "embedding_model": {
+                        "type": "string",
+                        "description": "Embedding model to use",
+                        "default": "nomic-embed-text"
+                    },
+                    "batch_size": {
+                        "type": "integer",
+                        "description": "Memories per embedding/storage batch",
+                        "minimum": 1,
+                        "maximum": 5000
+                    }
+                },
+                "required": ["memories"]
+            },
+            output_schema={
+                "type": "object",
+                "properties": {
+                    "stream_id": {"type": ["string", "null"]},
+                    "processed": {"type": "integer"},
+                    "stored": {"type": "integer"},
+                    "duplicates": {"type": "integer"},
+                    "rejected": {"type": "integer"},
+                    "failed": {"type": "integer"},
+                    "resumed_from": {"type": "integer"},
+                    "checkpoint": {"type": "integer"},
+                    "completed": {"type": "boolean"},
+                    "docs_per_sec": {"type": "number"},
+                    "memory_ids": {"type": "array", "items": {"type": "string"}},
+                    "errors": {"type": "array", "items": {"type": "object"}}
+                }
+            }
+        )
+
+    @property
+    def ledger(self) -> IngestLedger:
+        if self._ledger is None:
+            self._ledger = IngestLedger(self.ledger_path)
+        return self._ledger
+
+    async def execute(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute bulk memory storage.
+
+        Args:
+            parameters: Contains the memories and ingest options
+
+        Returns:
+            Dict with ingest counts, checkpoint and throughput
+        """
+        memories = parameters.get("memories") or []
+        return await self.ingest(
+            memories,
+            stream_id=parameters.get("stream_id"),
+            embedding_model=parameters.get("embedding_model", "nomic-embed-text"),
+            batch_size=parameters.get("batch_size"),
+            return_ids=True
+        )
+
+    async def get_checkpoint(self, stream_id: str) -> Optional[Dict[str, Any]]:
+        """Get the committed checkpoint for a stream."""
+        return await asyncio.to_thread(self.ledger.get_checkpoint, stream_id)
+
+    async def ingest(
+        self,
+        records: Union[Iterable[Dict[str, Any]], AsyncIterator[Dict[str, Any]]],
+        stream_id: Optional[str] = None,
+        embedding_model: str = "nomic-embed-text",
+        batch_size: Optional[int] = None,
+        return_ids: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Ingest a (possibly streamed) sequence of memory records.
+
+        Chunks are embedded concurrently (up to embed_concurrency at a time) but
+        committed strictly in input order, so the checkpoint always marks a
+        prefix of the input that is fully stored.
+
+        Args:
+            records: Iterable or async iterator of {"content", "metadata"} dicts
+            stream_id: Optional checkpoint key for resuming
+            embedding_model: Embedding model to use
+            batch_size: Memories per batch (defaults to MEMORY_INGEST_BATCH_SIZE)
+            return_ids: Include stored memory ids in the result
+
+        Returns:
+            Dict with ingest counts, checkpoint and throughput
+        """
+        start_time = time.time()
+        batch_size = batch_size or self.batch_size
+        self.ingest_metrics["runs"] += 1
+        self.ingest_metrics["active_runs"] += 1
+
+        totals = {"processed": 0, "stored": 0, "duplicates": 0, "rejected": 0, "failed": 0}
+        errors: List[Dict[str, Any]] = []
+        memory_ids: List[str] = []
+        resumed_from = 0
+        committed = 0
+        completed = False
+
+        try:
+            if not self.ollama_client:
+                raise ValueError("Ollama client tool not available for embedding generation")
+            if not self.chroma_client:
+                raise ValueError("ChromaDB client tool not available for storage")
+
+            if stream_id:
+                checkpoint = await self.get_checkpoint(stream_id)
+                resumed_from = checkpoint["position"] if checkpoint else 0
+            committed = resumed_from
+
+            await self.ollama_client.set_model(embedding_model)
+
+            seen: Set[str] = set()
+            pending: "asyncio.Queue[Optional[asyncio.Task]]" = asyncio.Queue(maxsize=self.embed_concurrency)
+
+            async def commit_in_order():
+                nonlocal committed
+                while True:
+                    task = await pending.get()
+                    if task is None:
+                        return
+                    batch = await task
+                    await self._store_batch(batch, stream_id)
+                    committed = batch["end"]
+                    for key in ("stored", "duplicates", "rejected", "failed"):
+                        totals[key] += batch["counts"][key]
+                    totals["processed"] += batch["end"] - batch["start"]
+                    errors.extend(batch["errors"][:self.max_reported_errors - len(errors)])
+                    if return_ids:
+                        memory_ids.extend(item["memory_id"] for item in batch["stored"])
+
+            committer = asyncio.create_task(commit_in_order())
+            try:
+                position = 0
+                chunk: List[tuple] = []
+                async for record in self._iterate(records):
+                    position += 1
+                    if position <= resumed_from:
+                        continue
+                    chunk.append((position - 1, record))
+                    if len(chunk) >= batch_size:
+                        await self._enqueue(pending, committer, chunk, seen)
+                        chunk = []
+                if chunk:
+                    await self._enqueue(pending, committer, chunk, seen)
+                await self._put(pending, committer, None)
+                await committer
+                completed = True
+            finally:
+                if not committer.done():
+                    committer.cancel()
+                while not pending.empty():
+                    task = pending.get_nowait()
+                    if task is not None:
+                        task.cancel()
+
+        except Exception as e:
+            self.logger.error(f"Error in memory batch store at position {committed}: {e}")
+            errors.append({"position": committed, "error": str(e)})
+
+        finally:
+            elapsed = time.time() - start_time
+            self.ingest_metrics["active_runs"] -= 1
+            self.ingest_metrics["busy_time"] += elapsed
+            self.ingest_metrics["documents_received"] += totals["processed"]
+            for key in ("stored", "duplicates", "rejected", "failed"):
+                self.ingest_metrics[key] += totals[key]
+            self.ingest_metrics["last_run_docs_per_sec"] = totals["processed"] / elapsed if elapsed > 0 else 0.0
+            self.ingest_metrics["last_run_at"] = datetime.now(timezone.utc).isoformat()
+
+        result = {
+            "stream_id": stream_id,
+            **totals,
+            "resumed_from": resumed_from,
+            "checkpoint": committed,
+            "completed": completed,
+            "elapsed_time": elapsed,
+            "docs_per_sec": self.ingest_metrics["last_run_docs_per_sec"],
+            "errors": errors
+        }
+        if return_ids:
+            result["memory_ids"] = memory_ids
+        return result
+
+    def get_ingest_metrics(self) -> Dict[str, Any]:
+        """Get cumulative ingest throughput metrics."""
+        metrics = dict(self.ingest_metrics)
+        busy = metrics["busy_time"]
+        metrics["docs_per_sec"] = metrics["documents_received"] / busy if busy > 0 else 0.0
+        return metrics
+
+    @staticmethod
+    async def _iterate(records):
+        if hasattr(records, "__aiter__"):
+            async for record in records:
+                yield record
+        else:
+            for record in records:
+                yield record
+
+    async def _put(self, pending: asyncio.Queue, committer: asyncio.Task, item):
+        """Queue work for the committer, surfacing its failure instead of blocking forever."""
+        put = asyncio.create_task(pending.put(item))
+        done, _ = await asyncio.wait({put, committer}, return_when=asyncio.FIRST_COMPLETED)
+        if put not in done:
+            put.cancel()
+            if item is not None:
+                item.cancel()
+            committer.result()  # re-raises the storage error
+            raise RuntimeError("Batch committer stopped unexpectedly")
+
+    async def _enqueue(self, pending: asyncio.Queue, committer: asyncio.Task, chunk: List[tuple], seen: Set[str]):
+        batch = await self._prepare_batch(chunk, seen)
+        await self._put(pending, committer, asyncio.create_task(self._embed_batch(batch)))
+
+    async def _prepare_batch(self, chunk: List[tuple], seen: Set[str]) -> Dict[str, Any]:
+        """Validate records and drop content already seen in this run or stored before."""
+        counts = {"stored": 0, "duplicates": 0, "rejected": 0, "failed": 0}
+        errors = []
+        candidates = []
+
+        for position, record in chunk:
+            content = record.get("content") if isinstance(record, dict) else None
+            metadata = (record.get("metadata") if isinstance(record, dict) else None) or {}
+            if isinstance(record, dict) and record.get("_error"):
+                reason = record["_error"]
+            elif not content or not isinstance(content, str):
+                reason = "No content provided for storage"
+            elif len(content) > 10000:
+                reason = "Content exceeds 10000 characters"
+            elif not metadata.get("source"):
+                reason = "Source metadata is required"
+            elif not metadata.get("data_scope"):
+                reason = "Data scope metadata is required"
+            else:
+                reason = None
+
+            if reason:
+                counts["rejected"] += 1
+                errors.append({"position": position, "error": reason})
+                continue
+
+            digest = content_hash(content, metadata["data_scope"])
+            if digest in seen:
+                counts["duplicates"] += 1
+                continue
+            seen.add(digest)
+            candidates.append({"position": position, "hash": digest, "content": content, "metadata": metadata})
+
+        known = await asyncio.to_thread(self.ledger.known_hashes, [c["hash"] for c in candidates]) if candidates else set()
+        items = []
+        for candidate in candidates:
+            if candidate["hash"] in known:
+                counts["duplicates"] += 1
+            else:
+                items.append(candidate)
+
+        return {
+            "start": chunk[0][0],
+            "end": chunk[-1][0] + 1,
+            "items": items,
+            "counts": counts,
+            "errors": errors,
+            "stored": []
+        }
+
+    async def _embed_batch(self, batch: Dict[str, Any]) -> Dict[str, Any]:
+        if not batch["items"]:
+            return batch
+
+        result = await self.ollama_client.generate_embeddings_batch([item["content"] for item in batch["items"]])
+        embedded = []
+        for item, embedding in zip(batch["items"], result.get("embeddings", [])):
+            if embedding:
+                item["embedding"] = embedding
+                embedded.append(item)
+            else:
+                batch["counts"]["failed"] += 1
+                batch["errors"].append({"position": item["position"], "error": "Embedding generation failed"})
+        batch["items"] = embedded
+        return batch
+
+    async def _store_batch(self, batch: Dict[str, Any], stream_id: Optional[str]):
+        """Write one batch with a single add and advance the checkpoint."""
+        items = batch["items"]
+        self.ingest_metrics["batches"] += 1
+
+        if items:
+            stored_at = datetime.now(timezone.utc).isoformat()
+            ids, contents, embeddings, metadatas = [], [], [], []
+            for item in items:
+                metadata = item["metadata"]
+                item["memory_id"] = str(uuid.uuid5(MEMORY_NAMESPACE, item["hash"]))
+                ids.append(item["memory_id"])
+                contents.append(item["content"])
+                embeddings.append(item["embedding"])
+                metadatas.append({
+                    **metadata,
+                    # Backfilled history keeps its original timestamp
+                    "created_at": metadata.get("created_at") or stored_at,
+                    "updated_at": stored_at,
+                    "content_length": len(item["content"]),
+                    "importance": metadata.get("importance", 0.5),
+                    "tags": metadata.get("tags", []),
+                    "content_hash": item["hash"]
+                })
+
+            storage_result = await self.chroma_client.store_memories(ids, contents, embeddings, metadatas)
+
+            # The ledger and checkpoint only advance for batches ChromaDB persisted,
+            # so a retry after an outage stores the batch instead of skipping it
+            if not storage_result.get("success"):
+                raise Exception(f"Failed to store batch: {storage_result.get('error')}")
+
+            if self.vector_index is not None and self.vector_index.is_ready():
+                try:
+                    await self.vector_index.add(ids, embeddings, contents, metadatas)
+                except Exception as e:
+                    self.logger.warning(f"Failed to index batch locally: {e}")
+
+            if self.retention is not None:
+                await self.retention.record(ids, metadatas)
+
+            batch["stored"] = items
+            batch["counts"]["stored"] = len(items)
+
+        await asyncio.to_thread(
+            self.ledger.commit, stream_id, batch["end"],
+            [(item["hash"], item["memory_id"]) for item in batch["stored"]], batch["counts"]
+        )
@@ -8,6 +8,7 @@ for semantic memory retrieval and storage.
 import sys
 import os
 import time
+import asyncio
 import logging
 from pathlib import Path
 from typing import List, Dict, Any, Optional
@@ -39,6 +40,7 @@ class ChromaClientTool(BaseTool):
         self.client = None
         self.collection = None
         self.collection_name = "kenny_memories"
+        self.max_add_batch = int(os.getenv("CHROMA_MAX_ADD_BATCH", "5000"))
         self.logger = logging.getLogger(__name__)
         
         # Configure ChromaDB data directory
@@ -145,6 +147,60 @@ class ChromaClientTool(BaseTool):
                 "error": str(e)
             }
     
+    async def store_memories(
+        self,
+        memory_ids: List[str],
+        contents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Store many memories with as few collection adds as possible.
+        
+        Args:
+            memory_ids: Unique identifiers for the memories
+            contents: Text content of each memory
+            embeddings: Vector embedding for each memory
+            metadatas: Metadata for each memory
+            
+        Returns:
+            Dict with storage result and count
+        """
+        try:
+            if not self.collection:
+                raise RuntimeError("ChromaDB collection not initialized")
+            
+            stored_at = datetime.now(timezone.utc).isoformat()
+            storage_metadatas = [
+                {**metadata, "stored_at": stored_at, "content_length": len(content)}
+                for content, metadata in zip(contents, metadatas)
+            ]
+            
+            # Upsert keeps replays of a partially stored batch idempotent
+            for i in range(0, len(memory_ids), self.max_add_batch):
+                end = i + self.max_add_batch
+                await asyncio.to_thread(
+                    self.collection.upsert,
+                    ids=memory_ids[i:end],
+                    embeddings=embeddings[i:end],
+                    documents=contents[i:end],
+                    metadatas=storage_metadatas[i:end]
+                )
+            
+            return {
+                "success": True,
+                "stored_count": len(memory_ids),
+                "stored_at": stored_at
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error storing batch of {len(memory_ids)} memories: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "stored_count": 0
+            }
+    
     async def similarity_search(
         self,
         query_embedding: List[float],
@@ -184,8 +240,9 @@ class ChromaClientTool(BaseTool):
                         where_clause["created_at"] = {}
                     where_clause["created_at"]["$lte"] = time_range["end"]
             
-            # Perform similarity search
-            search_results = self.collection.query(
+            # Perform similarity search off the event loop
+            search_results = await asyncio.to_thread(
+                self.collection.query,
                 query_embeddings=[query_embedding],
                 n_results=limit,
                 where=where_clause if where_clause else None
@@ -287,12 +344,17 @@ class ChromaClientTool(BaseTool):
             self.logger.error(f"Error deleting memory {memory_id}: {e}")
             return False
     
-    async def cleanup_old_memories(self, retention_days: int = 365) -> Dict[str, Any]:
+    async def cleanup_old_memories(self, retention_days: int = 365, chunk_size: int = 500) -> Dict[str, Any]:
         """
         Clean up old memories based on retention policy.
         
+        Expired memories are fetched and deleted a chunk at a time so memory
+        use stays bounded; the RetentionEngine tool does this incrementally in
+        the background from its day-partition index.
+        
         Args:
             retention_days: Number of days to retain memories
+            chunk_size: Maximum memories fetched and deleted per step
             
         Returns:
             Dict with cleanup results
@@ -304,17 +366,18 @@ class ChromaClientTool(BaseTool):
             cutoff_date = datetime.now(timezone.utc) - timedelta(days=retention_days)
             cutoff_iso = cutoff_date.isoformat()
             
-            # Find old memories
-            old_memories = self.collection.get(
-                where={"created_at": {"$lt": cutoff_iso}},
-                include=["metadatas"]
-            )
-            
             deleted_count = 0
-            if old_memories["ids"]:
-                # Delete old memories
-                self.collection.delete(ids=old_memories["ids"])
-                deleted_count = len(old_memories["ids"])
+            while True:
+                old_memories = await asyncio.to_thread(
+                    self.collection.get,
+                    where={"created_at": {"$lt": cutoff_iso}},
+                    limit=chunk_size,
+                    include=[]
+                )
+                if not old_memories["ids"]:
+                    break
+                await asyncio.to_thread(self.collection.delete, ids=old_memories["ids"])
+                deleted_count += len(old_memories["ids"])
                 
             self.logger.info(f"Cleaned up {deleted_count} old memories (older than {retention_days} days)")
             
@@ -3,20 +3,35 @@ Ollama client tool for the memory agent.
 
 Provides text embedding generation using local Ollama models
 with caching and batch processing capabilities.
+
+Batches are deduplicated, served from a bounded LRU of float32 vectors
+(optionally persisted to SQLite), and misses are embedded concurrently under
+an in-flight limit, or in chunks through Ollama's multi-input /api/embed
+endpoint when OLLAMA_EMBED_MULTI_INPUT is enabled. Embedding requests go
+through the SDK's shared Ollama scheduler: batch work waits behind interactive
+lookups, and concurrent /api/embed calls are coalesced.
 """
 
+import asyncio
+import os
+import sqlite3
 import sys
+import threading
 import time
 import hashlib
 import json
 import logging
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
 
 # Add the agent-sdk to the path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent.parent / "agent-sdk"))
 
 from kenny_agent.base_tool import BaseTool
+from kenny_agent.ollama_scheduler import get_ollama_scheduler
 
 try:
     import ollama
@@ -26,6 +41,124 @@ except ImportError:
 import httpx
 
 
+class EmbeddingCache:
+    """Bounded LRU of float32 embeddings with optional SQLite persistence.
+    
+    The async methods run the SQLite reads and writes in a worker thread, so
+    the LRU is guarded by a lock.
+    """
+    
+    def __init__(self, max_entries: int = 10000, persist_path: Optional[str] = None):
+        """Initialize the embedding cache."""
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.evictions = 0
+        self._lock = threading.Lock()
+        
+        if persist_path:
+            os.makedirs(os.path.dirname(persist_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(persist_path)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    cache_key TEXT PRIMARY KEY,
+                    dimensions INTEGER,
+                    vector BLOB,
+                    created_at REAL
+                )
+            """)
+            conn.commit()
+            conn.close()
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+    
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Look up keys in memory, then on disk; disk hits are promoted."""
+        found, missing = self._lookup(keys)
+        if missing and self.persist_path:
+            found.update(self._load(missing))
+        return found
+    
+    async def get_many_async(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """get_many, with the disk lookup for memory misses run in a worker thread."""
+        found, missing = self._lookup(keys)
+        if missing and self.persist_path:
+            found.update(await asyncio.to_thread(self._load, missing))
+        return found
+    
+    def _lookup(self, keys: List[str]) -> Tuple[Dict[str, np.ndarray], List[str]]:
+        found = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                vector = self.entries.get(key)
+                if vector is not None:
+                    self.entries.move_to_end(key)
+                    found[key] = vector
+                else:
+                    missing.append(key)
+        return found, missing
+    
+    def _load(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        conn = sqlite3.connect(self.persist_path)
+        try:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT cache_key, vector FROM embeddings WHERE cache_key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        finally:
+            conn.close()
+        with self._lock:
+            for key, vector in found.items():
+                self._remember(key, vector)
+        return found
+    
+    def put_many(self, items: Dict[str, np.ndarray]):
+        """Store vectors in memory and, if enabled, on disk in one transaction."""
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+        
+        if items and self.persist_path:
+            conn = sqlite3.connect(self.persist_path)
+            try:
+                now = time.time()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (cache_key, dimensions, vector, created_at) VALUES (?, ?, ?, ?)",
+                    [(key, len(vector), vector.tobytes(), now) for key, vector in items.items()]
+                )
+                conn.commit()
+            finally:
+                conn.close()
+    
+    async def put_many_async(self, items: Dict[str, np.ndarray]):
+        """put_many, with the disk write run in a worker thread."""
+        if not self.persist_path:
+            self.put_many(items)
+            return
+        await asyncio.to_thread(self.put_many, items)
+    
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+    
+    def _remember(self, key: str, vector: np.ndarray):
+        self.entries[key] = vector
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+
 class OllamaClientTool(BaseTool):
     """Tool for interacting with local Ollama models for embedding generation."""
     
@@ -39,10 +172,29 @@ class OllamaClientTool(BaseTool):
         
         self.client = None
         self.current_model = "nomic-embed-text"
-        self.embedding_cache = {}  # Simple in-memory cache
-        self.base_url = "http://localhost:11434"
+        self.base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+        self.scheduler = get_ollama_scheduler(self.base_url)
         self.logger = logging.getLogger(__name__)
         
+        # Embedding pipeline configuration
+        self.max_in_flight = int(os.getenv("OLLAMA_EMBED_MAX_IN_FLIGHT", "8"))
+        self.embed_batch_size = int(os.getenv("OLLAMA_EMBED_BATCH_SIZE", "32"))
+        # /api/embed returns unit-length vectors; its results are cached under separate keys
+        self.use_multi_input = os.getenv("OLLAMA_EMBED_MULTI_INPUT", "false").lower() == "true"
+        self.embedding_cache = EmbeddingCache(
+            max_entries=int(os.getenv("OLLAMA_EMBED_CACHE_SIZE", "10000")),
+            persist_path=os.getenv("OLLAMA_EMBED_CACHE_PATH") or None
+        )
+        self.embedding_stats = {
+            "batches": 0,
+            "texts": 0,
+            "cache_hits": 0,
+            "generated": 0,
+            "deduplicated": 0,
+            "failed": 0,
+            "requests": 0
+        }
+        
         # Model configurations
         self.models_config = {
             "nomic-embed-text": {
@@ -128,13 +280,14 @@ class OllamaClientTool(BaseTool):
         model = model_name or self.current_model
         return self.models_config.get(model, {})
     
-    async def generate_embedding(self, text: str, use_cache: bool = True) -> List[float]:
+    async def generate_embedding(self, text: str, use_cache: bool = True, lane: str = "interactive") -> List[float]:
         """
         Generate embedding for a single text.
         
         Args:
             text: Text to generate embedding for
             use_cache: Whether to use cached embeddings
+            lane: Ollama scheduler lane for the request
             
         Returns:
             List of embedding values
@@ -143,23 +296,25 @@ class OllamaClientTool(BaseTool):
             raise RuntimeError("Ollama client not initialized")
         
         # Check cache first
+        cache_key = self._get_cache_key(text, self.current_model)
         if use_cache:
-            cache_key = self._get_cache_key(text, self.current_model)
-            if cache_key in self.embedding_cache:
-                return self.embedding_cache[cache_key]
+            cached = await self.embedding_cache.get_many_async([cache_key])
+            if cache_key in cached:
+                return cached[cache_key].tolist()
         
         try:
-            response = await self.client.embeddings(
+            self.embedding_stats["requests"] += 1
+            response = await self.scheduler.embeddings(
                 model=self.current_model,
-                prompt=text
+                prompt=text,
+                lane=lane
             )
             
             embedding = response.get("embedding", [])
             
             # Cache the result
             if use_cache and embedding:
-                cache_key = self._get_cache_key(text, self.current_model)
-                self.embedding_cache[cache_key] = embedding
+                await self.embedding_cache.put_many_async({cache_key: np.asarray(embedding, dtype=np.float32)})
             
             return embedding
             
@@ -171,56 +326,136 @@ class OllamaClientTool(BaseTool):
         self, 
         texts: List[str], 
         normalize: bool = True,
-        cache_key: Optional[str] = None
+        cache_key: Optional[str] = None,
+        lane: str = "batch"
     ) -> Dict[str, Any]:
         """
         Generate embeddings for multiple texts with batch processing.
         
+        Duplicate texts are embedded once, cache hits are served from the LRU,
+        and misses are generated concurrently (at most max_in_flight requests).
+        
         Args:
             texts: List of texts to generate embeddings for
             normalize: Whether to normalize embeddings to unit length
             cache_key: Optional cache key for the batch
+            lane: Ollama scheduler lane for the requests
             
         Returns:
-            Dict with embeddings and metadata
+            Dict with embeddings (in input order, [] for failures) and per-batch
+            counts: cached_count + generated_count + deduplicated_count + failed_count
+            equals len(texts)
         """
         if not texts:
-            return {"embeddings": [], "cached_count": 0, "generated_count": 0}
+            return {"embeddings": [], "cached_count": 0, "generated_count": 0,
+                    "deduplicated_count": 0, "failed_count": 0}
         
-        embeddings = []
-        cached_count = 0
-        generated_count = 0
+        start_time = time.time()
+        model = self.current_model
+        keys = [self._get_cache_key(text, model, self.use_multi_input) for text in texts]
         
-        for text in texts:
-            try:
-                embedding = await self.generate_embedding(text, use_cache=True)
-                
-                # Normalize if requested
-                if normalize and embedding:
-                    embedding = self._normalize_embedding(embedding)
-                
-                embeddings.append(embedding)
-                
-                # Count cache hits vs generations (simplified)
-                cache_key_text = self._get_cache_key(text, self.current_model)
-                if cache_key_text in self.embedding_cache:
-                    cached_count += 1
-                else:
-                    generated_count += 1
-                    
-            except Exception as e:
-                self.logger.error(f"Error generating embedding for text: {e}")
+        # Embed each distinct text once
+        unique: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            unique.setdefault(key, text)
+        
+        vectors = await self.embedding_cache.get_many_async(list(unique))
+        cached_keys = set(vectors)
+        misses = [(key, text) for key, text in unique.items() if key not in cached_keys]
+        
+        generated: Dict[str, np.ndarray] = {}
+        if misses:
+            generated = await self._embed_misses(misses, model, lane)
+            await self.embedding_cache.put_many_async(generated)
+            vectors.update(generated)
+        
+        embeddings = []
+        seen = set()
+        cached_count = generated_count = deduplicated_count = failed_count = 0
+        for key in keys:
+            vector = vectors.get(key)
+            if vector is None:
+                failed_count += 1
                 embeddings.append([])  # Empty embedding on error
+                continue
+            
+            if key in seen:
+                deduplicated_count += 1
+            elif key in cached_keys:
+                cached_count += 1
+            else:
+                generated_count += 1
+            seen.add(key)
+            
+            if normalize:
+                norm = float(np.linalg.norm(vector))
+                if norm > 0:
+                    vector = vector / norm
+            embeddings.append(vector.tolist())
+        
+        self.embedding_stats["batches"] += 1
+        self.embedding_stats["texts"] += len(texts)
+        self.embedding_stats["cache_hits"] += cached_count
+        self.embedding_stats["generated"] += generated_count
+        self.embedding_stats["deduplicated"] += deduplicated_count
+        self.embedding_stats["failed"] += failed_count
         
         return {
             "embeddings": embeddings,
             "cached_count": cached_count,
-            "generated_count": generated_count
+            "generated_count": generated_count,
+            "deduplicated_count": deduplicated_count,
+            "failed_count": failed_count,
+            "processing_time": time.time() - start_time
         }
     
-    def _get_cache_key(self, text: str, model: str) -> str:
+    async def _embed_misses(self, misses: List[Tuple[str, str]], model: str, lane: str = "batch") -> Dict[str, np.ndarray]:
+        """Embed (cache_key, text) pairs concurrently; failed texts are left out of the result."""
+        semaphore = asyncio.Semaphore(max(self.max_in_flight, 1))
+        results: Dict[str, np.ndarray] = {}
+        
+        if self.use_multi_input:
+            chunks = [misses[i:i + self.embed_batch_size] for i in range(0, len(misses), self.embed_batch_size)]
+            
+            async def embed_chunk(chunk: List[Tuple[str, str]]):
+                async with semaphore:
+                    try:
+                        vectors = await self._embed_many([text for _, text in chunk], model, lane)
+                        for (key, _), vector in zip(chunk, vectors):
+                            if len(vector):
+                                results[key] = np.asarray(vector, dtype=np.float32)
+                    except Exception as e:
+                        self.logger.error(f"Error generating embeddings for {len(chunk)} texts: {e}")
+            
+            await asyncio.gather(*(embed_chunk(chunk) for chunk in chunks))
+            return results
+        
+        if not self.client:
+            self.logger.error("Ollama client not initialized")
+            return results
+        
+        async def embed_one(key: str, text: str):
+            async with semaphore:
+                try:
+                    self.embedding_stats["requests"] += 1
+                    response = await self.scheduler.embeddings(model=model, prompt=text, lane=lane)
+                    embedding = response.get("embedding", [])
+                    if embedding:
+                        results[key] = np.asarray(embedding, dtype=np.float32)
+                except Exception as e:
+                    self.logger.error(f"Error generating embedding for text: {e}")
+        
+        await asyncio.gather(*(embed_one(key, text) for key, text in misses))
+        return results
+    
+    async def _embed_many(self, texts: List[str], model: str, lane: str = "batch") -> List[List[float]]:
+        """Embed several texts through the multi-input /api/embed endpoint."""
+        self.embedding_stats["requests"] += 1
+        return await self.scheduler.embed(model, texts, lane=lane)
+    
+    def _get_cache_key(self, text: str, model: str, multi_input: bool = False) -> str:
         """Generate cache key for text and model combination."""
-        content = f"{model}:{text}"
+        content = f"{model}:embed:{text}" if multi_input else f"{model}:{text}"
         return hashlib.md5(content.encode()).hexdigest()
     
     def _normalize_embedding(self, embedding: List[float]) -> List[float]:
@@ -253,6 +488,15 @@ class OllamaClientTool(BaseTool):
             return self.current_model
         elif operation == "health_check":
             return {"status": "healthy" if self.client else "not_initialized"}
+        elif operation == "embedding_stats":
+            return {
+                **self.embedding_stats,
+                "cache_entries": len(self.embedding_cache),
+                "cache_evictions": self.embedding_cache.evictions,
+                "max_in_flight": self.max_in_flight,
+                "multi_input": self.use_multi_input,
+                "scheduler": self.scheduler.get_metrics()
+            }
         else:
             raise ValueError(f"Unknown operation: {operation}")
     
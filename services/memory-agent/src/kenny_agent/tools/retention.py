@@ -0,0 +1,346 @@
+"""
+Retention engine tool for the memory agent.
+
+Maintains a time-partition index (UTC day bucket -> memory ids) as memories
+are stored, and expires whole partitions from a background task. Expired
+partitions are deleted in bounded chunks with a deletes-per-second limit, so
+memory use stays flat and the store is never stalled by one huge delete.
+
+Retention is opt-in: nothing is ever deleted unless MEMORY_RETENTION_DAYS is set.
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import time
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+# Add the agent-sdk to the path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent.parent / "agent-sdk"))
+
+from kenny_agent.base_tool import BaseTool
+
+SECONDS_PER_DAY = 86400
+
+
+def day_bucket(created_at: Any) -> Optional[int]:
+    """UTC day number (days since the epoch) for an ISO timestamp or epoch value."""
+    if created_at is None or created_at == "":
+        return None
+    if isinstance(created_at, (int, float)):
+        return int(created_at // SECONDS_PER_DAY)
+    try:
+        parsed = datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() // SECONDS_PER_DAY)
+
+
+def day_iso(day: int) -> str:
+    return datetime.fromtimestamp(day * SECONDS_PER_DAY, timezone.utc).date().isoformat()
+
+
+class RetentionEngine(BaseTool):
+    """Tool expiring memories by day partition in bounded, rate-limited chunks."""
+
+    def __init__(self, chroma_client=None, vector_index=None, db_path: Optional[str] = None, ledger=None):
+        """Initialize the retention engine tool."""
+        super().__init__(
+            name="retention_engine",
+            description="Time-partitioned, incremental retention cleanup for stored memories",
+            version="1.0.0"
+        )
+
+        self.logger = logging.getLogger(__name__)
+        self.chroma_client = chroma_client
+        self.vector_index = vector_index
+        # Ingest ledger whose content hashes must be forgotten with the memories
+        self.ledger = ledger
+
+        default_db = Path.home() / "Library" / "Application Support" / "Kenny" / "memory_retention.db"
+        self.db_path = db_path or os.getenv("MEMORY_RETENTION_DB", str(default_db))
+        retention_days = os.getenv("MEMORY_RETENTION_DAYS")
+        self.retention_days: Optional[int] = int(retention_days) if retention_days else None
+        self.sweep_interval = float(os.getenv("MEMORY_RETENTION_INTERVAL", "3600"))
+        self.chunk_size = int(os.getenv("MEMORY_RETENTION_CHUNK_SIZE", "500"))
+        self.max_deletes_per_second = float(os.getenv("MEMORY_RETENTION_RATE", "2000"))
+        self.backfill_page_size = 1000
+
+        self._task: Optional[asyncio.Task] = None
+        self._sweep_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+
+        self.progress = {
+            "state": "idle",
+            "cutoff_day": None,
+            "partitions_pending": 0,
+            "partitions_done": 0,
+            "current_partition": None,
+            "deleted_this_run": 0,
+            "deleted_total": 0,
+            "chunks_deleted": 0,
+            "throttled_time": 0.0,
+            "last_run_started": None,
+            "last_run_finished": None,
+            "last_error": None
+        }
+
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def _init_db(self):
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS memory_partitions (
+                    day INTEGER NOT NULL,
+                    memory_id TEXT NOT NULL,
+                    PRIMARY KEY (day, memory_id)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE TABLE IF NOT EXISTS retention_state (key TEXT PRIMARY KEY, value TEXT)")
+
+    @property
+    def enabled(self) -> bool:
+        return self.retention_days is not None
+
+    async def initialize(self):
+        """Start the background sweeper when a retention window is configured."""
+        if not self.enabled:
+            self.logger.info("Retention disabled; set MEMORY_RETENTION_DAYS to expire old memories")
+            return True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._sweep_loop())
+        return True
+
+    async def cleanup(self):
+        """Stop the background sweeper."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self.logger.info("Retention engine stopped")
+
+    # Store-time maintenance
+
+    async def record(self, memory_ids: List[str], metadatas: List[Dict[str, Any]]) -> int:
+        """Add stored memories to their day partitions."""
+        rows = []
+        for memory_id, metadata in zip(memory_ids, metadatas):
+            day = day_bucket((metadata or {}).get("created_at"))
+            if day is not None:
+                rows.append((day, memory_id))
+        if rows:
+            await asyncio.to_thread(self._insert_rows, rows)
+        return len(rows)
+
+    def _insert_rows(self, rows: List[tuple]):
+        with self._connect() as conn:
+            conn.executemany("INSERT OR IGNORE INTO memory_partitions (day, memory_id) VALUES (?, ?)", rows)
+
+    def _get_state(self, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM retention_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: str):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO retention_state (key, value) VALUES (?, ?)", (key, value))
+
+    async def backfill_from_store(self) -> int:
+        """Build the partition index for memories stored before it existed, page by page."""
+        collection = getattr(self.chroma_client, "collection", None)
+        if collection is None or await asyncio.to_thread(self._get_state, "backfilled"):
+            return 0
+
+        indexed = 0
+        offset = 0
+        while True:
+            page = await asyncio.to_thread(
+                collection.get, include=["metadatas"], limit=self.backfill_page_size, offset=offset
+            )
+            ids = page.get("ids") or []
+            if not ids:
+                break
+            indexed += await self.record(ids, page.get("metadatas") or [{}] * len(ids))
+            offset += len(ids)
+
+        await asyncio.to_thread(self._set_state, "backfilled", datetime.now(timezone.utc).isoformat())
+        self.logger.info(f"Retention partition index backfilled with {indexed} memories")
+        return indexed
+
+    # Expiry
+
+    async def _sweep_loop(self):
+        try:
+            await self.backfill_from_store()
+        except Exception as e:
+            self.logger.error(f"Retention backfill failed: {e}")
+            self.progress["last_error"] = str(e)
+
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Retention sweep failed: {e}")
+                self.progress["last_error"] = str(e)
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.sweep_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def trigger(self):
+        """Wake the background sweeper now."""
+        self._wake.set()
+
+    def _expired_partitions(self, cutoff_day: int) -> List[int]:
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT DISTINCT day FROM memory_partitions WHERE day < ? ORDER BY day", (cutoff_day,)
+            )]
+
+    def _partition_chunk(self, day: int, limit: int) -> List[str]:
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT memory_id FROM memory_partitions WHERE day = ? LIMIT ?", (day, limit)
+            )]
+
+    def _drop_rows(self, day: int, memory_ids: List[str]):
+        with self._connect() as conn:
+            conn.executemany(
+                "DELETE FROM memory_partitions WHERE day = ? AND memory_id = ?",
+                [(day, memory_id) for memory_id in memory_ids]
+            )
+
+    async def run_once(self, retention_days: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Delete every partition older than the retention window.
+
+        Args:
+            retention_days: Override for MEMORY_RETENTION_DAYS
+
+        Returns:
+            Dict with cleanup results
+        """
+        async with self._sweep_lock:
+            retention_days = self.retention_days if retention_days is None else retention_days
+            if retention_days is None:
+                return {"success": True, "disabled": True, "deleted_count": 0, "partitions_deleted": 0}
+            cutoff_day = int(time.time() // SECONDS_PER_DAY) - retention_days
+            partitions = await asyncio.to_thread(self._expired_partitions, cutoff_day)
+
+            self.progress.update({
+                "state": "running",
+                "cutoff_day": day_iso(cutoff_day),
+                "partitions_pending": len(partitions),
+                "partitions_done": 0,
+                "deleted_this_run": 0,
+                "last_run_started": datetime.now(timezone.utc).isoformat(),
+                "last_error": None
+            })
+
+            try:
+                for day in partitions:
+                    self.progress["current_partition"] = day_iso(day)
+                    while True:
+                        chunk = await asyncio.to_thread(self._partition_chunk, day, self.chunk_size)
+                        if not chunk:
+                            break
+                        await self._delete_chunk(day, chunk)
+                    self.progress["partitions_done"] += 1
+                    self.progress["partitions_pending"] -= 1
+            finally:
+                self.progress["state"] = "idle"
+                self.progress["current_partition"] = None
+                self.progress["last_run_finished"] = datetime.now(timezone.utc).isoformat()
+
+            if partitions:
+                self.logger.info(
+                    f"Retention removed {self.progress['deleted_this_run']} memories "
+                    f"from {len(partitions)} partitions before {day_iso(cutoff_day)}"
+                )
+
+            return {
+                "success": True,
+                "deleted_count": self.progress["deleted_this_run"],
+                "partitions_deleted": len(partitions),
+                "cutoff_date": day_iso(cutoff_day)
+            }
+
+    async def _delete_chunk(self, day: int, memory_ids: List[str]):
+        started = time.monotonic()
+
+        collection = getattr(self.chroma_client, "collection", None)
+        if collection is not None:
+            await asyncio.to_thread(collection.delete, ids=memory_ids)
+        if self.vector_index is not None and self.vector_index.is_ready():
+            await self.vector_index.remove(memory_ids)
+        if self.ledger is not None:
+            # Otherwise re-ingesting the same content would be skipped as a duplicate
+            await asyncio.to_thread(self.ledger.forget, memory_ids)
+        await asyncio.to_thread(self._drop_rows, day, memory_ids)
+
+        self.progress["deleted_this_run"] += len(memory_ids)
+        self.progress["deleted_total"] += len(memory_ids)
+        self.progress["chunks_deleted"] += 1
+
+        # Rate limit: a chunk of n deletes may not finish faster than n / rate seconds
+        if self.max_deletes_per_second > 0:
+            remaining = len(memory_ids) / self.max_deletes_per_second - (time.monotonic() - started)
+            if remaining > 0:
+                self.progress["throttled_time"] += remaining
+                await asyncio.sleep(remaining)
+        else:
+            await asyncio.sleep(0)
+
+    def get_progress(self) -> Dict[str, Any]:
+        """Get retention progress and partition index statistics."""
+        with self._connect() as conn:
+            indexed, partitions, oldest = conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT day), MIN(day) FROM memory_partitions"
+            ).fetchone()
+        return {
+            **self.progress,
+            "enabled": self.enabled,
+            "retention_days": self.retention_days,
+            "max_deletes_per_second": self.max_deletes_per_second,
+            "chunk_size": self.chunk_size,
+            "indexed_memories": indexed,
+            "partitions": partitions,
+            "oldest_partition": day_iso(oldest) if oldest is not None else None
+        }
+
+    def execute(self, parameters: Dict[str, Any]) -> Any:
+        """
+        Execute tool operations.
+
+        Args:
+            parameters: Tool execution parameters
+
+        Returns:
+            Tool execution results
+        """
+        operation = parameters.get("operation")
+
+        if operation == "get_progress":
+            return self.get_progress()
+        elif operation == "health_check":
+            running = self._task is not None and not self._task.done()
+            return {"status": "healthy" if running else "not_running", "state": self.progress["state"]}
+        else:
+            raise ValueError(f"Unknown operation: {operation}")
@@ -0,0 +1,578 @@
+"""
+Local vector index tool for the memory agent.
+
+Keeps L2-normalized float32 embeddings in a memory-mapped file next to a
+SQLite table of ids, documents and metadata. The ``data_scope`` and
+``created_at`` metadata are held as NumPy columns so filters are applied
+before scoring, and the search is an exact dot-product top-k over the
+surviving rows. Searches and writes run on a small thread pool so they never
+block the event loop.
+
+Replacements and removals only mark rows deleted; once the deleted share of
+the stored rows passes MEMORY_VECTOR_INDEX_COMPACT_RATIO the live rows are
+rewritten contiguously into a new vector file.
+
+Intended for collections up to a few hundred thousand vectors; past
+MEMORY_VECTOR_INDEX_MAX the index reports itself not ready and retrieval
+falls back to ChromaDB.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+# Add the agent-sdk to the path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent.parent / "agent-sdk"))
+
+from kenny_agent.base_tool import BaseTool
+
+
+def _to_epoch(value: Any) -> float:
+    """Convert an ISO timestamp (or epoch number) to epoch seconds, NaN if unknown."""
+    if value is None or value == "":
+        return float("nan")
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return float("nan")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class LocalVectorIndex(BaseTool):
+    """Tool providing exact, pre-filtered similarity search over a local mmap'd index."""
+
+    def __init__(self, data_dir: Optional[str] = None, source=None):
+        """Initialize the local vector index tool."""
+        super().__init__(
+            name="vector_index",
+            description="Exact in-process vector search with metadata pre-filtering",
+            version="1.0.0"
+        )
+
+        self.logger = logging.getLogger(__name__)
+        self.source = source  # ChromaClientTool used to backfill an empty index
+
+        default_dir = Path.home() / "Library" / "Application Support" / "Kenny" / "memory_index"
+        self.data_dir = Path(data_dir or os.getenv("MEMORY_VECTOR_INDEX_DIR", str(default_dir)))
+        self.max_vectors = int(os.getenv("MEMORY_VECTOR_INDEX_MAX", "500000"))
+        self.backfill_page_size = 1000
+        self.compact_ratio = float(os.getenv("MEMORY_VECTOR_INDEX_COMPACT_RATIO", "0.25"))
+        self.compact_min_rows = 1024
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("MEMORY_VECTOR_INDEX_WORKERS", "2")),
+            thread_name_prefix="vector-index"
+        )
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._loaded = False
+        self.dimensions = 0
+        self.count = 0  # rows written, including deleted ones
+        self.capacity = 0
+        self._generation = 0  # bumped by each compaction, names the vector file
+        self._vectors: Optional[np.memmap] = None
+        self._alive = np.zeros(0, dtype=bool)
+        self._scopes = np.zeros(0, dtype=np.int32)
+        self._created = np.zeros(0, dtype=np.float64)
+        self._scope_codes: Dict[str, int] = {}
+        self._rows_by_id: Dict[str, int] = {}
+
+        self.stats = {
+            "searches": 0,
+            "total_search_time": 0.0,
+            "candidates_scored": 0,
+            "backfilled": 0,
+            "compactions": 0
+        }
+
+    @property
+    def vectors_path(self) -> Path:
+        return self._vectors_file(self._generation)
+
+    def _vectors_file(self, generation: int) -> Path:
+        return self.data_dir / ("vectors.f32" if generation == 0 else f"vectors.{generation}.f32")
+
+    @property
+    def live_count(self) -> int:
+        return len(self._rows_by_id)
+
+    def is_ready(self) -> bool:
+        """Whether the index is loaded and small enough to serve exact search."""
+        return self._loaded and self.live_count <= self.max_vectors
+
+    async def initialize(self):
+        """Load the index from disk, backfilling from ChromaDB if it is empty."""
+        try:
+            await self._run(self._load)
+
+            source_collection = getattr(self.source, "collection", None)
+            if self.live_count == 0 and source_collection is not None:
+                await self._run(self._backfill, source_collection)
+
+            self.logger.info(f"Local vector index loaded with {self.live_count} vectors from {self.data_dir}")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Failed to initialize local vector index: {e}")
+            self._loaded = False
+            return False
+
+    async def cleanup(self):
+        """Flush the index and release resources."""
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._vectors = None
+            self._loaded = False
+        self.executor.shutdown(wait=False)
+        self.logger.info("Local vector index cleaned up")
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def add(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        contents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ) -> int:
+        """
+        Add (or replace) vectors in the index.
+
+        Args:
+            ids: Memory identifiers
+            embeddings: Raw embeddings; they are normalized on insert
+            contents: Document text for each memory
+            metadatas: Metadata for each memory
+
+        Returns:
+            Number of vectors written
+        """
+        if not ids:
+            return 0
+        metadatas = metadatas or [{} for _ in ids]
+        return await self._run(self._add_sync, ids, embeddings, contents, metadatas)
+
+    async def remove(self, ids: List[str]) -> int:
+        """Remove vectors from the index; returns how many were present."""
+        return await self._run(self._remove_sync, ids)
+
+    async def compact(self) -> int:
+        """Rewrite the live rows contiguously; returns how many deleted rows were dropped."""
+        return await self._run(self._compact_sync)
+
+    async def similarity_search(
+        self,
+        query_embedding: List[float],
+        limit: int = 10,
+        similarity_threshold: float = 0.7,
+        data_scopes: Optional[List[str]] = None,
+        time_range: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Perform exact similarity search with metadata pre-filtering.
+
+        Mirrors ChromaClientTool.similarity_search so the two are interchangeable.
+
+        Args:
+            query_embedding: Query vector embedding
+            limit: Maximum number of results to return
+            similarity_threshold: Minimum similarity score
+            data_scopes: Filter by data scopes
+            time_range: Optional time range filter
+
+        Returns:
+            Dict with search results and metadata
+        """
+        try:
+            if not self._loaded:
+                raise RuntimeError("Local vector index not initialized")
+
+            start_time = time.time()
+            results, candidates = await self._run(
+                self._search_sync, query_embedding, limit, similarity_threshold, data_scopes, time_range
+            )
+            search_time = time.time() - start_time
+
+            self.stats["searches"] += 1
+            self.stats["total_search_time"] += search_time
+            self.stats["candidates_scored"] += candidates
+
+            return {
+                "results": results,
+                "total_found": len(results),
+                "search_metadata": {
+                    "similarity_threshold": similarity_threshold,
+                    "data_scopes_filter": data_scopes,
+                    "time_range_filter": time_range,
+                    "candidates_scored": candidates,
+                    "backend": "local"
+                }
+            }
+
+        except Exception as e:
+            self.logger.error(f"Error in local similarity search: {e}")
+            return {
+                "results": [],
+                "total_found": 0,
+                "search_metadata": {
+                    "error": str(e)
+                }
+            }
+
+    # Storage (runs on the executor)
+
+    def _load(self):
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            self._conn = sqlite3.connect(str(self.data_dir / "index.db"), check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS vectors (
+                    row INTEGER PRIMARY KEY,
+                    memory_id TEXT NOT NULL,
+                    content TEXT,
+                    metadata TEXT,
+                    data_scope TEXT,
+                    created_at REAL,
+                    deleted INTEGER DEFAULT 0
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_vectors_memory_id ON vectors(memory_id)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS index_info (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.commit()
+
+            row = self._conn.execute("SELECT value FROM index_info WHERE key = 'dimensions'").fetchone()
+            self.dimensions = int(row[0]) if row else 0
+            row = self._conn.execute("SELECT value FROM index_info WHERE key = 'generation'").fetchone()
+            self._generation = int(row[0]) if row else 0
+
+            rows = self._conn.execute(
+                "SELECT row, memory_id, data_scope, created_at, deleted FROM vectors ORDER BY row"
+            ).fetchall()
+            self.count = rows[-1][0] + 1 if rows else 0
+
+            self._alive = np.zeros(self.count, dtype=bool)
+            self._scopes = np.full(self.count, -1, dtype=np.int32)
+            self._created = np.full(self.count, np.nan, dtype=np.float64)
+            self._scope_codes = {}
+            self._rows_by_id = {}
+            for position, memory_id, data_scope, created_at, deleted in rows:
+                self._scopes[position] = self._scope_code(data_scope)
+                self._created[position] = np.nan if created_at is None else created_at
+                if not deleted:
+                    self._alive[position] = True
+                    self._rows_by_id[memory_id] = position
+
+            self.capacity = 0
+            self._vectors = None
+            if self.dimensions and self.count:
+                self._map_vectors(max(self.count, 1024))
+            self._loaded = True
+
+    def _backfill(self, collection):
+        offset = 0
+        while True:
+            page = collection.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=self.backfill_page_size,
+                offset=offset
+            )
+            ids = page.get("ids") or []
+            if not ids:
+                break
+
+            embeddings = page.get("embeddings")
+            keep = [i for i in range(len(ids)) if embeddings is not None and len(embeddings[i])]
+            if keep:
+                self._add_sync(
+                    [ids[i] for i in keep],
+                    [embeddings[i] for i in keep],
+                    [(page.get("documents") or [""] * len(ids))[i] for i in keep],
+                    [(page.get("metadatas") or [{}] * len(ids))[i] or {} for i in keep]
+                )
+                self.stats["backfilled"] += len(keep)
+            offset += len(ids)
+
+    def _scope_code(self, data_scope: Optional[str]) -> int:
+        if data_scope is None:
+            return -1
+        return self._scope_codes.setdefault(data_scope, len(self._scope_codes))
+
+    def _map_vectors(self, capacity: int):
+        """(Re)map the vector file with room for ``capacity`` rows."""
+        if self._vectors is not None:
+            self._vectors.flush()
+        size = capacity * self.dimensions * 4
+        with open(self.vectors_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dimensions))
+        self.capacity = capacity
+
+    def _grow_columns(self, needed: int):
+        if needed > self.capacity:
+            self._map_vectors(max(needed, self.capacity * 2, 1024))
+        if needed > len(self._alive):
+            size = self.capacity
+            self._alive = np.concatenate([self._alive, np.zeros(size - len(self._alive), dtype=bool)])
+            self._scopes = np.concatenate([self._scopes, np.full(size - len(self._scopes), -1, dtype=np.int32)])
+            self._created = np.concatenate([self._created, np.full(size - len(self._created), np.nan)])
+
+    def _add_sync(self, ids, embeddings, contents, metadatas) -> int:
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+            raise ValueError("Embeddings must be a list of equal-length vectors, one per id")
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+
+        with self._lock:
+            if not self.dimensions:
+                self.dimensions = matrix.shape[1]
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO index_info (key, value) VALUES ('dimensions', ?)",
+                    (str(self.dimensions),)
+                )
+            elif matrix.shape[1] != self.dimensions:
+                raise ValueError(f"Embedding dimensions {matrix.shape[1]} do not match index ({self.dimensions})")
+
+            start = self.count
+            self._grow_columns(start + len(ids))
+            self._vectors[start:start + len(ids)] = matrix
+            self._vectors.flush()
+
+            replaced = [self._rows_by_id[memory_id] for memory_id in ids if memory_id in self._rows_by_id]
+            rows = []
+            for offset, (memory_id, content, metadata) in enumerate(zip(ids, contents, metadatas)):
+                position = start + offset
+                data_scope = metadata.get("data_scope")
+                created_at = _to_epoch(metadata.get("created_at"))
+                self._scopes[position] = self._scope_code(data_scope)
+                self._created[position] = created_at
+                rows.append((
+                    position, memory_id, content, json.dumps(metadata, default=str), data_scope,
+                    None if np.isnan(created_at) else created_at
+                ))
+
+            if replaced:
+                self._alive[replaced] = False
+                self._conn.executemany("UPDATE vectors SET deleted = 1 WHERE row = ?", [(r,) for r in replaced])
+            self._conn.executemany(
+                "INSERT INTO vectors (row, memory_id, content, metadata, data_scope, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+            # Publish the rows only once they are fully written
+            for offset, memory_id in enumerate(ids):
+                self._rows_by_id[memory_id] = start + offset
+            self._alive[start:start + len(ids)] = True
+            self.count = start + len(ids)
+            self._maybe_compact_locked()
+
+        return len(ids)
+
+    def _remove_sync(self, ids: List[str]) -> int:
+        with self._lock:
+            rows = [self._rows_by_id.pop(memory_id) for memory_id in ids if memory_id in self._rows_by_id]
+            if rows:
+                self._alive[rows] = False
+                self._conn.executemany("UPDATE vectors SET deleted = 1 WHERE row = ?", [(r,) for r in rows])
+                self._conn.commit()
+                self._maybe_compact_locked()
+        return len(rows)
+
+    def _compact_sync(self) -> int:
+        with self._lock:
+            return self._compact_locked()
+
+    def _maybe_compact_locked(self):
+        dead = self.count - self.live_count
+        if self.count >= self.compact_min_rows and dead > self.compact_ratio * self.count:
+            self._compact_locked()
+
+    def _compact_locked(self) -> int:
+        """Copy the live rows into a new vector file and renumber them from 0."""
+        dropped = self.count - self.live_count
+        if dropped == 0 or self._vectors is None:
+            return 0
+
+        live = np.flatnonzero(self._alive[:self.count])
+        generation = self._generation + 1
+        capacity = max(len(live), 1024)
+        vectors = np.memmap(self._vectors_file(generation), dtype=np.float32, mode="w+",
+                            shape=(capacity, self.dimensions))
+        vectors[:len(live)] = self._vectors[live]
+        vectors.flush()
+
+        # Rows only move down, so renumbering in ascending order never collides
+        self._conn.execute("DELETE FROM vectors WHERE deleted = 1")
+        self._conn.executemany(
+            "UPDATE vectors SET row = ? WHERE row = ?",
+            [(new, int(old)) for new, old in enumerate(live) if new != old]
+        )
+        self._conn.execute(
+            "INSERT OR REPLACE INTO index_info (key, value) VALUES ('generation', ?)", (str(generation),)
+        )
+        self._conn.commit()
+
+        old_path = self.vectors_path
+        new_rows = {int(old): new for new, old in enumerate(live)}
+        self._rows_by_id = {memory_id: new_rows[row] for memory_id, row in self._rows_by_id.items()}
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._alive[:len(live)] = True
+        self._scopes = np.concatenate([self._scopes[live], np.full(capacity - len(live), -1, dtype=np.int32)])
+        self._created = np.concatenate([self._created[live], np.full(capacity - len(live), np.nan)])
+        self._vectors = vectors
+        self.capacity = capacity
+        self.count = len(live)
+        self._generation = generation
+        # Searches still holding the old mapping keep reading it after the unlink
+        old_path.unlink(missing_ok=True)
+
+        self.stats["compactions"] += 1
+        self.logger.info(f"Compacted local vector index: dropped {dropped} deleted rows, {len(live)} live")
+        return dropped
+
+    def _search_sync(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        similarity_threshold: float,
+        data_scopes: Optional[List[str]],
+        time_range: Optional[Dict[str, str]]
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        # Snapshot the columns; appends land past ``count`` and growth swaps in new arrays
+        with self._lock:
+            generation = self._generation
+            count = self.count
+            vectors = self._vectors
+            mask = self._alive[:count].copy()
+            scopes = self._scopes[:count]
+            created = self._created[:count]
+            scope_codes = dict(self._scope_codes)
+
+        if count == 0 or vectors is None:
+            return [], 0
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape != (self.dimensions,):
+            raise ValueError(f"Query has {query.size} dimensions, index has {self.dimensions}")
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return [], 0
+        query = query / norm
+
+        # Pre-filter on the metadata columns before any scoring
+        if data_scopes:
+            codes = [scope_codes[scope] for scope in data_scopes if scope in scope_codes]
+            mask &= np.isin(scopes, codes)
+        if time_range:
+            if time_range.get("start"):
+                mask &= created >= _to_epoch(time_range["start"])
+            if time_range.get("end"):
+                mask &= created <= _to_epoch(time_range["end"])
+
+        candidates = np.flatnonzero(mask)
+        if candidates.size == 0:
+            return [], 0
+
+        # A dense pass over the contiguous block beats gathering most of the rows
+        if candidates.size * 2 > count:
+            scores = (vectors[:count] @ query)[candidates]
+        else:
+            scores = vectors[candidates] @ query
+
+        scored = int(candidates.size)
+        keep = scores >= similarity_threshold
+        candidates, scores = candidates[keep], scores[keep]
+        if candidates.size == 0:
+            return [], scored
+
+        k = min(limit, candidates.size)
+        top = np.argpartition(-scores, k - 1)[:k] if candidates.size > k else np.arange(candidates.size)
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        positions = [int(candidates[i]) for i in top]
+        with self._lock:
+            fetched = None
+            if self._generation == generation:
+                placeholders = ",".join("?" * len(positions))
+                fetched = {
+                    row: (memory_id, content, metadata)
+                    for row, memory_id, content, metadata in self._conn.execute(
+                        f"SELECT row, memory_id, content, metadata FROM vectors WHERE row IN ({placeholders})",
+                        positions
+                    )
+                }
+        if fetched is None:
+            # A compaction renumbered the rows mid-search
+            return self._search_sync(query_embedding, limit, similarity_threshold, data_scopes, time_range)
+
+        results = []
+        for i, position in zip(top, positions):
+            memory_id, content, metadata = fetched[position]
+            results.append({
+                "id": memory_id,
+                "content": content,
+                "similarity_score": float(min(1.0, max(0.0, scores[i]))),
+                "metadata": json.loads(metadata) if metadata else {}
+            })
+        return results, scored
+
+    def execute(self, parameters: Dict[str, Any]) -> Any:
+        """
+        Execute tool operations.
+
+        Args:
+            parameters: Tool execution parameters
+
+        Returns:
+            Tool execution results
+        """
+        operation = parameters.get("operation")
+
+        if operation == "get_stats":
+            return self.get_index_stats()
+        elif operation == "health_check":
+            return {"status": "healthy" if self.is_ready() else "not_ready"}
+        else:
+            raise ValueError(f"Unknown operation: {operation}")
+
+    def get_index_stats(self) -> Dict[str, Any]:
+        """Get statistics about the local index."""
+        searches = self.stats["searches"]
+        return {
+            "ready": self.is_ready(),
+            "live_vectors": self.live_count,
+            "stored_rows": self.count,
+            "dimensions": self.dimensions,
+            "max_vectors": self.max_vectors,
+            "searches": searches,
+            "avg_search_time": self.stats["total_search_time"] / searches if searches else 0.0,
+            "avg_candidates_scored": self.stats["candidates_scored"] / searches if searches else 0.0,
+            "backfilled": self.stats["backfilled"],
+            "compactions": self.stats["compactions"],
+            "data_directory": str(self.data_dir)
+        }
@@ -12,10 +12,11 @@ from pathlib import Path
 # Add the agent-sdk to the path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "agent-sdk"))
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from typing import Dict, Any, List, Optional
+import json
 import logging
 import asyncio
 
@@ -87,6 +88,20 @@ class MemoryStoreRequest(BaseModel):
     )
 
 
+class MemoryStoreBatchRequest(BaseModel):
+    """Request model for memory.store_batch capability."""
+    input: Dict[str, Any] = Field(
+        ...,
+        description="Bulk storage parameters",
+        example={
+            "memories": [
+                {"content": "Lunch with Sarah on Friday", "metadata": {"source": "imessage", "data_scope": "messages:content"}}
+            ],
+            "stream_id": "imessage-backfill-2025"
+        }
+    )
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize the memory agent on startup."""
@@ -129,7 +144,8 @@ async def root():
         "capabilities": [
             "memory.retrieve",
             "memory.embed", 
-            "memory.store"
+            "memory.store",
+            "memory.store_batch"
         ]
     }
 
@@ -215,6 +231,101 @@ async def memory_store(request: MemoryStoreRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/capabilities/memory.store_batch")
+async def memory_store_batch(request: MemoryStoreBatchRequest):
+    """Execute memory.store_batch capability - bulk-store memories with dedupe and checkpoints."""
+    if not memory_agent:
+        raise HTTPException(status_code=503, detail="Memory Agent not initialized")
+    
+    try:
+        result = await memory_agent.execute_capability("memory.store_batch", request.input)
+        return result
+    except Exception as e:
+        logger.error(f"Error in memory.store_batch: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _ndjson_records(request: Request):
+    """Yield one record per NDJSON line as the body streams in."""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_ndjson_line(line)
+    if buffer.strip():
+        yield _parse_ndjson_line(buffer)
+
+
+def _parse_ndjson_line(line: bytes) -> Dict[str, Any]:
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return {"_error": f"Invalid JSON: {e}"}
+    return record if isinstance(record, dict) else {"_error": "Each line must be a JSON object"}
+
+
+@app.post("/ingest/ndjson")
+async def ingest_ndjson(
+    request: Request,
+    stream_id: Optional[str] = None,
+    embedding_model: str = "nomic-embed-text",
+    batch_size: Optional[int] = None
+):
+    """
+    Stream memories as NDJSON (one {"content", "metadata"} object per line).
+    
+    Replaying the same body with the same stream_id resumes after the last
+    committed batch.
+    """
+    if not memory_agent:
+        raise HTTPException(status_code=503, detail="Memory Agent not initialized")
+    
+    handler = memory_agent.capabilities["memory.store_batch"]
+    return await handler.ingest(
+        _ndjson_records(request),
+        stream_id=stream_id,
+        embedding_model=embedding_model,
+        batch_size=batch_size
+    )
+
+
+@app.get("/ingest/checkpoints/{stream_id}")
+async def get_ingest_checkpoint(stream_id: str):
+    """Get the committed checkpoint for an ingest stream."""
+    if not memory_agent:
+        raise HTTPException(status_code=503, detail="Memory Agent not initialized")
+    
+    checkpoint = await memory_agent.capabilities["memory.store_batch"].get_checkpoint(stream_id)
+    if not checkpoint:
+        raise HTTPException(status_code=404, detail=f"No checkpoint for stream '{stream_id}'")
+    return checkpoint
+
+
+@app.get("/retention")
+async def get_retention_progress():
+    """Get retention engine progress and partition statistics."""
+    if not memory_agent:
+        raise HTTPException(status_code=503, detail="Memory Agent not initialized")
+    
+    retention = memory_agent.tools["retention_engine"]
+    return await asyncio.to_thread(retention.get_progress)
+
+
+@app.post("/retention/run")
+async def run_retention():
+    """Wake the background retention sweeper now."""
+    if not memory_agent:
+        raise HTTPException(status_code=503, detail="Memory Agent not initialized")
+    
+    retention = memory_agent.tools["retention_engine"]
+    if not retention.enabled:
+        return {"triggered": False, "state": "disabled"}
+    retention.trigger()
+    return {"triggered": True, "state": retention.progress["state"]}
+
+
 @app.get("/stats")
 async def get_stats():
     """Get memory agent statistics."""
@@ -229,6 +340,10 @@ async def get_stats():
         if chroma_tool:
             stats = chroma_tool.get_collection_stats()
         
+        vector_index = memory_agent.tools.get("vector_index")
+        if vector_index:
+            stats["vector_index"] = vector_index.get_index_stats()
+        
         # Add agent-level stats
         stats.update({
             "agent_status": "running" if memory_agent.is_running else "stopped",
@@ -12,6 +12,10 @@ from pathlib import Path
 from unittest.mock import Mock, AsyncMock, patch
 import tempfile
 import shutil
+import threading
+import time
+import numpy as np
+from datetime import datetime, timedelta, timezone
 
 # Add the source directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
@@ -20,8 +24,34 @@ from kenny_agent.agent import MemoryAgent
 from kenny_agent.handlers.retrieve import MemoryRetrieveHandler
 from kenny_agent.handlers.embed import MemoryEmbedHandler
 from kenny_agent.handlers.store import MemoryStoreHandler
-from kenny_agent.tools.ollama_client import OllamaClientTool
+from kenny_agent.handlers.store_batch import MemoryStoreBatchHandler, IngestLedger
+from kenny_agent.tools.ollama_client import OllamaClientTool, EmbeddingCache
 from kenny_agent.tools.chroma_client import ChromaClientTool
+from kenny_agent.tools.vector_index import LocalVectorIndex
+from kenny_agent.tools.retention import RetentionEngine, day_bucket
+
+
+class FakeEmbeddingClient:
+    """Stand-in for the Ollama client and scheduler that tracks concurrent embedding calls."""
+    
+    def __init__(self, delay=0.0, fail_on=()):
+        self.delay = delay
+        self.fail_on = set(fail_on)
+        self.prompts = []
+        self.in_flight = 0
+        self.max_concurrent = 0
+    
+    async def embeddings(self, model, prompt, lane="batch"):
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.max_concurrent = max(self.max_concurrent, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if prompt in self.fail_on:
+                raise RuntimeError("embedding failed")
+            return {"embedding": [float(len(prompt)), 0.0, float(ord(prompt[0]) % 7)]}
+        finally:
+            self.in_flight -= 1
 
 
 class TestMemoryAgent:
@@ -60,6 +90,7 @@ class TestMemoryAgent:
         assert isinstance(agent.capabilities["memory.retrieve"], MemoryRetrieveHandler)
         assert isinstance(agent.capabilities["memory.embed"], MemoryEmbedHandler)
         assert isinstance(agent.capabilities["memory.store"], MemoryStoreHandler)
+        assert isinstance(agent.capabilities["memory.store_batch"], MemoryStoreBatchHandler)
     
     def test_tool_registration(self):
         """Test that all tools are registered correctly."""
@@ -68,10 +99,13 @@ class TestMemoryAgent:
         # Check that both tools are registered
         assert "ollama_client" in agent.tools
         assert "chroma_client" in agent.tools
+        assert "vector_index" in agent.tools
         
         # Check tool types
         assert isinstance(agent.tools["ollama_client"], OllamaClientTool)
         assert isinstance(agent.tools["chroma_client"], ChromaClientTool)
+        assert isinstance(agent.tools["vector_index"], LocalVectorIndex)
+        assert isinstance(agent.tools["retention_engine"], RetentionEngine)
     
     @pytest.mark.asyncio
     @patch('kenny_agent.agent.HealthMonitor')
@@ -147,11 +181,12 @@ class TestMemoryAgent:
         assert "tool_access" in manifest
         
         # Check capabilities in manifest
-        assert len(manifest["capabilities"]) == 3
+        assert len(manifest["capabilities"]) == 4
         capability_verbs = [cap["verb"] for cap in manifest["capabilities"]]
         assert "memory.retrieve" in capability_verbs
         assert "memory.embed" in capability_verbs
         assert "memory.store" in capability_verbs
+        assert "memory.store_batch" in capability_verbs
 
 
 class TestMemoryRetrieveHandler:
@@ -209,6 +244,33 @@ class TestMemoryRetrieveHandler:
         assert result["memories"][0]["id"] == "mem1"
         assert result["total_found"] == 1
     
+    @pytest.mark.asyncio
+    async def test_ready_local_index_replaces_chroma(self):
+        """Test that a ready local index serves searches instead of ChromaDB."""
+        mock_ollama = AsyncMock()
+        mock_ollama.generate_embedding.return_value = [0.1, 0.2, 0.3]
+        mock_ollama.get_current_model = Mock(return_value="nomic-embed-text")
+        mock_chroma = AsyncMock()
+        mock_index = AsyncMock()
+        mock_index.is_ready = Mock(return_value=True)
+        mock_index.similarity_search.return_value = {
+            "results": [{"id": "mem1", "content": "local", "similarity_score": 0.9, "metadata": {}}]
+        }
+        
+        handler = MemoryRetrieveHandler(mock_ollama, mock_chroma, mock_index)
+        result = await handler.execute({"query": "test query"})
+        
+        assert result["memories"][0]["content"] == "local"
+        assert result["search_metadata"]["search_backend"] == "local"
+        mock_chroma.similarity_search.assert_not_called()
+        
+        # Falls back to ChromaDB when the index cannot serve
+        mock_index.is_ready.return_value = False
+        mock_chroma.similarity_search.return_value = {"results": []}
+        result = await handler.execute({"query": "test query"})
+        assert result["search_metadata"]["search_backend"] == "chroma"
+        mock_chroma.similarity_search.assert_called_once()
+    
     @pytest.mark.asyncio
     async def test_execute_missing_tools(self):
         """Test execution with missing tools."""
@@ -360,6 +422,29 @@ class TestMemoryStoreHandler:
         assert result["metadata"]["content_length"] > 0
         assert result["metadata"]["embedding_dimensions"] == 3
     
+    @pytest.mark.asyncio
+    async def test_chroma_failure_is_not_masked_by_local_index(self):
+        """Test that a write ChromaDB rejected fails even if the local index would accept it."""
+        mock_ollama = AsyncMock()
+        mock_ollama.generate_embedding.return_value = [0.1, 0.2, 0.3]
+        mock_chroma = AsyncMock()
+        mock_chroma.store_memory.return_value = {"success": False, "error": "disk full"}
+        vector_index = AsyncMock()
+        vector_index.is_ready = Mock(return_value=True)
+        vector_index.add.return_value = 1
+        retention = AsyncMock()
+        handler = MemoryStoreHandler(mock_ollama, mock_chroma, vector_index, retention)
+        
+        result = await handler.execute({
+            "content": "Test memory content",
+            "metadata": {"source": "test", "data_scope": "test:data"}
+        })
+        
+        assert result["memory_id"] is None
+        assert "disk full" in result["metadata"]["error"]
+        vector_index.add.assert_not_awaited()
+        retention.record.assert_not_awaited()
+    
     @pytest.mark.asyncio
     async def test_execute_store_without_embedding(self):
         """Test memory storage without embedding generation."""
@@ -409,6 +494,136 @@ class TestMemoryStoreHandler:
         assert "error" in result["metadata"]
 
 
+def batch_handler(tmp_path, fail_after_adds=None):
+    """Store-batch handler over fake tools that record each embedding call and add."""
+    ollama = AsyncMock()
+    ollama.generate_embeddings_batch.side_effect = lambda texts: {
+        "embeddings": [[] if "unembeddable" in text else [float(len(text)), 1.0] for text in texts]
+    }
+    chroma = AsyncMock()
+    chroma.adds = []
+    
+    async def store_memories(ids, contents, embeddings, metadatas):
+        if fail_after_adds is not None and len(chroma.adds) >= fail_after_adds:
+            return {"success": False, "error": "disk full"}
+        chroma.adds.append(list(ids))
+        return {"success": True, "stored_count": len(ids)}
+    chroma.store_memories.side_effect = store_memories
+    
+    handler = MemoryStoreBatchHandler(ollama, chroma, ledger_path=str(tmp_path / "ingest.db"))
+    return handler, ollama, chroma
+
+
+def memory(text, scope="messages:content"):
+    return {"content": text, "metadata": {"source": "imessage", "data_scope": scope}}
+
+
+class TestMemoryStoreBatchHandler:
+    """Test suite for MemoryStoreBatchHandler."""
+    
+    @pytest.mark.asyncio
+    async def test_chunks_dedupes_and_rejects(self, tmp_path):
+        """Test batching into single adds with in-run dedupe and validation."""
+        handler, ollama, chroma = batch_handler(tmp_path)
+        memories = [memory(f"message {i}") for i in range(10)]
+        memories += [memory("message 3"), memory("message 3", scope="mail:content"), {"content": "no metadata"}]
+        
+        result = await handler.execute({"memories": memories, "batch_size": 4})
+        
+        assert result["completed"]
+        assert (result["stored"], result["duplicates"], result["rejected"]) == (11, 1, 1)
+        assert [len(ids) for ids in chroma.adds] == [4, 4, 3]
+        assert ollama.generate_embeddings_batch.await_count == 3
+        assert result["errors"] == [{"position": 12, "error": "Source metadata is required"}]
+        assert len(set(result["memory_ids"])) == 11
+    
+    @pytest.mark.asyncio
+    async def test_reingest_skips_stored_content(self, tmp_path):
+        """Test that content stored by an earlier run is not embedded again."""
+        handler, ollama, chroma = batch_handler(tmp_path)
+        await handler.execute({"memories": [memory(f"message {i}") for i in range(5)]})
+        
+        result = await handler.execute({"memories": [memory(f"message {i}") for i in range(7)]})
+        
+        assert (result["stored"], result["duplicates"]) == (2, 5)
+        embedded = ollama.generate_embeddings_batch.await_args_list[-1].args[0]
+        assert embedded == ["message 5", "message 6"]
+    
+    @pytest.mark.asyncio
+    async def test_embedding_failures_are_counted(self, tmp_path):
+        """Test that memories whose embedding fails are reported, not stored."""
+        handler, _, chroma = batch_handler(tmp_path)
+        
+        result = await handler.execute({"memories": [memory("fine"), memory("unembeddable text")]})
+        
+        assert (result["stored"], result["failed"]) == (1, 1)
+        assert result["errors"][0]["error"] == "Embedding generation failed"
+    
+    @pytest.mark.asyncio
+    async def test_resumes_from_checkpoint_after_store_failure(self, tmp_path):
+        """Test that a failed ingest resumes after the last committed batch."""
+        handler, ollama, chroma = batch_handler(tmp_path, fail_after_adds=2)
+        memories = [memory(f"message {i}") for i in range(10)]
+        
+        failed = await handler.ingest(iter(memories), stream_id="backfill", batch_size=3)
+        
+        assert not failed["completed"]
+        assert failed["checkpoint"] == 6
+        assert (await handler.get_checkpoint("backfill"))["position"] == 6
+        
+        handler.chroma_client.store_memories.side_effect = None
+        handler.chroma_client.store_memories.return_value = {"success": True}
+        ollama.generate_embeddings_batch.reset_mock()
+        resumed = await handler.ingest(iter(memories), stream_id="backfill", batch_size=3)
+        
+        assert resumed["completed"]
+        assert (resumed["resumed_from"], resumed["stored"], resumed["duplicates"]) == (6, 4, 0)
+        first_batch = ollama.generate_embeddings_batch.await_args_list[0].args[0]
+        assert first_batch == ["message 6", "message 7", "message 8"]
+        checkpoint = await handler.get_checkpoint("backfill")
+        assert (checkpoint["position"], checkpoint["stored"]) == (10, 10)
+    
+    @pytest.mark.asyncio
+    async def test_chroma_outage_does_not_advance_ledger(self, tmp_path):
+        """Test that a batch only ChromaDB failed to persist is stored again on retry."""
+        handler, _, chroma = batch_handler(tmp_path, fail_after_adds=0)
+        handler.vector_index = AsyncMock()
+        handler.vector_index.is_ready = Mock(return_value=True)
+        handler.vector_index.add.return_value = 3
+        handler.retention = AsyncMock()
+        memories = [memory(f"message {i}") for i in range(3)]
+        
+        failed = await handler.ingest(iter(memories), stream_id="outage")
+        
+        assert not failed["completed"] and failed["stored"] == 0
+        assert await handler.get_checkpoint("outage") is None
+        handler.vector_index.add.assert_not_awaited()
+        handler.retention.record.assert_not_awaited()
+        
+        chroma.store_memories.side_effect = None
+        chroma.store_memories.return_value = {"success": True}
+        retried = await handler.ingest(iter(memories), stream_id="outage")
+        assert (retried["stored"], retried["duplicates"]) == (3, 0)
+    
+    @pytest.mark.asyncio
+    async def test_async_stream_and_throughput_metrics(self, tmp_path):
+        """Test ingesting from an async iterator and the reported throughput."""
+        handler, _, _ = batch_handler(tmp_path)
+        
+        async def records():
+            for i in range(50):
+                yield memory(f"message {i}")
+        
+        result = await handler.ingest(records(), batch_size=8)
+        metrics = handler.get_ingest_metrics()
+        
+        assert result["stored"] == 50
+        assert metrics["documents_received"] == 50
+        assert metrics["batches"] == 7
+        assert metrics["docs_per_sec"] > 0
+        assert metrics["active_runs"] == 0
+
+
 class TestOllamaClientTool:
     """Test suite for OllamaClientTool."""
     
@@ -467,6 +682,116 @@ class TestOllamaClientTool:
         normalized_zero = tool._normalize_embedding(zero_embedding)
         assert normalized_zero == [0.0, 0.0]
 
+    @pytest.mark.asyncio
+    async def test_batch_dedupes_and_counts_accurately(self):
+        """Test batch embedding dedupes texts and reports per-batch counts."""
+        tool = OllamaClientTool()
+        tool.client = tool.scheduler = FakeEmbeddingClient()
+        
+        first = await tool.generate_embeddings_batch(["a", "b", "a", "c"], normalize=False)
+        assert first["generated_count"] == 3
+        assert first["deduplicated_count"] == 1
+        assert first["cached_count"] == 0
+        assert first["embeddings"][0] == first["embeddings"][2]
+        assert len(tool.client.prompts) == 3
+        
+        second = await tool.generate_embeddings_batch(["c", "d", "d"], normalize=False)
+        assert second["cached_count"] == 1
+        assert second["generated_count"] == 1
+        assert second["deduplicated_count"] == 1
+        assert tool.client.prompts[-1] == "d"
+    
+    @pytest.mark.asyncio
+    async def test_batch_misses_run_concurrently_within_limit(self):
+        """Test cache misses are embedded concurrently up to max_in_flight."""
+        tool = OllamaClientTool()
+        tool.client = tool.scheduler = FakeEmbeddingClient(delay=0.02)
+        tool.max_in_flight = 4
+        
+        result = await tool.generate_embeddings_batch([f"text {i}" for i in range(20)])
+        
+        assert result["generated_count"] == 20
+        assert tool.client.max_concurrent == 4
+        assert abs(sum(x * x for x in result["embeddings"][0]) - 1.0) < 1e-5
+    
+    @pytest.mark.asyncio
+    async def test_batch_failures_are_counted(self):
+        """Test failed texts get empty embeddings and are not cached."""
+        tool = OllamaClientTool()
+        tool.client = tool.scheduler = FakeEmbeddingClient(fail_on={"bad"})
+        
+        result = await tool.generate_embeddings_batch(["good", "bad"])
+        
+        assert result["embeddings"][1] == []
+        assert result["failed_count"] == 1
+        assert len(tool.embedding_cache) == 1
+    
+    @pytest.mark.asyncio
+    async def test_embedding_cache_is_bounded_and_persisted(self, tmp_path):
+        """Test LRU eviction and float32 persistence across instances."""
+        tool = OllamaClientTool()
+        tool.client = tool.scheduler = FakeEmbeddingClient()
+        tool.embedding_cache = EmbeddingCache(max_entries=2, persist_path=str(tmp_path / "embeddings.db"))
+        
+        await tool.generate_embeddings_batch(["a", "b", "c"], normalize=False)
+        assert len(tool.embedding_cache) == 2
+        assert tool.embedding_cache.evictions == 1
+        
+        restarted = OllamaClientTool()
+        restarted.client = restarted.scheduler = FakeEmbeddingClient()
+        restarted.embedding_cache = EmbeddingCache(max_entries=2, persist_path=str(tmp_path / "embeddings.db"))
+        result = await restarted.generate_embeddings_batch(["a", "b", "c"], normalize=False)
+        
+        assert result["cached_count"] == 3
+        assert restarted.client.prompts == []
+        assert result["embeddings"][0] == [1.0, 0.0, 6.0]
+    
+    @pytest.mark.asyncio
+    async def test_persisted_cache_io_runs_off_the_event_loop(self, tmp_path):
+        """Test SQLite embedding cache reads and writes happen in worker threads."""
+        loop_thread = threading.get_ident()
+        threads = []
+        
+        class RecordingCache(EmbeddingCache):
+            def _load(self, keys):
+                threads.append(threading.get_ident())
+                return super()._load(keys)
+            
+            def put_many(self, items):
+                threads.append(threading.get_ident())
+                super().put_many(items)
+        
+        tool = OllamaClientTool()
+        tool.client = tool.scheduler = FakeEmbeddingClient()
+        tool.embedding_cache = RecordingCache(persist_path=str(tmp_path / "embeddings.db"))
+        
+        await tool.generate_embeddings_batch(["a", "b"], normalize=False)
+        tool.embedding_cache.clear()
+        result = await tool.generate_embeddings_batch(["a", "b"], normalize=False)
+        
+        assert result["cached_count"] == 2
+        assert len(threads) == 3
+        assert loop_thread not in threads
+    
+    @pytest.mark.asyncio
+    async def test_multi_input_endpoint_chunks_misses(self):
+        """Test misses are sent in chunks to the multi-input embed endpoint."""
+        tool = OllamaClientTool()
+        tool.use_multi_input = True
+        tool.embed_batch_size = 8
+        requests = []
+        
+        async def embed_many(texts, model, lane="batch"):
+            requests.append(list(texts))
+            return [[float(len(text)), 1.0] for text in texts]
+        tool._embed_many = embed_many
+        
+        result = await tool.generate_embeddings_batch([f"text {i}" for i in range(20)] + ["text 0"])
+        
+        assert [len(chunk) for chunk in requests] == [8, 8, 4]
+        assert result["generated_count"] == 20
+        assert result["deduplicated_count"] == 1
+
 
 class TestChromaClientTool:
     """Test suite for ChromaClientTool."""
@@ -489,5 +814,274 @@ class TestChromaClientTool:
         assert "not initialized" in stats["error"].lower()
 
 
+class FakeChromaCollection:
+    """Pages stored memories the way ChromaDB's collection.get does."""
+    
+    def __init__(self, ids, embeddings, documents, metadatas):
+        self.rows = list(zip(ids, embeddings, documents, metadatas))
+    
+    def get(self, include=None, limit=None, offset=0):
+        page = self.rows[offset:offset + limit]
+        return {
+            "ids": [row[0] for row in page],
+            "embeddings": [row[1] for row in page],
+            "documents": [row[2] for row in page],
+            "metadatas": [row[3] for row in page]
+        }
+
+
+async def build_index(tmp_path, ids, embeddings, metadatas, source=None):
+    index = LocalVectorIndex(data_dir=str(tmp_path / "index"), source=source)
+    assert await index.initialize()
+    if ids:
+        await index.add(ids, embeddings, [f"content {i}" for i in ids], metadatas)
+    return index
+
+
+class TestLocalVectorIndex:
+    """Test suite for LocalVectorIndex."""
+    
+    @pytest.mark.asyncio
+    async def test_exact_top_k_matches_brute_force(self, tmp_path):
+        """Test that results are the exact top-k by cosine similarity."""
+        rng = np.random.default_rng(7)
+        vectors = rng.normal(size=(500, 16)).astype(np.float32)
+        ids = [f"m{i}" for i in range(500)]
+        index = await build_index(tmp_path, ids, vectors.tolist(), [{"data_scope": "mail"}] * 500)
+        
+        query = rng.normal(size=16)
+        result = await index.similarity_search(query.tolist(), limit=5, similarity_threshold=0.0)
+        
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:5]
+        assert [r["id"] for r in result["results"]] == [f"m{i}" for i in expected]
+        assert result["results"][0]["content"] == "content m%d" % expected[0]
+        await index.cleanup()
+    
+    @pytest.mark.asyncio
+    async def test_filters_apply_before_top_k(self, tmp_path):
+        """Test that a filtered query finds matches ranked below unfiltered ones."""
+        ids = [f"mail{i}" for i in range(100)] + ["contact1", "contact2", "contact-old"]
+        embeddings = [[1.0, 0.0, 0.0]] * 100 + [[0.8, 0.6, 0.0], [0.6, 0.8, 0.0], [0.9, 0.1, 0.0]]
+        metadatas = (
+            [{"data_scope": "mail", "created_at": "2025-08-01T00:00:00+00:00"}] * 100
+            + [{"data_scope": "contacts", "created_at": "2025-08-02T00:00:00+00:00"}] * 2
+            + [{"data_scope": "contacts", "created_at": "2024-01-01T00:00:00Z"}]
+        )
+        index = await build_index(tmp_path, ids, embeddings, metadatas)
+        
+        result = await index.similarity_search(
+            [1.0, 0.0, 0.0], limit=5, similarity_threshold=0.5,
+            data_scopes=["contacts"], time_range={"start": "2025-01-01T00:00:00Z"}
+        )
+        
+        assert [r["id"] for r in result["results"]] == ["contact1", "contact2"]
+        assert result["results"][0]["similarity_score"] == pytest.approx(0.8)
+        assert result["search_metadata"]["candidates_scored"] == 2
+        
+        unknown = await index.similarity_search([1.0, 0.0, 0.0], data_scopes=["calendar"])
+        assert unknown["results"] == []
+        await index.cleanup()
+    
+    @pytest.mark.asyncio
+    async def test_persistence_replacement_and_removal(self, tmp_path):
+        """Test that the mmap'd index reloads with replacements and removals applied."""
+        index = await build_index(
+            tmp_path, ["a", "b", "c"], [[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]], [{"data_scope": "mail"}] * 3
+        )
+        await index.add(["a"], [[0.0, 1.0]], ["updated a"], [{"data_scope": "mail"}])
+        assert await index.remove(["b", "missing"]) == 1
+        await index.cleanup()
+        
+        reopened = await build_index(tmp_path, [], [], [])
+        result = await reopened.similarity_search([0.0, 1.0], limit=10, similarity_threshold=0.0)
+        
+        assert reopened.live_count == 2
+        assert [(r["id"], r["content"]) for r in result["results"]] == [("a", "updated a"), ("c", "content c")]
+        await reopened.cleanup()
+    
+    @pytest.mark.asyncio
+    async def test_backfills_empty_index_from_chroma(self, tmp_path):
+        """Test that an empty index loads existing memories from ChromaDB."""
+        source = Mock()
+        source.collection = FakeChromaCollection(
+            [f"m{i}" for i in range(25)], [[1.0, float(i)] for i in range(25)],
+            [f"doc {i}" for i in range(25)], [{"data_scope": "mail"}] * 25
+        )
+        index = LocalVectorIndex(data_dir=str(tmp_path / "index"), source=source)
+        index.backfill_page_size = 10
+        
+        assert await index.initialize()
+        assert index.live_count == 25
+        assert index.get_index_stats()["backfilled"] == 25
+        result = await index.similarity_search([1.0, 0.0], limit=1)
+        assert result["results"][0]["content"] == "doc 0"
+        await index.cleanup()
+    
+    @pytest.mark.asyncio
+    async def test_compacts_once_deleted_rows_pass_ratio(self, tmp_path):
+        """Test that replaced and removed rows are reclaimed and the index still reloads."""
+        index = await build_index(
+            tmp_path, ["a", "b", "c", "d"], [[1.0, 0.0], [0.0, 1.0], [0.7, 0.7], [0.6, 0.8]],
+            [{"data_scope": "mail"}] * 4
+        )
+        index.compact_min_rows = 4
+        index.compact_ratio = 0.3
+        
+        await index.add(["a"], [[0.0, 1.0]], ["updated a"], [{"data_scope": "contacts"}])
+        assert index.get_index_stats()["compactions"] == 0
+        assert await index.remove(["b"]) == 1
+        
+        stats = index.get_index_stats()
+        assert stats["compactions"] == 1
+        assert (stats["stored_rows"], stats["live_vectors"]) == (3, 3)
+        assert index.vectors_path.name == "vectors.1.f32"
+        assert not (tmp_path / "index" / "vectors.f32").exists()
+        result = await index.similarity_search([0.0, 1.0], limit=10, similarity_threshold=0.0,
+                                               data_scopes=["contacts"])
+        assert [(r["id"], r["content"]) for r in result["results"]] == [("a", "updated a")]
+        await index.cleanup()
+        
+        reopened = await build_index(tmp_path, [], [], [])
+        result = await reopened.similarity_search([0.0, 1.0], limit=10, similarity_threshold=0.0)
+        assert reopened.count == 3
+        assert [r["id"] for r in result["results"]] == ["a", "d", "c"]
+        await reopened.cleanup()
+    
+    def test_not_ready_past_size_limit(self, tmp_path):
+        """Test that oversized or unloaded indexes defer to ChromaDB."""
+        index = LocalVectorIndex(data_dir=str(tmp_path / "index"))
+        assert not index.is_ready()
+        index._loaded = True
+        index.max_vectors = 0
+        index._rows_by_id["m1"] = 0
+        assert not index.is_ready()
+
+
+class FakeRetentionCollection:
+    """Records the delete calls the retention engine issues."""
+    
+    def __init__(self, metadatas=None):
+        self.metadatas = metadatas or {}
+        self.deletes = []
+    
+    def get(self, include=None, limit=None, offset=0):
+        ids = list(self.metadatas)[offset:offset + limit]
+        return {"ids": ids, "metadatas": [self.metadatas[i] for i in ids]}
+    
+    def delete(self, ids):
+        self.deletes.append(list(ids))
+
+
+def days_ago(days):
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+
+class TestRetentionEngine:
+    """Test suite for RetentionEngine."""
+    
+    def test_day_buckets(self):
+        """Test that timestamps map to UTC day partitions."""
+        assert day_bucket("1970-01-02T00:00:00Z") == 1
+        assert day_bucket("1970-01-02T23:59:59+00:00") == 1
+        assert day_bucket("1970-01-03T01:00:00+02:00") == 1
+        assert day_bucket(None) is None
+    
+    @pytest.mark.asyncio
+    async def test_expires_old_partitions_in_chunks(self, tmp_path):
+        """Test that only expired partitions are deleted, a bounded chunk at a time."""
+        chroma = Mock()
+        chroma.collection = FakeRetentionCollection()
+        vector_index = AsyncMock()
+        vector_index.is_ready = Mock(return_value=True)
+        engine = RetentionEngine(chroma, vector_index, db_path=str(tmp_path / "retention.db"))
+        engine.chunk_size = 100
+        engine.max_deletes_per_second = 0
+        
+        old = [f"old-{i}" for i in range(250)]
+        await engine.record(old, [{"created_at": days_ago(400 + i % 3)} for i in range(250)])
+        await engine.record(["recent"], [{"created_at": days_ago(10)}])
+        
+        result = await engine.run_once(retention_days=365)
+        
+        assert result["deleted_count"] == 250
+        assert result["partitions_deleted"] == 3
+        assert all(len(chunk) <= 100 for chunk in chroma.collection.deletes)
+        assert sorted(i for chunk in chroma.collection.deletes for i in chunk) == sorted(old)
+        assert vector_index.remove.await_count == len(chroma.collection.deletes)
+        
+        progress = engine.get_progress()
+        assert (progress["indexed_memories"], progress["partitions"]) == (1, 1)
+        assert (progress["partitions_done"], progress["partitions_pending"], progress["state"]) == (3, 0, "idle")
+        assert (await engine.run_once(retention_days=365))["deleted_count"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_retention_is_disabled_unless_configured(self, tmp_path, monkeypatch):
+        """Test that nothing expires when MEMORY_RETENTION_DAYS is unset."""
+        monkeypatch.delenv("MEMORY_RETENTION_DAYS", raising=False)
+        chroma = Mock()
+        chroma.collection = FakeRetentionCollection()
+        engine = RetentionEngine(chroma, db_path=str(tmp_path / "retention.db"))
+        await engine.record(["ancient"], [{"created_at": days_ago(5000)}])
+        
+        assert not engine.enabled
+        await engine.initialize()
+        assert engine._task is None
+        result = await engine.run_once()
+        
+        assert result["disabled"] is True
+        assert chroma.collection.deletes == []
+        assert engine.get_progress()["indexed_memories"] == 1
+        
+        monkeypatch.setenv("MEMORY_RETENTION_DAYS", "90")
+        assert RetentionEngine(chroma, db_path=str(tmp_path / "retention.db")).retention_days == 90
+    
+    @pytest.mark.asyncio
+    async def test_expiry_forgets_ingested_hashes(self, tmp_path):
+        """Test that expired memories are removed from the ingest ledger too."""
+        chroma = Mock()
+        chroma.collection = FakeRetentionCollection()
+        ledger = IngestLedger(str(tmp_path / "ingest.db"))
+        ledger.commit(None, 0, [("hash-old", "old"), ("hash-new", "new")], {})
+        engine = RetentionEngine(chroma, db_path=str(tmp_path / "retention.db"), ledger=ledger)
+        engine.max_deletes_per_second = 0
+        await engine.record(["old", "new"], [{"created_at": days_ago(400)}, {"created_at": days_ago(1)}])
+        
+        await engine.run_once(retention_days=365)
+        
+        assert ledger.known_hashes(["hash-old", "hash-new"]) == {"hash-new"}
+    
+    @pytest.mark.asyncio
+    async def test_deletes_are_rate_limited(self, tmp_path):
+        """Test that deletion does not exceed the configured rate."""
+        chroma = Mock()
+        chroma.collection = FakeRetentionCollection()
+        engine = RetentionEngine(chroma, db_path=str(tmp_path / "retention.db"))
+        engine.chunk_size = 50
+        engine.max_deletes_per_second = 1000
+        await engine.record([f"m{i}" for i in range(200)], [{"created_at": days_ago(500)}] * 200)
+        
+        start = time.monotonic()
+        await engine.run_once(retention_days=30)
+        
+        assert time.monotonic() - start >= 0.19
+        assert engine.progress["throttled_time"] > 0
+        assert len(chroma.collection.deletes) == 4
+    
+    @pytest.mark.asyncio
+    async def test_backfills_partitions_from_store_once(self, tmp_path):
+        """Test that existing memories are indexed page by page, only once."""
+        chroma = Mock()
+        chroma.collection = FakeRetentionCollection(
+            {f"m{i}": {"created_at": days_ago(i)} for i in range(25)}
+        )
+        engine = RetentionEngine(chroma, db_path=str(tmp_path / "retention.db"))
+        engine.backfill_page_size = 10
+        
+        assert await engine.backfill_from_store() == 25
+        assert await engine.backfill_from_store() == 0
+        assert engine.get_progress()["indexed_memories"] == 25
+
+
 # Integration tests would go here, but they require actual Ollama and ChromaDB instances
 # For now, we test the interfaces and error handling with mocks
\ No newline at end of file
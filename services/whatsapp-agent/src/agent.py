@@ -5,16 +5,20 @@ This agent provides WhatsApp functionality including message search and basic op
 """
 
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from kenny_agent.base_agent import BaseAgent
 from kenny_agent.health import HealthMonitor, HealthCheck, HealthStatus
+from kenny_agent.message_index import MessageIndex, MessageIndexSync
 
 from .handlers.search import SearchCapabilityHandler
 from .handlers.read import ReadCapabilityHandler
 from .handlers.propose_reply import ProposeReplyCapabilityHandler
-from .tools.whatsapp_bridge import WhatsAppBridgeTool
+from .tools.whatsapp_bridge import WhatsAppBridgeTool, index_record
 from .tools.image_processor import LocalImageProcessor
 
+# Messages listed on each message index sync pass
+INDEX_SYNC_LIMIT = int(os.getenv("WHATSAPP_INDEX_SYNC_LIMIT", "200"))
+
 
 class WhatsAppAgent(BaseAgent):
     """WhatsApp Agent providing WhatsApp-related capabilities."""
@@ -43,6 +47,10 @@ class WhatsAppAgent(BaseAgent):
         
         print(f"Registered tools: {list(self.tools.keys())}")
         
+        # Local message index shared with the other messaging agents
+        self.message_index = MessageIndex()
+        self.message_index_sync = MessageIndexSync(self.message_index, "whatsapp", self._fetch_for_index)
+        
         # Register capabilities with agent reference
         print("Registering capabilities...")
         search_handler = SearchCapabilityHandler()
@@ -93,6 +101,14 @@ class WhatsAppAgent(BaseAgent):
                 description="Check tool accessibility"
             )
         )
+        
+        self.health_monitor.add_health_check(
+            HealthCheck(
+                name="ocr_pool",
+                check_function=self.check_ocr_pool,
+                description="Check OCR queue depth and timings"
+            )
+        )
     
     def check_agent_status(self):
         """Health check for agent status."""
@@ -136,6 +152,26 @@ class WhatsAppAgent(BaseAgent):
                 details={"tool_count": len(self.tools), "missing": missing_tools}
             )
     
+    def check_ocr_pool(self):
+        """Health check for the OCR worker pool."""
+        metrics = self.tools["image_processor"].get_ocr_metrics()
+        backlog = metrics["queue_depth"] > metrics["workers"] * 4
+        return HealthStatus(
+            status="degraded" if backlog else "healthy",
+            message="OCR queue is backed up" if backlog else "OCR pool is keeping up",
+            details=metrics
+        )
+    
+    async def _fetch_for_index(self, cursor: Optional[str]) -> List[Dict[str, Any]]:
+        """List WhatsApp messages newer than the index cursor."""
+        parameters = {"operation": "list", "limit": INDEX_SYNC_LIMIT}
+        if cursor:
+            parameters["since"] = cursor
+        result = await self.tools["whatsapp_bridge"].execute_async(parameters)
+        if result.get("_mock"):
+            raise RuntimeError("WhatsApp bridge unavailable")
+        return [index_record(message) for message in result.get("results", [])]
+    
     async def start(self):
         """Start the WhatsApp Agent."""
         print(f"Starting {self.name}...")
@@ -143,6 +179,9 @@ class WhatsAppAgent(BaseAgent):
         print(f"Capabilities: {list(self.capabilities.keys())}")
         print(f"Tools: {list(self.tools.keys())}")
         
+        # Keep the local message index fed from the bridge
+        self.message_index_sync.start()
+        
         # Update health status
         self.update_health_status("healthy", "WhatsApp Agent started successfully")
         print("WhatsApp Agent started successfully!")
@@ -151,4 +190,7 @@ class WhatsAppAgent(BaseAgent):
         """Stop the WhatsApp Agent."""
         print(f"Stopping {self.name}...")
         self.update_health_status("degraded", "WhatsApp Agent stopping")
+        self.tools["image_processor"].ocr_pool.shutdown()
+        await self.message_index_sync.stop()
+        self.message_index.close()
         print("WhatsApp Agent stopped.")
\ No newline at end of file
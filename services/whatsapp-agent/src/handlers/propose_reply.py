@@ -5,6 +5,7 @@ This handler provides functionality to propose replies to WhatsApp messages,
 considering context, media content, and conversation history.
 """
 
+import asyncio
 from typing import Dict, Any, List, Optional
 from kenny_agent.base_handler import BaseCapabilityHandler
 
@@ -131,7 +132,7 @@ class ProposeReplyCapabilityHandler(BaseCapabilityHandler):
             message_id = parameters.get("message_id")
             if message_id:
                 # Get specific message
-                result = bridge_tool.execute({
+                result = await bridge_tool.execute_async({
                     "operation": "read",
                     "message_id": message_id
                 })
@@ -164,17 +165,17 @@ class ProposeReplyCapabilityHandler(BaseCapabilityHandler):
             
             # Mock media processing - in real implementation would process actual media files
             if message_data.get("message_type") == "image":
-                # Extract text from image
-                ocr_result = image_processor.execute({
-                    "operation": "ocr",
-                    "image_path": "/mock/path/to/image.jpg"
-                })
-                
-                # Analyze image properties
-                analysis_result = image_processor.execute({
-                    "operation": "analyze", 
-                    "image_path": "/mock/path/to/image.jpg"
-                })
+                # Extract text and analyze image properties off the event loop
+                ocr_result, analysis_result = await asyncio.gather(
+                    image_processor.execute_async({
+                        "operation": "ocr",
+                        "image_path": "/mock/path/to/image.jpg"
+                    }),
+                    image_processor.execute_async({
+                        "operation": "analyze", 
+                        "image_path": "/mock/path/to/image.jpg"
+                    })
+                )
                 
                 summary_parts = []
                 if ocr_result.get("text"):
@@ -206,7 +207,7 @@ class ProposeReplyCapabilityHandler(BaseCapabilityHandler):
                 return []
             
             # Get recent messages from chat
-            result = bridge_tool.execute({
+            result = await bridge_tool.execute_async({
                 "operation": "list",
                 "chat_id": chat_id,
                 "limit": context_length + 3  # Get extra to filter current message
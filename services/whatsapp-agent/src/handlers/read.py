@@ -5,6 +5,7 @@ This handler provides functionality to read full WhatsApp chat messages
 including media content with local image processing.
 """
 
+import asyncio
 from typing import Dict, Any, List, Optional
 from kenny_agent.base_handler import BaseCapabilityHandler
 
@@ -96,13 +97,13 @@ class ReadCapabilityHandler(BaseCapabilityHandler):
             chat_id = parameters.get("chat_id")
             
             if message_id:
-                bridge_result = whatsapp_bridge_tool.execute({
+                bridge_result = await whatsapp_bridge_tool.execute_async({
                     "operation": "read",
                     "message_id": message_id
                 })
             elif chat_id:
                 # Get latest message from chat
-                bridge_result = whatsapp_bridge_tool.execute({
+                bridge_result = await whatsapp_bridge_tool.execute_async({
                     "operation": "list",
                     "chat_id": chat_id,
                     "limit": 1
@@ -155,22 +156,22 @@ class ReadCapabilityHandler(BaseCapabilityHandler):
             }
             
             if process_images and media_info["type"] == "image":
-                # Process image with local OCR/analysis
-                image_result = image_processor.execute({
-                    "operation": "ocr",
-                    "image_path": "/mock/image/path.jpg"  # Would be real path from bridge
-                })
+                # OCR runs in the image processor's worker pool, alongside the image analysis
+                image_result, analysis_result = await asyncio.gather(
+                    image_processor.execute_async({
+                        "operation": "ocr",
+                        "image_path": "/mock/image/path.jpg"  # Would be real path from bridge
+                    }),
+                    image_processor.execute_async({
+                        "operation": "analyze",
+                        "image_path": "/mock/image/path.jpg"
+                    })
+                )
                 
                 if image_result.get("text"):
                     media_info["ocr_text"] = image_result["text"]
                     media_info["processed"] = True
                 
-                # Also get image analysis
-                analysis_result = image_processor.execute({
-                    "operation": "analyze",
-                    "image_path": "/mock/image/path.jpg"
-                })
-                
                 if analysis_result.get("properties"):
                     media_info["analysis"] = analysis_result["properties"]
             
@@ -191,7 +192,7 @@ class ReadCapabilityHandler(BaseCapabilityHandler):
         """Get context messages around the current message."""
         try:
             # Get recent messages from the chat
-            context_result = bridge_tool.execute({
+            context_result = await bridge_tool.execute_async({
                 "operation": "list",
                 "chat_id": chat_id,
                 "limit": count + 5  # Get extra to filter out current message
@@ -1,13 +1,16 @@
 """
 Search capability handler for WhatsApp messages.
 
-This handler provides search functionality for WhatsApp messages using
-the macOS Bridge integration.
+This handler answers from the local message index once WhatsApp has been
+synced, and falls back to the macOS Bridge integration otherwise.
 """
 
-from typing import Dict, Any, List
+import asyncio
+from typing import Dict, Any, List, Optional
 from kenny_agent.base_handler import BaseCapabilityHandler
 
+from ..tools.whatsapp_bridge import index_record
+
 
 class SearchCapabilityHandler(BaseCapabilityHandler):
     """Handler for searching WhatsApp messages."""
@@ -73,13 +76,18 @@ class SearchCapabilityHandler(BaseCapabilityHandler):
                 # Fallback to mock data if no agent context
                 return self._get_mock_search_results(parameters)
             
+            # Answer locally when the message index has WhatsApp
+            indexed = await self._search_index(parameters)
+            if indexed is not None:
+                return indexed
+            
             whatsapp_bridge_tool = self._agent.tools.get("whatsapp_bridge")
             if not whatsapp_bridge_tool:
                 # Fallback to mock data if WhatsApp bridge tool not available
                 return self._get_mock_search_results(parameters)
             
             # Execute WhatsApp bridge tool with search operation
-            bridge_result = whatsapp_bridge_tool.execute({
+            bridge_result = await whatsapp_bridge_tool.execute_async({
                 "operation": "search",
                 **parameters
             })
@@ -87,6 +95,8 @@ class SearchCapabilityHandler(BaseCapabilityHandler):
             # Convert bridge response to capability format
             if isinstance(bridge_result, dict) and bridge_result.get("results"):
                 messages = bridge_result["results"]
+                if not bridge_result.get("_mock"):
+                    await self._index_messages(messages)
                 return {
                     "results": messages,
                     "count": len(messages)
@@ -100,6 +110,43 @@ class SearchCapabilityHandler(BaseCapabilityHandler):
             print(f"WhatsApp search error: {e}")
             return self._get_mock_search_results(parameters)
     
+    async def _search_index(self, parameters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Search the agent's message index; None when it cannot answer."""
+        index = getattr(self._agent, "message_index", None)
+        if index is None:
+            return None
+        try:
+            messages = await asyncio.to_thread(
+                index.answer, "whatsapp",
+                query=parameters.get("query"),
+                contact=parameters.get("contact"),
+                since=parameters.get("since"),
+                until=parameters.get("until"),
+                limit=parameters.get("limit", 20)
+            )
+        except Exception as e:
+            print(f"[whatsapp_search] Message index search failed: {e}")
+            return None
+        if messages is None:
+            return None
+        chat_id = parameters.get("chat_id")
+        if chat_id:
+            messages = [m for m in messages if m.get("chat_id") == chat_id]
+        return {
+            "results": messages,
+            "count": len(messages)
+        }
+    
+    async def _index_messages(self, messages: List[Dict[str, Any]]):
+        """Write bridge results through to the message index."""
+        index = getattr(self._agent, "message_index", None)
+        if index is None or not messages:
+            return
+        try:
+            await asyncio.to_thread(index.upsert_messages, "whatsapp", [index_record(m) for m in messages])
+        except Exception as e:
+            print(f"[whatsapp_search] Could not index messages: {e}")
+    
     def _get_mock_search_results(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """
         Generate mock search results as fallback.
@@ -116,6 +116,12 @@ async def enhanced_health_check():
         return {"error": f"Failed to get enhanced health: {str(e)}"}
 
 
+@app.get("/health/ocr")
+async def ocr_metrics():
+    """OCR queue depth, per-image timings and cache counters."""
+    return whatsapp_agent.tools["image_processor"].get_ocr_metrics()
+
+
 @app.get("/capabilities")
 async def list_capabilities():
     """List all available capabilities."""
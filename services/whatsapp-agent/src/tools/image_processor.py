@@ -7,15 +7,23 @@ basic vision analysis, strictly adhering to ADR-0019 (no network egress).
 
 import os
 import base64
+import asyncio
 from typing import Dict, Any, Optional, List
 from kenny_agent.base_tool import BaseTool
 
+from .ocr_pool import OCRWorkerPool
+
 
 class LocalImageProcessor(BaseTool):
     """Tool for local-only image processing and understanding."""
     
-    def __init__(self):
-        """Initialize the local image processor."""
+    def __init__(self, ocr_pool: Optional[OCRWorkerPool] = None):
+        """
+        Initialize the local image processor.
+        
+        Args:
+            ocr_pool: OCR worker pool; defaults to a process pool with an on-disk result cache
+        """
         super().__init__(
             name="image_processor",
             description="Local-only image processing with OCR and vision analysis",
@@ -29,7 +37,7 @@ class LocalImageProcessor(BaseTool):
                     "options": {
                         "type": "object",
                         "properties": {
-                            "language": {"type": "string", "default": "en"},
+                            "language": {"type": "string", "default": "eng"},
                             "confidence_threshold": {"type": "number", "default": 0.5}
                         }
                     }
@@ -42,6 +50,7 @@ class LocalImageProcessor(BaseTool):
             }
         )
         self._setup_local_models()
+        self.ocr_pool = ocr_pool or OCRWorkerPool()
     
     def _setup_local_models(self):
         """Initialize local OCR and vision models."""
@@ -82,8 +91,33 @@ class LocalImageProcessor(BaseTool):
         else:
             raise ValueError(f"Unknown operation: {operation}")
     
-    def _extract_text(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract text from image using local OCR."""
+    async def execute_async(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute image processing without blocking the event loop.
+        
+        OCR runs in the worker pool; analysis only reads image headers and
+        runs in a thread.
+        
+        Args:
+            parameters: Operation parameters
+            
+        Returns:
+            Result of the image processing operation
+        """
+        operation = parameters.get("operation")
+        
+        if operation == "ocr" or operation == "extract_text":
+            return await self._extract_text_async(parameters)
+        elif operation == "analyze":
+            return await asyncio.to_thread(self._analyze_image, parameters)
+        else:
+            raise ValueError(f"Unknown operation: {operation}")
+    
+    def get_ocr_metrics(self) -> Dict[str, Any]:
+        """Get OCR queue depth, per-image timings and cache counters."""
+        return self.ocr_pool.get_metrics()
+    
+    def _ocr_unavailable(self) -> Optional[Dict[str, Any]]:
         if not self.tesseract_available or not self.pil_available:
             return {
                 "operation": "ocr",
@@ -92,52 +126,73 @@ class LocalImageProcessor(BaseTool):
                 "error": "OCR dependencies not available (tesseract, PIL)",
                 "mock": True
             }
+        return None
+    
+    def _ocr_result(self, result: Dict[str, Any], language: str) -> Dict[str, Any]:
+        return {
+            "operation": "ocr",
+            "text": result["text"].strip(),
+            "confidence": result["confidence"],
+            "language": language,
+            "word_count": result["word_count"],
+            "content_hash": result["content_hash"],
+            "cached": result["cached"],
+            "local_only": True  # Confirm no network used
+        }
+    
+    def _ocr_error(self, error: Exception) -> Dict[str, Any]:
+        print(f"[image_processor] OCR error: {error}")
+        return {
+            "operation": "ocr",
+            "text": "Mock OCR text: This is simulated text extraction from image",
+            "confidence": 0.8,
+            "error": str(error),
+            "mock": True
+        }
+    
+    def _extract_text(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract text from image using local OCR in the calling thread."""
+        unavailable = self._ocr_unavailable()
+        if unavailable:
+            return unavailable
         
-        try:
-            import pytesseract
-            from PIL import Image
-            
-            # Get image
-            image = self._load_image(parameters)
-            if not image:
-                return {
-                    "operation": "ocr",
-                    "text": "",
-                    "confidence": 0.0,
-                    "error": "Could not load image"
-                }
-            
-            # Extract options
-            options = parameters.get("options", {})
-            language = options.get("language", "en")
-            
-            # Perform OCR
-            custom_config = f'--oem 3 --psm 6 -l {language}'
-            extracted_text = pytesseract.image_to_string(image, config=custom_config)
-            
-            # Get confidence scores
-            data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-            confidences = [int(conf) for conf in data['conf'] if int(conf) > 0]
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-            
+        image_bytes = self._load_image_bytes(parameters)
+        if image_bytes is None:
             return {
                 "operation": "ocr",
-                "text": extracted_text.strip(),
-                "confidence": avg_confidence / 100.0,  # Convert to 0-1 scale
-                "language": language,
-                "word_count": len(extracted_text.split()),
-                "local_only": True  # Confirm no network used
+                "text": "",
+                "confidence": 0.0,
+                "error": "Could not load image"
             }
-            
+        
+        language = parameters.get("options", {}).get("language", "eng")
+        try:
+            return self._ocr_result(self.ocr_pool.ocr_sync(image_bytes, language), language)
         except Exception as e:
-            print(f"[image_processor] OCR error: {e}")
+            return self._ocr_error(e)
+    
+    async def _extract_text_async(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract text from image using local OCR in the worker pool."""
+        unavailable = self._ocr_unavailable()
+        if unavailable:
+            return unavailable
+        
+        image_bytes = await asyncio.to_thread(self._load_image_bytes, parameters)
+        if image_bytes is None:
             return {
                 "operation": "ocr",
-                "text": "Mock OCR text: This is simulated text extraction from image",
-                "confidence": 0.8,
-                "error": str(e),
-                "mock": True
+                "text": "",
+                "confidence": 0.0,
+                "error": "Could not load image"
             }
+        
+        language = parameters.get("options", {}).get("language", "eng")
+        try:
+            return self._ocr_result(await self.ocr_pool.ocr(image_bytes, language), language)
+        except asyncio.TimeoutError:
+            return self._ocr_error(TimeoutError(f"OCR timed out after {self.ocr_pool.timeout}s"))
+        except Exception as e:
+            return self._ocr_error(e)
     
     def _analyze_image(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze image for basic properties and content."""
@@ -206,16 +261,14 @@ class LocalImageProcessor(BaseTool):
                 "error": str(e)
             }
     
-    def _load_image(self, parameters: Dict[str, Any]):
-        """Load image from path or base64 data."""
+    def _load_image_bytes(self, parameters: Dict[str, Any]) -> Optional[bytes]:
+        """Read raw image bytes from path or base64 data."""
         try:
-            from PIL import Image
-            import io
-            
             if "image_path" in parameters:
                 image_path = parameters["image_path"]
                 if os.path.exists(image_path):
-                    return Image.open(image_path)
+                    with open(image_path, "rb") as f:
+                        return f.read()
                 else:
                     print(f"[image_processor] Image path not found: {image_path}")
                     return None
@@ -227,11 +280,26 @@ class LocalImageProcessor(BaseTool):
                     # Strip data URL prefix
                     image_data = image_data.split(",", 1)[1]
                 
-                image_bytes = base64.b64decode(image_data)
-                return Image.open(io.BytesIO(image_bytes))
+                return base64.b64decode(image_data)
             
             return None
             
+        except Exception as e:
+            print(f"[image_processor] Failed to load image: {e}")
+            return None
+    
+    def _load_image(self, parameters: Dict[str, Any]):
+        """Load image from path or base64 data."""
+        image_bytes = self._load_image_bytes(parameters)
+        if image_bytes is None:
+            return None
+        
+        try:
+            from PIL import Image
+            import io
+            
+            return Image.open(io.BytesIO(image_bytes))
+            
         except Exception as e:
             print(f"[image_processor] Failed to load image: {e}")
             return None
\ No newline at end of file
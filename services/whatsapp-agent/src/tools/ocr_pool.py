@@ -0,0 +1,281 @@
+"""
+Off-loop OCR for WhatsApp media.
+
+OCR runs in a process pool so a large screenshot never stalls the agent's
+event loop. Each image goes through one tesseract pass (image_to_data), which
+yields both the text and per-word confidences, after being converted to
+grayscale and downscaled. Results are stored in a local SQLite cache keyed by
+the SHA-256 of the image bytes, so a forwarded image is only ever OCR'd once,
+and concurrent requests for the same image share one job.
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+def content_hash(image_bytes: bytes) -> str:
+    """Hash image bytes for cache lookups."""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def prepare_image(image, max_dimension: int):
+    """Convert to grayscale and shrink so the longest side is at most max_dimension."""
+    from PIL import Image
+
+    if image.mode != "L":
+        image = image.convert("L")
+    longest = max(image.size)
+    if max_dimension and longest > max_dimension:
+        scale = max_dimension / longest
+        image = image.resize((max(1, int(image.width * scale)), max(1, int(image.height * scale))),
+                             Image.LANCZOS)
+    return image
+
+
+def ocr_image(image_bytes: bytes, language: str = "eng", max_dimension: int = 2000) -> Dict[str, Any]:
+    """
+    Run single-pass OCR on image bytes.
+
+    Runs in a pool worker, so it only takes and returns plain data.
+
+    Returns:
+        Dict with text, confidence (0-1), word_count, width/height and ocr_time
+    """
+    import pytesseract
+    from PIL import Image
+
+    started = time.perf_counter()
+    with Image.open(io.BytesIO(image_bytes)) as original:
+        original.load()
+        width, height = original.size
+        image = prepare_image(original, max_dimension)
+
+    data = pytesseract.image_to_data(image, config=f"--oem 3 --psm 6 -l {language}",
+                                     output_type=pytesseract.Output.DICT)
+
+    # Rebuild the text from word boxes, breaking lines where tesseract did
+    lines = []
+    current_line = None
+    confidences = []
+    for i, word in enumerate(data["text"]):
+        word = (word or "").strip()
+        if not word:
+            continue
+        line_key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        if line_key != current_line:
+            lines.append([])
+            current_line = line_key
+        lines[-1].append(word)
+        conf = float(data["conf"][i])
+        if conf > 0:
+            confidences.append(conf)
+
+    text = "\n".join(" ".join(line) for line in lines)
+    return {
+        "text": text,
+        "confidence": (sum(confidences) / len(confidences) / 100.0) if confidences else 0.0,
+        "word_count": len(text.split()),
+        "width": width,
+        "height": height,
+        "ocr_time": time.perf_counter() - started
+    }
+
+
+class OCRResultCache:
+    """Persistent OCR results keyed by image content hash and language."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """Initialize the OCR result cache."""
+        default_path = Path.home() / "Library" / "Application Support" / "Kenny" / "whatsapp_ocr_cache.db"
+        self.db_path = Path(db_path or os.getenv("WHATSAPP_OCR_CACHE_PATH", str(default_path)))
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_database()
+
+    def _init_database(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ocr_results (
+                    content_hash TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    confidence REAL NOT NULL,
+                    word_count INTEGER NOT NULL,
+                    width INTEGER,
+                    height INTEGER,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (content_hash, language)
+                )
+            """)
+
+    def get(self, digest: str, language: str) -> Optional[Dict[str, Any]]:
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT text, confidence, word_count, width, height FROM ocr_results "
+                "WHERE content_hash = ? AND language = ?", (digest, language)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"text": row[0], "confidence": row[1], "word_count": row[2], "width": row[3], "height": row[4]}
+
+    def set(self, digest: str, language: str, result: Dict[str, Any]):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ocr_results "
+                "(content_hash, language, text, confidence, word_count, width, height, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (digest, language, result["text"], result["confidence"], result["word_count"],
+                 result.get("width"), result.get("height"), time.time())
+            )
+
+    def count(self) -> int:
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("SELECT COUNT(*) FROM ocr_results").fetchone()[0]
+
+
+class OCRWorkerPool:
+    """Process pool for OCR with content-hash caching and in-flight deduplication."""
+
+    def __init__(self, max_workers: Optional[int] = None, cache: Optional[OCRResultCache] = None,
+                 timeout: Optional[float] = None, max_dimension: Optional[int] = None, ocr_fn=ocr_image):
+        """
+        Initialize the OCR worker pool.
+
+        Args:
+            max_workers: OCR processes (WHATSAPP_OCR_WORKERS)
+            cache: Result cache; defaults to the on-disk cache
+            timeout: Seconds to wait for one image (WHATSAPP_OCR_TIMEOUT)
+            max_dimension: Longest image side after downscaling (WHATSAPP_OCR_MAX_DIMENSION)
+            ocr_fn: Picklable function run in the workers
+        """
+        self.max_workers = max_workers or int(os.getenv("WHATSAPP_OCR_WORKERS", "2"))
+        self.cache = cache or OCRResultCache()
+        self.timeout = timeout or float(os.getenv("WHATSAPP_OCR_TIMEOUT", "30"))
+        self.max_dimension = max_dimension or int(os.getenv("WHATSAPP_OCR_MAX_DIMENSION", "2000"))
+        self.ocr_fn = ocr_fn
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight: Dict[tuple, asyncio.Task] = {}
+        self._queued = 0
+        self._timings = deque(maxlen=200)
+
+        self.metrics = {
+            "requests": 0,
+            "cache_hits": 0,
+            "deduplicated": 0,
+            "processed": 0,
+            "timeouts": 0,
+            "errors": 0
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def _record(self, result: Dict[str, Any], queued_at: float):
+        self.metrics["processed"] += 1
+        self._timings.append({
+            "ocr_time": result.get("ocr_time", 0.0),
+            "total_time": time.perf_counter() - queued_at
+        })
+
+    async def _process(self, image_bytes: bytes, digest: str, language: str) -> Dict[str, Any]:
+        cached = await asyncio.to_thread(self.cache.get, digest, language)
+        if cached is not None:
+            self.metrics["cache_hits"] += 1
+            return {**cached, "cached": True}
+
+        loop = asyncio.get_running_loop()
+        queued_at = time.perf_counter()
+        self._queued += 1
+        try:
+            job = loop.run_in_executor(self._get_executor(), self.ocr_fn, image_bytes, language, self.max_dimension)
+            result = await asyncio.wait_for(job, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.metrics["timeouts"] += 1
+            raise
+        except Exception:
+            self.metrics["errors"] += 1
+            raise
+        finally:
+            self._queued -= 1
+        self._record(result, queued_at)
+        # SQLite writes stay off the event loop like the OCR itself
+        await asyncio.to_thread(self.cache.set, digest, language, result)
+        return {**result, "cached": False}
+
+    async def ocr(self, image_bytes: bytes, language: str = "eng") -> Dict[str, Any]:
+        """
+        OCR an image in the pool, serving repeats from the cache.
+
+        Concurrent requests for the same image wait on the same job. The job is
+        registered before the cache lookup, so a request that arrives while the
+        lookup is still running joins it instead of starting a second OCR.
+
+        Returns:
+            OCR result with content_hash and a cached flag
+        """
+        self.metrics["requests"] += 1
+        digest = content_hash(image_bytes)
+        key = (digest, language)
+
+        task = self._in_flight.get(key)
+        shared = task is not None
+        if shared:
+            self.metrics["deduplicated"] += 1
+        else:
+            task = asyncio.ensure_future(self._process(image_bytes, digest, language))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        result = await asyncio.shield(task)
+        return {**result, "content_hash": digest, "cached": shared or result["cached"]}
+
+    def ocr_sync(self, image_bytes: bytes, language: str = "eng") -> Dict[str, Any]:
+        """OCR an image in the calling thread, still going through the cache."""
+        self.metrics["requests"] += 1
+        digest = content_hash(image_bytes)
+        cached = self.cache.get(digest, language)
+        if cached is not None:
+            self.metrics["cache_hits"] += 1
+            return {**cached, "content_hash": digest, "cached": True}
+
+        queued_at = time.perf_counter()
+        result = self.ocr_fn(image_bytes, language, self.max_dimension)
+        self._record(result, queued_at)
+        self.cache.set(digest, language, result)
+        return {**result, "content_hash": digest, "cached": False}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get queue depth, per-image timings and cache counters."""
+        ocr_times = [t["ocr_time"] for t in self._timings]
+        total_times = [t["total_time"] for t in self._timings]
+        return {
+            **self.metrics,
+            "queue_depth": self._queued,
+            "in_flight": len(self._in_flight),
+            "workers": self.max_workers,
+            "avg_ocr_time": statistics.mean(ocr_times) if ocr_times else 0.0,
+            "avg_total_time": statistics.mean(total_times) if total_times else 0.0,
+            "max_total_time": max(total_times) if total_times else 0.0,
+            "last_timings": list(self._timings)[-10:]
+        }
+
+    def shutdown(self):
+        """Stop the OCR worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
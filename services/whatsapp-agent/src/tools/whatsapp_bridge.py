@@ -9,6 +9,27 @@ will be added in future phases following ADR-0019 local-only constraints.
 import httpx
 from typing import Dict, Any, Optional, List
 from kenny_agent.base_tool import BaseTool
+from kenny_agent.bridge_client import get_bridge_client
+
+# Read timeouts per bridge endpoint
+ENDPOINT_TIMEOUTS = {
+    "/v1/whatsapp/search": 30.0,
+    "/v1/whatsapp/messages": 30.0,
+    "/v1/whatsapp/message/*": 30.0
+}
+
+
+def index_record(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a bridge WhatsApp message to a message index record."""
+    return {
+        "id": message.get("id"),
+        "thread_id": message.get("chat_id"),
+        "sender": message.get("from") or "",
+        "recipients": [message["to"]] if message.get("to") else [],
+        "body": message.get("content"),
+        "timestamp": message.get("timestamp"),
+        "payload": message
+    }
 
 
 class WhatsAppBridgeTool(BaseTool):
@@ -44,6 +65,7 @@ class WhatsAppBridgeTool(BaseTool):
         if norm.endswith('/bridge'):
             norm = norm[:-len('/bridge')]
         self.bridge_url = norm
+        self.client = get_bridge_client(norm, ENDPOINT_TIMEOUTS)
     
     def execute(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -66,44 +88,79 @@ class WhatsAppBridgeTool(BaseTool):
         else:
             raise ValueError(f"Unknown operation: {operation}")
     
+    async def execute_async(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute the WhatsApp bridge operation over the shared async bridge client.
+        
+        Args:
+            parameters: Operation parameters
+        
+        Returns:
+            Result of the operation
+        """
+        operation = parameters.get("operation")
+        
+        if operation == "search":
+            query = parameters.get("query", "")
+            try:
+                data = await self.client.get_json(
+                    "/v1/whatsapp/search", params={"query": query, **self._filter_params(parameters)}
+                )
+                messages = data.get("messages", []) if isinstance(data, dict) else data
+                return {"operation": "search", "query": query, "results": messages, "count": len(messages)}
+            except (httpx.RequestError, httpx.HTTPStatusError) as e:
+                print(f"[whatsapp_bridge] Error: {e}")
+                return self._get_mock_messages(parameters)
+        elif operation == "list":
+            try:
+                data = await self.client.get_json("/v1/whatsapp/messages", params=self._filter_params(parameters))
+                messages = data.get("messages", []) if isinstance(data, dict) else data
+                return {"operation": "list", "results": messages, "count": len(messages)}
+            except (httpx.RequestError, httpx.HTTPStatusError) as e:
+                print(f"[whatsapp_bridge] Error: {e}")
+                return self._get_mock_messages(parameters)
+        elif operation == "read":
+            message_id = parameters.get("message_id")
+            if not message_id:
+                raise ValueError("message_id is required for read operation")
+            try:
+                data = await self.client.get_json(f"/v1/whatsapp/message/{message_id}")
+                return {"operation": "read", "message_id": message_id, "message": data}
+            except (httpx.RequestError, httpx.HTTPStatusError) as e:
+                print(f"[whatsapp_bridge] Error: {e}")
+                return self._get_mock_message(message_id)
+        else:
+            raise ValueError(f"Unknown operation: {operation}")
+    
+    def get_client_metrics(self) -> Dict[str, Any]:
+        """Get metrics of the shared bridge client."""
+        return self.client.get_metrics()
+    
+    def _filter_params(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the limit/contact/chat_id/since query parameters."""
+        query_params = {"limit": parameters.get("limit", 20)}
+        for key in ("contact", "chat_id", "since"):
+            if parameters.get(key):
+                query_params[key] = parameters[key]
+        return query_params
+    
     def _search_messages(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Search WhatsApp messages."""
         query = parameters.get("query", "")
-        contact = parameters.get("contact")
-        chat_id = parameters.get("chat_id")
-        limit = parameters.get("limit", 20)
-        since = parameters.get("since")
-        
-        # Build query parameters
-        query_params = {
-            "query": query,
-            "limit": limit
-        }
-        if contact:
-            query_params["contact"] = contact
-        if chat_id:
-            query_params["chat_id"] = chat_id
-        if since:
-            query_params["since"] = since
+        query_params = {"query": query, **self._filter_params(parameters)}
         
         try:
             # Note: This endpoint doesn't exist yet in the bridge
             # This is a skeleton implementation for the foundation
-            url = f"{self.bridge_url}/v1/whatsapp/search"
-            print(f"[whatsapp_bridge] GET {url} params={query_params}")
-            
-            with httpx.Client(trust_env=False, http2=False, timeout=httpx.Timeout(connect=2.0, read=30.0, write=5.0, pool=3.0)) as client:
-                response = client.get(url, params=query_params, headers={"Connection": "close"}, follow_redirects=False)
-                response.raise_for_status()
-                
-                data = response.json()
-                messages = data.get("messages", []) if isinstance(data, dict) else data
-                return {
-                    "operation": "search",
-                    "query": query,
-                    "results": messages,
-                    "count": len(messages)
-                }
+            print(f"[whatsapp_bridge] GET {self.bridge_url}/v1/whatsapp/search params={query_params}")
+            data = self.client.get_json_sync("/v1/whatsapp/search", params=query_params)
+            messages = data.get("messages", []) if isinstance(data, dict) else data
+            return {
+                "operation": "search",
+                "query": query,
+                "results": messages,
+                "count": len(messages)
+            }
                 
         except (httpx.RequestError, httpx.HTTPStatusError) as e:
             print(f"[whatsapp_bridge] Error: {e}")
@@ -112,37 +169,19 @@ class WhatsAppBridgeTool(BaseTool):
     
     def _list_messages(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """List recent WhatsApp messages."""
-        contact = parameters.get("contact")
-        chat_id = parameters.get("chat_id")
-        limit = parameters.get("limit", 20)
-        since = parameters.get("since")
-        
-        # Build query parameters
-        query_params = {"limit": limit}
-        if contact:
-            query_params["contact"] = contact
-        if chat_id:
-            query_params["chat_id"] = chat_id
-        if since:
-            query_params["since"] = since
+        query_params = self._filter_params(parameters)
         
         try:
             # Note: This endpoint doesn't exist yet in the bridge
             # This is a skeleton implementation for the foundation
-            url = f"{self.bridge_url}/v1/whatsapp/messages"
-            print(f"[whatsapp_bridge] GET {url} params={query_params}")
-            
-            with httpx.Client(trust_env=False, http2=False, timeout=httpx.Timeout(connect=2.0, read=30.0, write=5.0, pool=3.0)) as client:
-                response = client.get(url, params=query_params, headers={"Connection": "close"}, follow_redirects=False)
-                response.raise_for_status()
-                
-                data = response.json()
-                messages = data.get("messages", []) if isinstance(data, dict) else data
-                return {
-                    "operation": "list",
-                    "results": messages,
-                    "count": len(messages)
-                }
+            print(f"[whatsapp_bridge] GET {self.bridge_url}/v1/whatsapp/messages params={query_params}")
+            data = self.client.get_json_sync("/v1/whatsapp/messages", params=query_params)
+            messages = data.get("messages", []) if isinstance(data, dict) else data
+            return {
+                "operation": "list",
+                "results": messages,
+                "count": len(messages)
+            }
                 
         except (httpx.RequestError, httpx.HTTPStatusError) as e:
             print(f"[whatsapp_bridge] Error: {e}")
@@ -158,36 +197,34 @@ class WhatsAppBridgeTool(BaseTool):
         try:
             # Note: This endpoint doesn't exist yet in the bridge
             # This is a skeleton implementation for the foundation
-            url = f"{self.bridge_url}/v1/whatsapp/message/{message_id}"
-            print(f"[whatsapp_bridge] GET {url}")
-            
-            with httpx.Client(trust_env=False, http2=False, timeout=httpx.Timeout(connect=2.0, read=30.0, write=5.0, pool=3.0)) as client:
-                response = client.get(url, headers={"Connection": "close"}, follow_redirects=False)
-                response.raise_for_status()
-                
-                data = response.json()
-                return {
-                    "operation": "read",
-                    "message_id": message_id,
-                    "message": data
-                }
+            print(f"[whatsapp_bridge] GET {self.bridge_url}/v1/whatsapp/message/{message_id}")
+            data = self.client.get_json_sync(f"/v1/whatsapp/message/{message_id}")
+            return {
+                "operation": "read",
+                "message_id": message_id,
+                "message": data
+            }
                 
         except (httpx.RequestError, httpx.HTTPStatusError) as e:
             print(f"[whatsapp_bridge] Error: {e}")
             # Fallback to mock message
-            return {
-                "operation": "read",
-                "message_id": message_id,
-                "message": {
-                    "id": message_id,
-                    "chat_id": "mock_chat",
-                    "from": "Mock Contact",
-                    "content": "This is a mock WhatsApp message",
-                    "timestamp": "2025-08-15T10:00:00Z",
-                    "message_type": "text",
-                    "has_media": False
-                }
+            return self._get_mock_message(message_id)
+    
+    def _get_mock_message(self, message_id: str) -> Dict[str, Any]:
+        """Generate a mock WhatsApp message for testing foundation."""
+        return {
+            "operation": "read",
+            "message_id": message_id,
+            "message": {
+                "id": message_id,
+                "chat_id": "mock_chat",
+                "from": "Mock Contact",
+                "content": "This is a mock WhatsApp message",
+                "timestamp": "2025-08-15T10:00:00Z",
+                "message_type": "text",
+                "has_media": False
             }
+        }
     
     def _get_mock_messages(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Generate mock WhatsApp messages for testing foundation."""
@@ -9,6 +9,9 @@ import pytest
 import sys
 import os
 import asyncio
+import base64
+import threading
+import time
 from unittest.mock import Mock, patch
 
 # Add parent directory to path for imports
@@ -16,6 +19,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.agent import WhatsAppAgent
 from src.tools.image_processor import LocalImageProcessor
+from src.tools.ocr_pool import OCRWorkerPool, OCRResultCache
 from src.handlers.search import SearchCapabilityHandler
 from src.handlers.read import ReadCapabilityHandler
 from src.handlers.propose_reply import ProposeReplyCapabilityHandler
@@ -25,8 +29,9 @@ class TestWhatsAppAgentIntegration:
     """Integration tests for WhatsApp Agent."""
     
     @pytest.fixture
-    def agent(self):
+    def agent(self, tmp_path, monkeypatch):
         """Create WhatsApp Agent instance for testing."""
+        monkeypatch.setenv("KENNY_MESSAGE_INDEX_PATH", str(tmp_path / "message_index.db"))
         return WhatsAppAgent()
     
     @pytest.fixture
@@ -90,6 +95,39 @@ class TestWhatsAppAgentIntegration:
             for field in required_fields:
                 assert field in message, f"Missing field in message: {field}"
     
+    @pytest.mark.asyncio
+    async def test_search_answers_from_message_index(self, agent):
+        """Test that search answers from the local index once WhatsApp has been synced."""
+        search_handler = agent.capabilities["messages.search"]
+        message = {
+            "id": "wa-1",
+            "chat_id": "chat-sarah",
+            "from": "15551234567@s.whatsapp.net",
+            "to": "Me",
+            "content": "Offsite venue is booked",
+            "timestamp": "2025-08-15T10:00:00+00:00",
+            "message_type": "text",
+            "has_media": False
+        }
+        
+        async def fetch(parameters):
+            return {"operation": "list", "results": [message], "count": 1}
+        
+        with patch.object(agent.tools["whatsapp_bridge"], "execute_async", side_effect=fetch) as bridge:
+            assert await agent.message_index_sync.sync_once() == 1
+            bridge.reset_mock()
+            
+            by_topic = await search_handler.execute({"query": "offsite"})
+            by_contact = await search_handler.execute({"contact": "+1 (555) 123-4567"})
+            
+            assert by_topic == {"results": [message], "count": 1}
+            assert by_contact == {"results": [message], "count": 1}
+            bridge.assert_not_called()
+            
+            # Nothing indexed matches, so the bridge is asked
+            await search_handler.execute({"query": "dinner"})
+            bridge.assert_called_once()
+    
     @pytest.mark.asyncio
     async def test_chats_read_capability(self, agent):
         """Test chats.read capability with media processing."""
@@ -261,5 +299,135 @@ class TestWhatsAppAgentIntegration:
             assert "no-egress" in capability["safety_annotations"]
 
 
+
+def fake_ocr(image_bytes, language, max_dimension):
+    """Stand-in for tesseract that runs in the OCR worker processes."""
+    time.sleep(0.2)
+    text = image_bytes.decode()
+    return {"text": text, "confidence": 0.9, "word_count": len(text.split()),
+            "width": 10, "height": 10, "ocr_time": 0.2}
+
+
+class TestOCRWorkerPool:
+    """Test off-loop OCR, the content-hash cache and queue metrics."""
+    
+    @pytest.fixture
+    def pool(self, tmp_path):
+        pool = OCRWorkerPool(max_workers=2, cache=OCRResultCache(str(tmp_path / "ocr.db")), ocr_fn=fake_ocr)
+        yield pool
+        pool.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_same_image_is_ocrd_once(self, pool, tmp_path):
+        """Concurrent and repeated requests for one image share a single OCR run."""
+        results = await asyncio.gather(*[pool.ocr(b"forwarded meme") for _ in range(3)], pool.ocr(b"other"))
+        again = await pool.ocr(b"forwarded meme")
+        
+        assert [r["text"] for r in results] == ["forwarded meme"] * 3 + ["other"]
+        assert again["cached"] and again["content_hash"] == results[0]["content_hash"]
+        metrics = pool.get_metrics()
+        assert metrics["processed"] == 2
+        assert metrics["deduplicated"] == 2
+        assert metrics["cache_hits"] == 1
+        
+        # The cache outlives the pool
+        restarted = OCRWorkerPool(cache=OCRResultCache(str(tmp_path / "ocr.db")), ocr_fn=fake_ocr)
+        assert (await restarted.ocr(b"other"))["cached"]
+        assert restarted.get_metrics()["processed"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_ocr_does_not_block_event_loop(self, pool):
+        """The event loop keeps running while an image is being OCR'd."""
+        task = asyncio.create_task(pool.ocr(b"screenshot"))
+        ticks = 0
+        depths = set()
+        while not task.done():
+            await asyncio.sleep(0.01)
+            depths.add(pool.get_metrics()["queue_depth"])
+            ticks += 1
+        
+        assert ticks >= 5
+        assert 1 in depths
+        metrics = pool.get_metrics()
+        assert metrics["queue_depth"] == 0
+        assert metrics["last_timings"][0]["total_time"] >= 0.2
+    
+    @pytest.mark.asyncio
+    async def test_cache_is_read_and_written_off_the_event_loop(self, tmp_path):
+        """SQLite cache lookups and writes run in worker threads."""
+        loop_thread = threading.get_ident()
+        calls = []
+        
+        class RecordingCache(OCRResultCache):
+            def get(self, digest, language):
+                calls.append(("get", threading.get_ident()))
+                return super().get(digest, language)
+            
+            def set(self, digest, language, result):
+                calls.append(("set", threading.get_ident()))
+                super().set(digest, language, result)
+        
+        pool = OCRWorkerPool(max_workers=1, cache=RecordingCache(str(tmp_path / "ocr.db")), ocr_fn=fake_ocr)
+        try:
+            await pool.ocr(b"receipt")
+            assert (await pool.ocr(b"receipt"))["cached"]
+        finally:
+            pool.shutdown()
+        
+        assert [name for name, _ in calls] == ["get", "set", "get"]
+        assert all(thread != loop_thread for _, thread in calls)
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_during_cache_lookup_joins_the_job(self, tmp_path):
+        """A request arriving while the first one's cache lookup runs does not OCR again."""
+        delays = [0.1, 1.0]
+        
+        class SlowCache(OCRResultCache):
+            def get(self, digest, language):
+                # A later lookup misses, then returns only after the first OCR has finished
+                cached = super().get(digest, language)
+                time.sleep(delays.pop(0) if delays else 0)
+                return cached
+        
+        pool = OCRWorkerPool(max_workers=2, cache=SlowCache(str(tmp_path / "ocr.db")), ocr_fn=fake_ocr)
+        try:
+            first = asyncio.create_task(pool.ocr(b"boarding pass"))
+            await asyncio.sleep(0.02)
+            second = asyncio.create_task(pool.ocr(b"boarding pass"))
+            results = await asyncio.gather(first, second)
+        finally:
+            pool.shutdown()
+        
+        assert [r["text"] for r in results] == ["boarding pass"] * 2
+        assert not results[0]["cached"] and results[1]["cached"]
+        metrics = pool.get_metrics()
+        assert metrics["processed"] == 1
+        assert metrics["deduplicated"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_image_processor_uses_pool(self, pool):
+        """execute_async routes OCR through the worker pool and its cache."""
+        processor = LocalImageProcessor(ocr_pool=pool)
+        processor.tesseract_available = processor.pil_available = True
+        parameters = {"operation": "ocr", "image_data": base64.b64encode(b"meeting at 5").decode()}
+        
+        first = await processor.execute_async(parameters)
+        second = processor.execute(parameters)
+        
+        assert first["text"] == second["text"] == "meeting at 5"
+        assert not first["cached"] and second["cached"]
+        assert first["local_only"]
+        assert processor.get_ocr_metrics()["processed"] == 1
+    
+    def test_prepare_image_downscales_to_grayscale(self):
+        """Pre-processing converts to grayscale and caps the longest side."""
+        Image = pytest.importorskip("PIL.Image")
+        from src.tools.ocr_pool import prepare_image
+        
+        prepared = prepare_image(Image.new("RGB", (4000, 1000)), 2000)
+        assert prepared.mode == "L"
+        assert prepared.size == (2000, 500)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file